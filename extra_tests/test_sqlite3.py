@@ -391,3 +391,71 @@ def test_description_delete():
         ("x", None, None, None, None, None, None),
         ("y", None, None, None, None, None, None),
     )
+
+
+def test_fetchmany_fetchall_batches(con):
+    cursor = con.cursor()
+    cursor.execute("create table foo (x int, y text)")
+    cursor.executemany("insert into foo values (?, ?)",
+                       [(i, str(i)) for i in range(10)])
+    cursor.execute("select x, y from foo order by x")
+    assert cursor.fetchone() == (0, u"0")
+    assert cursor.fetchmany(3) == [(1, u"1"), (2, u"2"), (3, u"3")]
+    cursor.arraysize = 2
+    assert cursor.fetchmany() == [(4, u"4"), (5, u"5")]
+    assert cursor.fetchall() == [(i, str(i)) for i in range(6, 10)]
+    assert cursor.fetchall() == []
+    assert cursor.fetchmany(5) == []
+    cursor.execute("select x from foo where x < 3 order by x")
+    cursor.row_factory = lambda cur, row: row[0] * 10
+    assert cursor.fetchall() == [0, 10, 20]
+
+def test_fetchall_converters():
+    con = _sqlite3.connect(":memory:", detect_types=_sqlite3.PARSE_DECLTYPES)
+    _sqlite3.register_converter("POINT", lambda s: tuple(map(int, s.split(b","))))
+    try:
+        con.execute("create table foo (p point, n int)")
+        con.executemany("insert into foo values (?, ?)",
+                        [("1,2", 1), (None, 2), ("5,6", None)])
+        rows = con.execute("select p, n from foo order by rowid").fetchall()
+        assert rows == [((1, 2), 1), (None, 2), ((5, 6), None)]
+    finally:
+        del _sqlite3.converters["POINT"]
+        con.close()
+
+def test_text_factory_changed_while_fetching(con):
+    con.execute("create table foo (x text)")
+    con.executemany("insert into foo values (?)", [("a",), ("b",), ("c",)])
+    cursor = con.execute("select x from foo order by x")
+    assert type(cursor.fetchone()[0]) is unicode
+    # the next row is already fetched, but not the one after it
+    con.text_factory = str
+    rows = cursor.fetchall()
+    assert rows == [(u"b",), ("c",)]
+    assert type(rows[1][0]) is str
+
+@pypy_only
+def test_statement_cache_info():
+    con = _sqlite3.connect(":memory:", cached_statements=2)
+    info = con.statement_cache_info()
+    assert info == (0, 0, 2, 0)
+    def run(sql):
+        return con.execute(sql).fetchall()
+    run("select 1")
+    run("select 1")
+    run("select 2")
+    info = con.statement_cache_info()
+    assert (info.hits, info.misses, info.maxsize, info.currsize) == (1, 2, 2, 2)
+    # "select 1" is the least recently used statement and gets evicted
+    run("select 2")
+    run("select 3")
+    run("select 2")
+    assert con.statement_cache_info() == (3, 3, 2, 2)
+    run("select 1")
+    assert con.statement_cache_info() == (3, 4, 2, 2)
+    # a statement still in use by a cursor is not shared
+    cursor = con.execute("select 1")
+    run("select 1")
+    assert con.statement_cache_info() == (4, 5, 2, 2)
+    assert cursor.fetchall() == [(1,)]
+    con.close()
@@ -206,6 +206,17 @@ class JSONEncoder(object):
         '{"foo": ["bar", "baz"]}'
 
         """
+        if self.ensure_ascii and self.encoding == 'utf-8':
+            encode = self.__get_fast_encode()
+            if encode is not None:
+                if self.indent is None:
+                    indent = -1
+                else:
+                    indent = self.indent
+                return encode(o, self.default, self.sort_keys,
+                              self.skipkeys, self.allow_nan,
+                              self.check_circular, indent,
+                              self.item_separator, self.key_separator)
         if self.check_circular:
             markers = {}
         else:
@@ -217,6 +228,17 @@ class JSONEncoder(object):
         self.__encode(o, markers, builder, 0)
         return builder.build()
 
+    def __get_fast_encode(self):
+        # the interp-level encoder in _pypyjson only supports ascii output
+        # with str separators and an integer indent
+        if (_pypyjson_encode is None or
+                type(self.item_separator) is not str or
+                type(self.key_separator) is not str or
+                (self.indent is not None and
+                 (type(self.indent) is not int or self.indent < 0))):
+            return None
+        return _pypyjson_encode
+
     def __emit_indent(self, builder, _current_indent_level):
         if self.indent is not None:
             _current_indent_level += 1
@@ -536,3 +558,7 @@ try:
     from _pypyjson import raw_encode_basestring_ascii
 except ImportError:
     pass
+try:
+    from _pypyjson import encode as _pypyjson_encode
+except ImportError:
+    _pypyjson_encode = None
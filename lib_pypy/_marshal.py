@@ -689,3 +689,25 @@ def dumps(x, version=version):
 def loads(s):
     um = _FastUnmarshaller(s)
     return um.load()
+
+@builtinify
+def loads_many(s, offset=0, count=-1):
+    """loads_many(string[, offset[, count]]) -> (values, offsets)
+
+Convert a string or buffer containing several marshalled values one
+after the other, starting at 'offset', back to a list of values.  At
+most 'count' values are loaded if 'count' is not negative.  'offsets'
+is the list of the positions where each value starts, followed by the
+position just after the last value."""
+    if not 0 <= offset <= len(s):
+        raise ValueError("offset out of range")
+    um = _FastUnmarshaller(s)
+    um.bufpos = offset
+    values = []
+    offsets = [offset]
+    while um.bufpos < len(s) and count != 0:
+        um._stringtable = []
+        values.append(um.load())
+        offsets.append(um.bufpos)
+        count -= 1
+    return values, offsets
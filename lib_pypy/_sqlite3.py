@@ -23,7 +23,7 @@
 #
 # Note: This software has been modified for use in PyPy.
 
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
 from functools import wraps
 import datetime
 import string
@@ -173,26 +173,46 @@ else:
     OptimizedUnicode = _unicode_text_factory
 
 
+_StatementCacheInfo = namedtuple('StatementCacheInfo',
+                                 ['hits', 'misses', 'maxsize', 'currsize'])
+
+
 class _StatementCache(object):
+    """A bounded cache of prepared statements, keyed by the SQL text.
+    The least recently used statement is evicted when it is full."""
+
     def __init__(self, connection, maxcount):
         self.connection = connection
         self.maxcount = maxcount
         self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
 
     def get(self, sql):
         try:
-            stat = self.cache[sql]
+            stat = self.cache.pop(sql)
         except KeyError:
+            self.misses += 1
             stat = Statement(self.connection, sql)
-            self.cache[sql] = stat
-            if len(self.cache) > self.maxcount:
-                self.cache.popitem(0)
+            if len(self.cache) >= self.maxcount:
+                if not self.cache:
+                    return stat
+                self.cache.popitem(last=False)
         else:
             if stat._in_use:
+                # still used by another cursor: prepare a fresh copy
+                self.misses += 1
                 stat = Statement(self.connection, sql)
-                self.cache[sql] = stat
+            else:
+                self.hits += 1
+        # (re-)insert as the most recently used entry
+        self.cache[sql] = stat
         return stat
 
+    def info(self):
+        return _StatementCacheInfo(self.hits, self.misses, self.maxcount,
+                                   len(self.cache))
+
 
 class Connection(object):
     __initialized = False
@@ -657,6 +677,11 @@ class Connection(object):
             return self._in_transaction
         in_transaction = property(__get_in_transaction)
 
+    def statement_cache_info(self):
+        """Return a named tuple (hits, misses, maxsize, currsize) describing
+        the cache of prepared statements of this connection."""
+        return self._statement_cache.info()
+
     def __get_total_changes(self):
         self._check_closed()
         return _lib.sqlite3_total_changes(self._db)
@@ -682,6 +707,33 @@ class Connection(object):
                 raise OperationalError("Error enabling load extension")
 
 
+def _column_value(statement, i, text_factory):
+    typ = _lib.sqlite3_column_type(statement, i)
+    if typ == _lib.SQLITE_NULL:
+        return None
+    elif typ == _lib.SQLITE_INTEGER:
+        return int(_lib.sqlite3_column_int64(statement, i))
+    elif typ == _lib.SQLITE_FLOAT:
+        return _lib.sqlite3_column_double(statement, i)
+    elif typ == _lib.SQLITE_TEXT:
+        text = _lib.sqlite3_column_text(statement, i)
+        text_len = _lib.sqlite3_column_bytes(statement, i)
+        return text_factory(_ffi.buffer(text, text_len)[:])
+    else:
+        assert typ == _lib.SQLITE_BLOB
+        blob = _lib.sqlite3_column_blob(statement, i)
+        blob_len = _lib.sqlite3_column_bytes(statement, i)
+        return _BLOB_TYPE(_ffi.buffer(blob, blob_len)[:])
+
+
+def _column_converted(statement, i, converter):
+    blob = _lib.sqlite3_column_blob(statement, i)
+    if not blob:
+        return None
+    blob_len = _lib.sqlite3_column_bytes(statement, i)
+    return converter(_ffi.buffer(blob, blob_len)[:])
+
+
 class Cursor(object):
     __initialized = False
     __statement = None
@@ -737,15 +789,19 @@ class Cursor(object):
                 "Cursor needed to be reset because of commit/rollback "
                 "and can no longer be fetched from.")
 
-    def __build_row_cast_map(self):
-        if not self.__connection._detect_types:
-            return
-        self.__row_cast_map = []
-        for i in xrange(_lib.sqlite3_column_count(self.__statement._statement)):
+    def __build_row_readers(self):
+        # The reader of every column is chosen once per statement execution,
+        # so that fetching a row is a simple loop over the columns.  The
+        # generic reader gets None and uses the text_factory of the
+        # connection at the time the row is fetched, like CPython.
+        statement = self.__statement._statement
+        detect_types = self.__connection._detect_types
+        self.__row_readers = []
+        for i in xrange(_lib.sqlite3_column_count(statement)):
             converter = None
 
-            if self.__connection._detect_types & PARSE_COLNAMES:
-                colname = _lib.sqlite3_column_name(self.__statement._statement, i)
+            if detect_types & PARSE_COLNAMES:
+                colname = _lib.sqlite3_column_name(statement, i)
                 if colname:
                     colname = _ffi.string(colname).decode('utf-8')
                     type_start = -1
@@ -757,8 +813,8 @@ class Cursor(object):
                             key = colname[type_start:pos]
                             converter = converters[key.upper()]
 
-            if converter is None and self.__connection._detect_types & PARSE_DECLTYPES:
-                decltype = _lib.sqlite3_column_decltype(self.__statement._statement, i)
+            if converter is None and detect_types & PARSE_DECLTYPES:
+                decltype = _lib.sqlite3_column_decltype(statement, i)
                 if decltype:
                     decltype = _ffi.string(decltype).decode('utf-8')
                     # if multiple words, use first, eg.
@@ -768,46 +824,60 @@ class Cursor(object):
                         decltype = decltype[:decltype.index('(')]
                     converter = converters.get(decltype.upper(), None)
 
-            self.__row_cast_map.append(converter)
-
-    def __fetch_one_row(self):
-        num_cols = _lib.sqlite3_data_count(self.__statement._statement)
-        row = newlist_hint(num_cols)
-        for i in xrange(num_cols):
-            if self.__connection._detect_types:
-                converter = self.__row_cast_map[i]
-            else:
-                converter = None
-
             if converter is not None:
-                blob = _lib.sqlite3_column_blob(self.__statement._statement, i)
-                if not blob:
-                    val = None
-                else:
-                    blob_len = _lib.sqlite3_column_bytes(self.__statement._statement, i)
-                    val = _ffi.buffer(blob, blob_len)[:]
-                    val = converter(val)
+                self.__row_readers.append((_column_converted, converter))
             else:
-                typ = _lib.sqlite3_column_type(self.__statement._statement, i)
-                if typ == _lib.SQLITE_NULL:
-                    val = None
-                elif typ == _lib.SQLITE_INTEGER:
-                    val = _lib.sqlite3_column_int64(self.__statement._statement, i)
-                    val = int(val)
-                elif typ == _lib.SQLITE_FLOAT:
-                    val = _lib.sqlite3_column_double(self.__statement._statement, i)
-                elif typ == _lib.SQLITE_TEXT:
-                    text = _lib.sqlite3_column_text(self.__statement._statement, i)
-                    text_len = _lib.sqlite3_column_bytes(self.__statement._statement, i)
-                    val = _ffi.buffer(text, text_len)[:]
-                    val = self.__connection.text_factory(val)
-                elif typ == _lib.SQLITE_BLOB:
-                    blob = _lib.sqlite3_column_blob(self.__statement._statement, i)
-                    blob_len = _lib.sqlite3_column_bytes(self.__statement._statement, i)
-                    val = _BLOB_TYPE(_ffi.buffer(blob, blob_len)[:])
-            row.append(val)
+                self.__row_readers.append((_column_value, None))
+
+    def __fetch_one_row(self):
+        statement = self.__statement._statement
+        readers = self.__row_readers
+        text_factory = self.__connection.text_factory
+        row = newlist_hint(len(readers))
+        i = 0
+        for reader, arg in readers:
+            if arg is None:
+                arg = text_factory
+            row.append(reader(statement, i, arg))
+            i += 1
         return tuple(row)
 
+    def __fetch_rows(self, size):
+        # Fetch up to 'size' rows (all of them if 'size' is not positive)
+        # in a single loop, without going through next() for every row.
+        self.__check_cursor()
+        self.__check_reset()
+        if size > 0:
+            rows = newlist_hint(size)
+        else:
+            rows = []
+        if not self.__statement:
+            return rows
+        try:
+            next_row = self.__next_row
+        except AttributeError:
+            return rows
+        del self.__next_row
+
+        statement = self.__statement._statement
+        row_factory = self.row_factory
+        while True:
+            if row_factory is not None:
+                next_row = row_factory(self, next_row)
+            rows.append(next_row)
+
+            ret = _lib.sqlite3_step(statement)
+            if ret != _lib.SQLITE_ROW:
+                self.__statement._reset()
+                if ret != _lib.SQLITE_DONE:
+                    raise self.__connection._get_exception(ret)
+                break
+            next_row = self.__fetch_one_row()
+            if len(rows) == size:
+                self.__next_row = next_row
+                break
+        return rows
+
     def __execute(self, multiple, sql, many_params):
         self.__locked = True
         self._reset = False
@@ -861,7 +931,7 @@ class Cursor(object):
                 if ret == _lib.SQLITE_ROW:
                     if multiple:
                         raise ProgrammingError("executemany() can only execute DML statements.")
-                    self.__build_row_cast_map()
+                    self.__build_row_readers()
                     self.__next_row = self.__fetch_one_row()
                 elif ret == _lib.SQLITE_DONE:
                     if not multiple:
@@ -979,15 +1049,10 @@ class Cursor(object):
     def fetchmany(self, size=None):
         if size is None:
             size = self.arraysize
-        lst = []
-        for row in self:
-            lst.append(row)
-            if len(lst) == size:
-                break
-        return lst
+        return self.__fetch_rows(size)
 
     def fetchall(self):
-        return list(self)
+        return self.__fetch_rows(-1)
 
     def __get_connection(self):
         self.__check_cursor()
@@ -21,8 +21,16 @@ import time as _timemodule
 import math as _math
 import struct as _struct
 
-# for cpyext, use these as base classes
+# the base classes store the fields, and are used by cpyext too.  The
+# calendar computations and the ISO 8601 parsing are done at interp-level
 from __pypy__._pypydatetime import dateinterop, deltainterop, timeinterop
+from __pypy__._pypydatetime import (ymd2ord as _ymd2ord,
+                                    ord2ymd as _ord2ymd,
+                                    normalize_date as _normalize_date,
+                                    normalize_datetime as _normalize_datetime,
+                                    parse_isoformat_date,
+                                    parse_isoformat_time,
+                                    parse_isoformat_datetime)
 
 _SENTINEL = object()
 
@@ -46,6 +54,9 @@ _MAX_DELTA_DAYS = 999999999
 # and Reingold's "Calendrical Calculations", where it's the base calendar
 # for all computations.  See the book for algorithms for converting between
 # proleptic Gregorian ordinals and many other calendar systems.
+#
+# The conversions between (year, month, day) and ordinals are done by
+# __pypy__._pypydatetime, see interp_pypydatetime.py.
 
 _DAYS_IN_MONTH = [-1, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
 
@@ -60,48 +71,11 @@ def _is_leap(year):
     "year -> 1 if leap year, else 0."
     return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
 
-def _days_before_year(year):
-    "year -> number of days before January 1st of year."
-    y = year - 1
-    return y*365 + y//4 - y//100 + y//400
-
-def _days_in_month(year, month):
-    "year, month -> number of days in that month in that year."
-    assert 1 <= month <= 12, month
-    if month == 2 and _is_leap(year):
-        return 29
-    return _DAYS_IN_MONTH[month]
-
 def _days_before_month(year, month):
     "year, month -> number of days in year preceding first day of month."
     assert 1 <= month <= 12, 'month must be in 1..12'
     return _DAYS_BEFORE_MONTH[month] + (month > 2 and _is_leap(year))
 
-def _ymd2ord(year, month, day):
-    "year, month, day -> ordinal, considering 01-Jan-0001 as day 1."
-    assert 1 <= month <= 12, 'month must be in 1..12'
-    dim = _days_in_month(year, month)
-    assert 1 <= day <= dim, ('day must be in 1..%d' % dim)
-    return (_days_before_year(year) +
-            _days_before_month(year, month) +
-            day)
-
-_DI400Y = _days_before_year(401)    # number of days in 400 years
-_DI100Y = _days_before_year(101)    #    "    "   "   " 100   "
-_DI4Y   = _days_before_year(5)      #    "    "   "   "   4   "
-
-# A 4-year cycle has an extra leap day over what we'd get from pasting
-# together 4 single years.
-assert _DI4Y == 4 * 365 + 1
-
-# Similarly, a 400-year cycle has an extra leap day over what we'd get from
-# pasting together 4 100-year cycles.
-assert _DI400Y == 4 * _DI100Y + 1
-
-# OTOH, a 100-year cycle has one fewer leap day than we'd get from
-# pasting together 25 4-year cycles.
-assert _DI100Y == 25 * _DI4Y - 1
-
 _US_PER_US = 1
 _US_PER_MS = 1000
 _US_PER_SECOND = 1000000
@@ -111,68 +85,6 @@ _US_PER_HOUR = 3600000000
 _US_PER_DAY = 86400000000
 _US_PER_WEEK = 604800000000
 
-def _ord2ymd(n):
-    "ordinal -> (year, month, day), considering 01-Jan-0001 as day 1."
-
-    # n is a 1-based index, starting at 1-Jan-1.  The pattern of leap years
-    # repeats exactly every 400 years.  The basic strategy is to find the
-    # closest 400-year boundary at or before n, then work with the offset
-    # from that boundary to n.  Life is much clearer if we subtract 1 from
-    # n first -- then the values of n at 400-year boundaries are exactly
-    # those divisible by _DI400Y:
-    #
-    #     D  M   Y            n              n-1
-    #     -- --- ----        ----------     ----------------
-    #     31 Dec -400        -_DI400Y       -_DI400Y -1
-    #      1 Jan -399         -_DI400Y +1   -_DI400Y      400-year boundary
-    #     ...
-    #     30 Dec  000        -1             -2
-    #     31 Dec  000         0             -1
-    #      1 Jan  001         1              0            400-year boundary
-    #      2 Jan  001         2              1
-    #      3 Jan  001         3              2
-    #     ...
-    #     31 Dec  400         _DI400Y        _DI400Y -1
-    #      1 Jan  401         _DI400Y +1     _DI400Y      400-year boundary
-    n -= 1
-    n400, n = divmod(n, _DI400Y)
-    year = n400 * 400 + 1   # ..., -399, 1, 401, ...
-
-    # Now n is the (non-negative) offset, in days, from January 1 of year, to
-    # the desired date.  Now compute how many 100-year cycles precede n.
-    # Note that it's possible for n100 to equal 4!  In that case 4 full
-    # 100-year cycles precede the desired day, which implies the desired
-    # day is December 31 at the end of a 400-year cycle.
-    n100, n = divmod(n, _DI100Y)
-
-    # Now compute how many 4-year cycles precede it.
-    n4, n = divmod(n, _DI4Y)
-
-    # And now how many single years.  Again n1 can be 4, and again meaning
-    # that the desired day is December 31 at the end of the 4-year cycle.
-    n1, n = divmod(n, 365)
-
-    year += n100 * 100 + n4 * 4 + n1
-    if n1 == 4 or n100 == 4:
-        assert n == 0
-        return year-1, 12, 31
-
-    # Now the year is correct, and n is the offset from January 1.  We find
-    # the month via an estimate that's either exact or one too large.
-    leapyear = n1 == 3 and (n4 != 24 or n100 == 3)
-    assert leapyear == _is_leap(year)
-    month = (n + 50) >> 5
-    preceding = _DAYS_BEFORE_MONTH[month] + (month > 2 and leapyear)
-    if preceding > n:  # estimate is too large
-        month -= 1
-        preceding -= _DAYS_IN_MONTH[month] + (month == 2 and leapyear)
-    n -= preceding
-    assert 0 <= n < _days_in_month(year, month)
-
-    # Now the year and month are correct, and n is the offset from the
-    # start of that month:  we're done!
-    return year, month, n+1
-
 # Month and day names.  For localized versions, see the calendar module.
 _MONTHNAMES = [None, "Jan", "Feb", "Mar", "Apr", "May", "Jun",
                      "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
@@ -184,13 +96,6 @@ def _build_struct_time(y, m, d, hh, mm, ss, dstflag):
     dnum = _days_before_month(y, m) + d
     return _timemodule.struct_time((y, m, d, hh, mm, ss, wday, dnum, dstflag))
 
-def _format_time(hh, mm, ss, us):
-    # Skip trailing microseconds when us==0.
-    result = "%02d:%02d:%02d" % (hh, mm, ss)
-    if us:
-        result += ".%06d" % us
-    return result
-
 # Correctly substitute for %z and %Z escapes in strftime formats.
 def _wrap_strftime(object, format, timetuple):
     year = timetuple[0]
@@ -198,6 +103,10 @@ def _wrap_strftime(object, format, timetuple):
         raise ValueError("year=%d is before %d; the datetime strftime() "
                          "methods require year >= %d" %
                          (year, _MINYEARFMT, _MINYEARFMT))
+    if '%f' not in format and '%z' not in format and '%Z' not in format:
+        # nothing to replace
+        return _timemodule.strftime(format, timetuple)
+
     # Don't call utcoffset() or tzname() unless actually needed.
     freplace = None  # the string to use for %f
     zreplace = None  # the string to use for %z
@@ -285,51 +194,6 @@ def _check_utc_offset(name, offset):
         raise ValueError("%s()=%d, must be in -1439..1439" % (name, offset))
     return offset
 
-def _check_int_field(value):
-    if isinstance(value, int):
-        return int(value)
-    if not isinstance(value, float):
-        try:
-            value = value.__int__()
-        except AttributeError:
-            pass
-        else:
-            if isinstance(value, int):
-                return int(value)
-            elif isinstance(value, long):
-                return int(long(value))
-            raise TypeError('__int__ method should return an integer')
-        raise TypeError('an integer is required')
-    raise TypeError('integer argument expected, got float')
-
-def _check_date_fields(year, month, day):
-    year = _check_int_field(year)
-    month = _check_int_field(month)
-    day = _check_int_field(day)
-    if not MINYEAR <= year <= MAXYEAR:
-        raise ValueError('year must be in %d..%d' % (MINYEAR, MAXYEAR), year)
-    if not 1 <= month <= 12:
-        raise ValueError('month must be in 1..12', month)
-    dim = _days_in_month(year, month)
-    if not 1 <= day <= dim:
-        raise ValueError('day must be in 1..%d' % dim, day)
-    return year, month, day
-
-def _check_time_fields(hour, minute, second, microsecond):
-    hour = _check_int_field(hour)
-    minute = _check_int_field(minute)
-    second = _check_int_field(second)
-    microsecond = _check_int_field(microsecond)
-    if not 0 <= hour <= 23:
-        raise ValueError('hour must be in 0..23', hour)
-    if not 0 <= minute <= 59:
-        raise ValueError('minute must be in 0..59', minute)
-    if not 0 <= second <= 59:
-        raise ValueError('second must be in 0..59', second)
-    if not 0 <= microsecond <= 999999:
-        raise ValueError('microsecond must be in 0..999999', microsecond)
-    return hour, minute, second, microsecond
-
 def _check_tzinfo_arg(tz):
     if tz is not None and not isinstance(tz, tzinfo):
         raise TypeError("tzinfo argument must be None or of a tzinfo subclass")
@@ -362,62 +226,6 @@ def _cmperror(x, y):
     raise TypeError("can't compare '%s' to '%s'" % (
                     type(x).__name__, type(y).__name__))
 
-def _normalize_pair(hi, lo, factor):
-    if not 0 <= lo <= factor-1:
-        inc, lo = divmod(lo, factor)
-        hi += inc
-    return hi, lo
-
-def _normalize_datetime(y, m, d, hh, mm, ss, us, ignore_overflow=False):
-    # Normalize all the inputs, and store the normalized values.
-    ss, us = _normalize_pair(ss, us, 1000000)
-    mm, ss = _normalize_pair(mm, ss, 60)
-    hh, mm = _normalize_pair(hh, mm, 60)
-    d, hh = _normalize_pair(d, hh, 24)
-    y, m, d = _normalize_date(y, m, d, ignore_overflow)
-    return y, m, d, hh, mm, ss, us
-
-def _normalize_date(year, month, day, ignore_overflow=False):
-    # That was easy.  Now it gets muddy:  the proper range for day
-    # can't be determined without knowing the correct month and year,
-    # but if day is, e.g., plus or minus a million, the current month
-    # and year values make no sense (and may also be out of bounds
-    # themselves).
-    # Saying 12 months == 1 year should be non-controversial.
-    if not 1 <= month <= 12:
-        year, month = _normalize_pair(year, month-1, 12)
-        month += 1
-        assert 1 <= month <= 12
-
-    # Now only day can be out of bounds (year may also be out of bounds
-    # for a datetime object, but we don't care about that here).
-    # If day is out of bounds, what to do is arguable, but at least the
-    # method here is principled and explainable.
-    dim = _days_in_month(year, month)
-    if not 1 <= day <= dim:
-        # Move day-1 days from the first of the month.  First try to
-        # get off cheap if we're only one day out of range (adjustments
-        # for timezone alone can't be worse than that).
-        if day == 0:    # move back a day
-            month -= 1
-            if month > 0:
-                day = _days_in_month(year, month)
-            else:
-                year, month, day = year-1, 12, 31
-        elif day == dim + 1:    # move forward a day
-            month += 1
-            day = 1
-            if month > 12:
-                month = 1
-                year += 1
-        else:
-            ordinal = _ymd2ord(year, month, 1) + (day - 1)
-            year, month, day = _ord2ymd(ordinal)
-
-    if not ignore_overflow and not MINYEAR <= year <= MAXYEAR:
-        raise OverflowError("date value out of range")
-    return year, month, day
-
 def _accum(tag, sofar, num, factor, leftover):
     if isinstance(num, (int, long)):
         prod = num * factor
@@ -453,7 +261,7 @@ class timedelta(deltainterop):
     Representation: (days, seconds, microseconds).  Why?  Because I
     felt like it.
     """
-    __slots__ = '_days', '_seconds', '_microseconds', '_hashcode'
+    __slots__ = ()    # the fields are stored by deltainterop
 
     def __new__(cls, days=_SENTINEL, seconds=_SENTINEL, microseconds=_SENTINEL,
                 milliseconds=_SENTINEL, minutes=_SENTINEL, hours=_SENTINEL, weeks=_SENTINEL):
@@ -488,18 +296,8 @@ class timedelta(deltainterop):
 
     @classmethod
     def _create(cls, d, s, us, normalize):
-        if normalize:
-            s, us = _normalize_pair(s, us, 1000000)
-            d, s = _normalize_pair(d, s, 24*3600)
-
-        if not -_MAX_DELTA_DAYS <= d <= _MAX_DELTA_DAYS:
-            raise OverflowError("days=%d; must have magnitude <= %d" % (d, _MAX_DELTA_DAYS))
-
         self = deltainterop.__new__(cls)
-        self._days = d
-        self._seconds = s
-        self._microseconds = us
-        self._hashcode = -1
+        self._init_delta(d, s, us, normalize)
         return self
 
     def _to_microseconds(self):
@@ -649,11 +447,11 @@ class timedelta(deltainterop):
 
     def _cmp(self, other):
         assert isinstance(other, timedelta)
-        return _cmp(self._getstate(), other._getstate())
+        return self._cmp_fields(other)
 
     def __hash__(self):
         if self._hashcode == -1:
-            self._hashcode = hash(self._getstate())
+            self._hashcode = self._hash_fields()
         return self._hashcode
 
     def __nonzero__(self):
@@ -701,7 +499,7 @@ class date(dateinterop):
     Properties (readonly):
     year, month, day
     """
-    __slots__ = '_year', '_month', '_day', '_hashcode'
+    __slots__ = ()    # the fields are stored by dateinterop
 
     def __new__(cls, year, month=None, day=None):
         """Constructor.
@@ -715,14 +513,9 @@ class date(dateinterop):
             # Pickle support
             self = dateinterop.__new__(cls)
             self.__setstate(year)
-            self._hashcode = -1
             return self
-        year, month, day = _check_date_fields(year, month, day)
         self = dateinterop.__new__(cls)
-        self._year = year
-        self._month = month
-        self._day = day
-        self._hashcode = -1
+        self._init_date(year, month, day)
         return self
 
     # Additional constructors
@@ -749,6 +542,13 @@ class date(dateinterop):
         y, m, d = _ord2ymd(n)
         return cls(y, m, d)
 
+    @classmethod
+    def fromisoformat(cls, date_string):
+        """Construct a date from the output of date.isoformat()."""
+        if not isinstance(date_string, str):
+            raise TypeError('fromisoformat: argument must be str')
+        return cls(*parse_isoformat_date(date_string))
+
     # Conversions to string
 
     def __repr__(self):
@@ -802,7 +602,7 @@ class date(dateinterop):
         - http://www.w3.org/TR/NOTE-datetime
         - http://www.cl.cam.ac.uk/~mgk25/iso-time.html
         """
-        return "%04d-%02d-%02d" % (self._year, self._month, self._day)
+        return self._format_date()
 
     __str__ = isoformat
 
@@ -829,13 +629,7 @@ class date(dateinterop):
         return _build_struct_time(self._year, self._month, self._day,
                                   0, 0, 0, -1)
 
-    def toordinal(self):
-        """Return proleptic Gregorian ordinal for the year, month and day.
-
-        January 1 of year 1 is day 1.  Only the year, month and day values
-        contribute to the result.
-        """
-        return _ymd2ord(self._year, self._month, self._day)
+    # toordinal() is inherited from dateinterop
 
     def replace(self, year=None, month=None, day=None):
         """Return a new date with new values for the specified fields."""
@@ -899,14 +693,12 @@ class date(dateinterop):
 
     def _cmp(self, other):
         assert isinstance(other, date)
-        y, m, d = self._year, self._month, self._day
-        y2, m2, d2 = other._year, other._month, other._day
-        return _cmp((y, m, d), (y2, m2, d2))
+        return self._cmp_fields(other)
 
     def __hash__(self):
         "Hash."
         if self._hashcode == -1:
-            self._hashcode = hash(self._getstate())
+            self._hashcode = self._hash_fields()
         return self._hashcode
 
     # Computations
@@ -1067,6 +859,51 @@ class tzinfo(object):
 
 _tzinfo_class = tzinfo
 
+class _FixedOffset(tzinfo):
+    """Fixed offset in minutes east of UTC, used by fromisoformat()."""
+    __slots__ = '_minutes',
+
+    def __init__(self, minutes):
+        self._minutes = minutes
+
+    def utcoffset(self, dt):
+        return timedelta(minutes=self._minutes)
+
+    def dst(self, dt):
+        return timedelta(0)
+
+    def tzname(self, dt):
+        minutes = self._minutes
+        sign = '+'
+        if minutes < 0:
+            sign = '-'
+            minutes = -minutes
+        return 'UTC%s%02d:%02d' % (sign, minutes // 60, minutes % 60)
+
+    def __repr__(self):
+        return 'datetime._FixedOffset(%d)' % self._minutes
+
+    def __eq__(self, other):
+        if isinstance(other, _FixedOffset):
+            return self._minutes == other._minutes
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, _FixedOffset):
+            return self._minutes != other._minutes
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self._minutes)
+
+    def __getinitargs__(self):
+        return (self._minutes,)
+
+def _offset_tzinfo(offset):
+    if offset is None:
+        return None
+    return _FixedOffset(offset)
+
 class time(timeinterop):
     """Time with time zone.
 
@@ -1090,7 +927,7 @@ class time(timeinterop):
     Properties (readonly):
     hour, minute, second, microsecond, tzinfo
     """
-    __slots__ = '_hour', '_minute', '_second', '_microsecond', '_tzinfo', '_hashcode'
+    __slots__ = ()    # the fields are stored by timeinterop
 
     def __new__(cls, hour=0, minute=0, second=0, microsecond=0, tzinfo=None):
         """Constructor.
@@ -1105,20 +942,21 @@ class time(timeinterop):
             # Pickle support
             self = timeinterop.__new__(cls)
             self.__setstate(hour, minute or None)
-            self._hashcode = -1
             return self
-        hour, minute, second, microsecond = _check_time_fields(
-            hour, minute, second, microsecond)
-        _check_tzinfo_arg(tzinfo)
         self = timeinterop.__new__(cls)
-        self._hour = hour
-        self._minute = minute
-        self._second = second
-        self._microsecond = microsecond
+        self._init_time(hour, minute, second, microsecond)
+        _check_tzinfo_arg(tzinfo)
         self._tzinfo = tzinfo
-        self._hashcode = -1
         return self
 
+    @classmethod
+    def fromisoformat(cls, time_string):
+        """Construct a time from the output of time.isoformat()."""
+        if not isinstance(time_string, str):
+            raise TypeError('fromisoformat: argument must be str')
+        hh, mm, ss, us, offset = parse_isoformat_time(time_string)
+        return cls(hh, mm, ss, us, _offset_tzinfo(offset))
+
     # Read-only field accessors
     @property
     def hour(self):
@@ -1199,10 +1037,7 @@ class time(timeinterop):
             base_compare = myoff == otoff
 
         if base_compare:
-            return _cmp((self._hour, self._minute, self._second,
-                         self._microsecond),
-                        (other._hour, other._minute, other._second,
-                         other._microsecond))
+            return self._cmp_fields(other)
         if myoff is None or otoff is None:
             raise TypeError("can't compare offset-naive and offset-aware times")
         myhhmm = self._hour * 60 + self._minute - myoff
@@ -1215,7 +1050,7 @@ class time(timeinterop):
         if self._hashcode == -1:
             tzoff = self._utcoffset()
             if not tzoff:  # zero or None
-                self._hashcode = hash(self._getstate()[0])
+                self._hashcode = self._hash_fields()
             else:
                 h, m = divmod(self.hour * 60 + self.minute - tzoff, 60)
                 if 0 <= h < 24:
@@ -1262,8 +1097,7 @@ class time(timeinterop):
         This is 'HH:MM:SS.mmmmmm+zz:zz', or 'HH:MM:SS+zz:zz' if
         self.microsecond == 0.
         """
-        s = _format_time(self._hour, self._minute, self._second,
-                         self._microsecond)
+        s = self._format_time()
         tz = self._tzstr()
         if tz:
             s += tz
@@ -1407,7 +1241,7 @@ class datetime(date):
     The year, month and day arguments are required. tzinfo may be None, or an
     instance of a tzinfo subclass. The remaining arguments may be ints or longs.
     """
-    __slots__ = date.__slots__ + time.__slots__
+    __slots__ = ()    # the fields are stored by dateinterop
 
     def __new__(cls, year, month=None, day=None, hour=0, minute=0, second=0,
                 microsecond=0, tzinfo=None):
@@ -1416,27 +1250,16 @@ class datetime(date):
             # Pickle support
             self = dateinterop.__new__(cls)
             self.__setstate(year, month)
-            self._hashcode = -1
             return self
         elif isinstance(year, tuple) and len(year) == 7:
             # Used by internal functions where the arguments are guaranteed to
             # be valid.
             year, month, day, hour, minute, second, microsecond = year
-        else:
-            year, month, day = _check_date_fields(year, month, day)
-            hour, minute, second, microsecond = _check_time_fields(
-                hour, minute, second, microsecond)
-        _check_tzinfo_arg(tzinfo)
         self = dateinterop.__new__(cls)
-        self._year = year
-        self._month = month
-        self._day = day
-        self._hour = hour
-        self._minute = minute
-        self._second = second
-        self._microsecond = microsecond
+        self._init_datetime(year, month, day, hour, minute, second,
+                            microsecond)
+        _check_tzinfo_arg(tzinfo)
         self._tzinfo = tzinfo
-        self._hashcode = -1
         return self
 
     # Read-only field accessors
@@ -1513,6 +1336,14 @@ class datetime(date):
         t = _timemodule.time()
         return cls.utcfromtimestamp(t)
 
+    @classmethod
+    def fromisoformat(cls, date_string):
+        """Construct a datetime from the output of datetime.isoformat()."""
+        if not isinstance(date_string, str):
+            raise TypeError('fromisoformat: argument must be str')
+        fields = parse_isoformat_datetime(date_string)
+        return cls(fields[:7], tzinfo=_offset_tzinfo(fields[7]))
+
     @classmethod
     def combine(cls, date, time):
         "Construct a datetime from a given date and a given time."
@@ -1626,9 +1457,7 @@ class datetime(date):
         Optional argument sep specifies the separator between date and
         time, default 'T'.
         """
-        s = ("%04d-%02d-%02d%c" % (self._year, self._month, self._day, sep) +
-             _format_time(self._hour, self._minute, self._second,
-                          self._microsecond))
+        s = "%s%c%s" % (self._format_date(), sep, self._format_time())
         off = self._utcoffset()
         if off is not None:
             if off < 0:
@@ -1793,12 +1622,7 @@ class datetime(date):
             base_compare = myoff == otoff
 
         if base_compare:
-            return _cmp((self._year, self._month, self._day,
-                         self._hour, self._minute, self._second,
-                         self._microsecond),
-                        (other._year, other._month, other._day,
-                         other._hour, other._minute, other._second,
-                         other._microsecond))
+            return self._cmp_fields(other)
         if myoff is None or otoff is None:
             raise TypeError("can't compare offset-naive and offset-aware datetimes")
         # XXX What follows could be done more efficiently...
@@ -1853,7 +1677,7 @@ class datetime(date):
         if self._hashcode == -1:
             tzoff = self._utcoffset()
             if tzoff is None:
-                self._hashcode = hash(self._getstate()[0])
+                self._hashcode = self._hash_fields()
             else:
                 days = _ymd2ord(self.year, self.month, self.day)
                 seconds = self.hour * 3600 + (self.minute - tzoff) * 60 + self.second
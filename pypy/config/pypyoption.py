@@ -36,7 +36,7 @@ working_modules.update([
     "cStringIO", "thread", "itertools", "pyexpat", "array",
     "binascii", "_multiprocessing", '_warnings', "_collections",
     "_multibytecodec", "_continuation", "_cffi_backend",
-    "_csv", "_pypyjson", "_jitlog", "cpyext"
+    "_csv", "_pypyjson", "_pickle", "_jitlog", "cpyext"
     # "_hashlib", "crypt", "_cppyy", "micronumpy"
 ])
 
@@ -48,6 +48,8 @@ PYPY_IRC_TOPIC: if set to a non-empty value, print a random #pypy IRC
                topic at startup of interactive mode.
 PYPYLOG: If set to a non-empty value, enable logging.
 PYPY_DISABLE_JIT: if set to a non-empty value, disable JIT.
+PYPY_JIT_WARMUP_CACHE: file from which the JIT loads the loops to trace
+               early, and to which it saves them at exit.
 PYTHON_DISABLE_REMOTE_DEBUG: if set to a non-empty value, disable the remote debugging interface
 """
 
@@ -270,6 +272,16 @@ def set_jit_option(options, jitparam, *args):
         import pypyjit
         pypyjit.set_param(jitparam)
 
+def load_jit_warmup_cache(filename):
+    if 'pypyjit' not in sys.builtin_module_names:
+        return
+    import pypyjit
+    try:
+        pypyjit.load_warmup_cache(filename, save_at_exit=True)
+    except Exception as e:
+        print >> sys.stderr, ("Warning: cannot load the JIT warm-up cache "
+                              "%r: %s" % (filename, e))
+
 def run_faulthandler():
     if 'faulthandler' in sys.builtin_module_names:
         import faulthandler
@@ -644,6 +656,11 @@ def run_command_line(interactive,
     mainmodule = type(sys)('__main__')
     sys.modules['__main__'] = mainmodule
 
+    if not ignore_environment:
+        warmup_cache = getenv('PYPY_JIT_WARMUP_CACHE')
+        if warmup_cache:
+            load_jit_warmup_cache(warmup_cache)
+
     if not no_site:
         try:
             import site
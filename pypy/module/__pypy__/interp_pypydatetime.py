@@ -1,24 +1,635 @@
+""" Interp-level support for lib_pypy/datetime.py.
+
+The date, time and timedelta classes of datetime.py are subclasses of the
+classes defined here, which store their fields as plain integers.  The
+calendar computations, the comparisons and the conversions from and to
+the ISO 8601 format are done at interp-level too.  The same classes are
+used by cpyext to expose datetime objects to C code.
+"""
+
+from rpython.rlib.rarithmetic import intmask
+from rpython.rlib.rstring import StringBuilder
 from pypy.interpreter.baseobjspace import W_Root
-from pypy.interpreter.typedef import TypeDef
-from pypy.interpreter.gateway import interp2app
-from rpython.tool.sourcetools import func_with_new_name
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.typedef import TypeDef, GetSetProperty
+
+MINYEAR = 1
+MAXYEAR = 9999
+MAX_DELTA_DAYS = 999999999
+
+DAYS_IN_MONTH = [-1, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+DAYS_BEFORE_MONTH = [-1, 0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304,
+                     334]
+
+# ____________________________________________________________
+# calendar computations in the proleptic Gregorian calendar, where
+# January 1 of year 1 is day number 1
+
+def is_leap(year):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+def days_before_year(year):
+    y = year - 1
+    return y * 365 + y // 4 - y // 100 + y // 400
+
+def days_in_month(year, month):
+    if month == 2 and is_leap(year):
+        return 29
+    return DAYS_IN_MONTH[month]
+
+def days_before_month(year, month):
+    result = DAYS_BEFORE_MONTH[month]
+    if month > 2 and is_leap(year):
+        result += 1
+    return result
+
+def ymd2ord(year, month, day):
+    return days_before_year(year) + days_before_month(year, month) + day
+
+DI400Y = days_before_year(401)
+DI100Y = days_before_year(101)
+DI4Y = days_before_year(5)
+
+def ord2ymd(n):
+    # find the closest 400-year boundary at or before n, then the 100-year,
+    # 4-year and 1-year cycles that precede n.  n100 and n1 can be 4, which
+    # means that n is December 31 at the end of the cycle
+    n -= 1
+    n400 = n // DI400Y
+    n = n % DI400Y
+    year = n400 * 400 + 1
+    n100 = n // DI100Y
+    n = n % DI100Y
+    n4 = n // DI4Y
+    n = n % DI4Y
+    n1 = n // 365
+    n = n % 365
+    year += n100 * 100 + n4 * 4 + n1
+    if n1 == 4 or n100 == 4:
+        return year - 1, 12, 31
+    # now n is the offset from January 1.  The estimate of the month is
+    # either exact or one too large
+    leapyear = n1 == 3 and (n4 != 24 or n100 == 3)
+    month = (n + 50) >> 5
+    preceding = DAYS_BEFORE_MONTH[month]
+    if month > 2 and leapyear:
+        preceding += 1
+    if preceding > n:
+        month -= 1
+        preceding -= DAYS_IN_MONTH[month]
+        if month == 2 and leapyear:
+            preceding -= 1
+    return year, month, n - preceding + 1
+
+def normalize_date(space, year, month, day, ignore_overflow):
+    if not 1 <= month <= 12:
+        year += (month - 1) // 12
+        month = (month - 1) % 12 + 1
+    dim = days_in_month(year, month)
+    if not 1 <= day <= dim:
+        if day == 0:
+            month -= 1
+            if month > 0:
+                day = days_in_month(year, month)
+            else:
+                year, month, day = year - 1, 12, 31
+        elif day == dim + 1:
+            month += 1
+            day = 1
+            if month > 12:
+                month = 1
+                year += 1
+        else:
+            year, month, day = ord2ymd(ymd2ord(year, month, 1) + (day - 1))
+    if not ignore_overflow and not MINYEAR <= year <= MAXYEAR:
+        raise oefmt(space.w_OverflowError, "date value out of range")
+    return year, month, day
+
+def cmp_ints(a, b):
+    if a < b:
+        return -1
+    if a > b:
+        return 1
+    return 0
+
+def hash_ints(values):
+    # like the hash of a tuple
+    x = 0x345678
+    mult = 1000003
+    length = len(values)
+    for value in values:
+        length -= 1
+        x = intmask((x ^ value) * mult)
+        mult += 82520 + length + length
+    return intmask(x + 97531)
+
+def append_digits(builder, value, width):
+    s = str(value)
+    for i in range(width - len(s)):
+        builder.append('0')
+    builder.append(s)
+
+def append_time(builder, hour, minute, second, microsecond):
+    append_digits(builder, hour, 2)
+    builder.append(':')
+    append_digits(builder, minute, 2)
+    builder.append(':')
+    append_digits(builder, second, 2)
+    if microsecond:
+        builder.append('.')
+        append_digits(builder, microsecond, 6)
+
+# ____________________________________________________________
+# checking the arguments of the constructors
+
+def check_int_field(space, w_value):
+    if space.isinstance_w(w_value, space.w_int):
+        return space.int_w(w_value)
+    if space.isinstance_w(w_value, space.w_float):
+        raise oefmt(space.w_TypeError, "integer argument expected, got float")
+    w_method = space.lookup(w_value, '__int__')
+    if w_method is None:
+        raise oefmt(space.w_TypeError, "an integer is required")
+    w_result = space.get_and_call_function(w_method, w_value)
+    if not (space.isinstance_w(w_result, space.w_int) or
+            space.isinstance_w(w_result, space.w_long)):
+        raise oefmt(space.w_TypeError,
+                    "__int__ method should return an integer")
+    return space.int_w(w_result)
+
+def field_error(space, msg, value):
+    # like ValueError(msg, value) in datetime.py
+    return OperationError(space.w_ValueError,
+                          space.newtuple([space.newtext(msg),
+                                          space.newint(value)]))
+
+def check_date_fields(space, year, month, day):
+    if not MINYEAR <= year <= MAXYEAR:
+        raise field_error(space, "year must be in %d..%d" % (MINYEAR, MAXYEAR),
+                          year)
+    if not 1 <= month <= 12:
+        raise field_error(space, "month must be in 1..12", month)
+    dim = days_in_month(year, month)
+    if not 1 <= day <= dim:
+        raise field_error(space, "day must be in 1..%d" % dim, day)
+
+def check_time_fields(space, hour, minute, second, microsecond):
+    if not 0 <= hour <= 23:
+        raise field_error(space, "hour must be in 0..23", hour)
+    if not 0 <= minute <= 59:
+        raise field_error(space, "minute must be in 0..59", minute)
+    if not 0 <= second <= 59:
+        raise field_error(space, "second must be in 0..59", second)
+    if not 0 <= microsecond <= 999999:
+        raise field_error(space, "microsecond must be in 0..999999",
+                          microsecond)
+
+# ____________________________________________________________
+# parsing the ISO 8601 format, like fromisoformat() of Python 3.7
+
+class ParseError(Exception):
+    pass
+
+def parse_digits(s, pos, count):
+    if pos + count > len(s):
+        raise ParseError
+    result = 0
+    for i in range(pos, pos + count):
+        c = s[i]
+        if not '0' <= c <= '9':
+            raise ParseError
+        result = result * 10 + (ord(c) - ord('0'))
+    return result
+
+def parse_date(s, pos):
+    """ Parses YYYY-MM-DD at pos. """
+    year = parse_digits(s, pos, 4)
+    if pos + 4 >= len(s) or s[pos + 4] != '-':
+        raise ParseError
+    month = parse_digits(s, pos + 5, 2)
+    if pos + 7 >= len(s) or s[pos + 7] != '-':
+        raise ParseError
+    day = parse_digits(s, pos + 8, 2)
+    return year, month, day
+
+def parse_time(s, pos):
+    """ Parses HH[:MM[:SS[.fff[fff]]]][+HH:MM] at pos, up to the end of
+    s.  Returns the fields, whether an UTC offset is given and the offset
+    in minutes. """
+    length = len(s)
+    minute = second = microsecond = 0
+    hour = parse_digits(s, pos, 2)
+    pos += 2
+    if pos < length and s[pos] == ':':
+        minute = parse_digits(s, pos + 1, 2)
+        pos += 3
+        if pos < length and s[pos] == ':':
+            second = parse_digits(s, pos + 1, 2)
+            pos += 3
+            if pos < length and s[pos] == '.':
+                if pos + 4 == length or (pos + 4 < length and
+                                         s[pos + 4] in '+-'):
+                    microsecond = parse_digits(s, pos + 1, 3) * 1000
+                    pos += 4
+                else:
+                    microsecond = parse_digits(s, pos + 1, 6)
+                    pos += 7
+    has_offset = False
+    offset = 0
+    if pos < length:
+        sign = s[pos]
+        if sign != '+' and sign != '-':
+            raise ParseError
+        offset_hours = parse_digits(s, pos + 1, 2)
+        if pos + 3 >= length or s[pos + 3] != ':':
+            raise ParseError
+        offset_minutes = parse_digits(s, pos + 4, 2)
+        pos += 6
+        if offset_minutes > 59:
+            raise ParseError
+        offset = offset_hours * 60 + offset_minutes
+        if sign == '-':
+            offset = -offset
+        has_offset = True
+    if pos != length:
+        raise ParseError
+    return hour, minute, second, microsecond, has_offset, offset
+
+def wrap_offset(space, has_offset, offset):
+    if has_offset:
+        return space.newint(offset)
+    return space.w_None
+
+def parse_error(space, s):
+    return oefmt(space.w_ValueError, "Invalid isoformat string: %R",
+                 space.newtext(s))
+
+@unwrap_spec(s='text')
+def parse_isoformat_date(space, s):
+    """parse_isoformat_date(s) -> (year, month, day)
+
+Parses a date in the format YYYY-MM-DD."""
+    try:
+        if len(s) != 10:
+            raise ParseError
+        year, month, day = parse_date(s, 0)
+    except ParseError:
+        raise parse_error(space, s)
+    check_date_fields(space, year, month, day)
+    return space.newtuple([space.newint(year), space.newint(month),
+                           space.newint(day)])
+
+@unwrap_spec(s='text')
+def parse_isoformat_time(space, s):
+    """parse_isoformat_time(s) -> (hour, minute, second, microsecond, offset)
+
+Parses a time in the format HH[:MM[:SS[.fff[fff]]]][+HH:MM].  offset is
+the UTC offset in minutes, or None."""
+    try:
+        hour, minute, second, microsecond, has_offset, offset = (
+            parse_time(s, 0))
+    except ParseError:
+        raise parse_error(space, s)
+    check_time_fields(space, hour, minute, second, microsecond)
+    return space.newtuple([space.newint(hour), space.newint(minute),
+                           space.newint(second), space.newint(microsecond),
+                           wrap_offset(space, has_offset, offset)])
+
+@unwrap_spec(s='text')
+def parse_isoformat_datetime(space, s):
+    """parse_isoformat_datetime(s) -> (year, month, day, hour, minute, second,
+                                   microsecond, offset)
+
+Parses a date, optionally followed by any single character and a time,
+in the formats accepted by parse_isoformat_date() and
+parse_isoformat_time()."""
+    hour = minute = second = microsecond = 0
+    has_offset = False
+    offset = 0
+    try:
+        year, month, day = parse_date(s, 0)
+        if len(s) > 10:
+            hour, minute, second, microsecond, has_offset, offset = (
+                parse_time(s, 11))
+    except ParseError:
+        raise parse_error(space, s)
+    check_date_fields(space, year, month, day)
+    check_time_fields(space, hour, minute, second, microsecond)
+    return space.newtuple([space.newint(year), space.newint(month),
+                           space.newint(day), space.newint(hour),
+                           space.newint(minute), space.newint(second),
+                           space.newint(microsecond),
+                           wrap_offset(space, has_offset, offset)])
+
+# ____________________________________________________________
+# module-level helpers used by datetime.py
+
+@unwrap_spec(year=int, month=int, day=int)
+def w_ymd2ord(space, year, month, day):
+    """ymd2ord(year, month, day) -> ordinal, considering 01-Jan-0001 as day 1"""
+    if not 1 <= month <= 12:
+        raise oefmt(space.w_ValueError, "month must be in 1..12")
+    return space.newint(ymd2ord(year, month, day))
+
+@unwrap_spec(n=int)
+def w_ord2ymd(space, n):
+    """ord2ymd(ordinal) -> (year, month, day)"""
+    year, month, day = ord2ymd(n)
+    return space.newtuple([space.newint(year), space.newint(month),
+                           space.newint(day)])
+
+@unwrap_spec(year=int, month=int, day=int, ignore_overflow=bool)
+def w_normalize_date(space, year, month, day, ignore_overflow=False):
+    """normalize_date(year, month, day, ignore_overflow=False)
+    -> (year, month, day)"""
+    year, month, day = normalize_date(space, year, month, day,
+                                      ignore_overflow)
+    return space.newtuple([space.newint(year), space.newint(month),
+                           space.newint(day)])
+
+@unwrap_spec(year=int, month=int, day=int, hour=int, minute=int, second=int,
+             microsecond=int, ignore_overflow=bool)
+def w_normalize_datetime(space, year, month, day, hour, minute, second,
+                         microsecond, ignore_overflow=False):
+    """normalize_datetime(year, month, day, hour, minute, second, microsecond,
+                   ignore_overflow=False) -> the same 7 fields, normalized"""
+    second += microsecond // 1000000
+    microsecond = microsecond % 1000000
+    minute += second // 60
+    second = second % 60
+    hour += minute // 60
+    minute = minute % 60
+    day += hour // 24
+    hour = hour % 24
+    year, month, day = normalize_date(space, year, month, day,
+                                      ignore_overflow)
+    return space.newtuple([space.newint(year), space.newint(month),
+                           space.newint(day), space.newint(hour),
+                           space.newint(minute), space.newint(second),
+                           space.newint(microsecond)])
+
+# ____________________________________________________________
+# the base classes
+
+def int_field(name, cls):
+    def fget(space, obj):
+        return space.newint(getattr(obj, name))
+    def fset(space, obj, w_value):
+        setattr(obj, name, space.int_w(w_value))
+    return GetSetProperty(fget, fset, cls=cls)
+
+def tzinfo_field(cls):
+    def fget(space, obj):
+        if obj.w_tzinfo is None:
+            return space.w_None
+        return obj.w_tzinfo
+    def fset(space, obj, w_value):
+        if space.is_w(w_value, space.w_None):
+            obj.w_tzinfo = None
+        else:
+            obj.w_tzinfo = w_value
+    return GetSetProperty(fget, fset, cls=cls)
+
+
+class W_DateTime_Date(W_Root):
+    """ The base class of datetime.date and datetime.datetime.  The time
+    fields stay 0 for dates. """
+    # instances are made by allocate_instance(), so the fields need
+    # class-level defaults
+    year = MINYEAR
+    month = 1
+    day = 1
+    hour = 0
+    minute = 0
+    second = 0
+    microsecond = 0
+    w_tzinfo = None
+    hashcode = -1
+
+    @staticmethod
+    def descr_new_date(space, w_type):
+        return space.allocate_instance(W_DateTime_Date, w_type)
+
+    def descr_init_date(self, space, w_year, w_month, w_day):
+        year = check_int_field(space, w_year)
+        month = check_int_field(space, w_month)
+        day = check_int_field(space, w_day)
+        check_date_fields(space, year, month, day)
+        self.year = year
+        self.month = month
+        self.day = day
+        self.hashcode = -1
+
+    def descr_init_datetime(self, space, w_year, w_month, w_day, w_hour,
+                            w_minute, w_second, w_microsecond):
+        self.descr_init_date(space, w_year, w_month, w_day)
+        hour = check_int_field(space, w_hour)
+        minute = check_int_field(space, w_minute)
+        second = check_int_field(space, w_second)
+        microsecond = check_int_field(space, w_microsecond)
+        check_time_fields(space, hour, minute, second, microsecond)
+        self.hour = hour
+        self.minute = minute
+        self.second = second
+        self.microsecond = microsecond
+
+    def descr_toordinal(self, space):
+        """Return proleptic Gregorian ordinal for the year, month and day.
+
+January 1 of year 1 is day 1.  Only the year, month and day values
+contribute to the result."""
+        return space.newint(ymd2ord(self.year, self.month, self.day))
+
+    def descr_cmp_fields(self, space, w_other):
+        if not isinstance(w_other, W_DateTime_Date):
+            raise oefmt(space.w_TypeError, "expected a date, got '%T'",
+                        w_other)
+        return space.newint(self.cmp_fields(w_other))
+
+    def cmp_fields(self, other):
+        for a, b in [(self.year, other.year), (self.month, other.month),
+                     (self.day, other.day), (self.hour, other.hour),
+                     (self.minute, other.minute), (self.second, other.second),
+                     (self.microsecond, other.microsecond)]:
+            if a != b:
+                return cmp_ints(a, b)
+        return 0
+
+    def descr_hash_fields(self, space):
+        return space.newint(hash_ints([self.year, self.month, self.day,
+                                       self.hour, self.minute, self.second,
+                                       self.microsecond]))
+
+    def descr_format_date(self, space):
+        builder = StringBuilder(10)
+        append_digits(builder, self.year, 4)
+        builder.append('-')
+        append_digits(builder, self.month, 2)
+        builder.append('-')
+        append_digits(builder, self.day, 2)
+        return space.newtext(builder.build())
+
+    def descr_format_time(self, space):
+        builder = StringBuilder(15)
+        append_time(builder, self.hour, self.minute, self.second,
+                    self.microsecond)
+        return space.newtext(builder.build())
+
+
+class W_DateTime_Time(W_Root):
+    """ The base class of datetime.time. """
+    hour = 0
+    minute = 0
+    second = 0
+    microsecond = 0
+    w_tzinfo = None
+    hashcode = -1
+
+    @staticmethod
+    def descr_new_time(space, w_type):
+        return space.allocate_instance(W_DateTime_Time, w_type)
+
+    def descr_init_time(self, space, w_hour, w_minute, w_second,
+                        w_microsecond):
+        hour = check_int_field(space, w_hour)
+        minute = check_int_field(space, w_minute)
+        second = check_int_field(space, w_second)
+        microsecond = check_int_field(space, w_microsecond)
+        check_time_fields(space, hour, minute, second, microsecond)
+        self.hour = hour
+        self.minute = minute
+        self.second = second
+        self.microsecond = microsecond
+        self.hashcode = -1
+
+    def descr_cmp_fields(self, space, w_other):
+        if not isinstance(w_other, W_DateTime_Time):
+            raise oefmt(space.w_TypeError, "expected a time, got '%T'",
+                        w_other)
+        for a, b in [(self.hour, w_other.hour),
+                     (self.minute, w_other.minute),
+                     (self.second, w_other.second),
+                     (self.microsecond, w_other.microsecond)]:
+            if a != b:
+                return space.newint(cmp_ints(a, b))
+        return space.newint(0)
+
+    def descr_hash_fields(self, space):
+        return space.newint(hash_ints([self.hour, self.minute, self.second,
+                                       self.microsecond]))
+
+    def descr_format_time(self, space):
+        builder = StringBuilder(15)
+        append_time(builder, self.hour, self.minute, self.second,
+                    self.microsecond)
+        return space.newtext(builder.build())
+
+
+class W_DateTime_Delta(W_Root):
+    """ The base class of datetime.timedelta. """
+    days = 0
+    seconds = 0
+    microseconds = 0
+    hashcode = -1
+
+    @staticmethod
+    def descr_new_delta(space, w_type):
+        return space.allocate_instance(W_DateTime_Delta, w_type)
+
+    @unwrap_spec(normalize=bool)
+    def descr_init_delta(self, space, w_days, w_seconds, w_microseconds,
+                         normalize=False):
+        try:
+            days = space.int_w(w_days)
+        except OperationError as e:
+            if not e.match(space, space.w_OverflowError):
+                raise
+            raise oefmt(space.w_OverflowError,
+                        "days=%R; must have magnitude <= %d", w_days,
+                        MAX_DELTA_DAYS)
+        seconds = space.int_w(w_seconds)
+        microseconds = space.int_w(w_microseconds)
+        if normalize:
+            seconds += microseconds // 1000000
+            microseconds = microseconds % 1000000
+            days += seconds // (24 * 3600)
+            seconds = seconds % (24 * 3600)
+        if not -MAX_DELTA_DAYS <= days <= MAX_DELTA_DAYS:
+            raise oefmt(space.w_OverflowError,
+                        "days=%d; must have magnitude <= %d", days,
+                        MAX_DELTA_DAYS)
+        self.days = days
+        self.seconds = seconds
+        self.microseconds = microseconds
+        self.hashcode = -1
+
+    def descr_cmp_fields(self, space, w_other):
+        if not isinstance(w_other, W_DateTime_Delta):
+            raise oefmt(space.w_TypeError, "expected a timedelta, got '%T'",
+                        w_other)
+        for a, b in [(self.days, w_other.days),
+                     (self.seconds, w_other.seconds),
+                     (self.microseconds, w_other.microseconds)]:
+            if a != b:
+                return space.newint(cmp_ints(a, b))
+        return space.newint(0)
 
-def create_class(name):
-    class W_Class(W_Root):
-        'builtin base clasee for datetime.%s to allow interop with cpyext' % name
-        def descr_new__(space, w_type):
-            return space.allocate_instance(W_Class, w_type)
+    def descr_hash_fields(self, space):
+        return space.newint(hash_ints([self.days, self.seconds,
+                                       self.microseconds]))
 
-    W_Class.typedef = TypeDef(name,
-        __new__ = interp2app(func_with_new_name(
-                                    W_Class.descr_new__.im_func,
-                                    '%s_new' % (name,))),
-        )
-    W_Class.typedef.acceptable_as_base_class = True
-    return W_Class
 
-W_DateTime_Time = create_class('pypydatetime_time')
-W_DateTime_Date = create_class('pypydatetime_date')
-W_DateTime_Delta = create_class('pypydatetime_delta')
+W_DateTime_Date.typedef = TypeDef('pypydatetime_date',
+    __doc__ = 'builtin base class for datetime.date to allow interop with '
+              'cpyext',
+    __new__ = interp2app(W_DateTime_Date.descr_new_date),
+    _year = int_field('year', W_DateTime_Date),
+    _month = int_field('month', W_DateTime_Date),
+    _day = int_field('day', W_DateTime_Date),
+    _hour = int_field('hour', W_DateTime_Date),
+    _minute = int_field('minute', W_DateTime_Date),
+    _second = int_field('second', W_DateTime_Date),
+    _microsecond = int_field('microsecond', W_DateTime_Date),
+    _tzinfo = tzinfo_field(W_DateTime_Date),
+    _hashcode = int_field('hashcode', W_DateTime_Date),
+    _init_date = interp2app(W_DateTime_Date.descr_init_date),
+    _init_datetime = interp2app(W_DateTime_Date.descr_init_datetime),
+    _cmp_fields = interp2app(W_DateTime_Date.descr_cmp_fields),
+    _hash_fields = interp2app(W_DateTime_Date.descr_hash_fields),
+    _format_date = interp2app(W_DateTime_Date.descr_format_date),
+    _format_time = interp2app(W_DateTime_Date.descr_format_time),
+    toordinal = interp2app(W_DateTime_Date.descr_toordinal),
+    )
+W_DateTime_Date.typedef.acceptable_as_base_class = True
 
+W_DateTime_Time.typedef = TypeDef('pypydatetime_time',
+    __doc__ = 'builtin base class for datetime.time to allow interop with '
+              'cpyext',
+    __new__ = interp2app(W_DateTime_Time.descr_new_time),
+    _hour = int_field('hour', W_DateTime_Time),
+    _minute = int_field('minute', W_DateTime_Time),
+    _second = int_field('second', W_DateTime_Time),
+    _microsecond = int_field('microsecond', W_DateTime_Time),
+    _tzinfo = tzinfo_field(W_DateTime_Time),
+    _hashcode = int_field('hashcode', W_DateTime_Time),
+    _init_time = interp2app(W_DateTime_Time.descr_init_time),
+    _cmp_fields = interp2app(W_DateTime_Time.descr_cmp_fields),
+    _hash_fields = interp2app(W_DateTime_Time.descr_hash_fields),
+    _format_time = interp2app(W_DateTime_Time.descr_format_time),
+    )
+W_DateTime_Time.typedef.acceptable_as_base_class = True
 
+W_DateTime_Delta.typedef = TypeDef('pypydatetime_delta',
+    __doc__ = 'builtin base class for datetime.timedelta to allow interop '
+              'with cpyext',
+    __new__ = interp2app(W_DateTime_Delta.descr_new_delta),
+    _days = int_field('days', W_DateTime_Delta),
+    _seconds = int_field('seconds', W_DateTime_Delta),
+    _microseconds = int_field('microseconds', W_DateTime_Delta),
+    _hashcode = int_field('hashcode', W_DateTime_Delta),
+    _init_delta = interp2app(W_DateTime_Delta.descr_init_delta),
+    _cmp_fields = interp2app(W_DateTime_Delta.descr_cmp_fields),
+    _hash_fields = interp2app(W_DateTime_Delta.descr_hash_fields),
+    )
+W_DateTime_Delta.typedef.acceptable_as_base_class = True
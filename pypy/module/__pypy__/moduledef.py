@@ -66,6 +66,16 @@ class PyPyDateTime(MixedModule):
         'dateinterop'  : 'interp_pypydatetime.W_DateTime_Date',
         'timeinterop'  : 'interp_pypydatetime.W_DateTime_Time',
         'deltainterop' : 'interp_pypydatetime.W_DateTime_Delta',
+        'ymd2ord'      : 'interp_pypydatetime.w_ymd2ord',
+        'ord2ymd'      : 'interp_pypydatetime.w_ord2ymd',
+        'normalize_date'     : 'interp_pypydatetime.w_normalize_date',
+        'normalize_datetime' : 'interp_pypydatetime.w_normalize_datetime',
+        'parse_isoformat_date'     :
+            'interp_pypydatetime.parse_isoformat_date',
+        'parse_isoformat_time'     :
+            'interp_pypydatetime.parse_isoformat_time',
+        'parse_isoformat_datetime' :
+            'interp_pypydatetime.parse_isoformat_datetime',
     }
 
 class PyPyBufferable(MixedModule):
@@ -0,0 +1,92 @@
+class AppTestPyPyDateTime:
+    spaceconfig = dict(usemodules=['__pypy__', 'struct', 'time', 'binascii'])
+
+    def test_ordinals(self):
+        from __pypy__._pypydatetime import ymd2ord, ord2ymd
+        assert ymd2ord(1, 1, 1) == 1
+        assert ymd2ord(1, 12, 31) == 365
+        assert ymd2ord(2000, 3, 1) == 730180
+        assert ymd2ord(9999, 12, 31) == 3652059
+        for n in [1, 59, 60, 365, 366, 730119, 730179, 730180, 3652059]:
+            assert ymd2ord(*ord2ymd(n)) == n
+        assert ord2ymd(730179) == (2000, 2, 29)
+        assert ord2ymd(146097) == (400, 12, 31)
+        raises(ValueError, ymd2ord, 2000, 13, 1)
+
+    def test_normalize(self):
+        from __pypy__._pypydatetime import normalize_date, normalize_datetime
+        assert normalize_date(2000, 13, 1) == (2001, 1, 1)
+        assert normalize_date(2000, 3, 0) == (2000, 2, 29)
+        assert normalize_date(2000, 1, 367) == (2001, 1, 1)
+        assert normalize_date(2000, 1, -30) == (1999, 12, 1)
+        raises(OverflowError, normalize_date, 9999, 12, 32)
+        assert normalize_date(9999, 12, 32, True) == (10000, 1, 1)
+        assert normalize_datetime(2000, 12, 31, 23, 59, 59, 1000000) == (
+            2001, 1, 1, 0, 0, 0, 0)
+        assert normalize_datetime(2000, 1, 1, 0, 0, 0, -1) == (
+            1999, 12, 31, 23, 59, 59, 999999)
+
+    def test_parse_isoformat(self):
+        from __pypy__._pypydatetime import (parse_isoformat_date,
+            parse_isoformat_time, parse_isoformat_datetime)
+        assert parse_isoformat_date('2019-02-28') == (2019, 2, 28)
+        assert parse_isoformat_time('12') == (12, 0, 0, 0, None)
+        assert parse_isoformat_time('12:30') == (12, 30, 0, 0, None)
+        assert parse_isoformat_time('12:30:15.123') == (12, 30, 15, 123000,
+                                                        None)
+        assert parse_isoformat_time('12:30:15.000123+01:30') == (
+            12, 30, 15, 123, 90)
+        assert parse_isoformat_time('00:00:00-05:00') == (0, 0, 0, 0, -300)
+        assert parse_isoformat_datetime('2019-02-28') == (
+            2019, 2, 28, 0, 0, 0, 0, None)
+        assert parse_isoformat_datetime('2019-02-28 01:02:03') == (
+            2019, 2, 28, 1, 2, 3, 0, None)
+        assert parse_isoformat_datetime('2019-02-28T01:02:03.500+00:00') == (
+            2019, 2, 28, 1, 2, 3, 500000, 0)
+        for s in ['2019-2-28', '2019-02-28x', '2019/02/28', '']:
+            raises(ValueError, parse_isoformat_date, s)
+        for s in ['1', '12:3', '12:30:15.12', '12:30+1:00', '12:30Z',
+                  '25:00', '12:60']:
+            raises(ValueError, parse_isoformat_time, s)
+        for s in ['2019-02-28T', '2019-02-29 00:00', '2019-02-28 12:30:']:
+            raises(ValueError, parse_isoformat_datetime, s)
+
+    def test_datetime_module(self):
+        import datetime, pickle
+        d = datetime.date(2019, 2, 28)
+        assert (d.year, d.month, d.day) == (2019, 2, 28)
+        assert d.isoformat() == '2019-02-28'
+        assert d.toordinal() == 737118
+        assert d + datetime.timedelta(1) == datetime.date(2019, 3, 1)
+        assert d - datetime.date(2018, 2, 28) == datetime.timedelta(365)
+        assert datetime.date.fromisoformat('2019-02-28') == d
+        raises(ValueError, datetime.date, 2019, 2, 29)
+        raises(TypeError, datetime.date, 2019.0, 2, 28)
+        t = datetime.time(1, 2, 3, 4)
+        assert t.isoformat() == '01:02:03.000004'
+        assert datetime.time.fromisoformat('01:02:03.000004') == t
+        dt = datetime.datetime(2019, 2, 28, 23, 59, 59, 999999)
+        assert str(dt) == '2019-02-28 23:59:59.999999'
+        dt2 = dt + datetime.timedelta(microseconds=1)
+        assert dt2 == datetime.datetime(2019, 3, 1)
+        assert dt2 > dt and not dt2 < dt
+        assert dt2 - dt == datetime.timedelta(0, 0, 1)
+        assert hash(dt2) == hash(datetime.datetime(2019, 3, 1, 0, 0))
+        assert datetime.datetime.fromisoformat(dt.isoformat()) == dt
+        aware = datetime.datetime.fromisoformat('2019-03-01T01:30:00+01:30')
+        assert aware.utcoffset() == datetime.timedelta(minutes=90)
+        assert aware.tzname() == 'UTC+01:30'
+        assert aware == datetime.datetime.fromisoformat(
+            '2019-03-01T00:00:00+00:00')
+        assert aware.isoformat() == '2019-03-01T01:30:00+01:30'
+        assert dt.strftime('%Y/%m/%d %H:%M:%S.%f') == (
+            '2019/02/28 23:59:59.999999')
+        for obj in [d, t, dt, aware, datetime.timedelta(-1, 5, 7)]:
+            for proto in range(3):
+                assert pickle.loads(pickle.dumps(obj, proto)) == obj
+        class MyDate(datetime.date):
+            pass
+        md = MyDate(2019, 2, 28)
+        assert md == d and hash(md) == hash(d)
+        raises(AttributeError, "d.foo = 1")
+        raises(AttributeError, "d.year = 2000")
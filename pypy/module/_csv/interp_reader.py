@@ -14,14 +14,29 @@ from pypy.objspace.std.util import wrap_parsestringerror
  IN_QUOTED_FIELD, ESCAPE_IN_QUOTED_FIELD, QUOTE_IN_QUOTED_FIELD,
  EAT_CRNL) = range(8)
 
+# per-column types, see the 'types' argument of reader()
+TYPE_STR, TYPE_INT, TYPE_FLOAT = range(3)
+
 
 class W_Reader(W_Root):
 
-    def __init__(self, space, dialect, w_iter):
+    def __init__(self, space, dialect, w_iter, types=None, chunked=False):
         self.space = space
         self.dialect = dialect
         self.w_iter = w_iter
         self.line_num = 0
+        self.types = types
+        self.chunked = chunked
+        # in chunked mode: the rest of the current chunk after the end of
+        # the last record
+        self.pending_chunk = None
+        self.pending_pos = 0
+        # in chunked mode: is the next character the first one of a line?
+        self.at_line_start = True
+        # used by read_columns(): one Column per field, or None
+        self.columns = None
+        self.column_index = 0
+        self.rows_in_columns = 0
 
     def iter_w(self):
         return self
@@ -40,53 +55,145 @@ class W_Reader(W_Root):
         field_builder.append(c)
 
     def save_field(self, field_builder):
-        space = self.space
         field = field_builder.build()
-        if self.numeric_field:
-            from rpython.rlib.rstring import ParseStringError
-            from rpython.rlib.rfloat import string_to_float
-            self.numeric_field = False
+        if self.columns is not None:
+            self.save_column_field(field)
+            return
+        w_obj = self.wrap_field(len(self.fields_w), field)
+        self.fields_w.append(w_obj)
+
+    def get_type(self, index):
+        types = self.types
+        if types is None or index >= len(types):
+            return TYPE_STR
+        return types[index]
+
+    def wrap_field(self, index, field):
+        space = self.space
+        numeric = self.numeric_field
+        self.numeric_field = False
+        fieldtype = self.get_type(index)
+        if fieldtype == TYPE_INT:
+            if not field:
+                return space.w_None
             try:
-                ff = string_to_float(field)
-            except ParseStringError as e:
-                raise wrap_parsestringerror(space, e, space.newtext(field))
-            w_obj = space.newfloat(ff)
+                return space.newint(self.parse_int(field))
+            except OverflowError:
+                return space.call_function(space.w_int, space.newtext(field))
+        elif fieldtype == TYPE_FLOAT or numeric:
+            if not field and not numeric:
+                return space.w_None
+            return space.newfloat(self.parse_float(field))
         else:
-            w_obj = space.newtext(field)
-        self.fields_w.append(w_obj)
+            return space.newtext(field)
+
+    def parse_int(self, field):
+        """ Parse field as an int. Raises OverflowError if it does not fit,
+        and ValueError if it is not an integer. """
+        from rpython.rlib.rarithmetic import string_to_int
+        from rpython.rlib.rstring import (ParseStringError,
+                                          ParseStringOverflowError)
+        space = self.space
+        try:
+            return string_to_int(field)
+        except ParseStringOverflowError:
+            raise OverflowError
+        except ParseStringError as e:
+            raise wrap_parsestringerror(space, e, space.newtext(field))
+
+    def parse_float(self, field):
+        from rpython.rlib.rstring import ParseStringError
+        from rpython.rlib.rfloat import string_to_float
+        space = self.space
+        try:
+            return string_to_float(field)
+        except ParseStringError as e:
+            raise wrap_parsestringerror(space, e, space.newtext(field))
+
+    def save_column_field(self, field):
+        columns = self.columns
+        index = self.column_index
+        self.column_index = index + 1
+        if index == len(columns):
+            if self.rows_in_columns:
+                raise self.error("expected %d fields, got more" % (
+                    len(columns),))
+            columns.append(make_column(self, index))
+        columns[index] = columns[index].add(field)
+        self.numeric_field = False
+
+    def finish_column_row(self):
+        columns = self.columns
+        if self.column_index != len(columns) and self.rows_in_columns:
+            raise self.error("expected %d fields, got %d" % (
+                len(columns), self.column_index))
+        self.column_index = 0
+        self.rows_in_columns += 1
 
     def next_w(self):
+        self.read_record()
+        w_result = self.space.newlist(self.fields_w)
+        self.fields_w = None
+        return w_result
+
+    def read_record(self):
+        """ Parse the next record into self.fields_w (or, in read_columns(),
+        into self.columns). Raises StopIteration at the end of the input."""
         space = self.space
         dialect = self.dialect
         self.fields_w = []
         self.numeric_field = False
         field_builder = None  # valid iff state not in [START_RECORD, EAT_CRNL]
         state = START_RECORD
+        # the previous character, to recognize \r\n in chunked mode
+        prev = '\0'
+        line = self.pending_chunk
+        pos = self.pending_pos
+        self.pending_chunk = None
         #
         while True:
-            try:
-                w_line = space.next(self.w_iter)
-            except OperationError as e:
-                if e.match(space, space.w_StopIteration):
-                    if (field_builder is not None and
-                            state != START_RECORD and state != EAT_CRNL and
-                            (len(field_builder.build()) > 0 or
-                             state == IN_QUOTED_FIELD)):
-                        if dialect.strict:
-                            raise self.error("newline inside string")
-                        else:
-                            self.save_field(field_builder)
-                            break
-                raise
-            self.line_num += 1
-            line = space.text_w(w_line)
-            for c in line:
+            if line is None:
+                try:
+                    w_line = space.next(self.w_iter)
+                except OperationError as e:
+                    if e.match(space, space.w_StopIteration):
+                        if self.chunked:
+                            if self.end_of_chunks(state, field_builder):
+                                break
+                        elif (field_builder is not None and
+                                state != START_RECORD and state != EAT_CRNL and
+                                (len(field_builder.build()) > 0 or
+                                 state == IN_QUOTED_FIELD)):
+                            if dialect.strict:
+                                raise self.error("newline inside string")
+                            else:
+                                self.save_field(field_builder)
+                                break
+                    raise
+                if not self.chunked:
+                    self.line_num += 1
+                line = space.text_w(w_line)
+                pos = 0
+            end = len(line)
+            while pos < end:
+                c = line[pos]
+                if (self.chunked and state == EAT_CRNL and
+                        not (c == '\n' and prev == '\r')):
+                    # the record ended before c, keep the rest of the chunk
+                    # for the next call
+                    self.pending_chunk = line
+                    self.pending_pos = pos
+                    break
+                pos += 1
+                if self.chunked:
+                    self.count_line(c, prev)
                 if c == '\0':
                     raise self.error("line contains NULL byte")
 
                 if state == START_RECORD:
                     if c == '\n' or c == '\r':
                         state = EAT_CRNL
+                        prev = c
                         continue
                     # normal character - handle as START_FIELD
                     state = START_FIELD
@@ -185,10 +292,21 @@ class W_Reader(W_Root):
                             dialect.delimiter, dialect.quotechar))
 
                 elif state == EAT_CRNL:
-                    if not (c == '\n' or c == '\r'):
+                    if not self.chunked and not (c == '\n' or c == '\r'):
                         raise self.error("new-line character seen in unquoted "
                                         "field - do you need to open the file "
                                         "in universal-newline mode?")
+                prev = c
+            if self.pending_chunk is not None:
+                break
+            line = None
+            if self.chunked:
+                if state == EAT_CRNL and prev == '\n':
+                    # the record ends with the chunk; only a final '\r'
+                    # could still be followed by the '\n' of a '\r\n'
+                    break
+                # records can span chunks, continue with the next one
+                continue
 
             if state == IN_FIELD or state == QUOTE_IN_QUOTED_FIELD:
                 self.save_field(field_builder)
@@ -208,10 +326,180 @@ class W_Reader(W_Root):
                 break
             else:
                 break
-        #
-        w_result = space.newlist(self.fields_w)
-        self.fields_w = None
-        return w_result
+        if self.columns is not None:
+            self.finish_column_row()
+
+    def count_line(self, c, prev):
+        """ Called in chunked mode for each character of the input, to count
+        the lines in line_num. """
+        if c == '\n' and prev == '\r':
+            return      # the end of a \r\n
+        if self.at_line_start:
+            self.line_num += 1
+        self.at_line_start = c == '\n' or c == '\r'
+
+    def end_of_chunks(self, state, field_builder):
+        """ Called in chunked mode when the input is exhausted. Finishes the
+        current record and returns True, or returns False if there is
+        none. """
+        if state == START_RECORD:
+            return False
+        if state == IN_QUOTED_FIELD or state == ESCAPE_IN_QUOTED_FIELD:
+            if self.dialect.strict:
+                raise self.error("unexpected end of data")
+        elif state == ESCAPED_CHAR:
+            if self.dialect.strict:
+                raise self.error("unexpected end of data")
+        elif state == START_FIELD:
+            # save empty field
+            field_builder = StringBuilder(1)
+        if state != EAT_CRNL:
+            self.save_field(field_builder)
+        return True
+
+    @unwrap_spec(n=int)
+    def read_many(self, n):
+        """read_many(n) -> list of up to n rows
+
+Reads the next n rows in one call. Returns fewer rows at the end of
+the input, and an empty list once it is exhausted."""
+        space = self.space
+        rows_w = []
+        while len(rows_w) < n:
+            try:
+                rows_w.append(self.next_w())
+            except OperationError as e:
+                if not e.match(space, space.w_StopIteration):
+                    raise
+                break
+        return space.newlist(rows_w)
+
+    @unwrap_spec(n=int)
+    def read_columns(self, n):
+        """read_columns(n) -> list of columns
+
+Reads up to n rows, which must all have the same number of fields, and
+returns their fields as one list per column.  Columns declared as int
+or float in 'types' are stored unboxed."""
+        space = self.space
+        self.columns = []
+        self.column_index = 0
+        self.rows_in_columns = 0
+        try:
+            while self.rows_in_columns < n:
+                try:
+                    self.read_record()
+                except OperationError as e:
+                    if not e.match(space, space.w_StopIteration):
+                        raise
+                    break
+            columns_w = [column.build() for column in self.columns]
+        finally:
+            self.columns = None
+            self.fields_w = None
+        return space.newlist(columns_w)
+
+
+class Column(object):
+    """ Accumulates the fields of one column for read_columns(). """
+
+    def __init__(self, reader, index):
+        self.reader = reader
+        self.index = index
+
+    def add(self, field):
+        """ Add a field. Returns the column to use from now on. """
+        raise NotImplementedError("abstract base class")
+
+    def build(self):
+        raise NotImplementedError("abstract base class")
+
+
+class ObjectColumn(Column):
+    def __init__(self, reader, index, items_w):
+        Column.__init__(self, reader, index)
+        self.items_w = items_w
+
+    def add(self, field):
+        self.items_w.append(self.reader.wrap_field(self.index, field))
+        return self
+
+    def build(self):
+        return self.reader.space.newlist(self.items_w)
+
+
+class IntColumn(Column):
+    def __init__(self, reader, index):
+        Column.__init__(self, reader, index)
+        self.items = []
+
+    def add(self, field):
+        if field:
+            try:
+                self.items.append(self.reader.parse_int(field))
+                return self
+            except OverflowError:
+                pass
+        # an empty field (None) or a long: switch to boxed storage
+        space = self.reader.space
+        items_w = [space.newint(i) for i in self.items]
+        if field:
+            w_obj = space.call_function(space.w_int, space.newtext(field))
+        else:
+            w_obj = space.w_None
+        items_w.append(w_obj)
+        return ObjectColumn(self.reader, self.index, items_w)
+
+    def build(self):
+        return self.reader.space.newlist_int(self.items)
+
+
+class FloatColumn(Column):
+    def __init__(self, reader, index):
+        Column.__init__(self, reader, index)
+        self.items = []
+
+    def add(self, field):
+        if field:
+            self.items.append(self.reader.parse_float(field))
+            return self
+        # an empty field (None): switch to boxed storage
+        space = self.reader.space
+        items_w = [space.newfloat(f) for f in self.items]
+        items_w.append(space.w_None)
+        return ObjectColumn(self.reader, self.index, items_w)
+
+    def build(self):
+        return self.reader.space.newlist_float(self.items)
+
+
+def make_column(reader, index):
+    fieldtype = reader.get_type(index)
+    if fieldtype == TYPE_INT:
+        return IntColumn(reader, index)
+    elif fieldtype == TYPE_FLOAT:
+        return FloatColumn(reader, index)
+    return ObjectColumn(reader, index, [])
+
+
+def _get_types(space, w_types):
+    """ Turn the 'types' argument into a list of TYPE_* constants. """
+    if w_types is None or space.is_w(w_types, space.w_None):
+        return None
+    types = []
+    for w_type in space.listview(w_types):
+        if space.is_w(w_type, space.w_int):
+            types.append(TYPE_INT)
+        elif space.is_w(w_type, space.w_float):
+            types.append(TYPE_FLOAT)
+        elif (space.is_w(w_type, space.w_bytes) or
+                  space.is_w(w_type, space.w_None)):
+            types.append(TYPE_STR)
+        else:
+            raise oefmt(space.w_TypeError,
+                        "types must contain int, float, str or None, not %R",
+                        w_type)
+    return types
 
 
 def csv_reader(space, w_iterator, w_dialect=None,
@@ -223,6 +511,8 @@ def csv_reader(space, w_iterator, w_dialect=None,
                   w_quoting          = None,
                   w_skipinitialspace = None,
                   w_strict           = None,
+                  w_types            = None,
+                  w_chunked          = None,
                   ):
     """
     csv_reader = reader(iterable [, dialect='excel']
@@ -237,12 +527,21 @@ def csv_reader(space, w_iterator, w_dialect=None,
     provided by the dialect.
 
     The returned object is an iterator.  Each iteration returns a row
-    of the CSV file (which can span multiple input lines)"""
+    of the CSV file (which can span multiple input lines).
+
+    PyPy extensions: "types" is a sequence giving the type of each
+    column, one of str, int, float or None (same as str).  Fields of int
+    and float columns are converted while parsing, and empty ones become
+    None.  If "chunked" is true, the iterable may return arbitrary
+    chunks of the input instead of lines.  The reader also has the
+    methods read_many() and read_columns() to parse many rows at once."""
     w_iter = space.iter(w_iterator)
     dialect = _build_dialect(space, w_dialect, w_delimiter, w_doublequote,
                              w_escapechar, w_lineterminator, w_quotechar,
                              w_quoting, w_skipinitialspace, w_strict)
-    return W_Reader(space, dialect, w_iter)
+    types = _get_types(space, w_types)
+    chunked = w_chunked is not None and space.is_true(w_chunked)
+    return W_Reader(space, dialect, w_iter, types, chunked)
 
 W_Reader.typedef = TypeDef(
         '_csv.reader',
@@ -251,6 +550,8 @@ W_Reader.typedef = TypeDef(
             wrapfn="newint"),
         __iter__ = interp2app(W_Reader.iter_w),
         next = interp2app(W_Reader.next_w),
+        read_many = interp2app(W_Reader.read_many),
+        read_columns = interp2app(W_Reader.read_columns),
         __doc__ = """CSV reader
 
 Reader objects are responsible for reading and parsing tabular data
@@ -7,6 +7,15 @@ from pypy.interpreter.typedef import interp_attrproperty_w
 from pypy.module._csv.interp_csv import _build_dialect
 from pypy.module._csv.interp_csv import (QUOTE_MINIMAL, QUOTE_ALL,
                                          QUOTE_NONNUMERIC, QUOTE_NONE)
+from pypy.objspace.std.floatobject import float_repr
+
+# writerows() calls write() on the file object only when this many bytes
+# are accumulated
+FLUSH_SIZE = 64 * 1024
+
+# all the characters that can appear in the str() of an int or the repr()
+# of a float
+NUMBER_CHARACTERS = "0123456789+-.einfa"
 
 
 class W_Writer(W_Root):
@@ -21,6 +30,13 @@ class W_Writer(W_Root):
         if dialect.quotechar != '\0':
             special += dialect.quotechar
         self.special_characters = special
+        # can ints and floats be written as they are, without checking for
+        # special characters?
+        plain_numbers = dialect.quoting != QUOTE_ALL
+        for c in special:
+            if c in NUMBER_CHARACTERS:
+                plain_numbers = False
+        self.plain_numbers = plain_numbers
 
     @objectmodel.dont_inline
     def error(self, msg):
@@ -33,27 +49,56 @@ class W_Writer(W_Root):
         """Construct and write a CSV record from a sequence of fields.
         Non-string elements will be converted to string."""
         space = self.space
+        rec = StringBuilder(80)
+        self.format_row(rec, w_fields)
+        line = rec.build()
+        return space.call_function(self.w_filewrite, space.newtext(line))
+
+    def format_row(self, rec, w_fields):
+        """ Append the CSV record for the sequence w_fields to rec. """
+        space = self.space
         fields_w = space.listview(w_fields)
         dialect = self.dialect
-        rec = StringBuilder(80)
         #
         for field_index in range(len(fields_w)):
             w_field = fields_w[field_index]
+            w_type = space.type(w_field)
+            is_str = False
             if space.is_w(w_field, space.w_None):
                 field = ""
+            elif space.is_w(w_type, space.w_int):
+                field = str(space.int_w(w_field))
+                if self.plain_numbers:
+                    if field_index > 0:
+                        rec.append(dialect.delimiter)
+                    rec.append(field)
+                    continue
+            elif space.is_w(w_type, space.w_float):
+                field = float_repr(space.float_w(w_field))
+                if self.plain_numbers:
+                    if field_index > 0:
+                        rec.append(dialect.delimiter)
+                    rec.append(field)
+                    continue
             elif space.isinstance_w(w_field, space.w_float):
                 field = space.text_w(space.repr(w_field))
+            elif space.is_w(w_type, space.w_bytes):
+                field = space.bytes_w(w_field)
+                is_str = True
             else:
                 field = space.text_w(space.str(w_field))
             #
             if dialect.quoting == QUOTE_NONNUMERIC:
-                try:
-                    space.float_w(w_field)    # is it an int/long/float?
-                    quoted = False
-                except OperationError as e:
-                    if e.async(space):
-                        raise
+                if is_str:
                     quoted = True
+                else:
+                    try:
+                        space.float_w(w_field)    # is it an int/long/float?
+                        quoted = False
+                    except OperationError as e:
+                        if e.async(space):
+                            raise
+                        quoted = True
             elif dialect.quoting == QUOTE_ALL:
                 quoted = True
             elif dialect.quoting == QUOTE_MINIMAL:
@@ -114,22 +159,38 @@ class W_Writer(W_Root):
         # Add line terminator
         rec.append(dialect.lineterminator)
 
-        line = rec.build()
-        return space.call_function(self.w_filewrite, space.newtext(line))
-
     def writerows(self, w_seqseq):
         """Construct and write a series of sequences to a csv file.
         Non-string elements will be converted to string."""
         space = self.space
         w_iter = space.iter(w_seqseq)
+        # the records are collected in rec and passed to write() in blocks
+        # of about FLUSH_SIZE bytes
+        rec = StringBuilder(FLUSH_SIZE)
         while True:
+            length = rec.getlength()
             try:
                 w_seq = space.next(w_iter)
+                self.format_row(rec, w_seq)
             except OperationError as e:
                 if e.match(space, space.w_StopIteration):
                     break
+                # write the complete records before the error
+                self.flush_records(rec, length)
                 raise
-            self.writerow(w_seq)
+            if rec.getlength() >= FLUSH_SIZE:
+                self.flush_records(rec, rec.getlength())
+                rec = StringBuilder(FLUSH_SIZE)
+        self.flush_records(rec, rec.getlength())
+
+    def flush_records(self, rec, length):
+        """ Write the first length bytes of rec to the file. """
+        if length > 0:
+            space = self.space
+            data = rec.build()
+            if length < len(data):
+                data = data[:length]
+            space.call_function(self.w_filewrite, space.newtext(data))
 
 
 def csv_writer(space, w_fileobj, w_dialect=None,
@@ -104,3 +104,87 @@ class AppTestReader(object):
         self._read_test(['a,"'], 'Error', strict=True)
         self._read_test(['"a'], 'Error', strict=True)
         self._read_test(['^'], 'Error', escapechar='^', strict=True)
+
+    def test_read_types(self):
+        self._read_test(['1,2.5,x', '-3,,y', ',1e3,'],
+                        [[1, 2.5, 'x'], [-3, None, 'y'], [None, 1000.0, '']],
+                        types=[int, float, str])
+        self._read_test(['a,b,c'], [['a', 'b', 'c']], types=[None])
+        self._read_test(['1,2,3'], [[1, '2', '3']], types=[int])
+        self._read_test(['99999999999999999999999'],
+                        [[99999999999999999999999]], types=[int])
+        raises(ValueError, self._read_test, ['1.5'], [], types=[int])
+        raises(ValueError, self._read_test, ['abc'], [], types=[float])
+        raises(TypeError, self._read_test, ['1'], [], types=[list])
+
+    def test_read_many(self):
+        import _csv
+        r = _csv.reader(['a,1', 'b,2', 'c,3'], types=[str, int])
+        assert r.read_many(2) == [['a', 1], ['b', 2]]
+        assert r.line_num == 2
+        assert r.read_many(2) == [['c', 3]]
+        assert r.read_many(2) == []
+        raises(StopIteration, r.next)
+
+    def test_read_columns(self):
+        import _csv
+        r = _csv.reader(['a,1,2.5', 'b,2,', 'c,3,1.0', 'd,4,0.5'],
+                        types=[str, int, float])
+        assert r.read_columns(3) == [['a', 'b', 'c'], [1, 2, 3],
+                                     [2.5, None, 1.0]]
+        assert r.read_columns(3) == [['d'], [4], [0.5]]
+        assert r.read_columns(3) == []
+        r = _csv.reader(['1,a', '99999999999999999999999,b', ',c'],
+                        types=[int])
+        assert r.read_columns(5) == [[1, 99999999999999999999999, None],
+                                     ['a', 'b', 'c']]
+        r = _csv.reader(['a,b', 'c'])
+        raises(_csv.Error, r.read_columns, 5)
+        r = _csv.reader(['a', 'b,c'])
+        raises(_csv.Error, r.read_columns, 5)
+
+    def test_read_chunked(self):
+        import _csv
+        data = 'a,"b\r\nc",1\r\nd,e,2\n\nf,"g""h",3\rx,y,'
+        expected = [['a', 'b\r\nc', 1], ['d', 'e', 2], [], ['f', 'g"h', 3],
+                    ['x', 'y', None]]
+        for size in [1, 2, 3, 7, len(data)]:
+            chunks = [data[i:i+size] for i in range(0, len(data), size)]
+            r = _csv.reader(chunks, chunked=True, types=[str, str, int])
+            assert list(r) == expected
+        r = _csv.reader(['a,b\r', '\n', 'c,d\r\n'], chunked=True)
+        assert list(r) == [['a', 'b'], ['c', 'd']]
+        # line_num counts the lines, not the chunks
+        for size in [1, 2, 3, 7, len(data)]:
+            chunks = [data[i:i+size] for i in range(0, len(data), size)]
+            r = _csv.reader(chunks, chunked=True)
+            assert [r.line_num for row in r] == [2, 3, 4, 5, 6]
+        r = _csv.reader(['a,b\r', '\n', 'c,d\r\n'], chunked=True)
+        assert [r.line_num for row in r] == [1, 2]
+        # a record ending with its chunk is returned without reading the
+        # next chunk, unless the chunk ends with '\r'
+        def gen(chunks, pulled):
+            for chunk in chunks:
+                pulled.append(chunk)
+                yield chunk
+        for first in ['a,b\n', 'a,b\r\n']:
+            pulled = []
+            r = _csv.reader(gen([first, 'c,d\n'], pulled), chunked=True)
+            assert next(r) == ['a', 'b']
+            assert pulled == [first]
+            assert next(r) == ['c', 'd']
+        pulled = []
+        r = _csv.reader(gen(['a,b\r', '\n', 'c,d'], pulled), chunked=True)
+        assert next(r) == ['a', 'b']
+        assert pulled == ['a,b\r', '\n']
+        r = _csv.reader(['a,b\nc,\0'], chunked=True)
+        next(r)
+        exc = raises(_csv.Error, next, r)
+        assert str(exc.value).startswith('line 2:')
+        r = _csv.reader(['a,"b', 'c'], chunked=True)
+        assert list(r) == [['a', 'bc']]
+        r = _csv.reader(['a,"b', 'c'], chunked=True, strict=True)
+        raises(_csv.Error, list, r)
+        # without chunked=True, the same input is an error
+        r = _csv.reader(['a\rb'])
+        raises(_csv.Error, list, r)
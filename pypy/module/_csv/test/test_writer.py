@@ -85,3 +85,55 @@ class AppTestWriter(object):
 
     def test_writerows(self):
         self._write_test([['a'],['b','c']], 'a\r\nb,c')
+
+    def test_writerows_numbers(self):
+        import _csv as csv
+        self._write_test([[1, 2.5, -3], [1e100, float('inf'), 'x']],
+                         '1,2.5,-3\r\n1e+100,inf,x')
+        self._write_test([[1, 2.5, 'a']], '1,2.5,"a"',
+                         quoting=csv.QUOTE_NONNUMERIC)
+        self._write_test([[1, 2.5, True]], '"1","2.5","True"',
+                         quoting=csv.QUOTE_ALL)
+        # the digits or the dot may need quoting or escaping
+        self._write_test([[12, 1.25]], '"12"2"1.25"', delimiter='2')
+        self._write_test([[12, 1.5]], '12,1\\.5', escapechar='\\',
+                         quoting=csv.QUOTE_NONE, quotechar='.')
+        # subclasses of int and float keep their own str() and repr()
+        class MyInt(int):
+            def __str__(self):
+                return 'int!'
+        class MyFloat(float):
+            def __repr__(self):
+                return 'float!'
+        self._write_test([[MyInt(1), MyFloat(2.5)]], 'int!,float!')
+
+    def test_writerows_batched(self):
+        import _csv
+        class File(object):
+            def __init__(self):
+                self.parts = []
+            def write(self, s):
+                self.parts.append(s)
+        f = File()
+        w = _csv.writer(f)
+        rows = [['a' * 100, i, i * 0.5] for i in range(1000)]
+        w.writerows(rows)
+        assert len(f.parts) == 2
+        expected = ''.join(['%s,%d,%r\r\n' % ('a' * 100, i, i * 0.5)
+                            for i in range(1000)])
+        assert ''.join(f.parts) == expected
+
+    def test_writerows_error(self):
+        import _csv
+        class File(object):
+            def __init__(self):
+                self.parts = []
+            def write(self, s):
+                self.parts.append(s)
+        class BadItem:
+            def __str__(self):
+                raise IOError
+        f = File()
+        w = _csv.writer(f)
+        raises(IOError, w.writerows, [['a', 1], ['b', BadItem()]])
+        assert f.parts == ['a,1\r\n']
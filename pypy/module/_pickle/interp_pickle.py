@@ -0,0 +1,1057 @@
+from rpython.rlib import rstackovf
+from rpython.rlib.objectmodel import (r_dict, compute_hash,
+                                      compute_identity_hash)
+from rpython.rlib.mutbuffer import MutableStringBuffer
+from rpython.rlib.rstring import StringBuilder
+from rpython.rlib.rstruct import ieee
+from rpython.rlib import rutf8
+
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.function import Function, BuiltinFunction
+from pypy.interpreter.gateway import applevel, interp2app, unwrap_spec
+from pypy.interpreter.typedef import (TypeDef, GetSetProperty,
+                                      interp_attrproperty)
+from pypy.interpreter.unicodehelper import raw_unicode_escape_helper
+from pypy.module.__builtin__.interp_classobj import (W_ClassObject,
+                                                     W_InstanceObject)
+from pypy.module.cStringIO.interp_stringio import W_OutputType
+from pypy.objspace.std.dictmultiobject import W_DictMultiObject
+from pypy.objspace.std.floatobject import float_repr
+
+
+HIGHEST_PROTOCOL = 2
+
+# the opcodes, see pickle.py and pickletools.py for the details
+MARK            = '('
+STOP            = '.'
+POP             = '0'
+POP_MARK        = '1'
+DUP             = '2'
+FLOAT           = 'F'
+INT             = 'I'
+BININT          = 'J'
+BININT1         = 'K'
+LONG            = 'L'
+BININT2         = 'M'
+NONE            = 'N'
+PERSID          = 'P'
+BINPERSID       = 'Q'
+REDUCE          = 'R'
+STRING          = 'S'
+BINSTRING       = 'T'
+SHORT_BINSTRING = 'U'
+UNICODE         = 'V'
+BINUNICODE      = 'X'
+APPEND          = 'a'
+BUILD           = 'b'
+GLOBAL          = 'c'
+DICT            = 'd'
+EMPTY_DICT      = '}'
+APPENDS         = 'e'
+GET             = 'g'
+BINGET          = 'h'
+INST            = 'i'
+LONG_BINGET     = 'j'
+LIST            = 'l'
+EMPTY_LIST      = ']'
+OBJ             = 'o'
+PUT             = 'p'
+BINPUT          = 'q'
+LONG_BINPUT     = 'r'
+SETITEM         = 's'
+TUPLE           = 't'
+EMPTY_TUPLE     = ')'
+SETITEMS        = 'u'
+BINFLOAT        = 'G'
+
+TRUE            = 'I01\n'
+FALSE           = 'I00\n'
+
+# protocol 2
+PROTO           = '\x80'
+NEWOBJ          = '\x81'
+EXT1            = '\x82'
+EXT2            = '\x83'
+EXT4            = '\x84'
+TUPLE1          = '\x85'
+TUPLE2          = '\x86'
+TUPLE3          = '\x87'
+NEWTRUE         = '\x88'
+NEWFALSE        = '\x89'
+LONG1           = '\x8a'
+LONG4           = '\x8b'
+
+# number of items per APPENDS and SETITEMS
+BATCHSIZE = 1000
+
+# picklers with a file pass the output to file.write() in blocks of
+# about this size
+FLUSH_SIZE = 64 * 1024
+
+
+app = applevel(r'''
+def get_state():
+    import pickle, copy_reg
+    return (pickle.PicklingError, pickle.UnpicklingError,
+            copy_reg.dispatch_table)
+
+def global_info(obj, name, proto):
+    """Check that obj can be pickled as a reference to a global.
+    Returns (module, name, extension code or 0)."""
+    import sys, pickle, copy_reg
+    if name is None:
+        name = obj.__name__
+    module = getattr(obj, "__module__", None)
+    if module is None:
+        module = pickle.whichmodule(obj, name)
+    try:
+        __import__(module)
+        mod = sys.modules[module]
+        klass = getattr(mod, name)
+    except (ImportError, KeyError, AttributeError):
+        raise pickle.PicklingError(
+            "Can't pickle %r: it's not found as %s.%s" % (obj, module, name))
+    else:
+        if klass is not obj:
+            raise pickle.PicklingError(
+                "Can't pickle %r: it's not the same object as %s.%s" %
+                (obj, module, name))
+    code = 0
+    if proto >= 2:
+        code = copy_reg._extension_registry.get((module, name), 0)
+    return module, name, code
+
+def moduledict_reduce(obj):
+    """Returns the reduce tuple for the __dict__ of a module, or None."""
+    import sys
+    from types import ModuleType
+    try:
+        name = obj['__name__']
+        if type(name) is not str:
+            return None
+        themodule = sys.modules[name]
+        if type(themodule) is not ModuleType:
+            return None
+        if themodule.__dict__ is not obj:
+            return None
+    except (AttributeError, KeyError, TypeError):
+        return None
+    return getattr, (themodule, '__dict__')
+
+def find_global(module, name):
+    import sys
+    __import__(module)
+    mod = sys.modules[module]
+    return getattr(mod, name)
+
+def get_extension(code):
+    """Returns (obj, None) if the extension code is in the cache, and
+    (None, (module, name)) otherwise."""
+    import copy_reg
+    nil = []
+    obj = copy_reg._extension_cache.get(code, nil)
+    if obj is not nil:
+        return obj, None
+    key = copy_reg._inverted_registry.get(code)
+    if not key:
+        raise ValueError("unregistered extension code %d" % code)
+    return None, key
+
+def cache_extension(code, obj):
+    import copy_reg
+    copy_reg._extension_cache[code] = obj
+
+def instantiate_classic(klass):
+    """Returns an instance of the old-style class klass, created without
+    calling __init__(), or None if klass is not such a class."""
+    from types import ClassType, InstanceType
+    if type(klass) is ClassType and not hasattr(klass, "__getinitargs__"):
+        return InstanceType(klass)
+    return None
+''', filename=__file__)
+
+get_state = app.interphook('get_state')
+global_info = app.interphook('global_info')
+moduledict_reduce = app.interphook('moduledict_reduce')
+find_global = app.interphook('find_global')
+get_extension = app.interphook('get_extension')
+cache_extension = app.interphook('cache_extension')
+instantiate_classic = app.interphook('instantiate_classic')
+
+
+class State(object):
+    """ The objects of the pickle and copy_reg modules that are needed at
+    interp-level. They are fetched lazily, when the first pickle is
+    created or loaded. """
+
+    def __init__(self, space):
+        self.w_PicklingError = None
+        self.w_UnpicklingError = None
+        self.w_dispatch_table = None
+
+    def init(self, space):
+        if self.w_dispatch_table is None:
+            w_res = get_state(space)
+            (self.w_PicklingError, self.w_UnpicklingError,
+             self.w_dispatch_table) = space.fixedview(w_res, 3)
+
+def get_pickle_state(space):
+    state = space.fromcache(State)
+    state.init(space)
+    return state
+
+
+def check_protocol(space, w_protocol):
+    if w_protocol is None or space.is_w(w_protocol, space.w_None):
+        return 0
+    proto = space.int_w(w_protocol)
+    if proto < 0:
+        return HIGHEST_PROTOCOL
+    if proto > HIGHEST_PROTOCOL:
+        raise oefmt(space.w_ValueError,
+                    "pickle protocol %d asked for; the highest available "
+                    "protocol is %d", proto, HIGHEST_PROTOCOL)
+    return proto
+
+def getattr_or_none(space, w_obj, name):
+    # unlike space.findattr(), only an AttributeError means that the
+    # attribute is missing, as in cPickle
+    try:
+        return space.getattr(w_obj, space.newtext(name))
+    except OperationError as e:
+        if not e.match(space, space.w_AttributeError):
+            raise
+        return None
+
+def pack_int4(i):
+    return (chr(i & 0xff) + chr((i >> 8) & 0xff) + chr((i >> 16) & 0xff) +
+            chr((i >> 24) & 0xff))
+
+def pack_float_be(x):
+    buf = MutableStringBuffer(8)
+    ieee.pack_float(buf, 0, x, 8, True)
+    return buf.finish()
+
+def encode_long(space, w_long):
+    """ Two's complement little-endian encoding of a long, with as few
+    bytes as possible. """
+    bigint = space.bigint_w(w_long)
+    if bigint.get_sign() == 0:
+        return ''
+    if bigint.get_sign() < 0:
+        nbits = bigint.invert().bit_length()
+    else:
+        nbits = bigint.bit_length()
+    return bigint.tobytes((nbits >> 3) + 1, 'little', True)
+
+def escape_unicode(s):
+    """ The raw-unicode-escape encoding of the utf-8 string s, with
+    backslashes and newlines escaped too. """
+    result = StringBuilder(len(s))
+    pos = 0
+    while pos < len(s):
+        oc = rutf8.codepoint_at_pos(s, pos)
+        if oc == ord('\\'):
+            result.append('\\u005c')
+        elif oc == ord('\n'):
+            result.append('\\u000a')
+        elif oc < 0x100:
+            result.append(chr(oc))
+        else:
+            raw_unicode_escape_helper(result, oc)
+        pos = rutf8.next_codepoint_pos(s, pos)
+    return result.build()
+
+# str and unicode objects are identical if they wrap the same RPython
+# string, or an equal string of length <= 1 (utf-8 length <= 2 for
+# unicode), see the is_w() methods of W_BytesObject and W_UnicodeObject.
+# The memo of strings follows that.
+
+def bytes_is(s1, s2):
+    if len(s2) > 1:
+        return s1 is s2
+    return s1 == s2
+
+def bytes_identity_hash(s):
+    if len(s) > 1:
+        return compute_identity_hash(s)
+    return compute_hash(s)
+
+def utf8_is(s1, s2):
+    if len(s2) > 2:
+        return s1 is s2
+    return s1 == s2
+
+def utf8_identity_hash(s):
+    if len(s) > 2:
+        return compute_identity_hash(s)
+    return compute_hash(s)
+
+def new_bytes_memo():
+    return r_dict(bytes_is, bytes_identity_hash)
+
+def new_utf8_memo():
+    return r_dict(utf8_is, utf8_identity_hash)
+
+
+class W_Pickler(W_Root):
+    """ The pickle protocols 0 to 2, as implemented by pickle.Pickler.
+    The output is collected in a StringBuilder and passed to the file in
+    large blocks. The memo maps the objects themselves (not their id) to
+    their index; str and unicode objects are memoized by their RPython
+    string, as their W_Root is not kept by the list strategies. """
+
+    def __init__(self, space):
+        self.space = space
+        self.proto = 0
+        self.bin = False
+        self.fast = 0
+        self.w_persistent_id = None
+        self.w_inst_persistent_id = None
+        # the persistent_id and inst_persistent_id of the running dump(),
+        # which can also be methods of a subclass
+        self.w_pers_func = None
+        self.w_inst_pers_func = None
+        # the nesting of save() calls, limited like in cPickle
+        self.depth = 0
+        self.memo = {}
+        self.memo_bytes = new_bytes_memo()
+        self.memo_utf8 = new_utf8_memo()
+        self.builder = StringBuilder()
+        self.w_output = None
+        self.w_write = None
+        self.state = get_pickle_state(space)
+
+    def set_output(self, w_file, proto):
+        space = self.space
+        self.proto = proto
+        self.bin = proto >= 1
+        self.w_output = None
+        self.w_write = None
+        if w_file is not None:
+            if isinstance(w_file, W_OutputType):
+                self.w_output = w_file
+            else:
+                w_write = space.findattr(w_file, space.newtext('write'))
+                if w_write is None:
+                    raise oefmt(space.w_TypeError,
+                                "argument must have 'write' attribute")
+                self.w_write = w_write
+
+    @staticmethod
+    def descr_new(space, w_subtype, __args__):
+        w_self = space.allocate_instance(W_Pickler, w_subtype)
+        W_Pickler.__init__(w_self, space)
+        return w_self
+
+    def descr_init(self, space, w_file=None, w_protocol=None):
+        if (w_protocol is None and w_file is not None and
+                space.isinstance_w(w_file, space.w_int)):
+            # Pickler(protocol): use getvalue() to get the result
+            w_protocol = w_file
+            w_file = None
+        if w_file is not None and space.is_w(w_file, space.w_None):
+            w_file = None
+        self.set_output(w_file, check_protocol(space, w_protocol))
+
+    def pickling_error(self, msg):
+        return OperationError(self.state.w_PicklingError,
+                              self.space.newtext(msg))
+
+    # ____________________________________________________________
+    # output
+
+    def write(self, s):
+        self.builder.append(s)
+
+    def maybe_flush(self):
+        if self.builder.getlength() >= FLUSH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.w_write is None and self.w_output is None:
+            return    # list-based pickler, see getvalue()
+        data = self.builder.build()
+        self.builder = StringBuilder()
+        if not data:
+            return
+        if self.w_output is not None:
+            self.w_output.check_closed()
+            self.w_output.write(data)
+        else:
+            space = self.space
+            space.call_function(self.w_write, space.newbytes(data))
+
+    def write_put(self, i):
+        if self.bin:
+            if i < 256:
+                self.write(BINPUT + chr(i))
+            else:
+                self.write(LONG_BINPUT + pack_int4(i))
+        else:
+            self.write(PUT + str(i) + '\n')
+
+    def write_get(self, i):
+        if self.bin:
+            if i < 256:
+                self.write(BINGET + chr(i))
+            else:
+                self.write(LONG_BINGET + pack_int4(i))
+        else:
+            self.write(GET + str(i) + '\n')
+
+    def memo_size(self):
+        return len(self.memo) + len(self.memo_bytes) + len(self.memo_utf8)
+
+    def memo_get(self, w_obj, w_type):
+        space = self.space
+        if space.is_w(w_type, space.w_bytes):
+            return self.memo_bytes.get(space.bytes_w(w_obj), 0)
+        if space.is_w(w_type, space.w_unicode):
+            return self.memo_utf8.get(space.utf8_w(w_obj), 0)
+        return self.memo.get(w_obj, 0)
+
+    def memo_set(self, w_obj, index):
+        space = self.space
+        w_type = space.type(w_obj)
+        if space.is_w(w_type, space.w_bytes):
+            self.memo_bytes[space.bytes_w(w_obj)] = index
+        elif space.is_w(w_type, space.w_unicode):
+            self.memo_utf8[space.utf8_w(w_obj)] = index
+        else:
+            self.memo[w_obj] = index
+
+    def memoize(self, w_obj):
+        if self.fast:
+            return
+        # like cPickle, start counting at 1
+        index = self.memo_size() + 1
+        self.write_put(index)
+        self.memo_set(w_obj, index)
+
+    # ____________________________________________________________
+    # app-level interface
+
+    def descr_dump(self, space, w_obj):
+        """dump(obj) -- Write a pickled representation of obj to the file."""
+        if type(self) is W_Pickler:
+            self.w_pers_func = self.w_persistent_id
+            self.w_inst_pers_func = self.w_inst_persistent_id
+        else:
+            # a subclass can define these as methods
+            self.w_pers_func = space.findattr(
+                self, space.newtext('persistent_id'))
+            self.w_inst_pers_func = space.findattr(
+                self, space.newtext('inst_persistent_id'))
+        if self.proto >= 2:
+            self.write(PROTO + chr(self.proto))
+        self.depth = 0
+        try:
+            self.save(w_obj)
+        except rstackovf.StackOverflow:
+            rstackovf.check_stack_overflow()
+            raise oefmt(space.w_RuntimeError,
+                        "maximum recursion depth exceeded")
+        finally:
+            self.w_pers_func = None
+            self.w_inst_pers_func = None
+        self.write(STOP)
+        self.flush()
+        return self
+
+    def descr_clear_memo(self, space):
+        """clear_memo() -- Clear the picklers memo"""
+        self.memo.clear()
+        self.memo_bytes.clear()
+        self.memo_utf8.clear()
+
+    @unwrap_spec(clear=int)
+    def descr_getvalue(self, space, clear=1):
+        """getvalue() -- Finish picking a list-based pickle"""
+        if self.w_write is not None or self.w_output is not None:
+            raise self.pickling_error(
+                "Attempt to getvalue() a non-list-based pickler")
+        data = self.builder.build()
+        self.builder = StringBuilder()
+        if not clear:
+            self.builder.append(data)
+        return space.newbytes(data)
+
+    def descr_get_memo(self, space):
+        w_memo = space.newdict()
+        for w_obj, index in self.memo.items():
+            self._add_to_memo_dict(w_memo, w_obj, index)
+        for s, index in self.memo_bytes.items():
+            self._add_to_memo_dict(w_memo, space.newbytes(s), index)
+        for s, index in self.memo_utf8.items():
+            w_obj = space.newutf8(s, rutf8.codepoints_in_utf8(s))
+            self._add_to_memo_dict(w_memo, w_obj, index)
+        return w_memo
+
+    def _add_to_memo_dict(self, w_memo, w_obj, index):
+        space = self.space
+        space.setitem(w_memo, space.id(w_obj),
+                      space.newtuple([space.newint(index), w_obj]))
+
+    def descr_set_memo(self, space, w_memo):
+        values_w = space.listview(space.call_method(w_memo, 'values'))
+        self.descr_clear_memo(space)
+        for w_value in values_w:
+            w_index, w_obj = space.fixedview(w_value, 2)
+            self.memo_set(w_obj, space.int_w(w_index))
+
+    def descr_get_fast(self, space):
+        return space.newint(self.fast)
+
+    def descr_set_fast(self, space, w_fast):
+        self.fast = space.int_w(w_fast)
+
+    def descr_get_persistent_id(self, space):
+        if self.w_persistent_id is None:
+            raise oefmt(space.w_AttributeError, "persistent_id")
+        return self.w_persistent_id
+
+    def descr_set_persistent_id(self, space, w_persistent_id):
+        self.w_persistent_id = w_persistent_id
+
+    def descr_get_inst_persistent_id(self, space):
+        if self.w_inst_persistent_id is None:
+            raise oefmt(space.w_AttributeError, "inst_persistent_id")
+        return self.w_inst_persistent_id
+
+    def descr_set_inst_persistent_id(self, space, w_inst_persistent_id):
+        self.w_inst_persistent_id = w_inst_persistent_id
+
+    # ____________________________________________________________
+    # saving
+
+    def save(self, w_obj):
+        space = self.space
+        if self.depth >= space.sys.recursionlimit:
+            raise oefmt(space.w_RuntimeError,
+                        "maximum recursion depth exceeded while pickling an "
+                        "object")
+        self.depth += 1
+        try:
+            self.save_obj(w_obj)
+        finally:
+            self.depth -= 1
+
+    def save_obj(self, w_obj):
+        space = self.space
+        if self.w_pers_func is not None:
+            if self.try_save_pers(self.w_pers_func, w_obj):
+                return
+        w_type = space.type(w_obj)
+        index = self.memo_get(w_obj, w_type)
+        if index:
+            self.write_get(index)
+            return
+        if space.is_w(w_obj, space.w_None):
+            self.write(NONE)
+        elif space.is_w(w_type, space.w_int):
+            self.save_int(space.int_w(w_obj))
+        elif space.is_w(w_type, space.w_bytes):
+            self.save_bytes(w_obj)
+        elif space.is_w(w_type, space.w_float):
+            self.save_float(space.float_w(w_obj))
+        elif space.is_w(w_type, space.w_unicode):
+            self.save_unicode(w_obj)
+        elif space.is_w(w_type, space.w_tuple):
+            self.save_tuple(w_obj)
+        elif space.is_w(w_type, space.w_list):
+            self.save_list(w_obj)
+        elif space.is_w(w_type, space.w_dict):
+            self.save_dict(w_obj)
+        elif space.is_w(w_type, space.w_bool):
+            self.save_bool(space.is_true(w_obj))
+        elif space.is_w(w_type, space.w_long):
+            self.save_long(w_obj)
+        elif space.is_w(w_type,
+                        space.gettypeobject(W_InstanceObject.typedef)):
+            self.save_inst(w_obj)
+        elif space.is_w(w_type, space.gettypeobject(W_ClassObject.typedef)):
+            self.save_global(w_obj, None)
+        elif space.is_w(w_type, space.gettypeobject(Function.typedef)):
+            self.save_function(w_obj)
+        elif space.is_w(w_type,
+                        space.gettypeobject(BuiltinFunction.typedef)):
+            self.save_global(w_obj, None)
+        else:
+            # like cPickle, inst_persistent_id is only called for the
+            # objects that are not of one of the types above
+            if self.w_inst_pers_func is not None:
+                if self.try_save_pers(self.w_inst_pers_func, w_obj):
+                    return
+            self.save_other(w_obj, w_type)
+
+    def try_save_pers(self, w_func, w_obj):
+        space = self.space
+        w_pid = space.call_function(w_func, w_obj)
+        if space.is_w(w_pid, space.w_None):
+            return False
+        self.save_pers(w_pid)
+        return True
+
+    def save_pers(self, w_pid):
+        if self.bin:
+            self.save(w_pid)
+            self.write(BINPERSID)
+        else:
+            space = self.space
+            self.write(PERSID + space.text_w(space.str(w_pid)) + '\n')
+
+    def save_bool(self, value):
+        if self.proto >= 2:
+            self.write(NEWTRUE if value else NEWFALSE)
+        else:
+            self.write(TRUE if value else FALSE)
+
+    def save_int(self, value):
+        if self.bin:
+            if value >= 0:
+                if value <= 0xff:
+                    self.write(BININT1 + chr(value))
+                    return
+                if value <= 0xffff:
+                    self.write(BININT2 + chr(value & 0xff) + chr(value >> 8))
+                    return
+            high_bits = value >> 31
+            if high_bits == 0 or high_bits == -1:
+                self.write(BININT + pack_int4(value))
+                return
+        self.write(INT + str(value) + '\n')
+
+    def save_long(self, w_obj):
+        space = self.space
+        if self.proto >= 2:
+            data = encode_long(space, w_obj)
+            n = len(data)
+            if n < 256:
+                self.write(LONG1 + chr(n))
+            else:
+                self.write(LONG4 + pack_int4(n))
+            self.write(data)
+            return
+        self.write(LONG + space.text_w(space.repr(w_obj)) + '\n')
+
+    def save_float(self, value):
+        if self.bin:
+            self.write(BINFLOAT + pack_float_be(value))
+        else:
+            self.write(FLOAT + float_repr(value) + '\n')
+
+    def save_bytes(self, w_obj):
+        space = self.space
+        if self.bin:
+            s = space.bytes_w(w_obj)
+            n = len(s)
+            if n < 256:
+                self.write(SHORT_BINSTRING + chr(n))
+            else:
+                self.write(BINSTRING + pack_int4(n))
+            self.write(s)
+        else:
+            self.write(STRING + space.text_w(space.repr(w_obj)) + '\n')
+        self.memoize(w_obj)
+
+    def save_unicode(self, w_obj):
+        s = self.space.utf8_w(w_obj)
+        if self.bin:
+            self.write(BINUNICODE + pack_int4(len(s)))
+            self.write(s)
+        else:
+            self.write(UNICODE + escape_unicode(s) + '\n')
+        self.memoize(w_obj)
+
+    def save_tuple(self, w_obj):
+        space = self.space
+        items_w = space.fixedview(w_obj)
+        n = len(items_w)
+        if n == 0:
+            if self.proto:
+                self.write(EMPTY_TUPLE)
+            else:
+                self.write(MARK + TUPLE)
+            return
+        if n <= 3 and self.proto >= 2:
+            for w_item in items_w:
+                self.save(w_item)
+            index = self.memo.get(w_obj, 0)
+            if index:
+                # the tuple is recursive, get it from the memo
+                self.write(POP * n)
+                self.write_get(index)
+            else:
+                if n == 1:
+                    self.write(TUPLE1)
+                elif n == 2:
+                    self.write(TUPLE2)
+                else:
+                    self.write(TUPLE3)
+                self.memoize(w_obj)
+            return
+        self.write(MARK)
+        for w_item in items_w:
+            self.save(w_item)
+        index = self.memo.get(w_obj, 0)
+        if index:
+            if self.proto:
+                self.write(POP_MARK)
+            else:
+                self.write(POP * (n + 1))
+            self.write_get(index)
+            return
+        self.write(TUPLE)
+        self.memoize(w_obj)
+
+    def save_list(self, w_list):
+        if self.bin:
+            self.write(EMPTY_LIST)
+        else:
+            self.write(MARK + LIST)
+        self.memoize(w_list)
+        if self.w_pers_func is None:
+            # ints and floats are never memoized, so they can be written
+            # straight out of the list strategy
+            ints = self.space.listview_int(w_list)
+            if ints is not None:
+                self.save_int_items(ints)
+                return
+            floats = self.space.listview_float(w_list)
+            if floats is not None:
+                self.save_float_items(floats)
+                return
+        items_w = self.space.listview(w_list)
+        for start in range(0, len(items_w), BATCHSIZE):
+            end = min(len(items_w), start + BATCHSIZE)
+            if not self.bin:
+                for i in range(start, end):
+                    self.save(items_w[i])
+                    self.write(APPEND)
+            else:
+                self.save_appends(items_w[start:end])
+            self.maybe_flush()
+
+    def save_appends(self, items_w):
+        if len(items_w) > 1:
+            self.write(MARK)
+            for w_item in items_w:
+                self.save(w_item)
+            self.write(APPENDS)
+        elif items_w:
+            self.save(items_w[0])
+            self.write(APPEND)
+
+    def save_int_items(self, ints):
+        n = len(ints)
+        for start in range(0, n, BATCHSIZE):
+            end = min(n, start + BATCHSIZE)
+            batch = self.bin and end - start > 1
+            if batch:
+                self.write(MARK)
+            for i in range(start, end):
+                self.save_int(ints[i])
+                if not batch:
+                    self.write(APPEND)
+            if batch:
+                self.write(APPENDS)
+            self.maybe_flush()
+
+    def save_float_items(self, floats):
+        n = len(floats)
+        for start in range(0, n, BATCHSIZE):
+            end = min(n, start + BATCHSIZE)
+            batch = self.bin and end - start > 1
+            if batch:
+                self.write(MARK)
+            for i in range(start, end):
+                self.save_float(floats[i])
+                if not batch:
+                    self.write(APPEND)
+            if batch:
+                self.write(APPENDS)
+            self.maybe_flush()
+
+    def save_dict(self, w_dict):
+        space = self.space
+        assert isinstance(w_dict, W_DictMultiObject)
+        if w_dict.getitem_str('__name__') is not None:
+            w_rv = moduledict_reduce(space, w_dict)
+            if not space.is_w(w_rv, space.w_None):
+                w_func, w_args = space.fixedview(w_rv, 2)
+                self.save_reduce(w_func, w_args, None, None, None, None)
+                return
+        if self.bin:
+            self.write(EMPTY_DICT)
+        else:
+            self.write(MARK + DICT)
+        self.memoize(w_dict)
+        iterator = w_dict.iteritems()
+        while True:
+            keys_w = []
+            values_w = []
+            while len(keys_w) < BATCHSIZE:
+                w_key, w_value = iterator.next_item()
+                if w_key is None:
+                    break
+                keys_w.append(w_key)
+                values_w.append(w_value)
+            self.save_setitems(keys_w, values_w)
+            self.maybe_flush()
+            if len(keys_w) < BATCHSIZE:
+                break
+
+    def save_setitems(self, keys_w, values_w):
+        n = len(keys_w)
+        if self.bin and n > 1:
+            self.write(MARK)
+            for i in range(n):
+                self.save(keys_w[i])
+                self.save(values_w[i])
+            self.write(SETITEMS)
+        else:
+            for i in range(n):
+                self.save(keys_w[i])
+                self.save(values_w[i])
+                self.write(SETITEM)
+
+    def save_iter_appends(self, w_iter):
+        space = self.space
+        done = False
+        while not done:
+            items_w = []
+            while len(items_w) < BATCHSIZE:
+                try:
+                    w_item = space.next(w_iter)
+                except OperationError as e:
+                    if not e.match(space, space.w_StopIteration):
+                        raise
+                    done = True
+                    break
+                if not self.bin:
+                    self.save(w_item)
+                    self.write(APPEND)
+                else:
+                    items_w.append(w_item)
+            self.save_appends(items_w)
+
+    def save_iter_setitems(self, w_iter):
+        space = self.space
+        done = False
+        while not done:
+            keys_w = []
+            values_w = []
+            while len(keys_w) < BATCHSIZE:
+                try:
+                    w_item = space.next(w_iter)
+                except OperationError as e:
+                    if not e.match(space, space.w_StopIteration):
+                        raise
+                    done = True
+                    break
+                w_key, w_value = space.fixedview(w_item, 2)
+                keys_w.append(w_key)
+                values_w.append(w_value)
+            self.save_setitems(keys_w, values_w)
+
+    def save_inst(self, w_obj):
+        space = self.space
+        w_cls = space.getattr(w_obj, space.newtext('__class__'))
+        w_getinitargs = getattr_or_none(space, w_obj, '__getinitargs__')
+        if w_getinitargs is not None:
+            args_w = space.listview(space.call_function(w_getinitargs))
+        else:
+            args_w = []
+        self.write(MARK)
+        if self.bin:
+            self.save(w_cls)
+            for w_arg in args_w:
+                self.save(w_arg)
+            self.write(OBJ)
+        else:
+            for w_arg in args_w:
+                self.save(w_arg)
+            w_module = space.getattr(w_cls, space.newtext('__module__'))
+            w_name = space.getattr(w_cls, space.newtext('__name__'))
+            self.write(INST + space.text_w(w_module) + '\n' +
+                       space.text_w(w_name) + '\n')
+        self.memoize(w_obj)
+        w_getstate = getattr_or_none(space, w_obj, '__getstate__')
+        if w_getstate is None:
+            w_state = space.getattr(w_obj, space.newtext('__dict__'))
+        else:
+            w_state = space.call_function(w_getstate)
+        self.save(w_state)
+        self.write(BUILD)
+
+    def save_global(self, w_obj, w_name):
+        space = self.space
+        if w_name is None:
+            w_name = space.w_None
+        w_info = global_info(space, w_obj, w_name, space.newint(self.proto))
+        w_module, w_name, w_code = space.fixedview(w_info, 3)
+        code = space.int_w(w_code)
+        if code:
+            if code <= 0xff:
+                self.write(EXT1 + chr(code))
+            elif code <= 0xffff:
+                self.write(EXT2 + chr(code & 0xff) + chr(code >> 8))
+            else:
+                self.write(EXT4 + pack_int4(code))
+            return
+        self.write(GLOBAL + space.text_w(w_module) + '\n' +
+                   space.text_w(w_name) + '\n')
+        self.memoize(w_obj)
+
+    def save_function(self, w_obj):
+        space = self.space
+        try:
+            self.save_global(w_obj, None)
+            return
+        except OperationError as e:
+            if not e.match(space, self.state.w_PicklingError):
+                raise
+        self.save_other(w_obj, space.type(w_obj))
+
+    def save_other(self, w_obj, w_type):
+        space = self.space
+        w_reduce = space.finditem(self.state.w_dispatch_table, w_type)
+        if w_reduce is not None:
+            w_rv = space.call_function(w_reduce, w_obj)
+        else:
+            if space.issubtype_w(w_type, space.w_type):
+                self.save_global(w_obj, None)
+                return
+            w_reduce = getattr_or_none(space, w_obj, '__reduce_ex__')
+            if w_reduce is not None:
+                w_rv = space.call_function(w_reduce, space.newint(self.proto))
+            else:
+                w_reduce = getattr_or_none(space, w_obj, '__reduce__')
+                if w_reduce is None:
+                    raise oefmt(self.state.w_PicklingError,
+                                "Can't pickle '%N' object: %R", w_type, w_obj)
+                w_rv = space.call_function(w_reduce)
+        w_rvtype = space.type(w_rv)
+        if space.is_w(w_rvtype, space.w_bytes):
+            self.save_global(w_obj, w_rv)
+            return
+        if not space.is_w(w_rvtype, space.w_tuple):
+            raise oefmt(self.state.w_PicklingError,
+                        "%R must return string or tuple", w_reduce)
+        items_w = space.fixedview(w_rv)
+        n = len(items_w)
+        if not 2 <= n <= 5:
+            raise oefmt(self.state.w_PicklingError,
+                        "Tuple returned by %R must have two to five elements",
+                        w_reduce)
+        items_w = items_w + [None] * (5 - n)
+        w_state = items_w[2]
+        if w_state is not None and space.is_w(w_state, space.w_None):
+            w_state = None
+        w_listitems = items_w[3]
+        if w_listitems is not None and space.is_w(w_listitems, space.w_None):
+            w_listitems = None
+        w_dictitems = items_w[4]
+        if w_dictitems is not None and space.is_w(w_dictitems, space.w_None):
+            w_dictitems = None
+        self.save_reduce(items_w[0], items_w[1], w_state, w_listitems,
+                         w_dictitems, w_obj)
+
+    def save_reduce(self, w_func, w_args, w_state, w_listitems, w_dictitems,
+                    w_obj):
+        space = self.space
+        if (w_listitems is not None and
+                space.lookup(w_listitems, 'next') is None):
+            raise oefmt(self.state.w_PicklingError,
+                        "fourth element of the tuple returned by __reduce__ "
+                        "must be an iterator, not %T", w_listitems)
+        if (w_dictitems is not None and
+                space.lookup(w_dictitems, 'next') is None):
+            raise oefmt(self.state.w_PicklingError,
+                        "fifth element of the tuple returned by __reduce__ "
+                        "must be an iterator, not %T", w_dictitems)
+        if not space.isinstance_w(w_args, space.w_tuple):
+            raise self.pickling_error("args from reduce() should be a tuple")
+        if space.findattr(w_func, space.newtext('__call__')) is None:
+            raise self.pickling_error("func from reduce should be callable")
+        w_funcname = None
+        if self.proto >= 2:
+            w_funcname = space.findattr(w_func, space.newtext('__name__'))
+        if (w_funcname is not None and
+                space.eq_w(w_funcname, space.newtext('__newobj__'))):
+            args_w = space.fixedview(w_args)
+            if not args_w:
+                raise oefmt(space.w_IndexError, "tuple index out of range")
+            w_cls = args_w[0]
+            if space.findattr(w_cls, space.newtext('__new__')) is None:
+                raise self.pickling_error(
+                    "args[0] from __newobj__ args has no __new__")
+            if w_obj is not None and not space.is_w(w_cls,
+                    space.getattr(w_obj, space.newtext('__class__'))):
+                raise self.pickling_error(
+                    "args[0] from __newobj__ args has the wrong class")
+            self.save(w_cls)
+            self.save(space.newtuple(args_w[1:]))
+            self.write(NEWOBJ)
+        else:
+            self.save(w_func)
+            self.save(w_args)
+            self.write(REDUCE)
+        if w_obj is not None:
+            index = self.memo.get(w_obj, 0)
+            if index:
+                # the object is recursive, throw away what was just written
+                # and get it from the memo
+                self.write(POP)
+                self.write_get(index)
+            else:
+                self.memoize(w_obj)
+        if w_listitems is not None:
+            self.save_iter_appends(w_listitems)
+        if w_dictitems is not None:
+            self.save_iter_setitems(w_dictitems)
+        if w_state is not None:
+            self.save(w_state)
+            self.write(BUILD)
+
+
+W_Pickler.typedef = TypeDef(
+    'cPickle.Pickler',
+    __new__ = interp2app(W_Pickler.descr_new),
+    __init__ = interp2app(W_Pickler.descr_init),
+    dump = interp2app(W_Pickler.descr_dump),
+    clear_memo = interp2app(W_Pickler.descr_clear_memo),
+    getvalue = interp2app(W_Pickler.descr_getvalue),
+    memo = GetSetProperty(W_Pickler.descr_get_memo, W_Pickler.descr_set_memo),
+    fast = GetSetProperty(W_Pickler.descr_get_fast, W_Pickler.descr_set_fast),
+    persistent_id = GetSetProperty(W_Pickler.descr_get_persistent_id,
+                                   W_Pickler.descr_set_persistent_id),
+    inst_persistent_id = GetSetProperty(
+        W_Pickler.descr_get_inst_persistent_id,
+        W_Pickler.descr_set_inst_persistent_id),
+    proto = interp_attrproperty('proto', W_Pickler, wrapfn="newint"),
+    binary = interp_attrproperty('bin', W_Pickler, wrapfn="newbool"),
+    __doc__ = """Pickler(file, protocol=0) -- Create a pickler.
+
+This takes a file-like object for writing a pickle data stream.
+The optional proto argument tells the pickler to use the given
+protocol; supported protocols are 0, 1, 2.  The default
+protocol is 0.  If the file argument is omitted, or is an integer
+(the protocol), the pickle is collected in memory and returned
+by getvalue().""")
+
+
+def dump(space, w_obj, w_file, w_protocol=None):
+    """dump(obj, file, protocol=0) -- Write an object in pickle format to the given file."""
+    pickler = W_Pickler(space)
+    pickler.set_output(w_file, check_protocol(space, w_protocol))
+    pickler.descr_dump(space, w_obj)
+
+def dumps(space, w_obj, w_protocol=None):
+    """dumps(obj, protocol=0) -- Return a string containing an object in pickle format."""
+    pickler = W_Pickler(space)
+    pickler.set_output(None, check_protocol(space, w_protocol))
+    pickler.descr_dump(space, w_obj)
+    return space.newbytes(pickler.builder.build())
@@ -0,0 +1,662 @@
+from rpython.rlib.rarithmetic import string_to_int
+from rpython.rlib.rbigint import rbigint
+from rpython.rlib.rstring import ParseStringError
+from rpython.rlib.rstruct import ieee
+
+from pypy.interpreter import unicodehelper
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.typedef import TypeDef, GetSetProperty, interp2app
+from pypy.module.cStringIO.interp_stringio import W_InputOutputType
+from pypy.module._pickle.interp_pickle import (
+    get_pickle_state, find_global, get_extension, cache_extension,
+    instantiate_classic, getattr_or_none, HIGHEST_PROTOCOL)
+from pypy.module._pickle import interp_pickle as op
+
+
+class AbstractReader(object):
+    """ The input of an Unpickler. read(n) returns exactly n bytes and
+    readline() a line including the final newline (or the non-empty rest
+    of the input, like in cPickle), or they raise EOFError. """
+
+    def __init__(self, space):
+        self.space = space
+
+    def raise_eof(self):
+        raise OperationError(self.space.w_EOFError, self.space.w_None)
+
+    def read(self, n):
+        raise NotImplementedError("Purely abstract method")
+
+    def readline(self):
+        raise NotImplementedError("Purely abstract method")
+
+    def read1(self):
+        return ord(self.read(1)[0])
+
+
+class StringReader(AbstractReader):
+    def __init__(self, space, data):
+        AbstractReader.__init__(self, space)
+        self.data = data
+        self.pos = 0
+
+    def read(self, n):
+        pos = self.pos
+        end = pos + n
+        if n < 0 or end > len(self.data):
+            self.raise_eof()
+        self.pos = end
+        return self.data[pos:end]
+
+    def read1(self):
+        pos = self.pos
+        if pos >= len(self.data):
+            self.raise_eof()
+        self.pos = pos + 1
+        return ord(self.data[pos])
+
+    def readline(self):
+        pos = self.pos
+        if pos >= len(self.data):
+            self.raise_eof()
+        end = self.data.find('\n', pos) + 1
+        if end <= 0:
+            end = len(self.data)
+        self.pos = end
+        return self.data[pos:end]
+
+
+class StringIOReader(AbstractReader):
+    """ Reads directly from a cStringIO object. """
+
+    def __init__(self, space, w_input):
+        AbstractReader.__init__(self, space)
+        self.w_input = w_input
+
+    def read(self, n):
+        self.w_input.check_closed()
+        data = self.w_input.read(n)
+        if len(data) != n:
+            self.raise_eof()
+        return data
+
+    def readline(self):
+        self.w_input.check_closed()
+        line = self.w_input.readline()
+        if not line:
+            self.raise_eof()
+        return line
+
+
+class FileReader(AbstractReader):
+    def __init__(self, space, w_file):
+        AbstractReader.__init__(self, space)
+        self.w_read = space.getattr(w_file, space.newtext('read'))
+        self.w_readline = space.getattr(w_file, space.newtext('readline'))
+
+    def read(self, n):
+        space = self.space
+        w_data = space.call_function(self.w_read, space.newint(n))
+        data = space.bytes_w(w_data)
+        if len(data) != n:
+            self.raise_eof()
+        return data
+
+    def readline(self):
+        space = self.space
+        line = space.bytes_w(space.call_function(self.w_readline))
+        if not line:
+            self.raise_eof()
+        return line
+
+
+def strip_newline(line):
+    end = len(line) - 1
+    assert end >= 0
+    return line[:end]
+
+def unpack_int4(s):
+    # signed, like in pickle.py
+    high = ord(s[3])
+    if high >= 0x80:
+        high -= 0x100
+    return ord(s[0]) | (ord(s[1]) << 8) | (ord(s[2]) << 16) | (high << 24)
+
+
+class W_Unpickler(W_Root):
+    """ Loads pickles of the protocols 0 to 2. The marks are kept in a
+    separate stack of positions instead of being pushed on the stack. """
+
+    def __init__(self, space, reader):
+        self.space = space
+        self.reader = reader
+        self.memo = {}
+        self.stack_w = []
+        self.marks = []
+        self.w_find_global = None
+        self.find_global_set = False
+        self.w_persistent_load = None
+        # the find_global and persistent_load of the running load(),
+        # which can also be methods of a subclass
+        self.use_find_global = False
+        self.w_find_global_func = None
+        self.w_pers_func = None
+        # noload(): don't create the objects, only walk the pickle
+        self.skip_objects = False
+        self.state = get_pickle_state(space)
+
+    @staticmethod
+    def descr_new(space, w_subtype, __args__):
+        w_self = space.allocate_instance(W_Unpickler, w_subtype)
+        W_Unpickler.__init__(w_self, space, None)
+        return w_self
+
+    def descr_init(self, space, w_file):
+        self.reader = make_reader(space, w_file)
+
+    def unpickling_error(self, msg):
+        return OperationError(self.state.w_UnpicklingError,
+                              self.space.newtext(msg))
+
+    # ____________________________________________________________
+    # app-level interface
+
+    def descr_load(self, space):
+        """load() -- Load a pickle"""
+        return self.run_load(False)
+
+    def descr_noload(self, space):
+        """noload() -- not load a pickle, but go through most of the motions
+
+This function can be used to read past a pickle without instantiating
+any objects or importing any modules.  It can also be used to find all
+persistent references without instantiating any objects or importing
+any modules."""
+        return self.run_load(True)
+
+    def run_load(self, skip_objects):
+        space = self.space
+        if self.reader is None:
+            raise oefmt(space.w_ValueError,
+                        "Unpickler.__init__() was not called")
+        if type(self) is W_Unpickler:
+            self.use_find_global = self.find_global_set
+            self.w_find_global_func = self.w_find_global
+            self.w_pers_func = self.w_persistent_load
+        else:
+            # a subclass can define these as methods
+            w_func = space.findattr(self, space.newtext('find_global'))
+            self.use_find_global = w_func is not None
+            if w_func is not None and space.is_w(w_func, space.w_None):
+                w_func = None
+            self.w_find_global_func = w_func
+            self.w_pers_func = space.findattr(
+                self, space.newtext('persistent_load'))
+        self.skip_objects = skip_objects
+        self.stack_w = []
+        self.marks = []
+        try:
+            return self.load()
+        finally:
+            self.stack_w = []
+            self.marks = []
+            self.w_find_global_func = None
+            self.w_pers_func = None
+
+    def descr_get_memo(self, space):
+        w_memo = space.newdict()
+        for index, w_obj in self.memo.items():
+            space.setitem(w_memo, space.newint(index), w_obj)
+        return w_memo
+
+    def descr_set_memo(self, space, w_memo):
+        memo = {}
+        w_items = space.call_method(w_memo, 'items')
+        for w_item in space.listview(w_items):
+            w_key, w_value = space.fixedview(w_item, 2)
+            memo[space.int_w(w_key)] = w_value
+        self.memo = memo
+
+    def descr_get_find_global(self, space):
+        if not self.find_global_set:
+            raise oefmt(space.w_AttributeError, "find_global")
+        if self.w_find_global is None:
+            return space.w_None
+        return self.w_find_global
+
+    def descr_set_find_global(self, space, w_find_global):
+        self.find_global_set = True
+        if space.is_w(w_find_global, space.w_None):
+            self.w_find_global = None
+        else:
+            self.w_find_global = w_find_global
+
+    def descr_get_persistent_load(self, space):
+        if self.w_persistent_load is None:
+            raise oefmt(space.w_AttributeError, "persistent_load")
+        return self.w_persistent_load
+
+    def descr_set_persistent_load(self, space, w_persistent_load):
+        self.w_persistent_load = w_persistent_load
+
+    # ____________________________________________________________
+    # the stack
+
+    def push(self, w_obj):
+        self.stack_w.append(w_obj)
+
+    def pop(self):
+        if len(self.stack_w) <= self.top_mark():
+            raise self.unpickling_error("unpickling stack underflow")
+        return self.stack_w.pop()
+
+    def top(self):
+        if len(self.stack_w) <= self.top_mark():
+            raise self.unpickling_error("unpickling stack underflow")
+        return self.stack_w[-1]
+
+    def top_mark(self):
+        if self.marks:
+            return self.marks[-1]
+        return 0
+
+    def pop_mark(self):
+        """ Remove the topmost mark. Returns the position of the first
+        stack item after it. """
+        if not self.marks:
+            raise self.unpickling_error("could not find MARK")
+        return self.marks.pop()
+
+    def pop_items(self, k):
+        """ Remove and return the stack items from position k on. """
+        assert k >= 0
+        items_w = self.stack_w[k:]
+        del self.stack_w[k:]
+        return items_w
+
+    # ____________________________________________________________
+    # loading
+
+    def load(self):
+        space = self.space
+        reader = self.reader
+        while True:
+            key = chr(reader.read1())
+            if key == op.STOP:
+                break
+            elif key == op.MARK:
+                self.marks.append(len(self.stack_w))
+            elif key == op.BININT1:
+                self.push(space.newint(reader.read1()))
+            elif key == op.BININT2:
+                s = reader.read(2)
+                self.push(space.newint(ord(s[0]) | (ord(s[1]) << 8)))
+            elif key == op.BININT:
+                self.push(space.newint(unpack_int4(reader.read(4))))
+            elif key == op.BINFLOAT:
+                self.push(space.newfloat(
+                    ieee.unpack_float(reader.read(8), True)))
+            elif key == op.SHORT_BINSTRING:
+                self.push(space.newbytes(reader.read(reader.read1())))
+            elif key == op.BINSTRING:
+                n = unpack_int4(reader.read(4))
+                if n < 0:
+                    raise self.unpickling_error(
+                        "BINSTRING pickle has negative byte count")
+                self.push(space.newbytes(reader.read(n)))
+            elif key == op.BINUNICODE:
+                n = unpack_int4(reader.read(4))
+                if n < 0:
+                    raise self.unpickling_error(
+                        "BINUNICODE pickle has negative byte count")
+                s = reader.read(n)
+                length = unicodehelper.check_utf8_or_raise(space, s)
+                self.push(space.newutf8(s, length))
+            elif key == op.NONE:
+                self.push(space.w_None)
+            elif key == op.NEWTRUE:
+                self.push(space.w_True)
+            elif key == op.NEWFALSE:
+                self.push(space.w_False)
+            elif key == op.EMPTY_LIST:
+                self.push(space.newlist([]))
+            elif key == op.EMPTY_DICT:
+                self.push(space.newdict())
+            elif key == op.EMPTY_TUPLE:
+                self.push(space.newtuple([]))
+            elif key == op.TUPLE1:
+                w_a = self.pop()
+                self.push(space.newtuple([w_a]))
+            elif key == op.TUPLE2:
+                w_b = self.pop()
+                w_a = self.pop()
+                self.push(space.newtuple([w_a, w_b]))
+            elif key == op.TUPLE3:
+                w_c = self.pop()
+                w_b = self.pop()
+                w_a = self.pop()
+                self.push(space.newtuple([w_a, w_b, w_c]))
+            elif key == op.TUPLE:
+                items_w = self.pop_items(self.pop_mark())
+                self.push(space.newtuple(items_w))
+            elif key == op.LIST:
+                items_w = self.pop_items(self.pop_mark())
+                self.push(space.newlist(items_w[:]))
+            elif key == op.DICT:
+                items_w = self.pop_items(self.pop_mark())
+                w_dict = space.newdict()
+                self.set_items(w_dict, items_w)
+                self.push(w_dict)
+            elif key == op.APPEND:
+                w_value = self.pop()
+                if not self.skip_objects:
+                    self.append_items(self.top(), [w_value])
+            elif key == op.APPENDS:
+                items_w = self.pop_items(self.pop_mark())
+                if not self.skip_objects:
+                    self.append_items(self.top(), items_w)
+            elif key == op.SETITEM:
+                w_value = self.pop()
+                w_key = self.pop()
+                if not self.skip_objects:
+                    space.setitem(self.top(), w_key, w_value)
+            elif key == op.SETITEMS:
+                items_w = self.pop_items(self.pop_mark())
+                if not self.skip_objects:
+                    self.set_items(self.top(), items_w)
+            elif key == op.BINPUT:
+                self.memo[reader.read1()] = self.top()
+            elif key == op.LONG_BINPUT:
+                index = unpack_int4(reader.read(4))
+                if index < 0:
+                    raise oefmt(space.w_ValueError, "negative LONG_BINPUT argument")
+                self.memo[index] = self.top()
+            elif key == op.PUT:
+                index = self.parse_int(strip_newline(reader.readline()))
+                self.memo[index] = self.top()
+            elif key == op.BINGET:
+                self.push(self.memo_get(reader.read1()))
+            elif key == op.LONG_BINGET:
+                self.push(self.memo_get(unpack_int4(reader.read(4))))
+            elif key == op.GET:
+                s = strip_newline(reader.readline())
+                try:
+                    index = string_to_int(s)
+                except ParseStringError:
+                    # no such key in the memo, as in cPickle
+                    raise OperationError(space.w_KeyError, space.newbytes(s))
+                self.push(self.memo_get(index))
+            elif key == op.POP:
+                if self.marks and self.marks[-1] == len(self.stack_w):
+                    self.marks.pop()
+                else:
+                    self.pop()
+            elif key == op.POP_MARK:
+                self.pop_items(self.pop_mark())
+            elif key == op.DUP:
+                self.push(self.top())
+            elif key == op.INT:
+                self.load_int(reader.readline())
+            elif key == op.LONG:
+                s = strip_newline(reader.readline())
+                self.push(space.call_function(space.w_long, space.newbytes(s),
+                                              space.newint(0)))
+            elif key == op.LONG1:
+                self.push(self.decode_long(reader.read(reader.read1())))
+            elif key == op.LONG4:
+                n = unpack_int4(reader.read(4))
+                if n < 0:
+                    raise self.unpickling_error(
+                        "LONG pickle has negative byte count")
+                self.push(self.decode_long(reader.read(n)))
+            elif key == op.FLOAT:
+                s = strip_newline(reader.readline())
+                self.push(space.call_function(space.w_float,
+                                              space.newbytes(s)))
+            elif key == op.STRING:
+                self.load_string(reader.readline())
+            elif key == op.UNICODE:
+                s = strip_newline(reader.readline())
+                utf8, length = unicodehelper.decode_raw_unicode_escape(space,
+                                                                       s)
+                self.push(space.newutf8(utf8, length))
+            elif key == op.GLOBAL:
+                module = strip_newline(reader.readline())
+                name = strip_newline(reader.readline())
+                if self.skip_objects:
+                    self.push(space.w_None)
+                else:
+                    self.push(self.find_class(module, name))
+            elif key == op.EXT1:
+                self.load_extension(reader.read1())
+            elif key == op.EXT2:
+                s = reader.read(2)
+                self.load_extension(ord(s[0]) | (ord(s[1]) << 8))
+            elif key == op.EXT4:
+                self.load_extension(unpack_int4(reader.read(4)))
+            elif key == op.REDUCE:
+                w_args = self.pop()
+                w_func = self.pop()
+                if self.skip_objects:
+                    self.push(space.w_None)
+                else:
+                    self.push(space.call(w_func, w_args))
+            elif key == op.NEWOBJ:
+                w_args = self.pop()
+                w_cls = self.pop()
+                if self.skip_objects:
+                    self.push(space.w_None)
+                else:
+                    w_new = space.getattr(w_cls, space.newtext('__new__'))
+                    args_w = [w_cls] + space.fixedview(w_args)
+                    self.push(space.call(w_new, space.newtuple(args_w)))
+            elif key == op.BUILD:
+                w_state = self.pop()
+                if not self.skip_objects:
+                    self.load_build(self.top(), w_state)
+            elif key == op.INST:
+                module = strip_newline(reader.readline())
+                name = strip_newline(reader.readline())
+                items_w = self.pop_items(self.pop_mark())
+                if self.skip_objects:
+                    self.push(space.w_None)
+                else:
+                    self.instantiate(self.find_class(module, name), items_w)
+            elif key == op.OBJ:
+                items_w = self.pop_items(self.pop_mark())
+                if not items_w:
+                    raise self.unpickling_error("unpickling stack underflow")
+                if self.skip_objects:
+                    self.push(space.w_None)
+                else:
+                    self.instantiate(items_w[0], items_w[1:])
+            elif key == op.PROTO:
+                proto = reader.read1()
+                if proto > HIGHEST_PROTOCOL:
+                    raise oefmt(space.w_ValueError,
+                                "unsupported pickle protocol: %d", proto)
+            elif key == op.PERSID:
+                pid = strip_newline(reader.readline())
+                self.push(self.persistent_load(space.newbytes(pid)))
+            elif key == op.BINPERSID:
+                self.push(self.persistent_load(self.pop()))
+            else:
+                raise oefmt(self.state.w_UnpicklingError,
+                            "invalid load key, '%s'.", key)
+        return self.pop()
+
+    def parse_int(self, s):
+        try:
+            return string_to_int(s)
+        except ParseStringError:
+            raise oefmt(self.space.w_ValueError,
+                        "invalid literal for int(): '%s'", s)
+
+    def memo_get(self, index):
+        try:
+            return self.memo[index]
+        except KeyError:
+            space = self.space
+            raise OperationError(space.w_KeyError, space.newint(index))
+
+    def load_int(self, line):
+        space = self.space
+        if line == op.FALSE[1:]:
+            self.push(space.w_False)
+        elif line == op.TRUE[1:]:
+            self.push(space.w_True)
+        else:
+            s = strip_newline(line)
+            try:
+                w_value = space.newint(string_to_int(s))
+            except ParseStringError:
+                # out of range or invalid, let int() deal with it
+                w_value = space.call_function(space.w_int, space.newbytes(s))
+            self.push(w_value)
+
+    def decode_long(self, data):
+        return self.space.newlong_from_rbigint(
+            rbigint.frombytes(data, 'little', True))
+
+    def load_string(self, line):
+        space = self.space
+        end = len(line) - 2
+        if end < 1 or line[0] != line[end] or (line[0] != "'" and
+                                               line[0] != '"'):
+            raise oefmt(space.w_ValueError, "insecure string pickle")
+        w_rep = space.newbytes(line[1:end])
+        self.push(space.call_method(w_rep, 'decode',
+                                    space.newtext('string-escape')))
+
+    def append_items(self, w_list, items_w):
+        space = self.space
+        if space.is_w(space.type(w_list), space.w_list):
+            space.call_method(w_list, 'extend', space.newlist(items_w[:]))
+        else:
+            w_append = space.getattr(w_list, space.newtext('append'))
+            for w_item in items_w:
+                space.call_function(w_append, w_item)
+
+    def set_items(self, w_dict, items_w):
+        space = self.space
+        if len(items_w) & 1:
+            raise self.unpickling_error("odd number of items for SETITEMS")
+        for i in range(0, len(items_w), 2):
+            space.setitem(w_dict, items_w[i], items_w[i + 1])
+
+    def find_class(self, module, name):
+        space = self.space
+        w_module = space.newtext(module)
+        w_name = space.newtext(name)
+        if self.use_find_global:
+            if self.w_find_global_func is None:
+                raise self.unpickling_error(
+                    "Global and instance pickles are not supported.")
+            return space.call_function(self.w_find_global_func, w_module,
+                                       w_name)
+        return find_global(space, w_module, w_name)
+
+    def load_extension(self, code):
+        space = self.space
+        if self.skip_objects:
+            self.push(space.w_None)
+            return
+        w_code = space.newint(code)
+        w_res = get_extension(space, w_code)
+        w_obj, w_key = space.fixedview(w_res, 2)
+        if space.is_w(w_key, space.w_None):
+            self.push(w_obj)
+            return
+        w_module, w_name = space.fixedview(w_key, 2)
+        w_obj = self.find_class(space.text_w(w_module), space.text_w(w_name))
+        cache_extension(space, w_code, w_obj)
+        self.push(w_obj)
+
+    def persistent_load(self, w_pid):
+        space = self.space
+        if self.w_pers_func is None:
+            raise self.unpickling_error(
+                "A load persistent id instruction was encountered,\n"
+                "but no persistent_load function was specified.")
+        if space.isinstance_w(self.w_pers_func, space.w_list):
+            # like cPickle, collect the persistent ids in the list
+            space.call_method(self.w_pers_func, 'append', w_pid)
+            return w_pid
+        return space.call_function(self.w_pers_func, w_pid)
+
+    def instantiate(self, w_klass, args_w):
+        space = self.space
+        if not args_w:
+            w_value = instantiate_classic(space, w_klass)
+            if not space.is_w(w_value, space.w_None):
+                self.push(w_value)
+                return
+        try:
+            w_value = space.call(w_klass, space.newtuple(args_w))
+        except OperationError as e:
+            if not e.match(space, space.w_TypeError):
+                raise
+            w_name = space.getattr(w_klass, space.newtext('__name__'))
+            raise oefmt(space.w_TypeError, "in constructor for %s: %s",
+                        space.text_w(w_name),
+                        space.text_w(space.str(e.get_w_value(space))))
+        self.push(w_value)
+
+    def load_build(self, w_inst, w_state):
+        space = self.space
+        w_setstate = getattr_or_none(space, w_inst, '__setstate__')
+        if w_setstate is not None:
+            space.call_function(w_setstate, w_state)
+            return
+        w_slotstate = None
+        if (space.isinstance_w(w_state, space.w_tuple) and
+                space.len_w(w_state) == 2):
+            w_state, w_slotstate = space.fixedview(w_state, 2)
+        if space.is_true(w_state):
+            w_dict = space.getattr(w_inst, space.newtext('__dict__'))
+            w_items = space.call_method(w_state, 'items')
+            for w_item in space.listview(w_items):
+                w_key, w_value = space.fixedview(w_item, 2)
+                space.setitem(w_dict, w_key, w_value)
+        if w_slotstate is not None and space.is_true(w_slotstate):
+            w_items = space.call_method(w_slotstate, 'items')
+            for w_item in space.listview(w_items):
+                w_key, w_value = space.fixedview(w_item, 2)
+                space.setattr(w_inst, w_key, w_value)
+
+
+def make_reader(space, w_file):
+    if isinstance(w_file, W_InputOutputType):
+        return StringIOReader(space, w_file)
+    return FileReader(space, w_file)
+
+
+W_Unpickler.typedef = TypeDef(
+    'cPickle.Unpickler',
+    __new__ = interp2app(W_Unpickler.descr_new),
+    __init__ = interp2app(W_Unpickler.descr_init),
+    load = interp2app(W_Unpickler.descr_load),
+    noload = interp2app(W_Unpickler.descr_noload),
+    memo = GetSetProperty(W_Unpickler.descr_get_memo,
+                          W_Unpickler.descr_set_memo),
+    find_global = GetSetProperty(W_Unpickler.descr_get_find_global,
+                                 W_Unpickler.descr_set_find_global),
+    persistent_load = GetSetProperty(W_Unpickler.descr_get_persistent_load,
+                                     W_Unpickler.descr_set_persistent_load),
+    __doc__ = """Unpickler(file) -- Create an unpickler.
+
+This takes a file-like object with read() and readline() methods for
+reading a pickle data stream.""")
+
+
+def load(space, w_file):
+    """load(file) -- Load a pickle from the given file"""
+    unpickler = W_Unpickler(space, make_reader(space, w_file))
+    return unpickler.run_load(False)
+
+def loads(space, w_data):
+    """loads(string) -- Load a pickle from the given string"""
+    data = space.bufferstr_w(w_data)
+    unpickler = W_Unpickler(space, StringReader(space, data))
+    return unpickler.run_load(False)
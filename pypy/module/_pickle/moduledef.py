@@ -0,0 +1,19 @@
+from pypy.interpreter.mixedmodule import MixedModule
+
+
+class Module(MixedModule):
+    """Interp-level implementation of the cPickle Pickler and Unpickler,
+for the pickle protocols 0 to 2.  Used by lib_pypy/cPickle.py."""
+
+    appleveldefs = {
+    }
+
+    interpleveldefs = {
+        'HIGHEST_PROTOCOL': 'space.newint(interp_pickle.HIGHEST_PROTOCOL)',
+        'Pickler': 'interp_pickle.W_Pickler',
+        'dump': 'interp_pickle.dump',
+        'dumps': 'interp_pickle.dumps',
+        'Unpickler': 'interp_unpickle.W_Unpickler',
+        'load': 'interp_unpickle.load',
+        'loads': 'interp_unpickle.loads',
+    }
@@ -0,0 +1,350 @@
+class AppTestPickle(object):
+    spaceconfig = dict(usemodules=['_pickle', 'struct', 'binascii',
+                                   'cStringIO'])
+
+    def test_simple_roundtrip(self):
+        import _pickle
+        values = [None, True, False, 0, 1, -1, 255, 256, 65535, 65536,
+                  2**31 - 1, -2**31, 2**40, -2**40, 2**100, -2**100, 0L,
+                  1.5, -0.0, 1e300, '', 'abc', 'x' * 300, u'', u'abc',
+                  u'\u1234\n\\', (), (1,), (1, 2), (1, 2, 3), (1, 2, 3, 4),
+                  [], [1, 'a'], {}, {'a': 1, 2: [3]}]
+        for proto in range(3):
+            for value in values:
+                s = _pickle.dumps(value, proto)
+                res = _pickle.loads(s)
+                assert res == value
+                assert type(res) is type(value)
+
+    def test_output(self):
+        import _pickle
+        assert _pickle.dumps(1) == 'I1\n.'
+        assert _pickle.dumps(1, 1) == 'K\x01.'
+        assert _pickle.dumps([1, 2], 2) == '\x80\x02]q\x01(K\x01K\x02e.'
+        assert _pickle.dumps(('a', 'a'), 2) == (
+            '\x80\x02U\x01aq\x01h\x01\x86q\x02.')
+        assert _pickle.dumps(True, 0) == 'I01\n.'
+        assert _pickle.dumps(True, 2) == '\x80\x02\x88.'
+        assert _pickle.dumps(255L, 2) == '\x80\x02\x8a\x02\xff\x00.'
+        assert _pickle.dumps(-128L, 2) == '\x80\x02\x8a\x01\x80.'
+        assert _pickle.dumps(u'a\nb', 0) == 'Va\\u000ab\np1\n.'
+        assert _pickle.dumps(1.5, 1) == 'G?\xf8\x00\x00\x00\x00\x00\x00.'
+
+    def test_same_as_pickle(self):
+        import _pickle, pickle
+        class Pickler(pickle.Pickler):
+            def memoize(self, obj):
+                # cPickle starts counting at one
+                self.memo[id(None)] = None
+                return pickle.Pickler.memoize(self, obj)
+        from cStringIO import StringIO
+        value = [1, 2.5, 'abc', u'def', (1, 2), {'x': [None, True]},
+                 2**70, ['abc'] * 3, (1, 2, 3, 4, 5)]
+        value.append(value)
+        for proto in range(3):
+            f = StringIO()
+            Pickler(f, proto).dump(value)
+            assert _pickle.dumps(value, proto) == f.getvalue()
+
+    def test_shared_and_recursive(self):
+        import _pickle
+        a = [1]
+        b = [a, a]
+        b.append(b)
+        d = {}
+        d['self'] = d
+        t = ([],)
+        t[0].append(t)
+        for proto in range(3):
+            res = _pickle.loads(_pickle.dumps(b, proto))
+            assert res[0] is res[1]
+            assert res[2] is res
+            res = _pickle.loads(_pickle.dumps(d, proto))
+            assert res['self'] is res
+            res = _pickle.loads(_pickle.dumps(t, proto))
+            assert res[0][0] is res
+
+    def test_big_containers(self):
+        import _pickle
+        for value in [range(2500), [i * 0.5 for i in range(2500)],
+                      [str(i) for i in range(2500)],
+                      dict.fromkeys(range(2500), 'x')]:
+            for proto in range(3):
+                assert _pickle.loads(_pickle.dumps(value, proto)) == value
+
+    def test_instances(self):
+        import _pickle, sys
+        mod = type(sys)('pickle_test_classes')
+        sys.modules['pickle_test_classes'] = mod
+        class Old:
+            def __init__(self, x):
+                self.x = x
+        class New(object):
+            def __init__(self, x):
+                self.x = x
+        class Slots(object):
+            __slots__ = ['a', 'b']
+        class Reduce(object):
+            def __reduce__(self):
+                return (Reduce, (), {'y': 42})
+        for cls in [Old, New, Slots, Reduce]:
+            cls.__module__ = 'pickle_test_classes'
+            setattr(mod, cls.__name__, cls)
+        s = Slots()
+        s.a = 5
+        for proto in range(3):
+            res = _pickle.loads(_pickle.dumps(Old(5), proto))
+            assert res.__class__ is Old and res.x == 5
+            res = _pickle.loads(_pickle.dumps(New(6), proto))
+            assert type(res) is New and res.x == 6
+            if proto >= 2:
+                res = _pickle.loads(_pickle.dumps(s, proto))
+                assert type(res) is Slots and res.a == 5
+                assert not hasattr(res, 'b')
+            res = _pickle.loads(_pickle.dumps(Reduce(), proto))
+            assert type(res) is Reduce and res.y == 42
+            res = _pickle.loads(_pickle.dumps([New, len], proto))
+            assert res == [New, len]
+
+    def test_errors(self):
+        import _pickle, pickle
+        class Local:
+            pass
+        Local.__module__ = 'no_such_module_for_pickle'
+        raises(pickle.PicklingError, _pickle.dumps, Local)
+        raises(ValueError, _pickle.dumps, 1, 3)
+        raises(EOFError, _pickle.loads, '')
+        raises(EOFError, _pickle.loads, 'I1\n')
+        raises(EOFError, _pickle.loads, 'K')
+        raises(pickle.UnpicklingError, _pickle.loads, 'z')
+        raises(pickle.UnpicklingError, _pickle.loads, 't.')
+        raises(pickle.UnpicklingError, _pickle.loads, '0.')
+        raises(KeyError, _pickle.loads, 'h\x01.')
+        raises(ValueError, _pickle.loads, "S'abc\n.")
+        raises(ValueError, _pickle.loads, '\x80\x03N.')
+        # like cPickle, the last line doesn't need a newline, but its last
+        # character is dropped anyway
+        exc = raises(KeyError, _pickle.loads, 'garyp')
+        assert exc.value.args == ('ary',)
+        # the 4th and 5th items of __reduce__() must be iterators
+        class C(object):
+            def __reduce__(self):
+                return list, (), None, [], None
+        class D(object):
+            def __reduce__(self):
+                return dict, (), None, None, []
+        for proto in range(3):
+            raises(pickle.PicklingError, _pickle.dumps, C(), proto)
+            raises(pickle.PicklingError, _pickle.dumps, D(), proto)
+
+    def test_errors_from_getattr(self):
+        import _pickle
+        # only an AttributeError means that __getinitargs__, __getstate__
+        # or __reduce_ex__ is missing
+        class BadGetattr:
+            def __getattr__(self, key):
+                raise RuntimeError(key)
+        class NewBadGetattr(object):
+            def __getattribute__(self, key):
+                raise RuntimeError(key)
+        for proto in range(3):
+            raises(RuntimeError, _pickle.dumps, BadGetattr(), proto)
+            raises(RuntimeError, _pickle.dumps, NewBadGetattr(), proto)
+
+    def test_recursion_limit(self):
+        import _pickle, sys
+        value = []
+        for i in range(30):
+            value = [value]
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(20)
+        try:
+            raises(RuntimeError, _pickle.dumps, value)
+        finally:
+            sys.setrecursionlimit(limit)
+        assert _pickle.loads(_pickle.dumps(value)) == value
+
+    def test_pickler_unpickler_objects(self):
+        import _pickle
+        from cStringIO import StringIO
+        class File(object):
+            def __init__(self):
+                self.parts = []
+            def write(self, s):
+                self.parts.append(s)
+        f = File()
+        p = _pickle.Pickler(f, 2)
+        assert p.proto == 2 and p.binary
+        data = ['abc', 'abc']
+        p.dump(data)
+        p.dump(data)
+        assert len(f.parts) == 2
+        assert f.parts[1] == '\x80\x02h\x01.'
+        p.clear_memo()
+        p.dump(data)
+        assert f.parts[2] == f.parts[0]
+        u = _pickle.Unpickler(StringIO(''.join(f.parts)))
+        res = u.load()
+        assert res == data
+        assert u.load() is res
+        assert u.load() == data
+        raises(EOFError, u.load)
+        #
+        p = _pickle.Pickler(1)
+        p.dump(5)
+        assert p.getvalue(0) == 'K\x05.'
+        assert p.getvalue() == 'K\x05.'
+        assert p.getvalue() == ''
+        #
+        p = _pickle.Pickler(StringIO())
+        p.dump(data)
+        primed = _pickle.Pickler(StringIO())
+        primed.memo = p.memo
+        assert primed.memo == p.memo
+
+    def test_persistent(self):
+        import _pickle
+        from cStringIO import StringIO
+        for proto in range(3):
+            f = StringIO()
+            p = _pickle.Pickler(f, proto)
+            p.persistent_id = lambda obj: str(obj) if obj in (1, 2) else None
+            p.dump([1, 2, 3])
+            u = _pickle.Unpickler(StringIO(f.getvalue()))
+            raises(Exception, u.load)
+            u = _pickle.Unpickler(StringIO(f.getvalue()))
+            u.persistent_load = lambda pid: 'pid' + pid
+            assert u.load() == ['pid1', 'pid2', 3]
+
+    def test_find_global(self):
+        import _pickle, pickle
+        from cStringIO import StringIO
+        s = _pickle.dumps(len)
+        u = _pickle.Unpickler(StringIO(s))
+        u.find_global = None
+        raises(pickle.UnpicklingError, u.load)
+        u = _pickle.Unpickler(StringIO(s))
+        u.find_global = lambda module, name: (module, name)
+        assert u.load() == ('__builtin__', 'len')
+
+    def test_inst_persistent_id(self):
+        import _pickle
+        from cStringIO import StringIO
+        class A(object):
+            pass
+        a = A()
+        seen = []
+        def inst_persistent_id(obj):
+            seen.append(obj)
+            return 'a' if obj is a else None
+        f = StringIO()
+        p = _pickle.Pickler(f, 2)
+        p.inst_persistent_id = inst_persistent_id
+        p.dump([1, 'x', a, len])
+        # only called for the objects that are not of the basic types
+        assert seen == [a]
+        u = _pickle.Unpickler(StringIO(f.getvalue()))
+        u.persistent_load = lambda pid: 'pid' + pid
+        assert u.load() == [1, 'x', 'pida', len]
+
+    def test_subclass(self):
+        import _pickle, pickle
+        from cStringIO import StringIO
+        class Pickler(_pickle.Pickler):
+            def __init__(self, f):
+                _pickle.Pickler.__init__(self, f, 2)
+                self.extra = 42
+            def persistent_id(self, obj):
+                if obj == 'ext':
+                    return 'pid'
+                return None
+        class Unpickler(_pickle.Unpickler):
+            def persistent_load(self, pid):
+                return 'loaded ' + pid
+            def find_global(self, module, name):
+                return module, name
+        f = StringIO()
+        p = Pickler(f)
+        assert p.extra == 42 and p.proto == 2
+        p.dump(['ext', 'int', len])
+        u = Unpickler(StringIO(f.getvalue()))
+        assert u.load() == ['loaded pid', 'int', ('__builtin__', 'len')]
+        #
+        class NoGlobals(_pickle.Unpickler):
+            find_global = None
+        u = NoGlobals(StringIO(_pickle.dumps(len)))
+        raises(pickle.UnpicklingError, u.load)
+        #
+        class Lazy(_pickle.Unpickler):
+            def __init__(self, f):
+                pass
+        raises(ValueError, Lazy(StringIO('N.')).load)
+
+    def test_noload(self):
+        import _pickle, sys
+        from cStringIO import StringIO
+        mod = type(sys)('pickle_test_noload')
+        sys.modules['pickle_test_noload'] = mod
+        class A(object):
+            pass
+        class B:
+            pass
+        for cls in [A, B]:
+            cls.__module__ = 'pickle_test_noload'
+            setattr(mod, cls.__name__, cls)
+        a = A()
+        a.x = 5
+        for proto in range(3):
+            for value in [a, B(), len, (a, 'z')]:
+                u = _pickle.Unpickler(StringIO(_pickle.dumps(value, proto)))
+                u.find_global = None     # no global is looked up
+                res = u.noload()
+                if isinstance(value, tuple):
+                    assert res == (None, 'z')
+                else:
+                    assert res is None
+            # the items of lists and dicts are not added
+            s = _pickle.dumps([1, {'k': 2}], proto)
+            assert _pickle.Unpickler(StringIO(s)).noload() == []
+        # the persistent ids can be collected in a list
+        f = StringIO()
+        p = _pickle.Pickler(f, 1)
+        p.persistent_id = lambda obj: str(obj) if obj in (1, 2) else None
+        p.dump([1, a, 2])
+        u = _pickle.Unpickler(StringIO(f.getvalue()))
+        u.persistent_load = pids = []
+        u.noload()
+        assert pids == ['1', '2']
+
+    def test_file_like(self):
+        import _pickle
+        class Reader(object):
+            def __init__(self, data):
+                self.data = data
+            def read(self, n):
+                res = self.data[:n]
+                self.data = self.data[n:]
+                return res
+            def readline(self):
+                i = self.data.index('\n') + 1
+                res = self.data[:i]
+                self.data = self.data[i:]
+                return res
+        value = {'a': [1, 2.5, u'x'], 'b': ('y', None)}
+        for proto in range(3):
+            assert _pickle.load(Reader(_pickle.dumps(value, proto))) == value
+
+    def test_cpickle_uses_it(self):
+        import cPickle, _pickle
+        assert cPickle.Pickler is _pickle.Pickler
+        assert cPickle.loads is _pickle.loads
+
+    def test_same_as_fallback(self):
+        # the pure Python cPickle, used when there is no _pickle module
+        import _pickle, _cpickle_fallback
+        value = [{'a': [1, 2.5, u'x'], 'b': ('y', None)}, 'y', -2**70]
+        value.append(value[0])
+        for proto in range(3):
+            s = _pickle.dumps(value, proto)
+            assert _cpickle_fallback.dumps(value, proto) == s
+            assert _cpickle_fallback.loads(s) == value
@@ -77,15 +77,10 @@ class JSONDecoder(W_Root):
         self.space = space
         self.w_empty_string = space.newutf8("", 0)
 
-        self.s = s
-
-        # we put our string in a raw buffer so:
-        # 1) we automatically get the '\0' sentinel at the end of the string,
-        #    which means that we never have to check for the "end of string"
-        # 2) we can pass the buffer directly to strtod
-        self.ll_chars, self.llobj, self.flag = rffi.get_nonmovingbuffer_ll_final_null(self.s)
-        self.end_ptr = lltype.malloc(rffi.CCHARPP.TO, 1, flavor='raw')
-        self.pos = 0
+        # the total number of bytes decoded by this decoder, which is more
+        # than len(self.s) if it is used incrementally (see set_input)
+        self.total_size = 0
+        self.set_input(s)
         self.intcache = space.fromcache(IntCache)
 
         # two caches, one for keys, one for general strings. they both have the
@@ -112,15 +107,50 @@ class JSONDecoder(W_Root):
         # object, before they get copied into the eventual dict
         self.scratch = [[None] * self.DEFAULT_SIZE_SCRATCH]
 
+        # if not None, json objects are decoded into instances of this class
+        # instead of into dicts (see _create_instance_map)
+        self.w_object_class = None
 
-    def close(self):
+
+    def set_input(self, s):
+        """ Start decoding the string s. The key and string caches, as well
+        as the maps, are kept from any previous input, which is useful for
+        decoding a stream of documents piece by piece. """
+        self.s = s
+        self.total_size += len(s)
+
+        # we put our string in a raw buffer so:
+        # 1) we automatically get the '\0' sentinel at the end of the string,
+        #    which means that we never have to check for the "end of string"
+        # 2) we can pass the buffer directly to strtod
+        self.ll_chars, self.llobj, self.flag = rffi.get_nonmovingbuffer_ll_final_null(self.s)
+        self.end_ptr = lltype.malloc(rffi.CCHARPP.TO, 1, flavor='raw')
+        self.pos = 0
+
+    def free_input(self):
+        """ Release the raw buffer of the current input. """
         rffi.free_nonmovingbuffer_ll(self.ll_chars, self.llobj, self.flag)
         lltype.free(self.end_ptr, flavor='raw')
+
+    def clear_caches(self):
+        """ Forget the cached keys and strings, to bound the memory used by
+        a decoder that is reused for many documents. """
+        self.cache_keys = {}
+        self.cache_values = {}
+        self.lru_cache = [0] * self.LRU_SIZE
+        self.lru_index = 0
+
+    def cleanup_unclear_objects(self):
         # clean up objects that are instances of now blocked maps
         for w_obj in self.unclear_objects:
             jsonmap = self._get_jsonmap_from_dict(w_obj)
             if jsonmap.is_state_blocked():
                 self._devolve_jsonmap_dict(w_obj)
+        self.unclear_objects = []
+
+    def close(self):
+        self.free_input()
+        self.cleanup_unclear_objects()
 
     def getslice(self, start, end):
         assert start >= 0
@@ -332,6 +362,8 @@ class JSONDecoder(W_Root):
         i = self.skip_whitespace(i)
         if self.ll_chars[i] == '}':
             self.pos = i+1
+            if self.w_object_class is not None:
+                return self._create_empty_instance()
             return self.space.newdict()
 
         if self.scratch:
@@ -368,6 +400,9 @@ class JSONDecoder(W_Root):
             if ch == '}':
                 self.pos = i
                 self.scratch.append(values_w)  # can reuse next time
+                if self.w_object_class is not None:
+                    return self._create_instance_map(values_w, nextindex,
+                                                     currmap)
                 if currmap.is_state_blocked():
                     dict_w = self._switch_to_dict(currmap, values_w, nextindex)
                     return self._create_dict(dict_w)
@@ -385,10 +420,219 @@ class JSONDecoder(W_Root):
             else:
                 self._raise_object_error(ch, start, i - 1)
 
+    def decode_columns(self, i):
+        """ Decode an array of objects that all have the same keys in the
+        same order into a dict mapping every key to the list of its values.
+        The columns are normal lists, so columns of ints or floats get the
+        unboxed integer or float list strategies. """
+        start = i
+        i = self.skip_whitespace(i)
+        if self.ll_chars[i] != '[':
+            self._raise("Expected '[' at char %d", i)
+        i = self.skip_whitespace(i + 1)
+        if self.ll_chars[i] == ']':
+            self.pos = i + 1
+            return self.space.newdict()
+        # the maps of the keys of the first row, in order
+        keymaps = []
+        columns_w = []
+        first = True
+        while True:
+            if self.ll_chars[i] != '{':
+                self._raise("Expected object at char %d", i)
+            if first:
+                if not self._decode_first_row(i + 1, keymaps, columns_w):
+                    # a key is repeated in the first row
+                    return self._decode_columns_generic(start)
+                first = False
+            else:
+                self._decode_row(i + 1, keymaps, columns_w)
+            i = self._skip_to_next_row(start)
+            if i < 0:
+                break
+        dict_w = self._create_empty_dict()
+        for index in range(len(keymaps)):
+            dict_w[keymaps[index].w_key] = columns_w[index]
+        return self._create_dict(dict_w)
+
+    def _decode_columns_generic(self, i):
+        """ Slow path of decode_columns(), used when the first row has a
+        repeated key: decode every row as a normal object, in which the last
+        value of a repeated key wins, and split the objects into columns. """
+        space = self.space
+        start = i
+        i = self.skip_whitespace(i)
+        i = self.skip_whitespace(i + 1)     # '[', checked by decode_columns()
+        keys_w = None
+        columns_w = []
+        while True:
+            if self.ll_chars[i] != '{':
+                self._raise("Expected object at char %d", i)
+            w_row = self.decode_object(i + 1)
+            row_keys_w = space.listview(space.call_method(w_row, "keys"))
+            if keys_w is None:
+                keys_w = row_keys_w
+                for w_key in keys_w:
+                    w_value = space.getitem(w_row, w_key)
+                    columns_w.append(space.newlist([w_value]))
+            else:
+                if len(row_keys_w) != len(keys_w):
+                    self._raise_row_shape_error(i + 1)
+                for index in range(len(keys_w)):
+                    if not space.eq_w(row_keys_w[index], keys_w[index]):
+                        self._raise_row_shape_error(i + 1)
+                    w_value = space.getitem(w_row, keys_w[index])
+                    columns_w[index].append(w_value)
+            i = self._skip_to_next_row(start)
+            if i < 0:
+                break
+        w_res = space.newdict()
+        for index in range(len(keys_w)):
+            space.setitem(w_res, keys_w[index], columns_w[index])
+        return w_res
+
+    def _skip_to_next_row(self, start):
+        """ Skip the ',' or ']' after a row of the columnar array starting at
+        start. Returns the position of the next row, or -1 at the end of the
+        array. """
+        i = self.skip_whitespace(self.pos)
+        ch = self.ll_chars[i]
+        i += 1
+        if ch == ']':
+            self.pos = i
+            return -1
+        elif ch == ',':
+            return self.skip_whitespace(i)
+        elif ch == '\0':
+            self._raise("Unterminated array starting at char %d", start)
+        else:
+            self._raise("Unexpected '%s' when decoding array (char %d)",
+                        ch, i - 1)
+
+    def _decode_first_row(self, i, keymaps, columns_w):
+        """ Decode the first object of a columnar array, recording its keys
+        in keymaps and starting a column for each of them. Returns False if
+        a key is repeated. """
+        start = i
+        i = self.skip_whitespace(i)
+        if self.ll_chars[i] == '}':
+            self.pos = i + 1
+            return True
+        currmap = self.startmap
+        while True:
+            if isinstance(currmap, JSONMap) and currmap.is_state_blocked():
+                # blocked maps have no transitions, make a map that is not
+                # part of the tree, we only need its key
+                w_key = self.decode_key_string(i)
+                newmap = currmap._make_next_map(w_key,
+                                                self.getslice(i, self.pos))
+            else:
+                newmap = self.decode_key_map(i, currmap)
+            if newmap is None:
+                return False
+            assert isinstance(newmap, JSONMap)
+            currmap = newmap
+            keymaps.append(currmap)
+            i = self.skip_whitespace(self.pos)
+            if self.ll_chars[i] != ':':
+                self._raise("No ':' found at char %d", i)
+            w_value = self.decode_any(i + 1, currmap)
+            columns_w.append(self.space.newlist([w_value]))
+            i = self.skip_whitespace(self.pos)
+            ch = self.ll_chars[i]
+            i += 1
+            if ch == '}':
+                self.pos = i
+                return True
+            elif ch == ',':
+                i = self.skip_whitespace(i)
+            else:
+                self._raise_object_error(ch, start, i - 1)
+
+    def _decode_row(self, i, keymaps, columns_w):
+        """ Decode an object of a columnar array, which must have the same
+        keys as the first one, appending its values to columns_w. """
+        start = i
+        i = self.skip_whitespace(i)
+        index = 0
+        if self.ll_chars[i] != '}':
+            while True:
+                if index == len(keymaps):
+                    self._raise_row_shape_error(start)
+                keymap = keymaps[index]
+                if keymap.key_repr_cmp(self.ll_chars, i):
+                    self.pos = i + len(keymap.key_repr)
+                else:
+                    w_key = self.decode_key_string(i)
+                    if not keymap.w_key.eq_w(w_key):
+                        self._raise_row_shape_error(start)
+                i = self.skip_whitespace(self.pos)
+                if self.ll_chars[i] != ':':
+                    self._raise("No ':' found at char %d", i)
+                w_value = self.decode_any(i + 1, keymap)
+                columns_w[index].append(w_value)
+                index += 1
+                i = self.skip_whitespace(self.pos)
+                ch = self.ll_chars[i]
+                i += 1
+                if ch == '}':
+                    break
+                elif ch == ',':
+                    i = self.skip_whitespace(i)
+                else:
+                    self._raise_object_error(ch, start, i - 1)
+        else:
+            i += 1
+        if index != len(keymaps):
+            self._raise_row_shape_error(start)
+        self.pos = i
+
+    def _raise_row_shape_error(self, start):
+        self._raise("Object starting at char %d does not have the same keys "
+                    "as the first one", start - 1)
+
     def _create_dict_map(self, values_w, jsonmap):
         from pypy.objspace.std.jsondict import from_values_and_jsonmap
         return from_values_and_jsonmap(self.space, values_w, jsonmap)
 
+    def _create_empty_instance(self):
+        from pypy.objspace.std.objectobject import W_ObjectObject
+        return self.space.allocate_instance(W_ObjectObject,
+                                            self.w_object_class)
+
+    def _set_instance_attr(self, w_obj, attrname, w_key, w_value):
+        if attrname is not None:
+            if w_obj.setdictvalue(self.space, attrname, w_value):
+                return
+        # non-ascii keys are no valid attribute names, store them in the
+        # instance dict under their unicode key
+        self.space.setitem(w_obj.getdict(self.space), w_key, w_value)
+
+    def _create_instance_map(self, values_w, nextindex, jsonmap):
+        """ Create an instance of w_object_class and write values_w straight
+        into its attributes, using the attribute names that are cached on
+        jsonmap. No intermediate dict is built. """
+        assert isinstance(jsonmap, JSONMap)
+        w_obj = self._create_empty_instance()
+        attrnames = jsonmap.get_attr_names()
+        keys_w = jsonmap.get_keys_in_order()
+        assert nextindex == len(attrnames)
+        for i in range(nextindex):
+            self._set_instance_attr(w_obj, attrnames[i], keys_w[i],
+                                    values_w[i])
+        return w_obj
+
+    def _create_instance_dict(self, dict_w):
+        from pypy.objspace.std.unicodeobject import W_UnicodeObject
+        w_obj = self._create_empty_instance()
+        for w_key, w_value in dict_w.iteritems():
+            assert isinstance(w_key, W_UnicodeObject)
+            attrname = None
+            if w_key.is_ascii():
+                attrname = w_key._utf8
+            self._set_instance_attr(w_obj, attrname, w_key, w_value)
+        return w_obj
+
     def _devolve_jsonmap_dict(self, w_dict):
         from pypy.objspace.std.jsondict import devolve_jsonmap_dict
         devolve_jsonmap_dict(w_dict)
@@ -420,6 +664,8 @@ class JSONDecoder(W_Root):
             i += 1
             if ch == '}':
                 self.pos = i
+                if self.w_object_class is not None:
+                    return self._create_instance_dict(dict_w)
                 return self._create_dict(dict_w)
             elif ch == ',':
                 i = self.skip_whitespace(i)
@@ -569,7 +815,7 @@ class JSONDecoder(W_Root):
             contextmap.decoded_strings += 1
             if not contextmap.should_cache_strings():
                 cache = False
-        if len(self.s) < self.MIN_SIZE_FOR_STRING_CACHE:
+        if self.total_size < self.MIN_SIZE_FOR_STRING_CACHE:
             cache = False
 
         if not cache:
@@ -997,6 +1243,9 @@ class JSONMap(MapBase):
         self.keys_in_order = None
         self.strategy_instance = None
 
+        # for decoding into instances
+        self.attr_names = None
+
     def __repr__(self):
         return "<JSONMap key_repr=%s #instantiation=%s #leaves=%s prev=%r>" % (
                 self.key_repr, self.instantiation_count, self.number_of_leaves, self.prev)
@@ -1157,6 +1406,22 @@ class JSONMap(MapBase):
                 keys_in_order[index] = w_key
         return keys_in_order
 
+    def get_attr_names(self):
+        """ The keys of self, in order, as attribute names. None for keys
+        that are not ascii. """
+        attr_names = self.attr_names
+        if attr_names is None:
+            from pypy.objspace.std.unicodeobject import W_UnicodeObject
+            keys_w = self.get_keys_in_order()
+            attr_names = [None] * len(keys_w)
+            for i in range(len(keys_w)):
+                w_key = keys_w[i]
+                assert isinstance(w_key, W_UnicodeObject)
+                if w_key.is_ascii():
+                    attr_names[i] = w_key._utf8
+            self.attr_names = attr_names
+        return attr_names
+
     # _____________________________________________________
 
     def _get_dot_text(self):
@@ -1177,12 +1442,21 @@ class JSONMap(MapBase):
         return res
 
 @jit.dont_look_inside
-def loads(space, w_s):
+def loads(space, w_s, w_object_class=None):
+    """ Decode the JSON document in the utf-8 encoded string s. If
+    object_class is given, JSON objects are decoded into instances of that
+    class instead of into dicts. The keys are stored as instance attributes
+    and __init__ is not called. """
     if space.isinstance_w(w_s, space.w_unicode):
         raise oefmt(space.w_TypeError,
                     "Expected utf8-encoded str, got unicode")
     s = space.bytes_w(w_s)
+    if not space.is_none(w_object_class):
+        _check_object_class(space, w_object_class)
+    else:
+        w_object_class = None
     decoder = JSONDecoder(space, s)
+    decoder.w_object_class = w_object_class
     try:
         w_res = decoder.decode_any(0)
         i = decoder.skip_whitespace(decoder.pos)
@@ -1195,3 +1469,36 @@ def loads(space, w_s):
     finally:
         decoder.close()
 
+
+@jit.dont_look_inside
+def loads_columns(space, w_s):
+    """ Decode a JSON array of objects which all have the same keys, in the
+    same order, into a dict mapping each key to the list of its values. """
+    if space.isinstance_w(w_s, space.w_unicode):
+        raise oefmt(space.w_TypeError,
+                    "Expected utf8-encoded str, got unicode")
+    s = space.bytes_w(w_s)
+    decoder = JSONDecoder(space, s)
+    try:
+        w_res = decoder.decode_columns(0)
+        i = decoder.skip_whitespace(decoder.pos)
+        if i < len(s):
+            start = i
+            end = len(s) - 1
+            raise oefmt(space.w_ValueError,
+                        "Extra data: char %d - %d", start, end)
+        return w_res
+    finally:
+        decoder.close()
+
+def _check_object_class(space, w_object_class):
+    from pypy.objspace.std.objectobject import W_ObjectObject
+    from pypy.objspace.std.typeobject import W_TypeObject
+    if not isinstance(w_object_class, W_TypeObject):
+        raise oefmt(space.w_TypeError,
+                    "object_class must be a type, not %T", w_object_class)
+    if not w_object_class.hasdict:
+        raise oefmt(space.w_TypeError,
+                    "instances of %N have no __dict__", w_object_class)
+    # raises TypeError if the instances are not plain objects
+    space.allocate_instance(W_ObjectObject, w_object_class)
@@ -1,6 +1,9 @@
 from rpython.rlib.rstring import StringBuilder
-from rpython.rlib import rutf8
+from rpython.rlib import rutf8, jit
+from rpython.rlib.rfloat import isfinite
 from pypy.interpreter import unicodehelper
+from pypy.interpreter.error import oefmt
+from pypy.interpreter.gateway import unwrap_spec
 
 
 HEX = '0123456789abcdef'
@@ -16,35 +19,21 @@ ESCAPE_BEFORE_SPACE = [ESCAPE_DICT.get(chr(_i), '\\u%04x' % _i)
                        for _i in range(32)]
 
 
-def raw_encode_basestring_ascii(space, w_string):
-    if space.isinstance_w(w_string, space.w_bytes):
-        s = space.bytes_w(w_string)
-        for i in range(len(s)):
-            c = s[i]
-            if c >= ' ' and c <= '~' and c != '"' and c != '\\':
-                pass
-            else:
-                first = i
-                break
+def _find_first_special(s):
+    """ Return the index of the first character of s that needs escaping,
+    or -1 if s consists only of printable ascii characters. """
+    for i in range(len(s)):
+        c = s[i]
+        if c >= ' ' and c <= '~' and c != '"' and c != '\\':
+            pass
         else:
-            # the input is a string with only non-special ascii chars
-            return w_string
-
-        unicodehelper.check_utf8_or_raise(space, s)
-        sb = StringBuilder(len(s))
-        sb.append_slice(s, 0, first)
-    else:
-        # We used to check if 'u' contains only safe characters, and return
-        # 'w_string' directly.  But this requires an extra pass over all
-        # characters, and the expected use case of this function, from
-        # json.encoder, will anyway re-encode a unicode result back to
-        # a string (with the ascii encoding).  This requires two passes
-        # over the characters.  So we may as well directly turn it into a
-        # string here --- only one pass.
-        s = space.utf8_w(w_string)
-        sb = StringBuilder(len(s))
-        first = 0
+            return i
+    return -1
 
+def _escape_utf8_ascii(sb, s, first):
+    """ Append the escaped version of the utf-8 string s to sb, starting at
+    codepoint index first. The characters before first must already have
+    been appended by the caller. """
     it = rutf8.Utf8StringIterator(s)
     for i in range(first):
         it.next()
@@ -77,5 +66,385 @@ def raw_encode_basestring_ascii(space, w_string):
                 sb.append(HEX[(s2 >> 4) & 0x0f])
                 sb.append(HEX[s2 & 0x0f])
 
+
+def raw_encode_basestring_ascii(space, w_string):
+    if space.isinstance_w(w_string, space.w_bytes):
+        s = space.bytes_w(w_string)
+        first = _find_first_special(s)
+        if first < 0:
+            # the input is a string with only non-special ascii chars
+            return w_string
+
+        unicodehelper.check_utf8_or_raise(space, s)
+        sb = StringBuilder(len(s))
+        sb.append_slice(s, 0, first)
+    else:
+        # We used to check if 'u' contains only safe characters, and return
+        # 'w_string' directly.  But this requires an extra pass over all
+        # characters, and the expected use case of this function, from
+        # json.encoder, will anyway re-encode a unicode result back to
+        # a string (with the ascii encoding).  This requires two passes
+        # over the characters.  So we may as well directly turn it into a
+        # string here --- only one pass.
+        s = space.utf8_w(w_string)
+        sb = StringBuilder(len(s))
+        first = 0
+
+    _escape_utf8_ascii(sb, s, first)
     res = sb.build()
     return space.newtext(res)
+
+
+class JSONEncoder(object):
+    """ An encoder that walks dicts, lists, tuples, strings and numbers
+    directly into a StringBuilder. It implements the same semantics as the
+    pure-Python JSONEncoder in lib-python's json/encoder.py for the case
+    ensure_ascii=True, encoding='utf-8'. Objects of unknown type are passed
+    to w_default. """
+
+    def __init__(self, space, w_default, sort_keys, skipkeys, allow_nan,
+                 check_circular, indent, item_separator, key_separator):
+        self.space = space
+        self.w_default = w_default
+        self.sort_keys = sort_keys
+        self.skipkeys = skipkeys
+        self.allow_nan = allow_nan
+        # maps containers that are currently being encoded to None, for
+        # detecting circular references
+        if check_circular:
+            self.markers = {}
+        else:
+            self.markers = None
+        # indent < 0 means "no indentation", like indent=None at app-level
+        self.indent = indent
+        self.item_separator = item_separator
+        self.key_separator = key_separator
+        self.sb = StringBuilder()
+
+    def build(self):
+        return self.sb.build()
+
+    def _mark(self, w_obj):
+        markers = self.markers
+        if markers is not None:
+            if w_obj in markers:
+                raise oefmt(self.space.w_ValueError,
+                            "Circular reference detected")
+            markers[w_obj] = None
+
+    def _unmark(self, w_obj):
+        markers = self.markers
+        if markers is not None:
+            del markers[w_obj]
+
+    def _emit_indent(self, level):
+        """ Emit the newline after an opening bracket. Returns the separator
+        to use between items. """
+        if self.indent < 0:
+            return self.item_separator
+        newline_indent = '\n' + ' ' * (self.indent * level)
+        self.sb.append(newline_indent)
+        return self.item_separator + newline_indent
+
+    def _emit_unindent(self, level):
+        if self.indent >= 0:
+            self.sb.append('\n')
+            self.sb.append(' ' * (self.indent * (level - 1)))
+
+    # ____________________________________________________________
+    # atoms
+
+    def append_bytes_escaped(self, s):
+        """ Append the quoted JSON form of the utf-8 byte string s. """
+        sb = self.sb
+        sb.append('"')
+        first = _find_first_special(s)
+        if first < 0:
+            sb.append(s)
+        else:
+            unicodehelper.check_utf8_or_raise(self.space, s)
+            sb.append_slice(s, 0, first)
+            _escape_utf8_ascii(sb, s, first)
+        sb.append('"')
+
+    def append_unicode_escaped(self, w_uni):
+        sb = self.sb
+        s, length = self.space.utf8_len_w(w_uni)
+        sb.append('"')
+        if length == len(s):
+            # pure ascii, only look for the characters that need escaping
+            first = _find_first_special(s)
+            if first < 0:
+                sb.append(s)
+            else:
+                sb.append_slice(s, 0, first)
+                _escape_utf8_ascii(sb, s, first)
+        else:
+            _escape_utf8_ascii(sb, s, 0)
+        sb.append('"')
+
+    def append_string(self, w_string):
+        space = self.space
+        if space.isinstance_w(w_string, space.w_bytes):
+            self.append_bytes_escaped(space.bytes_w(w_string))
+        else:
+            self.append_unicode_escaped(w_string)
+
+    def floatstr(self, w_float, x):
+        if isfinite(x):
+            from pypy.objspace.std.floatobject import float_repr
+            return float_repr(x)
+        if not self.allow_nan:
+            raise oefmt(self.space.w_ValueError,
+                "Out of range float values are not JSON compliant: %R",
+                w_float)
+        if x != x:
+            return 'NaN'
+        elif x > 0.0:
+            return 'Infinity'
+        else:
+            return '-Infinity'
+
+    def intstr(self, w_int):
+        space = self.space
+        if space.is_w(space.type(w_int), space.w_int):
+            return str(space.int_w(w_int))
+        # longs and subclasses of int: use str(), like json/encoder.py
+        return space.text_w(space.str(w_int))
+
+    # ____________________________________________________________
+    # generic dispatch
+
+    def encode(self, w_obj, level=0):
+        space = self.space
+        sb = self.sb
+        if space.isinstance_w(w_obj, space.w_bytes):
+            self.append_bytes_escaped(space.bytes_w(w_obj))
+        elif space.isinstance_w(w_obj, space.w_unicode):
+            self.append_unicode_escaped(w_obj)
+        elif space.is_w(w_obj, space.w_None):
+            sb.append('null')
+        elif space.is_w(w_obj, space.w_True):
+            sb.append('true')
+        elif space.is_w(w_obj, space.w_False):
+            sb.append('false')
+        elif (space.isinstance_w(w_obj, space.w_int) or
+                space.isinstance_w(w_obj, space.w_long)):
+            sb.append(self.intstr(w_obj))
+        elif space.isinstance_w(w_obj, space.w_float):
+            sb.append(self.floatstr(w_obj, space.float_w(w_obj)))
+        elif (space.isinstance_w(w_obj, space.w_list) or
+                space.isinstance_w(w_obj, space.w_tuple)):
+            self.encode_list(w_obj, level)
+        elif space.isinstance_w(w_obj, space.w_dict):
+            self.encode_dict(w_obj, level)
+        else:
+            self._mark(w_obj)
+            w_res = space.call_function(self.w_default, w_obj)
+            self.encode(w_res, level)
+            self._unmark(w_obj)
+
+    # ____________________________________________________________
+    # lists
+
+    def encode_list(self, w_list, level):
+        space = self.space
+        sb = self.sb
+        if not space.is_true(w_list):
+            sb.append('[]')
+            return
+        self._mark(w_list)
+        sb.append('[')
+        level += 1
+        separator = self._emit_indent(level)
+        # fast paths for lists that store unboxed ints or floats
+        ints = space.listview_int(w_list)
+        if ints is not None:
+            for i in range(len(ints)):
+                if i > 0:
+                    sb.append(separator)
+                sb.append(str(ints[i]))
+        else:
+            floats = space.listview_float(w_list)
+            if floats is not None:
+                for i in range(len(floats)):
+                    if i > 0:
+                        sb.append(separator)
+                    x = floats[i]
+                    if isfinite(x):
+                        from pypy.objspace.std.floatobject import float_repr
+                        sb.append(float_repr(x))
+                    else:
+                        sb.append(self.floatstr(space.newfloat(x), x))
+            else:
+                items_w = space.listview(w_list)
+                for i in range(len(items_w)):
+                    if i > 0:
+                        sb.append(separator)
+                    self.encode(items_w[i], level)
+        self._emit_unindent(level)
+        sb.append(']')
+        self._unmark(w_list)
+
+    # ____________________________________________________________
+    # dicts
+
+    def encode_dict(self, w_dict, level):
+        space = self.space
+        sb = self.sb
+        if not space.is_true(w_dict):
+            sb.append('{}')
+            return
+        self._mark(w_dict)
+        sb.append('{')
+        level += 1
+        separator = self._emit_indent(level)
+        if self.sort_keys or not self._encode_dict_fast(w_dict, level,
+                                                         separator):
+            self._encode_dict_generic(w_dict, level, separator)
+        self._emit_unindent(level)
+        sb.append('}')
+        self._unmark(w_dict)
+
+    def _encode_dict_generic(self, w_dict, level, separator):
+        space = self.space
+        w_items = space.call_method(w_dict, 'items')
+        if self.sort_keys:
+            # keys are unique, so sorting the (key, value) pairs sorts by key
+            space.call_method(w_items, 'sort')
+        first = True
+        for w_item in space.listview(w_items):
+            w_key, w_value = space.fixedview(w_item, 2)
+            first = self._encode_item(w_key, w_value, level, separator, first)
+
+    def _encode_item(self, w_key, w_value, level, separator, first):
+        """ Encode a single key: value pair with a key of arbitrary type.
+        Returns the new value of 'first'. """
+        space = self.space
+        if (space.isinstance_w(w_key, space.w_bytes) or
+                space.isinstance_w(w_key, space.w_unicode)):
+            key = None
+        # JavaScript is weakly typed for these, so it makes sense to
+        # also allow them.  Many encoders seem to do something like this.
+        elif space.isinstance_w(w_key, space.w_float):
+            key = self.floatstr(w_key, space.float_w(w_key))
+        elif space.is_w(w_key, space.w_True):
+            key = 'true'
+        elif space.is_w(w_key, space.w_False):
+            key = 'false'
+        elif space.is_w(w_key, space.w_None):
+            key = 'null'
+        elif (space.isinstance_w(w_key, space.w_int) or
+                space.isinstance_w(w_key, space.w_long)):
+            key = self.intstr(w_key)
+        elif self.skipkeys:
+            return first
+        else:
+            raise oefmt(space.w_TypeError, "key %R is not a string", w_key)
+        if not first:
+            self.sb.append(separator)
+        if key is None:
+            self.append_string(w_key)
+        else:
+            self.append_bytes_escaped(key)
+        self.sb.append(self.key_separator)
+        self.encode(w_value, level)
+        return False
+
+    def _encode_value_with_key(self, key, w_value, level, separator, first):
+        if not first:
+            self.sb.append(separator)
+        self.append_bytes_escaped(key)
+        self.sb.append(self.key_separator)
+        self.encode(w_value, level)
+
+    def _encode_dict_fast(self, w_dict, level, separator):
+        """ Encode the items of w_dict without wrapping keys, if its strategy
+        allows it. Returns False if the generic path needs to be used. """
+        from pypy.objspace.std.dictmultiobject import (
+            W_DictObject, BytesDictStrategy, UnicodeDictStrategy,
+            IntDictStrategy)
+        from pypy.objspace.std.mapdict import MapDictStrategy
+        from pypy.objspace.std.jsondict import JsonDictStrategy
+        if type(w_dict) is not W_DictObject:
+            return False
+        strategy = w_dict.get_strategy()
+        sb = self.sb
+        # note that all the fast paths take a snapshot of the items first,
+        # because encoding a value can call arbitrary app-level code via
+        # 'default', which could mutate the dict
+        if isinstance(strategy, BytesDictStrategy):
+            keys, values_w = strategy.view_as_kwargs(w_dict)
+            for i in range(len(keys)):
+                self._encode_value_with_key(keys[i], values_w[i], level,
+                                            separator, i == 0)
+        elif isinstance(strategy, UnicodeDictStrategy):
+            items = strategy.unerase(w_dict.dstorage).items()
+            for i in range(len(items)):
+                w_key, w_value = items[i]
+                if i > 0:
+                    sb.append(separator)
+                self.append_unicode_escaped(w_key)
+                sb.append(self.key_separator)
+                self.encode(w_value, level)
+        elif isinstance(strategy, IntDictStrategy):
+            items = strategy.unerase(w_dict.dstorage).items()
+            for i in range(len(items)):
+                key, w_value = items[i]
+                self._encode_value_with_key(str(key), w_value, level,
+                                            separator, i == 0)
+        elif isinstance(strategy, JsonDictStrategy):
+            keys_w = strategy.jsonmap.get_keys_in_order()
+            values_w = strategy.unerase(w_dict.dstorage)[:]
+            for i in range(len(keys_w)):
+                if i > 0:
+                    sb.append(separator)
+                self.append_unicode_escaped(keys_w[i])
+                sb.append(self.key_separator)
+                self.encode(values_w[i], level)
+        elif isinstance(strategy, MapDictStrategy):
+            self._encode_mapdict(strategy.unerase(w_dict.dstorage), level,
+                                 separator)
+        else:
+            return False
+        return True
+
+    def _encode_mapdict(self, w_obj, level, separator):
+        """ Encode the __dict__ of an instance that uses mapdict, reading
+        the attribute names directly from the map. """
+        from pypy.objspace.std.mapdict import DICT
+        attrs = []
+        curr_map = w_obj._get_mapdict_map()
+        while True:
+            curr_map = curr_map.search(DICT)
+            if curr_map is None:
+                break
+            attrs.append(curr_map.name)
+            curr_map = curr_map.back
+        # walk the attributes oldest-first, like the mapdict iterators do
+        first = True
+        for i in range(len(attrs) - 1, -1, -1):
+            attr = attrs[i]
+            w_value = w_obj.getdictvalue(self.space, attr)
+            if w_value is None:
+                continue     # attribute deleted in the meantime
+            self._encode_value_with_key(attr, w_value, level, separator,
+                                        first)
+            first = False
+
+
+@unwrap_spec(sort_keys=bool, skipkeys=bool, allow_nan=bool,
+             check_circular=bool, indent=int, item_separator='text',
+             key_separator='text')
+@jit.dont_look_inside
+def encode(space, w_obj, w_default, sort_keys=False, skipkeys=False,
+           allow_nan=True, check_circular=True, indent=-1,
+           item_separator=', ', key_separator=': '):
+    """ Encode w_obj to an ascii-only JSON string. Objects that are not
+    dicts, lists, tuples, strings, numbers, bools or None are converted by
+    calling default(obj). A negative indent means no pretty-printing. """
+    encoder = JSONEncoder(space, w_default, sort_keys, skipkeys, allow_nan,
+                          check_circular, indent, item_separator,
+                          key_separator)
+    encoder.encode(w_obj)
+    return space.newbytes(encoder.build())
@@ -0,0 +1,302 @@
+from rpython.rlib import jit
+from rpython.rlib.objectmodel import specialize
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.error import oefmt, OperationError
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.interpreter.typedef import TypeDef, interp2app
+from pypy.interpreter.typedef import interp_attrproperty
+from pypy.module._pypyjson.interp_decoder import JSONDecoder, is_whitespace
+
+# states of the top-level scanner in array mode
+(BEFORE_ARRAY, ARRAY_FIRST, ARRAY_NEXT, AFTER_ELEMENT, ARRAY_DONE) = range(5)
+
+# the key and string caches of the decoder are emptied between two chunks
+# when they hold more strings than this
+MAX_CACHED_STRINGS = 4096
+
+
+class W_IncrementalDecoder(W_Root):
+    """ Decodes a stream of JSON text that is fed in chunks of arbitrary
+    size. Whenever a top-level value (or, in array mode, an element of the
+    top-level array) is complete, it is decoded and returned from feed().
+
+    Only the bytes of the value that is currently incomplete are kept
+    around, as a list of chunks that is joined once the value is complete.
+    The JSONDecoder, and with it the key and string caches, is reused for
+    all the values of the stream, until the caches grow too big. The maps
+    are global anyway.
+    """
+
+    def __init__(self, space, array):
+        self.space = space
+        self.array = array
+        self.state = BEFORE_ARRAY
+        self.decoder = None
+        self.closed = False
+
+        # the chunks of the value that is currently incomplete, and the
+        # position in the whole stream of the next chunk
+        self.parts = []
+        self.offset = 0
+
+        # values that were decoded but not returned yet, because another
+        # value of the same chunk was invalid
+        self.ready_w = []
+
+        # state of the scanner that looks for the end of the current value.
+        # value_start is its position in the stream, or -1 if we are
+        # between values
+        self.value_start = -1
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    @staticmethod
+    @unwrap_spec(array=bool)
+    def descr_new(space, w_subtype, array=False):
+        return W_IncrementalDecoder(space, array)
+
+    @specialize.arg(1)
+    def _raise(self, msg, pos):
+        raise oefmt(self.space.w_ValueError, msg, pos)
+
+    @unwrap_spec(data='bytes')
+    def descr_feed(self, space, data):
+        """feed(data) -> list of the values completed by data
+
+If one of these values is invalid, ValueError is raised, and the other ones
+are returned by the next call to feed() or close()."""
+        self._check_closed()
+        self._process(data, final=False)
+        return self._take_ready()
+
+    def descr_close(self, space):
+        """close() -> list of the remaining values
+
+Finishes decoding the stream. Raises ValueError if it ends in the
+middle of a value (or, in array mode, of the top-level array).
+The decoder can't be used any more afterwards."""
+        self._check_closed()
+        self.closed = True
+        self._process("", final=True)
+        if self.value_start >= 0:
+            self._raise("Unterminated value starting at char %d",
+                        self.value_start)
+        if self.array and self.state != ARRAY_DONE:
+            self._raise("Unterminated array at char %d", self.offset)
+        return self._take_ready()
+
+    def _check_closed(self):
+        if self.closed:
+            raise oefmt(self.space.w_ValueError,
+                        "I/O operation on closed decoder")
+
+    def _take_ready(self):
+        values_w = self.ready_w
+        self.ready_w = []
+        return self.space.newlist(values_w)
+
+    def _process(self, s, final):
+        """ Scan the chunk s and decode the values that it completes. """
+        starts = []
+        ends = []
+        scan_error = None
+        try:
+            self._scan(s, starts, ends, final)
+        except OperationError as e:
+            # give up on the incomplete value, but still decode the values
+            # found before the error
+            scan_error = e
+            self.value_start = -1
+        try:
+            if starts:
+                self._decode_chunk(s, starts, ends)
+        finally:
+            # keep the bytes of the incomplete value, if any
+            if self.value_start < 0:
+                self.parts = []
+            elif self.value_start >= self.offset:
+                start = self.value_start - self.offset
+                assert start >= 0
+                self.parts = [s[start:]]
+            else:
+                self.parts.append(s)
+            self.offset += len(s)
+        if scan_error is not None:
+            raise scan_error
+
+    def _decode_chunk(self, s, starts, ends):
+        """ The positions in starts and ends are relative to s; the first
+        start is negative if the value began in a previous chunk. """
+        prefix = ""
+        if starts[0] < 0:
+            prefix = "".join(self.parts)
+            assert len(prefix) == -starts[0]
+        end = ends[-1]
+        assert end >= 0
+        text = prefix + s[:end]
+        shift = len(prefix)
+        for i in range(len(starts)):
+            starts[i] += shift
+            ends[i] += shift
+        self._decode_values(text, self.offset - shift, starts, ends)
+
+    # ____________________________________________________________
+    # scanning
+
+    def _scan(self, s, starts, ends, final):
+        """ Find the values completed by the chunk s, appending their start
+        and end positions in s to starts and ends. """
+        i = 0
+        length = len(s)
+        while True:
+            if self.value_start < 0:
+                while i < length and is_whitespace(s[i]):
+                    i += 1
+                if i == length:
+                    break
+                ch = s[i]
+                if self.array and self.state != ARRAY_NEXT:
+                    if self.state == BEFORE_ARRAY:
+                        if ch != '[':
+                            self._raise("Expected '[' at char %d",
+                                        self.offset + i)
+                        self.state = ARRAY_FIRST
+                        i += 1
+                        continue
+                    elif self.state == ARRAY_FIRST:
+                        if ch == ']':
+                            self.state = ARRAY_DONE
+                            i += 1
+                            continue
+                    elif self.state == AFTER_ELEMENT:
+                        if ch == ',':
+                            self.state = ARRAY_NEXT
+                        elif ch == ']':
+                            self.state = ARRAY_DONE
+                        else:
+                            self._raise(
+                                "Expected ',' or ']' after array element "
+                                "(char %d)", self.offset + i)
+                        i += 1
+                        continue
+                    else:
+                        assert self.state == ARRAY_DONE
+                        self._raise("Extra data after array at char %d",
+                                    self.offset + i)
+                self._start_value(ch, self.offset + i)
+                i += 1
+            end = self._find_value_end(s, i)
+            if end < 0:
+                if not final or self.depth > 0 or self.in_string:
+                    break
+                # a number or constant at the very end of the stream
+                end = length
+            starts.append(self.value_start - self.offset)
+            ends.append(end)
+            self.value_start = -1
+            if self.array:
+                self.state = AFTER_ELEMENT
+            i = end
+
+    def _start_value(self, ch, i):
+        self.value_start = i
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        if ch == '"':
+            self.in_string = True
+        elif ch == '[' or ch == '{':
+            self.depth = 1
+
+    def _find_value_end(self, s, i):
+        """ Continue scanning the current value at position i. Returns the
+        position after its end, or -1 if more input is needed. """
+        depth = self.depth
+        in_string = self.in_string
+        escaped = self.escaped
+        length = len(s)
+        while i < length:
+            ch = s[i]
+            i += 1
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == '\\':
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+                    if depth == 0:
+                        return i
+            elif depth == 0:
+                # inside a number or constant
+                if is_whitespace(ch) or ch in ',:[]{}"':
+                    return i - 1
+            elif ch == '"':
+                in_string = True
+            elif ch == '[' or ch == '{':
+                depth += 1
+            elif ch == ']' or ch == '}':
+                depth -= 1
+                if depth == 0:
+                    return i
+        self.depth = depth
+        self.in_string = in_string
+        self.escaped = escaped
+        return -1
+
+    # ____________________________________________________________
+    # decoding
+
+    @jit.dont_look_inside
+    def _decode_values(self, text, base, starts, ends):
+        """ Decode the values at the given positions of text, which is at
+        the position base of the stream, and append them to self.ready_w.
+        If some of them are invalid, the others are still decoded, and the
+        first error is raised at the end. """
+        space = self.space
+        decoder = self.decoder
+        if decoder is None:
+            decoder = self.decoder = JSONDecoder(space, text)
+        else:
+            decoder.set_input(text)
+        first_error = None
+        try:
+            for i in range(len(starts)):
+                try:
+                    w_res = decoder.decode_any(starts[i])
+                    if decoder.pos != ends[i]:
+                        raise oefmt(space.w_ValueError,
+                                    "Extra data: char %d - %d",
+                                    base + decoder.pos,
+                                    base + ends[i] - 1)
+                except OperationError as e:
+                    if first_error is None:
+                        first_error = e
+                    continue
+                self.ready_w.append(w_res)
+        finally:
+            decoder.free_input()
+            decoder.cleanup_unclear_objects()
+            if (len(decoder.cache_keys) + len(decoder.cache_values) >
+                    MAX_CACHED_STRINGS):
+                decoder.clear_caches()
+        if first_error is not None:
+            raise first_error
+
+
+W_IncrementalDecoder.typedef = TypeDef(
+    '_pypyjson.IncrementalDecoder',
+    __new__ = interp2app(W_IncrementalDecoder.descr_new),
+    feed = interp2app(W_IncrementalDecoder.descr_feed),
+    close = interp2app(W_IncrementalDecoder.descr_close),
+    array = interp_attrproperty('array', W_IncrementalDecoder,
+        wrapfn="newbool"),
+    __doc__ = """IncrementalDecoder(array=False)
+
+Decodes JSON text that arrives in chunks, e.g. while reading a big file.
+feed(data) returns the list of top-level values completed by data. Values
+can be separated by arbitrary whitespace, which includes newline-delimited
+JSON. If array is true, the input must be a single JSON array, and feed()
+returns its elements as they become complete.""")
+W_IncrementalDecoder.typedef.acceptable_as_base_class = False
@@ -7,6 +7,9 @@ class Module(MixedModule):
 
     interpleveldefs = {
         'loads' : 'interp_decoder.loads',
+        'loads_columns' : 'interp_decoder.loads_columns',
+        'encode' : 'interp_encoder.encode',
+        'IncrementalDecoder' : 'interp_incremental.W_IncrementalDecoder',
         'raw_encode_basestring_ascii':
             'interp_encoder.raw_encode_basestring_ascii',
         }
@@ -244,6 +244,19 @@ class TestJson(object):
         assert space.int_w(space.getitem(w_res, w_c)) == 3
         dec.close()
 
+    def test_decode_columns_blocked_repeated_key(self):
+        space = self.space
+        s = '[{"x": 0, "a": 1, "b": 2, "a": 3}, {"x": 4, "a": 5, "b": 6}]'
+        dec = JSONDecoder(space, s)
+        dec.startmap = base = Terminator(space)
+        m1 = base.get_next(space.newutf8("x", 1), '"x"', 0, 3, base)
+        m1.mark_blocked(base)
+        w_res = dec.decode_columns(0)
+        for key, expected in [("x", [0, 4]), ("a", [3, 5]), ("b", [2, 6])]:
+            w_column = space.getitem(w_res, space.newutf8(key, 1))
+            assert space.unwrap(w_column) == expected
+        dec.close()
+
     def test_deal_with_blocked_number_of_leaves(self):
         w_a = self.space.newutf8("a", 1)
         w_b = self.space.newutf8("b", 1)
@@ -272,6 +285,43 @@ class TestJson(object):
         assert m2.instantiation_count == 2
         dec.close()
 
+    def test_incremental_keeps_caches(self):
+        from pypy.module._pypyjson.interp_incremental import W_IncrementalDecoder
+        space = self.space
+        dec = W_IncrementalDecoder(space, False)
+        w_l1 = dec.descr_feed(space, '{"abc": 1}\n{"ab')
+        decoder = dec.decoder
+        assert len(decoder.cache_keys) == 1
+        w_l2 = dec.descr_feed(space, 'c": 2}\n')
+        assert dec.decoder is decoder
+        assert len(decoder.cache_keys) == 1
+        assert decoder.total_size == len('{"abc": 1}') + len('{"abc": 2}')
+        # only the bytes of the incomplete value are kept, without copying
+        # them at every call
+        dec.descr_feed(space, '[1, 2')
+        assert dec.parts == ['[1, 2']
+        dec.descr_feed(space, ', 3')
+        assert dec.parts == ['[1, 2', ', 3']
+        w_l3 = dec.descr_feed(space, '] ')
+        assert dec.parts == []
+        assert space.unwrap(w_l3) == [[1, 2, 3]]
+        w_d1, = space.unpackiterable(w_l1)
+        w_d2, = space.unpackiterable(w_l2)
+        w_k1, = space.unpackiterable(w_d1)
+        w_k2, = space.unpackiterable(w_d2)
+        assert w_k1 is w_k2
+
+    def test_incremental_bounds_caches(self):
+        from pypy.module._pypyjson import interp_incremental
+        space = self.space
+        dec = interp_incremental.W_IncrementalDecoder(space, False)
+        n = interp_incremental.MAX_CACHED_STRINGS
+        dec.descr_feed(space, '{%s}\n' % ', '.join(
+            ['"k%d": 1' % i for i in range(n)]))
+        assert len(dec.decoder.cache_keys) == n
+        dec.descr_feed(space, '{"a": 1, "b": 2}\n')
+        assert len(dec.decoder.cache_keys) == 0
+
 
 class AppTest(object):
     spaceconfig = {"objspace.usemodules._pypyjson": True}
@@ -541,3 +591,255 @@ class AppTest(object):
         a = '{"abc": "4", "k": 1, "k": 1.5, "c": null, "k": 2}'
         d = _pypyjson.loads(a)
         assert d == {u"abc": u"4", u"c": None, u"k": 2}
+
+    def test_encode_atoms(self):
+        import _pypyjson
+        def default(o):
+            raise TypeError(repr(o))
+        enc = lambda o: _pypyjson.encode(o, default)
+        assert enc(None) == 'null'
+        assert enc(True) == 'true'
+        assert enc(False) == 'false'
+        assert enc(42) == '42'
+        assert enc(-12345678901234567890) == '-12345678901234567890'
+        assert enc(1.5) == '1.5'
+        assert enc(0.1) == '0.1'
+        assert enc(float('inf')) == 'Infinity'
+        assert enc(float('-inf')) == '-Infinity'
+        assert enc(float('nan')) == 'NaN'
+        assert enc("abc") == '"abc"'
+        assert enc(u"a\u1234\"") == '"a\\u1234\\""'
+        assert enc("\xc2\x84\n") == '"\\u0084\\n"'
+        raises(UnicodeDecodeError, enc, "\xc0")
+        raises(ValueError, _pypyjson.encode, float('nan'), default, False,
+               False, False)
+
+    def test_encode_containers(self):
+        import _pypyjson
+        def default(o):
+            raise TypeError(repr(o))
+        enc = lambda o: _pypyjson.encode(o, default)
+        assert enc([]) == '[]'
+        assert enc(()) == '[]'
+        assert enc({}) == '{}'
+        assert enc([1, 2, 3]) == '[1, 2, 3]'
+        assert enc([1.5, 2.0, float('inf')]) == '[1.5, 2.0, Infinity]'
+        assert enc((1, "a", None)) == '[1, "a", null]'
+        assert enc({"a": [1, {"b": 2}]}) == '{"a": [1, {"b": 2}]}'
+        assert enc({u"\xe4": 1}) == '{"\\u00e4": 1}'
+        assert enc({1: 2}) == '{"1": 2}'
+        assert enc({1.5: 2}) == '{"1.5": 2}'
+        assert enc({True: 1}) == '{"true": 1}'
+        assert enc({None: 1}) == '{"null": 1}'
+        exc = raises(TypeError, enc, {(1, 2): 3})
+        assert str(exc.value) == "key (1, 2) is not a string"
+        assert _pypyjson.encode({(1, 2): 3, "a": 4}, default,
+                                False, True) == '{"a": 4}'
+
+    def test_encode_dict_strategies(self):
+        import _pypyjson
+        def default(o):
+            return o.__dict__
+        enc = lambda o: _pypyjson.encode(o, default)
+        class A(object):
+            pass
+        a = A()
+        a.x = 1
+        a.y = "z"
+        assert enc(a) == '{"x": 1, "y": "z"}'
+        assert enc([a, a]) == '[{"x": 1, "y": "z"}, {"x": 1, "y": "z"}]'
+        d = _pypyjson.loads('{"a": 1, "b": [true]}')
+        assert enc(d) == '{"a": 1, "b": [true]}'
+        class D(dict):
+            def items(self):
+                return [("x", 1)]
+        assert enc(D(a=5)) == '{"x": 1}'
+
+    def test_encode_options(self):
+        import _pypyjson
+        def default(o):
+            raise TypeError(repr(o))
+        d = {"b": [1, 2], "a": {}, "c": 3}
+        res = _pypyjson.encode(d, default, True)
+        assert res == '{"a": {}, "b": [1, 2], "c": 3}'
+        res = _pypyjson.encode(d, default, True, False, True, True, -1,
+                               ',', ':')
+        assert res == '{"a":{},"b":[1,2],"c":3}'
+        res = _pypyjson.encode(d, default, True, False, True, True, 2)
+        assert res == ('{\n  "a": {}, \n  "b": [\n    1, \n    2\n  ], '
+                       '\n  "c": 3\n}')
+        res = _pypyjson.encode([1], default, False, False, True, True, 0)
+        assert res == '[\n1\n]'
+
+    def test_encode_default_and_circular(self):
+        import _pypyjson
+        class A(object):
+            pass
+        def default(o):
+            if isinstance(o, A):
+                return ["A"]
+            raise TypeError(repr(o) + " is not JSON serializable")
+        assert _pypyjson.encode({"a": A()}, default) == '{"a": ["A"]}'
+        raises(TypeError, _pypyjson.encode, object(), default)
+        l = []
+        l.append(l)
+        exc = raises(ValueError, _pypyjson.encode, l, default)
+        assert str(exc.value) == "Circular reference detected"
+        d = {}
+        d["a"] = d
+        raises(ValueError, _pypyjson.encode, d, default)
+        def default2(o):
+            return o
+        raises(ValueError, _pypyjson.encode, A(), default2)
+        raises(RuntimeError, _pypyjson.encode, l, default, False, False,
+               True, False)
+
+    def test_incremental_values(self):
+        import _pypyjson
+        dec = _pypyjson.IncrementalDecoder()
+        assert not dec.array
+        assert dec.feed('{"a": 1, "b"') == []
+        assert dec.feed(': [1, "]"]}\n{"a"') == [{u"a": 1, u"b": [1, u"]"]}]
+        assert dec.feed(': 2}\n"x\\"') == [{u"a": 2}]
+        assert dec.feed('y" 12') == [u'x"y']
+        assert dec.feed('3 true') == [123]
+        assert dec.feed('') == []
+        assert dec.close() == [True]
+
+    def test_incremental_byte_by_byte(self):
+        import _pypyjson
+        s = '[1, {"a": "b"}] 2.5e3 null "\\u1234" {}'
+        dec = _pypyjson.IncrementalDecoder()
+        res = []
+        for c in s:
+            res.extend(dec.feed(c))
+        res.extend(dec.close())
+        assert res == [[1, {u"a": u"b"}], 2.5e3, None, u"\u1234", {}]
+
+    def test_incremental_array(self):
+        import _pypyjson
+        dec = _pypyjson.IncrementalDecoder(array=True)
+        assert dec.array
+        assert dec.feed(' [ 1, {"a":') == [1]
+        assert dec.feed(' [2]}, 3') == [{u"a": [2]}]
+        assert dec.feed(', "x"] ') == [3, u"x"]
+        assert dec.close() == []
+        dec = _pypyjson.IncrementalDecoder(array=True)
+        assert dec.feed('[]') == []
+        assert dec.close() == []
+
+    def test_incremental_errors(self):
+        import _pypyjson
+        dec = _pypyjson.IncrementalDecoder()
+        dec.feed('{"a": [1')
+        raises(ValueError, dec.close)
+        dec = _pypyjson.IncrementalDecoder()
+        exc = raises(ValueError, dec.feed, '1 2x ')
+        assert str(exc.value) == "Extra data: char 3 - 3"
+        dec = _pypyjson.IncrementalDecoder(array=True)
+        raises(ValueError, dec.feed, '{}')
+        dec = _pypyjson.IncrementalDecoder(array=True)
+        raises(ValueError, dec.feed, '[1 2]')
+        dec = _pypyjson.IncrementalDecoder(array=True)
+        raises(ValueError, dec.feed, '[1] 2')
+        dec = _pypyjson.IncrementalDecoder(array=True)
+        dec.feed('[1, 2')
+        raises(ValueError, dec.close)
+
+    def test_incremental_closed(self):
+        import _pypyjson
+        dec = _pypyjson.IncrementalDecoder()
+        assert dec.feed('1 ') == [1]
+        assert dec.close() == []
+        exc = raises(ValueError, dec.feed, '2 ')
+        assert str(exc.value) == "I/O operation on closed decoder"
+        raises(ValueError, dec.close)
+        # also when close() failed
+        dec = _pypyjson.IncrementalDecoder()
+        dec.feed('[1')
+        raises(ValueError, dec.close)
+        raises(ValueError, dec.feed, ']')
+        raises(ValueError, dec.close)
+
+    def test_incremental_errors_keep_values(self):
+        import _pypyjson
+        dec = _pypyjson.IncrementalDecoder()
+        raises(ValueError, dec.feed, '{"a": 1, } {"b": 2} ')
+        assert dec.feed('3 ') == [{u"b": 2}, 3]
+        dec = _pypyjson.IncrementalDecoder()
+        raises(ValueError, dec.feed, '1 2x [4')
+        assert dec.feed('] ') == [1, [4]]
+        assert dec.close() == []
+        dec = _pypyjson.IncrementalDecoder(array=True)
+        raises(ValueError, dec.feed, '[1, 2 3')
+        assert dec.feed('') == [1, 2]
+
+    def test_object_class(self):
+        import _pypyjson
+        class Point(object):
+            def __init__(self):
+                raise AssertionError("should not be called")
+        s = '[{"x": 1, "y": 2.5}, {"x": 3, "y": {"z": "a"}}, {}]'
+        l = _pypyjson.loads(s, Point)
+        assert len(l) == 3
+        p1, p2, p3 = l
+        assert type(p1) is Point
+        assert p1.__dict__ == {"x": 1, "y": 2.5}
+        assert p2.x == 3
+        assert type(p2.y) is Point
+        assert p2.y.z == u"a"
+        assert p3.__dict__ == {}
+        # repeated keys go through the dict-based path
+        p = _pypyjson.loads('{"a": 1, "b": 2, "a": 3}', Point)
+        assert p.__dict__ == {"a": 3, "b": 2}
+        # non-ascii keys end up in the dict as unicode keys
+        p = _pypyjson.loads('{"\\u1234": 1}', Point)
+        assert p.__dict__ == {u"\u1234": 1}
+        assert _pypyjson.loads('{"a": 1}', None) == {u"a": 1}
+
+    def test_object_class_invalid(self):
+        import _pypyjson
+        raises(TypeError, _pypyjson.loads, '{}', 42)
+        raises(TypeError, _pypyjson.loads, '{}', object)
+        raises(TypeError, _pypyjson.loads, '{}', int)
+        class Slots(object):
+            __slots__ = ['a']
+        raises(TypeError, _pypyjson.loads, '{}', Slots)
+
+    def test_loads_columns(self):
+        import _pypyjson
+        s = '''[{"id": 1, "x": 1.5, "name": "a"},
+                {"id": 2, "x": 2.5, "name": "b"},
+                { "id" : 3 , "x": 3.5, "name": null}]'''
+        d = _pypyjson.loads_columns(s)
+        assert d == {u"id": [1, 2, 3], u"x": [1.5, 2.5, 3.5],
+                     u"name": [u"a", u"b", None]}
+        assert _pypyjson.loads_columns(' [] ') == {}
+        assert _pypyjson.loads_columns('[{}, {}]') == {}
+        d = _pypyjson.loads_columns('[{"a": 1}, {"\\u0061": 2}]')
+        assert d == {u"a": [1, 2]}
+
+    def test_loads_columns_strategies(self):
+        import _pypyjson, __pypy__
+        d = _pypyjson.loads_columns('[{"i": 1, "f": 1.5}, {"i": 2, "f": 2.5}]')
+        assert __pypy__.strategy(d[u"i"]) == "IntegerListStrategy"
+        assert __pypy__.strategy(d[u"f"]) == "FloatListStrategy"
+
+    def test_loads_columns_errors(self):
+        import _pypyjson
+        for s in ['{}', '[1]', '[{"a": 1}, {"b": 1}]', '[{"a": 1}, {}]',
+                  '[{"a": 1}, {"a": 1, "b": 2}]', '[{"a": 1, "a": 2}, {"b": 1}]',
+                  '[{"a": 1, "b": 2}, {"b": 2, "a": 1}]', '[{"a": 1}',
+                  '[{"a": 1}] x']:
+            raises(ValueError, _pypyjson.loads_columns, s)
+        exc = raises(ValueError, _pypyjson.loads_columns,
+                     '[{"a": 1}, {"b": 1}]')
+        assert str(exc.value) == ("Object starting at char 11 does not have "
+                                  "the same keys as the first one")
+
+    def test_loads_columns_repeated_key(self):
+        import _pypyjson
+        # like in loads(), the last value of a repeated key wins
+        d = _pypyjson.loads_columns('[{"a": 1, "b": 2, "a": 3}, {"a": 4, "b": 5}]')
+        assert d == {u"a": [3, 4], u"b": [2, 5]}
+        assert list(d) == [u"a", u"b"]
@@ -0,0 +1,8 @@
+import py
+from pypy.objspace.fake.checkmodule import checkmodule
+
+def test_checkmodule():
+    py.test.skip("the decoder works directly on the W_UnicodeObjects of the "
+                 "std objspace (e.g. in the maps), which the fake objspace "
+                 "cannot annotate")
+    checkmodule('_pypyjson')
@@ -140,6 +140,17 @@ def init_datetime(space):
                    attach=timedeltatype_attach,
                   )
 
+def _get_tzinfo(space, w_obj):
+    if isinstance(w_obj, W_DateTime_Date):
+        w_tzinfo = w_obj.w_tzinfo
+    elif isinstance(w_obj, W_DateTime_Time):
+        w_tzinfo = w_obj.w_tzinfo
+    else:
+        return space.getattr(w_obj, space.newtext('tzinfo'))
+    if w_tzinfo is None:
+        return space.w_None
+    return w_tzinfo
+
 def type_attach(space, py_obj, w_obj, w_userdata=None):
     '''Fills a newly allocated py_obj from the w_obj
     If it is a datetime.time or datetime.datetime, it may have tzinfo
@@ -150,7 +161,7 @@ def type_attach(space, py_obj, w_obj, w_userdata=None):
         _PyDateTime_Import(space)
     if state.datetimeAPI[0].c_TimeType == py_obj.c_ob_type:
         py_datetime = rffi.cast(PyDateTime_Time, py_obj)
-        w_tzinfo = space.getattr(w_obj, space.newtext('tzinfo'))
+        w_tzinfo = _get_tzinfo(space, w_obj)
         if space.is_none(w_tzinfo):
             py_datetime.c_hastzinfo = cts.cast('unsigned char', 0)
             py_datetime.c_tzinfo = lltype.nullptr(PyObject.TO)
@@ -160,7 +171,7 @@ def type_attach(space, py_obj, w_obj, w_userdata=None):
     elif state.datetimeAPI[0].c_DateTimeType == py_obj.c_ob_type:
         # For now this is exactly the same structure as PyDateTime_Time
         py_datetime = rffi.cast(PyDateTime_DateTime, py_obj)
-        w_tzinfo = space.getattr(w_obj, space.newtext('tzinfo'))
+        w_tzinfo = _get_tzinfo(space, w_obj)
         if space.is_none(w_tzinfo):
             py_datetime.c_hastzinfo = cts.cast('unsigned char', 0)
             py_datetime.c_tzinfo = lltype.nullptr(PyObject.TO)
@@ -187,11 +198,17 @@ def type_dealloc(space, py_obj):
 def timedeltatype_attach(space, py_obj, w_obj, w_userdata=None):
     "Fills a newly allocated py_obj from the w_obj"
     py_delta = rffi.cast(PyDateTime_Delta, py_obj)
-    days = space.int_w(space.getattr(w_obj, space.newtext('days')))
+    if isinstance(w_obj, W_DateTime_Delta):
+        days = w_obj.days
+        seconds = w_obj.seconds
+        microseconds = w_obj.microseconds
+    else:
+        days = space.int_w(space.getattr(w_obj, space.newtext('days')))
+        seconds = space.int_w(space.getattr(w_obj, space.newtext('seconds')))
+        microseconds = space.int_w(
+            space.getattr(w_obj, space.newtext('microseconds')))
     py_delta.c_days = cts.cast('int', days)
-    seconds = space.int_w(space.getattr(w_obj, space.newtext('seconds')))
     py_delta.c_seconds = cts.cast('int', seconds)
-    microseconds = space.int_w(space.getattr(w_obj, space.newtext('microseconds')))
     py_delta.c_microseconds = cts.cast('int', microseconds)
 
 # Constructors. They are better used as macros.
@@ -300,24 +317,32 @@ def _PyDelta_FromDelta(space, days, seconds, useconds, normalize, w_type):
 def PyDateTime_GET_YEAR(space, w_obj):
     """Return the year, as a positive int.
     """
+    if isinstance(w_obj, W_DateTime_Date):
+        return w_obj.year
     return space.int_w(space.getattr(w_obj, space.newtext("year")))
 
 @cpython_api([rffi.VOIDP], rffi.INT_real, error=CANNOT_FAIL)
 def PyDateTime_GET_MONTH(space, w_obj):
     """Return the month, as an int from 1 through 12.
     """
+    if isinstance(w_obj, W_DateTime_Date):
+        return w_obj.month
     return space.int_w(space.getattr(w_obj, space.newtext("month")))
 
 @cpython_api([rffi.VOIDP], rffi.INT_real, error=CANNOT_FAIL)
 def PyDateTime_GET_DAY(space, w_obj):
     """Return the day, as an int from 1 through 31.
     """
+    if isinstance(w_obj, W_DateTime_Date):
+        return w_obj.day
     return space.int_w(space.getattr(w_obj, space.newtext("day")))
 
 @cpython_api([rffi.VOIDP], rffi.INT_real, error=CANNOT_FAIL)
 def PyDateTime_DATE_GET_HOUR(space, w_obj):
     """Return the hour, as an int from 0 through 23.
     """
+    if isinstance(w_obj, W_DateTime_Date):
+        return w_obj.hour
     # w_obj must be a datetime.timedate object.  However, I've seen libraries
     # call this macro with a datetime.date object.  I think it returns
     # nonsense in CPython, but it doesn't crash.  We'll just return zero
@@ -331,6 +356,8 @@ def PyDateTime_DATE_GET_HOUR(space, w_obj):
 def PyDateTime_DATE_GET_MINUTE(space, w_obj):
     """Return the minute, as an int from 0 through 59.
     """
+    if isinstance(w_obj, W_DateTime_Date):
+        return w_obj.minute
     try:
         return space.int_w(space.getattr(w_obj, space.newtext("minute")))
     except OperationError:
@@ -340,6 +367,8 @@ def PyDateTime_DATE_GET_MINUTE(space, w_obj):
 def PyDateTime_DATE_GET_SECOND(space, w_obj):
     """Return the second, as an int from 0 through 59.
     """
+    if isinstance(w_obj, W_DateTime_Date):
+        return w_obj.second
     try:
         return space.int_w(space.getattr(w_obj, space.newtext("second")))
     except OperationError:
@@ -349,6 +378,8 @@ def PyDateTime_DATE_GET_SECOND(space, w_obj):
 def PyDateTime_DATE_GET_MICROSECOND(space, w_obj):
     """Return the microsecond, as an int from 0 through 999999.
     """
+    if isinstance(w_obj, W_DateTime_Date):
+        return w_obj.microsecond
     try:
         return space.int_w(space.getattr(w_obj, space.newtext("microsecond")))
     except OperationError:
@@ -358,24 +389,32 @@ def PyDateTime_DATE_GET_MICROSECOND(space, w_obj):
 def PyDateTime_TIME_GET_HOUR(space, w_obj):
     """Return the hour, as an int from 0 through 23.
     """
+    if isinstance(w_obj, W_DateTime_Time):
+        return w_obj.hour
     return space.int_w(space.getattr(w_obj, space.newtext("hour")))
 
 @cpython_api([rffi.VOIDP], rffi.INT_real, error=CANNOT_FAIL)
 def PyDateTime_TIME_GET_MINUTE(space, w_obj):
     """Return the minute, as an int from 0 through 59.
     """
+    if isinstance(w_obj, W_DateTime_Time):
+        return w_obj.minute
     return space.int_w(space.getattr(w_obj, space.newtext("minute")))
 
 @cpython_api([rffi.VOIDP], rffi.INT_real, error=CANNOT_FAIL)
 def PyDateTime_TIME_GET_SECOND(space, w_obj):
     """Return the second, as an int from 0 through 59.
     """
+    if isinstance(w_obj, W_DateTime_Time):
+        return w_obj.second
     return space.int_w(space.getattr(w_obj, space.newtext("second")))
 
 @cpython_api([rffi.VOIDP], rffi.INT_real, error=CANNOT_FAIL)
 def PyDateTime_TIME_GET_MICROSECOND(space, w_obj):
     """Return the microsecond, as an int from 0 through 999999.
     """
+    if isinstance(w_obj, W_DateTime_Time):
+        return w_obj.microsecond
     return space.int_w(space.getattr(w_obj, space.newtext("microsecond")))
 
 # XXX these functions are not present in the Python API
@@ -384,12 +423,18 @@ def PyDateTime_TIME_GET_MICROSECOND(space, w_obj):
 
 @cpython_api([rffi.VOIDP], rffi.INT_real, error=CANNOT_FAIL)
 def PyDateTime_DELTA_GET_DAYS(space, w_obj):
+    if isinstance(w_obj, W_DateTime_Delta):
+        return w_obj.days
     return space.int_w(space.getattr(w_obj, space.newtext("days")))
 
 @cpython_api([rffi.VOIDP], rffi.INT_real, error=CANNOT_FAIL)
 def PyDateTime_DELTA_GET_SECONDS(space, w_obj):
+    if isinstance(w_obj, W_DateTime_Delta):
+        return w_obj.seconds
     return space.int_w(space.getattr(w_obj, space.newtext("seconds")))
 
 @cpython_api([rffi.VOIDP], rffi.INT_real, error=CANNOT_FAIL)
 def PyDateTime_DELTA_GET_MICROSECONDS(space, w_obj):
+    if isinstance(w_obj, W_DateTime_Delta):
+        return w_obj.microseconds
     return space.int_w(space.getattr(w_obj, space.newtext("microseconds")))
@@ -52,14 +52,17 @@ def dump_rpy_heap(file):
 class GcStats(object):
     def __init__(self, s):
         self._s = s
-        for item in ('total_gc_memory', 'jit_backend_used',
+        for item in ('total_gc_memory', 'jit_backend_used', 'jit_backend_peak',
                      'total_memory_pressure',
                      'total_allocated_memory', 'jit_backend_allocated',
                      'peak_memory', 'peak_allocated_memory', 'total_arena_memory',
                      'total_rawmalloced_memory', 'nursery_size',
                      'peak_arena_memory', 'peak_rawmalloced_memory',
+                     'nursery_min_size', 'nursery_max_size',
                      ):
             setattr(self, item, self._format(getattr(self._s, item)))
+        self.nursery_resizes = self._s.nursery_resizes
+        self.nursery_survival_rate = self._s.nursery_survival_rate
         memory_pressure = 0
         if self._s.total_memory_pressure != -1:
             memory_pressure = self._s.total_memory_pressure
@@ -87,7 +90,7 @@ class GcStats(object):
        in arenas:            %s (peak: %s)
        rawmalloced:          %s (peak: %s)
        nursery:              %s
-    raw assembler used:      %s%s
+    raw assembler used:      %s (peak: %s)%s
     -----------------------------
     Total:                   %s
 
@@ -105,7 +108,7 @@ class GcStats(object):
               self.total_arena_memory, self.peak_arena_memory,
               self.total_rawmalloced_memory, self.peak_rawmalloced_memory,
               self.nursery_size,
-           self.jit_backend_used,
+           self.jit_backend_used, self.jit_backend_peak,
            extra,
            self.memory_used_sum,
 
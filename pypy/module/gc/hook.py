@@ -1,11 +1,13 @@
-from rpython.memory.gc.hook import GcHooks
+from rpython.memory.gc.hook import GcHooks, HEAP_CENSUS
 from rpython.memory.gc import incminimark
 from rpython.rlib import rgc
 from rpython.rlib.nonconst import NonConstant
 from rpython.rlib.rarithmetic import r_uint, r_longlong, longlongmax
+from rpython.rtyper.lltypesystem import lltype
 from pypy.interpreter.gateway import interp2app, unwrap_spec, WrappedDefault
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.typedef import TypeDef, interp_attrproperty, GetSetProperty
+from pypy.interpreter.typedef import interp_attrproperty_w
 from pypy.interpreter.executioncontext import AsyncAction
 
 inf = float("inf")
@@ -34,6 +36,9 @@ class LowLevelGcHooks(GcHooks):
     def is_gc_collect_enabled(self):
         return self.w_hooks.gc_collect_enabled
 
+    def is_gc_census_enabled(self):
+        return self.w_hooks.gc_census_enabled
+
     def on_gc_minor(self, duration, total_memory_used, pinned_objects):
         action = self.w_hooks.gc_minor
         action.count += 1
@@ -69,6 +74,12 @@ class LowLevelGcHooks(GcHooks):
         action.pinned_objects = pinned_objects
         action.fire()
 
+    def on_gc_census(self, census):
+        action = self.w_hooks.gc_census
+        action.count += 1
+        action.census = census
+        action.fire()
+
 
 class W_AppLevelHooks(W_Root):
 
@@ -77,9 +88,11 @@ class W_AppLevelHooks(W_Root):
         self.gc_minor_enabled = False
         self.gc_collect_step_enabled = False
         self.gc_collect_enabled = False
+        self.gc_census_enabled = False
         self.gc_minor = GcMinorHookAction(space)
         self.gc_collect_step = GcCollectStepHookAction(space)
         self.gc_collect = GcCollectHookAction(space)
+        self.gc_census = GcCensusHookAction(space)
 
     def descr_get_on_gc_minor(self, space):
         return self.gc_minor.w_callable
@@ -105,18 +118,32 @@ class W_AppLevelHooks(W_Root):
         self.gc_collect.w_callable = w_obj
         self.gc_collect.fix_annotation()
 
+    def descr_get_on_gc_census(self, space):
+        return self.gc_census.w_callable
+
+    def descr_set_on_gc_census(self, space, w_obj):
+        self.gc_census_enabled = not space.is_none(w_obj)
+        self.gc_census.w_callable = w_obj
+        self.gc_census.fix_annotation()
+
     def descr_set(self, space, w_obj):
         w_a = space.getattr(w_obj, space.newtext('on_gc_minor'))
         w_b = space.getattr(w_obj, space.newtext('on_gc_collect_step'))
         w_c = space.getattr(w_obj, space.newtext('on_gc_collect'))
+        # on_gc_census is optional, as it was added later
+        w_d = space.findattr(w_obj, space.newtext('on_gc_census'))
+        if w_d is None:
+            w_d = space.w_None
         self.descr_set_on_gc_minor(space, w_a)
         self.descr_set_on_gc_collect_step(space, w_b)
         self.descr_set_on_gc_collect(space, w_c)
+        self.descr_set_on_gc_census(space, w_d)
 
     def descr_reset(self, space):
         self.descr_set_on_gc_minor(space, space.w_None)
         self.descr_set_on_gc_collect_step(space, space.w_None)
         self.descr_set_on_gc_collect(space, space.w_None)
+        self.descr_set_on_gc_census(space, space.w_None)
 
 
 class NoRecursiveAction(AsyncAction):
@@ -258,6 +285,52 @@ class GcCollectHookAction(NoRecursiveAction):
         self.space.call_function(self.w_callable, w_stats)
 
 
+class GcCensusHookAction(NoRecursiveAction):
+    census = lltype.nullptr(HEAP_CENSUS)
+
+    def __init__(self, space):
+        NoRecursiveAction.__init__(self, space)
+        self.w_callable = space.w_None
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+
+    def fix_annotation(self):
+        # the annotation of the class and its attributes must be completed
+        # BEFORE we do the gc transform; this makes sure that everything is
+        # annotated with the correct types
+        if NonConstant(False):
+            self.count = NonConstant(-42)
+            self.census = NonConstant(lltype.nullptr(HEAP_CENSUS))
+            self.fire()
+
+    def _do_perform(self, ec, frame):
+        # 'self.census' belongs to the GC, which may reuse it once we
+        # start allocating: make a raw copy of it first
+        space = self.space
+        census = self.census
+        if not census:
+            return
+        length = len(census)
+        copy = lltype.malloc(HEAP_CENSUS, length, flavor='raw')
+        try:
+            for i in range(length):
+                copy[i].count = census[i].count
+                copy[i].size = census[i].size
+            w_census = space.newdict()
+            for i in range(length):
+                if copy[i].count > 0:
+                    w_item = space.newtuple([space.newint(copy[i].count),
+                                             space.newint(copy[i].size)])
+                    space.setitem(w_census, space.newint(i), w_item)
+        finally:
+            lltype.free(copy, flavor='raw')
+        w_stats = W_GcCensusStats(self.count, w_census)
+        self.reset()
+        self.space.call_function(self.w_callable, w_stats)
+
+
 class W_GcMinorStats(W_Root):
 
     def __init__(self, count, duration, duration_min, duration_max,
@@ -314,6 +387,14 @@ class W_GcCollectStats(W_Root):
         self.pinned_objects = pinned_objects
 
 
+class W_GcCensusStats(W_Root):
+    def __init__(self, count, w_census):
+        self.count = count
+        # {type index: (number of objects, total size in bytes)}, where
+        # the type indexes are the line numbers in gc.get_typeids_z()
+        self.w_census = w_census
+
+
 # just a shortcut to make the typedefs shorter
 def wrap_many(cls, names):
     d = {}
@@ -340,6 +421,10 @@ W_AppLevelHooks.typedef = TypeDef(
         W_AppLevelHooks.descr_get_on_gc_collect,
         W_AppLevelHooks.descr_set_on_gc_collect),
 
+    on_gc_census = GetSetProperty(
+        W_AppLevelHooks.descr_get_on_gc_census,
+        W_AppLevelHooks.descr_set_on_gc_census),
+
     set = interp2app(W_AppLevelHooks.descr_set),
     reset = interp2app(W_AppLevelHooks.descr_reset),
     )
@@ -389,3 +474,11 @@ W_GcCollectStats.typedef = TypeDef(
         "pinned_objects",
      ))
     )
+
+W_GcCensusStats.typedef = TypeDef(
+    "GcCensusStats",
+    census = interp_attrproperty_w("w_census", cls=W_GcCensusStats),
+    **wrap_many(W_GcCensusStats, (
+        "count",
+     ))
+    )
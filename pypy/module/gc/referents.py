@@ -185,12 +185,18 @@ class W_GcStats(W_Root):
         self.peak_allocated_memory = rgc.get_stats(rgc.PEAK_ALLOCATED_MEMORY)
         self.jit_backend_allocated = jit_hooks.stats_asmmemmgr_allocated(None)
         self.jit_backend_used = jit_hooks.stats_asmmemmgr_used(None)
+        self.jit_backend_peak = jit_hooks.stats_asmmemmgr_peak(None)
         self.total_arena_memory = rgc.get_stats(rgc.TOTAL_ARENA_MEMORY)
         self.total_rawmalloced_memory = rgc.get_stats(
             rgc.TOTAL_RAWMALLOCED_MEMORY)
         self.peak_arena_memory = rgc.get_stats(rgc.PEAK_ARENA_MEMORY)
         self.peak_rawmalloced_memory = rgc.get_stats(rgc.PEAK_RAWMALLOCED_MEMORY)
         self.nursery_size = rgc.get_stats(rgc.NURSERY_SIZE)
+        self.nursery_min_size = rgc.get_stats(rgc.NURSERY_MIN_SIZE)
+        self.nursery_max_size = rgc.get_stats(rgc.NURSERY_MAX_SIZE)
+        self.nursery_resizes = rgc.get_stats(rgc.NURSERY_RESIZES)
+        self.nursery_survival_rate = (
+            rgc.get_stats(rgc.NURSERY_SURVIVAL_RATE) / 1000.0)
         self.total_gc_time = rgc.get_stats(rgc.TOTAL_GC_TIME)
 
 W_GcStats.typedef = TypeDef("GcStats",
@@ -208,6 +214,8 @@ W_GcStats.typedef = TypeDef("GcStats",
         cls=W_GcStats, wrapfn="newint"),
     jit_backend_used=interp_attrproperty("jit_backend_used",
         cls=W_GcStats, wrapfn="newint"),
+    jit_backend_peak=interp_attrproperty("jit_backend_peak",
+        cls=W_GcStats, wrapfn="newint"),
     total_arena_memory=interp_attrproperty("total_arena_memory",
         cls=W_GcStats, wrapfn="newint"),
     total_rawmalloced_memory=interp_attrproperty("total_rawmalloced_memory",
@@ -218,6 +226,14 @@ W_GcStats.typedef = TypeDef("GcStats",
         cls=W_GcStats, wrapfn="newint"),
     nursery_size=interp_attrproperty("nursery_size",
         cls=W_GcStats, wrapfn="newint"),
+    nursery_min_size=interp_attrproperty("nursery_min_size",
+        cls=W_GcStats, wrapfn="newint"),
+    nursery_max_size=interp_attrproperty("nursery_max_size",
+        cls=W_GcStats, wrapfn="newint"),
+    nursery_resizes=interp_attrproperty("nursery_resizes",
+        cls=W_GcStats, wrapfn="newint"),
+    nursery_survival_rate=interp_attrproperty("nursery_survival_rate",
+        cls=W_GcStats, wrapfn="newfloat"),
     total_gc_time=interp_attrproperty("total_gc_time",
         cls=W_GcStats, wrapfn="newint"),
 )
@@ -1,5 +1,7 @@
 import pytest
 from rpython.rlib.rarithmetic import r_uint
+from rpython.rtyper.lltypesystem import lltype
+from rpython.memory.gc.hook import HEAP_CENSUS
 from pypy.module.gc.hook import LowLevelGcHooks
 from pypy.interpreter.baseobjspace import ObjSpace
 from pypy.interpreter.gateway import interp2app, unwrap_spec
@@ -24,6 +26,19 @@ class AppTestGcHooks(object):
         def fire_gc_collect(space, a, b, c, d, e, f, g):
             gchooks.fire_gc_collect(a, b, c, d, e, f, g)
 
+        # the census arrays belong to the GC, and must stay alive until
+        # the hook runs
+        cls.censuses = []
+
+        @unwrap_spec(ObjSpace, int, int)
+        def fire_gc_census(space, index, count):
+            census = lltype.malloc(HEAP_CENSUS, index + 1, flavor='raw',
+                                   zero=True, track_allocation=False)
+            census[index].count = count
+            census[index].size = count * 16
+            cls.censuses.append(census)
+            gchooks.fire_gc_census(census)
+
         @unwrap_spec(ObjSpace)
         def fire_many(space):
             gchooks.fire_gc_minor(5.0, 0, 0)
@@ -36,13 +51,19 @@ class AppTestGcHooks(object):
         cls.w_fire_gc_minor = space.wrap(interp2app(fire_gc_minor))
         cls.w_fire_gc_collect_step = space.wrap(interp2app(fire_gc_collect_step))
         cls.w_fire_gc_collect = space.wrap(interp2app(fire_gc_collect))
+        cls.w_fire_gc_census = space.wrap(interp2app(fire_gc_census))
         cls.w_fire_many = space.wrap(interp2app(fire_many))
 
+    def teardown_class(cls):
+        for census in cls.censuses:
+            lltype.free(census, flavor='raw', track_allocation=False)
+
     def test_default(self):
         import gc
         assert gc.hooks.on_gc_minor is None
         assert gc.hooks.on_gc_collect_step is None
         assert gc.hooks.on_gc_collect is None
+        assert gc.hooks.on_gc_census is None
 
     def test_on_gc_minor(self):
         import gc
@@ -120,6 +141,23 @@ class AppTestGcHooks(object):
             (1, 7, 8, 9, 10, 11, 12, 21),
             ]
 
+    def test_on_gc_census(self):
+        import gc
+        lst = []
+        def on_gc_census(stats):
+            lst.append((stats.count, stats.census))
+        gc.hooks.on_gc_census = on_gc_census
+        self.fire_gc_census(3, 10)
+        self.fire_gc_census(0, 2)
+        assert lst == [
+            (1, {3: (10, 160)}),
+            (1, {0: (2, 32)}),
+            ]
+        #
+        gc.hooks.on_gc_census = None
+        self.fire_gc_census(1, 1)  # won't fire
+        assert len(lst) == 2
+
     def test_consts(self):
         import gc
         S = gc.GcCollectStepStats
@@ -181,6 +219,7 @@ class AppTestGcHooks(object):
         assert gc.hooks.on_gc_minor is None
         assert gc.hooks.on_gc_collect_step is None
         assert gc.hooks.on_gc_collect is None
+        assert gc.hooks.on_gc_census is None
 
     def test_no_recursive(self):
         import gc
@@ -49,10 +49,43 @@ def load(space, w_f):
 def loads(space, w_str):
     """Convert a string back to a value.  Extra characters in the string are
 ignored."""
-    u = StringUnmarshaller(space, w_str)
+    u = make_unmarshaller(space, w_str)
     obj = u.load_w_obj()
     return obj
 
+@unwrap_spec(offset=int, count=int)
+def loads_many(space, w_str, offset=0, count=-1):
+    """loads_many(string[, offset[, count]]) -> (values, offsets)
+
+Convert a string or buffer containing several marshalled values one
+after the other, starting at 'offset', back to a list of values.  At
+most 'count' values are loaded if 'count' is not negative.  'offsets'
+is the list of the positions where each value starts, followed by the
+position just after the last value."""
+    u = make_unmarshaller(space, w_str)
+    if offset < 0 or offset > u.limit:
+        raise oefmt(space.w_ValueError, "offset out of range")
+    u.bufpos = offset
+    values_w = []
+    offsets_w = [space.newint(offset)]
+    while u.bufpos < u.limit and count != 0:
+        # every value was written by its own Marshaller, with its own
+        # table of interned strings
+        u.stringtable_w = []
+        values_w.append(u.load_w_obj())
+        offsets_w.append(space.newint(u.bufpos))
+        count -= 1
+    return space.newtuple([space.newlist(values_w),
+                           space.newlist(offsets_w)])
+
+def make_unmarshaller(space, w_str):
+    # strings are read directly; any other object with the buffer
+    # interface (mmap, memoryview, array...) is read in place, without
+    # first copying its whole content into a string
+    if space.isinstance_w(w_str, space.w_bytes):
+        return StringUnmarshaller(space, w_str)
+    return BufferUnmarshaller(space, space.getarg_w('s*', w_str))
+
 
 class AbstractReaderWriter(object):
     def __init__(self, space):
@@ -498,3 +531,63 @@ class StringUnmarshaller(Unmarshaller):
             return x
         else:
             self.raise_exc('bad marshal data')
+
+
+class BufferUnmarshaller(Unmarshaller):
+    # Unmarshaller reading from an interp-level buffer, which is not
+    # copied: only the pieces of it that are needed are read
+    def __init__(self, space, buf):
+        Unmarshaller.__init__(self, space, None)
+        self.buf = buf
+        self.bufpos = 0
+        self.limit = buf.getlength()
+
+    def raise_eof(self):
+        space = self.space
+        raise oefmt(space.w_EOFError, "EOF read where object expected")
+
+    def get(self, n):
+        pos = self.bufpos
+        newpos = pos + n
+        if newpos > self.limit:
+            self.raise_eof()
+        self.bufpos = newpos
+        return self.buf.getslice(pos, 1, n)
+
+    def get1(self):
+        pos = self.bufpos
+        if pos >= self.limit:
+            self.raise_eof()
+        self.bufpos = pos + 1
+        return self.buf.getitem(pos)
+
+    def get_int(self):
+        pos = self.bufpos
+        newpos = pos + 4
+        if newpos > self.limit:
+            self.raise_eof()
+        self.bufpos = newpos
+        a = ord(self.buf.getitem(pos))
+        b = ord(self.buf.getitem(pos+1))
+        c = ord(self.buf.getitem(pos+2))
+        d = ord(self.buf.getitem(pos+3))
+        if d & 0x80:
+            d -= 0x100
+        x = a | (b<<8) | (c<<16) | (d<<24)
+        return intmask(x)
+
+    def get_lng(self):
+        pos = self.bufpos
+        newpos = pos + 4
+        if newpos > self.limit:
+            self.raise_eof()
+        self.bufpos = newpos
+        a = ord(self.buf.getitem(pos))
+        b = ord(self.buf.getitem(pos+1))
+        c = ord(self.buf.getitem(pos+2))
+        d = ord(self.buf.getitem(pos+3))
+        x = a | (b<<8) | (c<<16) | (d<<24)
+        if x >= 0:
+            return x
+        else:
+            self.raise_exc('bad marshal data')
@@ -14,5 +14,6 @@ class Module(MixedModule):
         'dumps'   : 'interp_marshal.dumps',
         'load'    : 'interp_marshal.load',
         'loads'   : 'interp_marshal.loads',
+        'loads_many': 'interp_marshal.loads_many',
         'version' : 'space.newint(interp_marshal.Py_MARSHAL_VERSION)',
     }
@@ -2,7 +2,7 @@ from rpython.tool.udir import udir
 
 
 class AppTestMarshal:
-    spaceconfig = {'usemodules': ['array']}
+    spaceconfig = {'usemodules': ['array', 'mmap']}
 
     def setup_class(cls):
         tmpfile = udir.join('AppTestMarshal.tmp')
@@ -15,11 +15,11 @@ class AppTestMarshal:
         x = marshal.loads(s)
         assert x == case and type(x) is type(case)
 
-        exc = raises(TypeError, marshal.loads, memoryview(s))
-        assert str(exc.value) == "must be string or read-only buffer, not memoryview"
-
         import sys
         if '__pypy__' in sys.builtin_module_names:
+            x = marshal.loads(memoryview(s))
+            assert x == case and type(x) is type(case)
+
             f = StringIO.StringIO()
             marshal.dump(case, f)
             f.seek(0)
@@ -196,6 +196,49 @@ class AppTestMarshal:
             pass
         assert marshal.dumps(subtype('c', 'test')) == marshal.dumps(array('c', 'test'))
 
+    def test_loads_buffer(self):
+        import marshal, sys
+        if '__pypy__' not in sys.builtin_module_names:
+            skip("PyPy only")
+        from array import array
+        import mmap
+        obj = [4, ("hello", 7.5), u"x" * 100, {"a": None}]
+        s = marshal.dumps(obj)
+        assert marshal.loads(buffer(s)) == obj
+        assert marshal.loads(memoryview("xx" + s)[2:]) == obj
+        assert marshal.loads(array('c', s)) == obj
+        f = open(self.tmpfile, 'w+b')
+        f.write(s)
+        f.flush()
+        m = mmap.mmap(f.fileno(), 0)
+        assert marshal.loads(m) == obj
+        m.close()
+        f.close()
+        raises(EOFError, marshal.loads, memoryview(s[:-1]))
+        exc = raises(TypeError, marshal.loads, 42)
+        assert str(exc.value) == "must be string or buffer, not int"
+
+    def test_loads_many(self):
+        import marshal, sys
+        if '__pypy__' not in sys.builtin_module_names:
+            skip("PyPy only")
+        objs = [4, "hello", ("hello", "hello"), None, [u"\u1234"]]
+        dumped = [marshal.dumps(obj) for obj in objs]
+        s = "".join(dumped)
+        offsets = [0]
+        for part in dumped:
+            offsets.append(offsets[-1] + len(part))
+        assert marshal.loads_many(s) == (objs, offsets)
+        assert marshal.loads_many(memoryview(s)) == (objs, offsets)
+        assert marshal.loads_many(s, offsets[2]) == (objs[2:], offsets[2:])
+        assert marshal.loads_many(s, offsets[1], 2) == (objs[1:3],
+                                                        offsets[1:4])
+        assert marshal.loads_many(s, count=0) == ([], [0])
+        assert marshal.loads_many(s, len(s)) == ([], [len(s)])
+        raises(EOFError, marshal.loads_many, s[:-1])
+        raises(ValueError, marshal.loads_many, s, -1)
+        raises(ValueError, marshal.loads_many, s, len(s) + 1)
+
     def test_bad_typecode(self):
         import marshal
         exc = raises(ValueError, marshal.loads, chr(1))
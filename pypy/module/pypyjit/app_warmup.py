@@ -0,0 +1,40 @@
+def save_warmup_cache(filename):
+    """ save_warmup_cache(filename)
+
+    Write the warm-up profile recorded so far (see get_warmup_profile())
+    to the given file, in the marshal format.
+    """
+    import marshal
+    import pypyjit
+    profile = pypyjit.get_warmup_profile()
+    # the hottest loops first
+    profile.sort(key=lambda entry: entry[4] + entry[5], reverse=True)
+    with open(filename, 'wb') as f:
+        marshal.dump(profile, f)
+
+def load_warmup_cache(filename, save_at_exit=False):
+    """ load_warmup_cache(filename, save_at_exit=False)
+
+    Pre-seed the JIT with the warm-up profile saved by save_warmup_cache()
+    in the given file, if it exists, and start recording a new profile.
+    The loops of the profile are traced after a few iterations when their
+    module is imported.  If 'save_at_exit' is true, the new profile is
+    written back to the same file when the process exits.
+    """
+    import marshal
+    import pypyjit
+    try:
+        f = open(filename, 'rb')
+    except IOError:
+        pass
+    else:
+        with f:
+            try:
+                profile = marshal.load(f)
+            except (EOFError, ValueError, TypeError):
+                profile = []      # truncated or corrupted file: ignore it
+        pypyjit.preseed_warmup_profile(profile)
+    pypyjit.set_warmup_recording(True)
+    if save_at_exit:
+        import atexit
+        atexit.register(save_warmup_cache, filename)
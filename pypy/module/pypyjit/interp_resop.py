@@ -10,7 +10,7 @@ from rpython.rtyper.annlowlevel import cast_base_ptr_to_instance, hlstr
 from rpython.rtyper.rclass import OBJECT
 #from rpython.jit.metainterp.resoperation import rop
 from rpython.rlib.nonconst import NonConstant
-from rpython.rlib.rarithmetic import r_uint
+from rpython.rlib.rarithmetic import r_uint, intmask
 from rpython.rlib import jit_hooks
 from rpython.rlib.jit import Counters
 from rpython.rlib.objectmodel import compute_unique_id
@@ -348,10 +348,14 @@ W_JitLoopInfo.typedef.acceptable_as_base_class = False
 
 
 class W_JitInfoSnapshot(W_Root):
-    def __init__(self, space, w_times, w_counters, w_counter_times):
+    def __init__(self, space, w_times, w_counters, w_counter_times,
+                 w_loops, code_memory_used, code_memory_peak):
         self.w_loop_run_times = w_times
         self.w_counters = w_counters
         self.w_counter_times = w_counter_times
+        self.w_loops = w_loops
+        self.code_memory_used = code_memory_used
+        self.code_memory_peak = code_memory_peak
 
 W_JitInfoSnapshot.typedef = TypeDef(
     "JitInfoSnapshot",
@@ -362,7 +366,20 @@ W_JitInfoSnapshot.typedef = TypeDef(
                                        doc="various JIT counters"),
     counter_times = interp_attrproperty_w("w_counter_times",
                                             cls=W_JitInfoSnapshot,
-                                            doc="various JIT timers")
+                                            doc="various JIT timers"),
+    loops = interp_attrproperty_w("w_loops", cls=W_JitInfoSnapshot,
+                                  doc="a dict mapping the number of each "
+                                      "compiled loop to a dict of its "
+                                      "statistics"),
+    code_memory_used = interp_attrproperty("code_memory_used",
+                                   cls=W_JitInfoSnapshot,
+                                   doc="Bytes of machine code in use",
+                                   wrapfn="newint"),
+    code_memory_peak = interp_attrproperty("code_memory_peak",
+                                   cls=W_JitInfoSnapshot,
+                                   doc="Largest number of bytes of machine "
+                                       "code ever in use",
+                                   wrapfn="newint"),
 )
 W_JitInfoSnapshot.typedef.acceptable_as_base_class = False
 
@@ -388,7 +405,30 @@ def get_stats_snapshot(space):
     space.setitem_str(w_counter_times, 'TRACING', space.newfloat(tr_time))
     b_time = jit_hooks.stats_get_times_value(None, Counters.BACKEND)
     space.setitem_str(w_counter_times, 'BACKEND', space.newfloat(b_time))
-    return W_JitInfoSnapshot(space, w_times, w_counters, w_counter_times)
+    # the longest single pauses, to see what the JIT adds to tail latency
+    tr_max = jit_hooks.stats_get_max_times_value(None, Counters.TRACING)
+    space.setitem_str(w_counter_times, 'TRACING_MAX', space.newfloat(tr_max))
+    b_max = jit_hooks.stats_get_max_times_value(None, Counters.BACKEND)
+    space.setitem_str(w_counter_times, 'BACKEND_MAX', space.newfloat(b_max))
+    w_loops = space.newdict()
+    ll_loops = jit_hooks.stats_get_loop_stats(None)
+    if ll_loops:
+        for i in range(len(ll_loops)):
+            stats = ll_loops[i]
+            w_stats = space.newdict()
+            space.setitem_str(w_stats, 'entries', space.newint(stats.entries))
+            space.setitem_str(w_stats, 'guard_failures',
+                              space.newint(stats.guard_failures))
+            space.setitem_str(w_stats, 'bridges', space.newint(stats.bridges))
+            space.setitem_str(w_stats, 'compile_time',
+                              space.newfloat(stats.compile_time))
+            space.setitem_str(w_stats, 'code_size',
+                              space.newint(stats.code_size))
+            space.setitem(w_loops, space.newint(stats.number), w_stats)
+    code_used = jit_hooks.stats_asmmemmgr_used(None)
+    code_peak = jit_hooks.stats_asmmemmgr_peak(None)
+    return W_JitInfoSnapshot(space, w_times, w_counters, w_counter_times,
+                             w_loops, intmask(code_used), intmask(code_peak))
 
 def get_stats_asmmemmgr(space):
     """Returns the raw memory currently used by the JIT backend,
@@ -0,0 +1,152 @@
+""" Warm-up profiles: record which loops the JIT compiled, and on the next
+start of the process pre-seed the counters of those loops so that they are
+traced again after a few iterations instead of 'threshold' ones.
+
+A loop is identified by its code object (co_filename, co_firstlineno,
+co_name) and the position 'next_instr' of the loop header, which are
+stable across processes, unlike the code objects themselves.
+"""
+
+from rpython.jit.metainterp.history import JitCellToken
+from rpython.rlib import jit_hooks
+from rpython.rlib.jit import dont_look_inside
+from rpython.rlib.rarithmetic import r_uint
+from rpython.rlib.rweakref import RWeakKeyDictionary
+from rpython.rtyper.annlowlevel import (cast_base_ptr_to_instance,
+    cast_instance_to_gcref)
+from rpython.rtyper.lltypesystem import lltype
+from rpython.rtyper.rclass import OBJECT
+
+from pypy.interpreter.error import oefmt
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.interpreter.pycode import PyCode
+
+
+class WarmupEntry(object):
+    def __init__(self, filename, firstlineno, name, next_instr):
+        self.filename = filename
+        self.firstlineno = firstlineno
+        self.name = name
+        self.next_instr = next_instr
+        self.loops = 0      # number of times the loop was compiled
+        self.bridges = 0    # number of bridges compiled out of it
+
+
+class WarmupCache(object):
+    def __init__(self, space):
+        self.recording = False
+        # (filename, firstlineno, name, next_instr) -> WarmupEntry
+        self.entries = {}
+        # loop token -> WarmupEntry, to find the entry of the loop from
+        # which a bridge is compiled.  The keys are weak, so that the
+        # loops freed by the memory manager go away
+        self.entries_by_loop = RWeakKeyDictionary(JitCellToken, WarmupEntry)
+        # (filename, firstlineno, name) -> list of 'next_instr' to seed
+        # when a code object with this key is created
+        self.pending = {}
+
+    @dont_look_inside
+    def seed(self, pycode, next_instr):
+        jit_hooks.trace_next_iteration('pypyjit', r_uint(next_instr), 0,
+                                       cast_instance_to_gcref(pycode))
+
+
+def _init_jit_warmup(pycode):
+    cache = pycode.space.fromcache(WarmupCache)
+    if cache.pending:
+        _seed_code(cache, pycode)
+
+@dont_look_inside
+def _seed_code(cache, pycode):
+    key = (pycode.co_filename, pycode.co_firstlineno, pycode.co_name)
+    positions = cache.pending.get(key, None)
+    if positions is not None:
+        del cache.pending[key]
+        for next_instr in positions:
+            if 0 <= next_instr < len(pycode.co_code):
+                cache.seed(pycode, next_instr)
+
+PyCode._init_jit_warmup = _init_jit_warmup
+
+
+def record_loop(space, debug_info):
+    cache = space.fromcache(WarmupCache)
+    if not cache.recording:
+        return
+    if debug_info.get_jitdriver().name != 'pypyjit':
+        return
+    greenkey = debug_info.greenkey
+    next_instr = greenkey[0].getint()
+    if greenkey[1].getint():     # is_being_profiled
+        return
+    ll_code = lltype.cast_opaque_ptr(lltype.Ptr(OBJECT),
+                                     greenkey[2].getref_base())
+    pycode = cast_base_ptr_to_instance(PyCode, ll_code)
+    key = (pycode.co_filename, pycode.co_firstlineno, pycode.co_name,
+           next_instr)
+    entry = cache.entries.get(key, None)
+    if entry is None:
+        entry = WarmupEntry(pycode.co_filename, pycode.co_firstlineno,
+                            pycode.co_name, next_instr)
+        cache.entries[key] = entry
+    entry.loops += 1
+    cache.entries_by_loop.set(debug_info.looptoken, entry)
+
+def record_bridge(space, debug_info):
+    cache = space.fromcache(WarmupCache)
+    if not cache.recording:
+        return
+    entry = cache.entries_by_loop.get(debug_info.looptoken)
+    if entry is not None:
+        entry.bridges += 1
+
+
+@unwrap_spec(enabled=bool)
+def set_warmup_recording(space, enabled):
+    """ set_warmup_recording(enabled)
+
+    Start or stop recording the loops compiled by the JIT into the
+    warm-up profile returned by get_warmup_profile().
+    """
+    space.fromcache(WarmupCache).recording = enabled
+
+def get_warmup_profile(space):
+    """ get_warmup_profile() -> list of tuples
+
+    Return the loops compiled since the recording was started, as tuples
+    (co_filename, co_firstlineno, co_name, next_instr, loops, bridges),
+    where 'loops' is the number of times the loop was compiled and
+    'bridges' the number of bridges compiled out of it.
+    """
+    cache = space.fromcache(WarmupCache)
+    result_w = []
+    for entry in cache.entries.values():
+        result_w.append(space.newtuple([
+            space.newtext(entry.filename),
+            space.newint(entry.firstlineno),
+            space.newtext(entry.name),
+            space.newint(entry.next_instr),
+            space.newint(entry.loops),
+            space.newint(entry.bridges)]))
+    return space.newlist(result_w)
+
+def preseed_warmup_profile(space, w_profile):
+    """ preseed_warmup_profile(profile)
+
+    Take a list of tuples as returned by get_warmup_profile(), and for
+    each of them, arrange for the loop to be traced early when the
+    corresponding code object is created, typically when its module is
+    imported.  Only the first four items of every tuple are used.
+    """
+    cache = space.fromcache(WarmupCache)
+    for w_item in space.listview(w_profile):
+        items_w = space.fixedview(w_item)
+        if len(items_w) < 4:
+            raise oefmt(space.w_ValueError,
+                        "warm-up profile entries must have at least 4 items")
+        filename = space.text_w(items_w[0])
+        firstlineno = space.int_w(items_w[1])
+        name = space.text_w(items_w[2])
+        next_instr = space.int_w(items_w[3])
+        key = (filename, firstlineno, name)
+        cache.pending.setdefault(key, []).append(next_instr)
@@ -2,6 +2,8 @@ from pypy.interpreter.mixedmodule import MixedModule
 
 class Module(MixedModule):
     appleveldefs = {
+        'save_warmup_cache': 'app_warmup.save_warmup_cache',
+        'load_warmup_cache': 'app_warmup.load_warmup_cache',
     }
 
     interpleveldefs = {
@@ -14,6 +16,9 @@ class Module(MixedModule):
         'trace_next_iteration': 'interp_jit.trace_next_iteration',
         'trace_next_iteration_hash': 'interp_jit.trace_next_iteration_hash',
         'releaseall': 'interp_jit.releaseall',
+        'set_warmup_recording': 'interp_warmup.set_warmup_recording',
+        'get_warmup_profile': 'interp_warmup.get_warmup_profile',
+        'preseed_warmup_profile': 'interp_warmup.preseed_warmup_profile',
         'set_compile_hook': 'interp_resop.set_compile_hook',
         'set_abort_hook': 'interp_resop.set_abort_hook',
         'set_trace_too_long_hook': 'interp_resop.set_trace_too_long_hook',
@@ -36,6 +41,7 @@ class Module(MixedModule):
         # force the __extend__ hacks to occur early
         from pypy.module.pypyjit.interp_jit import pypyjitdriver
         from pypy.module.pypyjit.hooks import pypy_hooks
+        import pypy.module.pypyjit.interp_warmup
         # add the 'defaults' attribute
         from rpython.rlib.jit import PARAMETERS
         space = self.space
@@ -0,0 +1,141 @@
+import py
+import gc
+from pypy.interpreter.gateway import interp2app
+from rpython.jit.metainterp.history import JitCellToken, ConstInt, ConstPtr,\
+     BasicFailDescr
+from rpython.jit.metainterp.logger import Logger
+from rpython.rtyper.annlowlevel import cast_instance_to_base_ptr
+from rpython.rtyper.lltypesystem import lltype, llmemory
+from pypy.module.pypyjit.hooks import pypy_hooks
+from pypy.module.pypyjit.interp_warmup import WarmupCache
+from pypy.module.pypyjit.test.test_jit_hook import MockJitDriverSD, MockSD
+from rpython.rlib.jit import JitDebugInfo
+
+
+class AppTestWarmup(object):
+    spaceconfig = dict(usemodules=('pypyjit',))
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("Can't run this test with -A")
+        space = cls.space
+        w_f = space.appexec([], """():
+        def function(n):
+            while n:
+                n -= 1
+        return function
+        """)
+        cls.w_f = w_f
+        ll_code = cast_instance_to_base_ptr(w_f.code)
+        code_gcref = lltype.cast_opaque_ptr(llmemory.GCREF, ll_code)
+        logger = Logger(MockSD())
+        tokens = [JitCellToken()]
+
+        def interp_on_compile(next_instr, is_being_profiled):
+            greenkey = [ConstInt(next_instr), ConstInt(is_being_profiled),
+                        ConstPtr(code_gcref)]
+            di_loop = JitDebugInfo(MockJitDriverSD, logger, tokens[0], [],
+                                   'loop', greenkey)
+            if pypy_hooks.are_hooks_enabled():
+                pypy_hooks.after_compile(di_loop)
+
+        def interp_on_compile_bridge():
+            di_bridge = JitDebugInfo(MockJitDriverSD, logger, tokens[0], [],
+                                     'bridge', fail_descr=BasicFailDescr())
+            if pypy_hooks.are_hooks_enabled():
+                pypy_hooks.after_compile_bridge(di_bridge)
+
+        seeded = []
+        def seed(pycode, next_instr):
+            seeded.append((pycode.co_name, next_instr))
+        cache = space.fromcache(WarmupCache)
+        cache.seed = seed
+
+        def interp_get_seeded():
+            result = space.wrap(seeded[:])
+            del seeded[:]
+            return result
+
+        def interp_free_loop():
+            # the loop is freed, and later a new one gets compiled
+            tokens[0] = JitCellToken()
+            gc.collect()
+            return space.newint(cache.entries_by_loop.length())
+
+        def interp_reset():
+            cache.recording = False
+            cache.entries.clear()
+            cache.entries_by_loop = WarmupCache(space).entries_by_loop
+            cache.pending.clear()
+
+        cls.w_on_compile = space.wrap(interp2app(interp_on_compile,
+                                  unwrap_spec=[int, int]))
+        cls.w_on_compile_bridge = space.wrap(
+            interp2app(interp_on_compile_bridge))
+        cls.w_get_seeded = space.wrap(interp2app(interp_get_seeded))
+        cls.w_free_loop = space.wrap(interp2app(interp_free_loop))
+        cls.w_reset = space.wrap(interp2app(interp_reset))
+        cls.interp_reset = staticmethod(interp_reset)
+        cls.w_tmpfile = space.wrap(str(py.test.ensuretemp("pypyjit")
+                                           .join("warmup.cache")))
+
+    def setup_method(self, meth):
+        self.interp_reset()
+
+    def test_recording(self):
+        import pypyjit
+        code = self.f.__code__
+        self.on_compile(6, 0)
+        assert pypyjit.get_warmup_profile() == []
+        pypyjit.set_warmup_recording(True)
+        self.on_compile(6, 0)
+        self.on_compile(6, 0)
+        self.on_compile(3, 1)      # is_being_profiled: ignored
+        self.on_compile_bridge()
+        assert pypyjit.get_warmup_profile() == [
+            (code.co_filename, code.co_firstlineno, code.co_name, 6, 2, 1)]
+        pypyjit.set_warmup_recording(False)
+        self.on_compile(6, 0)
+        assert pypyjit.get_warmup_profile()[0][4] == 2
+
+    def test_freed_loop(self):
+        import pypyjit
+        pypyjit.set_warmup_recording(True)
+        self.on_compile(6, 0)
+        assert self.free_loop() == 0
+        # a bridge of a loop that is not known is not counted
+        self.on_compile_bridge()
+        assert pypyjit.get_warmup_profile()[0][4:] == (1, 0)
+
+    def test_preseed(self):
+        import pypyjit
+        src = "def g(n):\n    while n:\n        n -= 1\n"
+        co = compile(src, "warmup_test.py", "exec")
+        g_code = [c for c in co.co_consts if hasattr(c, 'co_code')][0]
+        assert self.get_seeded() == []
+        pypyjit.preseed_warmup_profile([
+            ("warmup_test.py", g_code.co_firstlineno, "g", 3, 1, 0),
+            ("warmup_test.py", g_code.co_firstlineno, "g", 9999),
+            ("warmup_test.py", 42, "g", 3)])
+        compile(src, "other_file.py", "exec")
+        assert self.get_seeded() == []
+        compile(src, "warmup_test.py", "exec")
+        assert self.get_seeded() == [("g", 3)]
+        # only the first code object created gets seeded
+        compile(src, "warmup_test.py", "exec")
+        assert self.get_seeded() == []
+        raises(ValueError, pypyjit.preseed_warmup_profile, [("x", 1, "g")])
+
+    def test_save_load(self):
+        import pypyjit
+        code = self.f.__code__
+        pypyjit.load_warmup_cache(self.tmpfile + ".missing")
+        self.on_compile(6, 0)
+        pypyjit.save_warmup_cache(self.tmpfile)
+        self.reset()
+        pypyjit.load_warmup_cache(self.tmpfile)
+        assert pypyjit.get_warmup_profile() == []
+        src = ("\n" * (code.co_firstlineno - 1) +
+               "def function(n):\n    while n:\n        n -= 1\n")
+        compile(src, code.co_filename, "exec")
+        assert self.get_seeded() == [("function", 6)]
@@ -468,4 +468,5 @@ FakeObjSpace.sys.filesystemencoding = 'foobar'
 FakeObjSpace.sys.defaultencoding = 'ascii'
 FakeObjSpace.sys.dlopenflags = 123
 FakeObjSpace.sys.track_resources = False
+FakeObjSpace.sys.recursionlimit = 1000
 FakeObjSpace.builtin = FakeModule()
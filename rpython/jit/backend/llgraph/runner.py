@@ -53,7 +53,8 @@ class LLTrace(object):
         self.operations = []
         for op in operations:
             opnum = op.getopnum()
-            if opnum == rop.GUARD_VALUE:
+            if (opnum == rop.GUARD_VALUE or opnum == rop.GUARD_CLASS or
+                    opnum == rop.GUARD_NONNULL_CLASS):
                 # we don't care about the value 13 here, because we gonna
                 # fish it from the extra slot on frame anyway
                 op.getdescr().make_a_counter_per_value(op, 13)
@@ -1248,10 +1249,11 @@ class LLFrame(object):
             llmemory.cast_int_to_adr(klass),
             rclass.CLASSTYPE)
         if value.typeptr != expected_class:
-            self.fail_guard(descr)
+            self.fail_guard(descr, extra_value=arg)
 
     def execute_guard_nonnull_class(self, descr, arg, klass):
-        self.execute_guard_nonnull(descr, arg)
+        if not arg:
+            self.fail_guard(descr, extra_value=arg)
         self.execute_guard_class(descr, arg, klass)
 
     def execute_guard_gc_type(self, descr, arg, typeid):
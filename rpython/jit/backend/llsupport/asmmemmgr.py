@@ -18,6 +18,7 @@ class AsmMemoryManager(object):
                        num_indices      = NUM_INDICES):
         self.total_memory_allocated = r_uint(0)
         self.total_mallocs = r_uint(0)
+        self.peak_mallocs = r_uint(0)
         self.large_alloc_size = large_alloc_size
         self.min_fragment = min_fragment
         self.num_indices = num_indices
@@ -27,7 +28,12 @@ class AsmMemoryManager(object):
 
     def get_stats(self):
         """Returns stats for rlib.jit.jit_hooks.stats_asmmemmgr_*()."""
-        return (self.total_memory_allocated, self.total_mallocs)
+        return (self.total_memory_allocated, self.total_mallocs,
+                self.peak_mallocs)
+
+    def _update_peak(self):
+        if self.total_mallocs > self.peak_mallocs:
+            self.peak_mallocs = self.total_mallocs
 
     def malloc(self, minsize, maxsize):
         """Allocate executable memory, between minsize and maxsize bytes,
@@ -42,6 +48,7 @@ class AsmMemoryManager(object):
             stop = smaller_stop
             result = (start, stop)
         self.total_mallocs += r_uint(stop - start)
+        self._update_peak()
         return result   # pair (start, stop)
 
     def free(self, start, stop):
@@ -62,8 +69,10 @@ class AsmMemoryManager(object):
         if stop - middle >= self.min_fragment:
             self.total_mallocs -= r_uint(stop - middle)
             self._add_free_block(middle, stop)
+            self._update_peak()
             return True
         else:
+            self._update_peak()
             return False    # too small to record
 
     def _mmap_alloc(self, size):
@@ -101,6 +101,24 @@ def test_malloc_with_fragment():
             assert memmgr.free_blocks_end == {}
             assert memmgr.blocks_by_size == [[], [], [], [], []]
 
+def test_peak_mallocs():
+    memmgr = AsmMemoryManager(min_fragment=8,
+                              num_indices=5)
+    memmgr._add_free_block(10, 100)
+    (start1, stop1) = memmgr.malloc(20, 20)
+    (start2, stop2) = memmgr.malloc(30, 30)
+    assert memmgr.get_stats()[1:] == (50, 50)
+    memmgr.free(start1, stop1)
+    assert memmgr.get_stats()[1:] == (30, 50)
+    (start3, stop3) = memmgr.open_malloc(8)
+    assert memmgr.open_free(start3 + 10, stop3)
+    assert memmgr.get_stats()[1:] == (40, 50)
+    memmgr.free(start2, stop2)
+    (start4, stop4) = memmgr.malloc(25, 25)
+    assert memmgr.get_stats()[1:] == (35, 50)
+    memmgr.malloc(20, 20)
+    assert memmgr.get_stats()[1:] == (55, 55)
+
 
 class TestAsmMemoryManager:
     AMMClass = AsmMemoryManager
@@ -252,6 +252,27 @@ class TranslationTestJITStats(CCompiledMixin):
         assert res == 2
         # one for loop and one for the prologue, no unrolling
 
+    def test_jit_get_loop_stats(self):
+        driver = JitDriver(greens = [], reds = ['i'])
+
+        def f():
+            i = 0
+            while i < 100000:
+                driver.jit_merge_point(i=i)
+                i += 1
+
+        def main():
+            f()
+            ll_loops = jit_hooks.stats_get_loop_stats(None)
+            if len(ll_loops) != 1:
+                return -1
+            if ll_loops[0].entries < 1 or ll_loops[0].code_size <= 0:
+                return -2
+            return 0
+
+        res = self.meta_interp(main, [])
+        assert res == 0
+
     def test_flush_trace_counts(self):
         driver = JitDriver(greens = [], reds = ['i'])
 
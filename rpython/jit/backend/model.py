@@ -292,12 +292,17 @@ class AbstractCPU(object):
 class CompiledLoopToken(object):
     asmmemmgr_blocks = None
     asmmemmgr_gcreftracers = None
+    profile_counters = None     # see metainterp/loopprofile.py
 
     def __init__(self, cpu, number):
         cpu.tracker.total_compiled_loops += 1
         self.cpu = cpu
         self.number = number
         self.bridges_count = 0
+        # per-loop statistics, see jit_hooks.stats_get_loop_stats()
+        self.entry_count = 0        # entries from the interpreter
+        self.guard_failures = 0     # guard failures leaving the machine code
+        self.compile_time = 0.0     # tracing and compiling, with the bridges
         self.invalidate_positions = []
         # a list of weakrefs to looptokens that has been redirected to
         # this one
@@ -306,6 +311,22 @@ class CompiledLoopToken(object):
         debug_print("allocating Loop #", self.number)
         debug_stop("jit-mem-looptoken-alloc")
 
+    def get_code_size(self):
+        """The number of bytes of machine code and data of the loop and
+        its bridges."""
+        size = 0
+        if self.asmmemmgr_blocks is not None:
+            for rawstart, rawstop in self.asmmemmgr_blocks:
+                size += rawstop - rawstart
+        return size
+
+    def free_profile_counters(self):
+        counters = self.profile_counters
+        if counters is not None:
+            self.profile_counters = None
+            for counter in counters:
+                lltype.free(counter, flavor='raw', track_allocation=False)
+
     def compiling_a_bridge(self):
         self.cpu.tracker.total_compiled_bridges += 1
         self.bridges_count += 1
@@ -333,6 +354,7 @@ class CompiledLoopToken(object):
         #debug_print("freeing Loop #", self.number, 'with',
         #            self.bridges_count, 'attached bridges')
         self.cpu.free_loop_and_bridges(self)
+        self.free_profile_counters()
         self.cpu.tracker.total_freed_loops += 1
         self.cpu.tracker.total_freed_bridges += self.bridges_count
         #debug_stop("jit-mem-looptoken-free")
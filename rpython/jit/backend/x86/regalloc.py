@@ -503,11 +503,18 @@ class RegAlloc(BaseRegalloc, VectorRegallocMixin):
     def consider_guard_class(self, op):
         assert not isinstance(op.getarg(0), Const)
         x = self.rm.make_sure_var_in_reg(op.getarg(0))
+        loc = self.assembler.cpu.all_reg_indexes[x.value]
+        op.getdescr().make_a_counter_per_value(op, loc)
         y = self.loc(op.getarg(1))
         self.perform_guard(op, [x, y], None)
 
     consider_guard_nonnull_class = consider_guard_class
-    consider_guard_gc_type = consider_guard_class
+
+    def consider_guard_gc_type(self, op):
+        assert not isinstance(op.getarg(0), Const)
+        x = self.rm.make_sure_var_in_reg(op.getarg(0))
+        y = self.loc(op.getarg(1))
+        self.perform_guard(op, [x, y], None)
 
     def consider_guard_is_object(self, op):
         x = self.make_sure_var_in_reg(op.getarg(0))
@@ -0,0 +1,7 @@
+from rpython.jit.backend.x86.test.test_basic import Jit386Mixin
+from rpython.jit.metainterp.test import test_loopprofile
+
+class TestLoopProfile(Jit386Mixin, test_loopprofile.LoopProfileTests):
+    # for the individual tests see
+    # ====> ../../../metainterp/test/test_loopprofile.py
+    pass
@@ -7,8 +7,8 @@ from __future__ import print_function
 from rpython.jit.codewriter import support
 from rpython.jit.codewriter.jitcode import JitCode
 from rpython.jit.codewriter.effectinfo import (VirtualizableAnalyzer,
-    QuasiImmutAnalyzer, RandomEffectsAnalyzer, effectinfo_from_writeanalyze,
-    EffectInfo, CallInfoCollection)
+    QuasiImmutAnalyzer, RandomEffectsAnalyzer, ReadonlyArgsAnalyzer,
+    effectinfo_from_writeanalyze, EffectInfo, CallInfoCollection)
 from rpython.rtyper.lltypesystem import lltype, llmemory
 from rpython.rtyper.lltypesystem.lltype import getfunctionptr
 from rpython.rlib import rposix
@@ -40,6 +40,7 @@ class CallControl(object):
             self.quasiimmut_analyzer = QuasiImmutAnalyzer(translator)
             self.randomeffects_analyzer = RandomEffectsAnalyzer(translator)
             self.collect_analyzer = CollectAnalyzer(translator)
+            self.readonly_args_analyzer = ReadonlyArgsAnalyzer()
             self.seen_rw = DependencyTracker(self.readwrite_analyzer)
             self.seen_gc = DependencyTracker(self.collect_analyzer)
         #
@@ -237,6 +238,7 @@ class CallControl(object):
         elidable = False
         loopinvariant = False
         call_release_gil_target = EffectInfo._NO_CALL_RELEASE_GIL_TARGET
+        readonly_args = 0
         if op.opname == "direct_call":
             funcobj = op.args[0].value._obj
             assert getattr(funcobj, 'calling_conv', 'c') == 'c', (
@@ -255,6 +257,10 @@ class CallControl(object):
                     "JIT backend does not support natural_arity calls, please wrap it in a helper")
                 tgt_func = llmemory.cast_ptr_to_adr(tgt_func)
                 call_release_gil_target = (tgt_func, tgt_saveerr)
+            graph = getattr(funcobj, 'graph', None)
+            if graph is not None:
+                readonly_args = self.readonly_args_analyzer.analyze_graph(
+                    graph)
 
         elif op.opname == 'indirect_call':
             # check that we're not trying to call indirectly some
@@ -321,6 +327,7 @@ class CallControl(object):
             self.readwrite_analyzer.analyze(op, self.seen_rw), self.cpu,
             extraeffect, oopspecindex, can_invalidate, call_release_gil_target,
             extradescr, self.collect_analyzer.analyze(op, self.seen_gc),
+            readonly_args,
         )
         #
         assert effectinfo is not None
@@ -122,7 +122,8 @@ class EffectInfo(object):
                 can_invalidate=False,
                 call_release_gil_target=_NO_CALL_RELEASE_GIL_TARGET,
                 extradescrs=None,
-                can_collect=True):
+                can_collect=True,
+                readonly_args=0):
         readonly_descrs_fields = frozenset_or_none(readonly_descrs_fields)
         readonly_descrs_arrays = frozenset_or_none(readonly_descrs_arrays)
         readonly_descrs_interiorfields = frozenset_or_none(
@@ -131,6 +132,8 @@ class EffectInfo(object):
         write_descrs_arrays = frozenset_or_none(write_descrs_arrays)
         write_descrs_interiorfields = frozenset_or_none(
                                               write_descrs_interiorfields)
+        if extraeffect >= EffectInfo.EF_FORCES_VIRTUAL_OR_VIRTUALIZABLE:
+            readonly_args = 0
         key = (readonly_descrs_fields,
                readonly_descrs_arrays,
                readonly_descrs_interiorfields,
@@ -140,7 +143,8 @@ class EffectInfo(object):
                extraeffect,
                oopspecindex,
                can_invalidate,
-               can_collect)
+               can_collect,
+               readonly_args)
         tgt_func, tgt_saveerr = call_release_gil_target
         if tgt_func:
             key += (object(),)    # don't care about caching in this case
@@ -192,6 +196,7 @@ class EffectInfo(object):
         result.extraeffect = extraeffect
         result.can_invalidate = can_invalidate
         result.can_collect = can_collect
+        result.readonly_args = readonly_args
         result.oopspecindex = oopspecindex
         result.extradescrs = extradescrs
         result.call_release_gil_target = call_release_gil_target
@@ -241,6 +246,13 @@ class EffectInfo(object):
     def check_can_collect(self):
         return self.can_collect
 
+    def check_readonly_arg(self, index):
+        """Is the index'th argument (not counting the function and the
+        void arguments) only read by the call?  See ReadonlyArgsAnalyzer."""
+        if index >= MAX_READONLY_ARGS:
+            return False
+        return bool(self.readonly_args & (1 << index))
+
     def check_is_elidable(self):
         return (self.extraeffect == self.EF_ELIDABLE_CAN_RAISE or
                 self.extraeffect == self.EF_ELIDABLE_OR_MEMORYERROR or
@@ -280,7 +292,8 @@ def effectinfo_from_writeanalyze(effects, cpu,
                                  call_release_gil_target=
                                      EffectInfo._NO_CALL_RELEASE_GIL_TARGET,
                                  extradescr=None,
-                                 can_collect=True):
+                                 can_collect=True,
+                                 readonly_args=0):
     from rpython.translator.backendopt.writeanalyze import top_set
     if effects is top_set or extraeffect == EffectInfo.EF_RANDOM_EFFECTS:
         readonly_descrs_fields = None
@@ -375,7 +388,8 @@ def effectinfo_from_writeanalyze(effects, cpu,
                       can_invalidate,
                       call_release_gil_target,
                       extradescr,
-                      can_collect)
+                      can_collect,
+                      readonly_args)
 
 def consider_struct(TYPE, fieldname):
     if getattr(TYPE, fieldname) is lltype.Void:
@@ -417,6 +431,86 @@ class RandomEffectsAnalyzer(BoolGraphAnalyzer):
     def analyze_simple_operation(self, op, graphinfo):
         return False
 
+MAX_READONLY_ARGS = 31
+
+class ReadonlyArgsAnalyzer(object):
+    """Finds the GC arguments of a graph that are only read: the graph
+    reads their fields, items and length, but it does not write to them,
+    compare them, store them anywhere or return them, and it only passes
+    them to graphs that do the same.  A residual call can be given a copy
+    of such an argument: see OptVirtualize.optimize_CALL_N()."""
+
+    READ_OPS = dict.fromkeys([
+        'getfield', 'getarrayitem', 'getinteriorfield', 'getarraysize',
+        'getinteriorarraysize', 'ptr_nonzero', 'ptr_iszero', 'keepalive'])
+    ALIAS_OPS = dict.fromkeys(['same_as', 'cast_pointer'])
+
+    def __init__(self):
+        self.cache = {}      # {(graph, index): bool}
+
+    def analyze_graph(self, graph):
+        """Returns a bitmask of the non-void arguments of 'graph' that are
+        only read."""
+        result = 0
+        i = 0
+        for index, v in enumerate(graph.getargs()):
+            if v.concretetype is lltype.Void:
+                continue
+            if i < MAX_READONLY_ARGS and self.is_readonly_arg(graph, index):
+                result |= 1 << i
+            i += 1
+        return result
+
+    def is_readonly_arg(self, graph, index):
+        key = (graph, index)
+        try:
+            return self.cache[key]
+        except KeyError:
+            pass
+        v = graph.getargs()[index]
+        T = v.concretetype
+        if not (isinstance(T, lltype.Ptr) and T.TO._gckind == 'gc'):
+            self.cache[key] = False
+            return False
+        self.cache[key] = False     # recursive calls: assume the worst
+        result = self._is_only_read(graph, v)
+        self.cache[key] = result
+        return result
+
+    def _is_only_read(self, graph, v_arg):
+        pending = [(graph.startblock, v_arg)]
+        seen = {}
+        while pending:
+            block, v = pending.pop()
+            if (block, v) in seen:
+                continue
+            seen[block, v] = None
+            if block is graph.returnblock or block is graph.exceptblock:
+                return False
+            aliases = {v: None}
+            for op in block.operations:
+                used = [i for i in range(len(op.args)) if op.args[i] in aliases]
+                if not used:
+                    continue
+                if op.opname in self.READ_OPS:
+                    continue
+                if op.opname in self.ALIAS_OPS:
+                    aliases[op.result] = None
+                    continue
+                if op.opname != 'direct_call' or 0 in used:
+                    return False
+                callee = getattr(op.args[0].value._obj, 'graph', None)
+                if callee is None:
+                    return False
+                for i in used:
+                    if not self.is_readonly_arg(callee, i - 1):
+                        return False
+            for link in block.exits:
+                for i in range(len(link.args)):
+                    if link.args[i] in aliases:
+                        pending.append((link.target, link.target.inputargs[i]))
+        return True
+
 # ____________________________________________________________
 
 class CallInfoCollection(object):
@@ -396,3 +396,55 @@ def test_can_or_cannot_collect():
         assert call_op.opname == 'direct_call'
         call_descr = cc.getcalldescr(call_op)
         assert call_descr.extrainfo.check_can_collect() == expected
+
+def test_readonly_args():
+    from rpython.jit.backend.llgraph.runner import LLGraphCPU
+    class A(object):
+        def __init__(self, x):
+            self.x = x
+    prebuilt = [A(5)]
+
+    def f1(a, n):
+        return a.x + n     # reads 'a'
+    f1._dont_inline_ = True
+
+    def f2(a, b):
+        a.x = b.x          # writes 'a', reads 'b'
+        return 0
+    f2._dont_inline_ = True
+
+    def f3(a):
+        prebuilt[0] = a    # stores 'a'
+        return 0
+    f3._dont_inline_ = True
+
+    def f4(a, b):
+        return f1(a, 1) + f1(b, 2) + f2(b, a) + (a is prebuilt[0])
+    f4._dont_inline_ = True
+
+    def f5(a, n):
+        while n > 0:
+            n -= f1(a, n)
+        return n
+    f5._dont_inline_ = True
+
+    def f(n):
+        a = A(n)
+        b = A(n + 1)
+        return f1(a, n) + f2(a, b) + f3(a) + f4(a, b) + f5(b, n)
+
+    rtyper = support.annotate(f, [1])
+    jitdriver_sd = FakeJitDriverSD(rtyper.annotator.translator.graphs[0])
+    cc = CallControl(LLGraphCPU(rtyper), jitdrivers_sd=[jitdriver_sd])
+    res = cc.find_all_graphs(FakePolicy())
+    [f_graph] = [x for x in res if x.func is f]
+    calls = [op for block in f_graph.iterblocks()
+                for op in block.operations
+                if op.opname == 'direct_call' and
+                   op.args[0].value._obj._name in ('f1', 'f2', 'f3', 'f4', 'f5')]
+    expected = {'f1': 0b01, 'f2': 0b10, 'f3': 0b0, 'f4': 0b0, 'f5': 0b01}
+    for call_op in calls:
+        call_descr = cc.getcalldescr(call_op)
+        name = call_op.args[0].value._obj._name
+        assert call_descr.extrainfo.readonly_args == expected[name]
+    assert len(calls) == 5
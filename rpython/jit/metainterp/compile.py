@@ -15,11 +15,12 @@ from rpython.jit.metainterp.resoperation import (
     InputArgRef, InputArgFloat)
 from rpython.jit.metainterp.history import (TreeLoop, JitCellToken,
     TargetToken, AbstractFailDescr, ConstInt)
-from rpython.jit.metainterp import history, jitexc
+from rpython.jit.metainterp import history, jitexc, loopprofile
 from rpython.jit.metainterp.optimize import InvalidLoop
 from rpython.jit.metainterp.resume import (
     PENDINGFIELDSP, ResumeDataDirectReader)
 from rpython.jit.metainterp.resumecode import NUMBERING
+from rpython.jit.metainterp.compilebudget import DEFERRED_FRACTION
 from rpython.jit.metainterp.support import adr2int
 from rpython.jit.codewriter import longlong
 
@@ -528,6 +529,9 @@ def send_loop_to_backend(greenkey, jitdriver_sd, metainterp_sd, loop, type,
             hooks.before_compile(debug_info)
         else:
             hooks = None
+    profile_counter = lltype.nullptr(loopprofile.COUNTER)
+    if type == "loop" and jitdriver_sd.warmstate.retrace_hot_bridges > 0:
+        profile_counter = loopprofile.insert_loop_counter(loop)
     operations = get_deep_immutable_oplist(loop.operations)
     metainterp_sd.profiler.start_backend()
     debug_start("jit-backend")
@@ -544,6 +548,10 @@ def send_loop_to_backend(greenkey, jitdriver_sd, metainterp_sd, loop, type,
     finally:
         debug_stop("jit-backend")
     metainterp_sd.profiler.end_backend()
+    _record_compile_time(metainterp_sd, original_jitcell_token)
+    if profile_counter:
+        loopprofile.attach_loop_counter(original_jitcell_token,
+                                        profile_counter)
     if hooks is not None:
         debug_info.asminfo = asminfo
         hooks.after_compile(debug_info)
@@ -564,10 +572,21 @@ def send_loop_to_backend(greenkey, jitdriver_sd, metainterp_sd, loop, type,
                                       name=loopname)
     #
     if metainterp_sd.warmrunnerdesc is not None:    # for tests
-        metainterp_sd.warmrunnerdesc.memory_manager.keep_loop_alive(original_jitcell_token)
+        memmgr = metainterp_sd.warmrunnerdesc.memory_manager
+        memmgr.keep_loop_alive(original_jitcell_token)
+        memmgr.code_size_changed(original_jitcell_token)
+
+def _record_compile_time(metainterp_sd, looptoken):
+    # the time since the tracing started, or since the previous loop or
+    # bridge that it produced, which includes the optimizer and the backend
+    clt = looptoken.compiled_loop_token
+    if clt is not None:
+        clt.compile_time += metainterp_sd.profiler.take_phase_time(
+            Counters.TRACING)
 
 def send_bridge_to_backend(jitdriver_sd, metainterp_sd, faildescr, inputargs,
-                           operations, original_loop_token, memo):
+                           operations, original_loop_token, memo,
+                           live_failargs=None):
     forget_optimization_info(operations)
     forget_optimization_info(inputargs)
     if not we_are_translated():
@@ -585,6 +604,14 @@ def send_bridge_to_backend(jitdriver_sd, metainterp_sd, faildescr, inputargs,
             hooks.before_compile_bridge(debug_info)
         else:
             hooks = None
+    checkdescr = None
+    if live_failargs is not None and (type(faildescr) is ResumeGuardDescr or
+                                      type(faildescr) is ResumeGuardCopiedDescr):
+        checkdescr = ResumeRetraceCheckDescr()
+        checkdescr.copy_all_attributes_from(faildescr)
+    operations = loopprofile.insert_bridge_counter(metainterp_sd,
+        original_loop_token, inputargs, operations,
+        jitdriver_sd.warmstate.retrace_hot_bridges, checkdescr, live_failargs)
     operations = get_deep_immutable_oplist(operations)
     metainterp_sd.profiler.start_backend()
     debug_start("jit-backend")
@@ -597,6 +624,7 @@ def send_bridge_to_backend(jitdriver_sd, metainterp_sd, faildescr, inputargs,
     finally:
         debug_stop("jit-backend")
     metainterp_sd.profiler.end_backend()
+    _record_compile_time(metainterp_sd, original_loop_token)
     if hooks is not None:
         debug_info.asminfo = asminfo
         hooks.after_compile_bridge(debug_info)
@@ -616,6 +644,9 @@ def send_bridge_to_backend(jitdriver_sd, metainterp_sd, faildescr, inputargs,
     #if metainterp_sd.warmrunnerdesc is not None:    # for tests
     #    metainterp_sd.warmrunnerdesc.memory_manager.keep_loop_alive(
     #        original_loop_token)
+    if metainterp_sd.warmrunnerdesc is not None:    # for tests
+        metainterp_sd.warmrunnerdesc.memory_manager.code_size_changed(
+            original_loop_token)
     return asminfo
 
 # ____________________________________________________________
@@ -685,27 +716,39 @@ class AbstractResumeGuardDescr(ResumeDescr):
     status = r_uint(0)
 
     ST_BUSY_FLAG    = 0x01     # if set, busy tracing from the guard
-    ST_TYPE_MASK    = 0x06     # mask for the type (TY_xxx)
-    ST_SHIFT        = 3        # in "status >> ST_SHIFT" is stored:
+    ST_TYPE_MASK    = 0x0E     # mask for the type (TY_xxx)
+    ST_SHIFT        = 4        # in "status >> ST_SHIFT" is stored:
                                # - if TY_NONE, the jitcounter hash directly
                                # - otherwise, the guard_value failarg index
+                               #   (or the guard_class one for TY_CLASS)
     ST_SHIFT_MASK   = -(1 << ST_SHIFT)
     TY_NONE         = 0x00
     TY_INT          = 0x02
     TY_REF          = 0x04
     TY_FLOAT        = 0x06
+    TY_CLASS        = 0x08
 
     def get_resumestorage(self):
         raise NotImplementedError("abstract base class")
 
     def handle_fail(self, deadframe, metainterp_sd, jitdriver_sd):
+        self.rd_loop_token.guard_failures += 1
+        min_runs = jitdriver_sd.warmstate.retrace_hot_bridges
+        if min_runs > 0:
+            looptoken = self.rd_loop_token.loop_token_wref()
+            if looptoken is not None:
+                loopprofile.check_hot_bridges(metainterp_sd.cpu, looptoken,
+                                              min_runs)
         if (self.must_compile(deadframe, metainterp_sd, jitdriver_sd)
                 and not rstack.stack_almost_full()):
+            compile_budget = metainterp_sd.warmrunnerdesc.compile_budget
             self.start_compiling()
+            compile_budget.start_compiling()
             try:
                 self._trace_and_compile_from_bridge(deadframe, metainterp_sd,
                                                     jitdriver_sd)
             finally:
+                compile_budget.done_compiling()
                 self.done_compiling()
         else:
             from rpython.jit.metainterp.blackhole import resume_in_blackhole
@@ -750,7 +793,7 @@ class AbstractResumeGuardDescr(ResumeDescr):
         elif self.status & self.ST_BUSY_FLAG:
             return False
         #
-        else:    # we have a GUARD_VALUE that fails.
+        else:    # we have a GUARD_VALUE or a GUARD_CLASS that fails.
             from rpython.rlib.objectmodel import current_object_addr_as_int
 
             index = intmask(self.status >> self.ST_SHIFT)
@@ -769,6 +812,15 @@ class AbstractResumeGuardDescr(ResumeDescr):
                 floatval = metainterp_sd.cpu.get_value_direct(deadframe, 'f',
                                                               index)
                 intval = longlong.gethash_fast(floatval)
+            elif typetag == self.TY_CLASS:
+                # one counter per class seen by a polymorphic guard_class,
+                # so that only the classes that are common get a bridge
+                refval = metainterp_sd.cpu.get_value_direct(deadframe, 'r',
+                                                            index)
+                if refval:
+                    intval = metainterp_sd.cpu.bh_classof(refval)
+                else:
+                    intval = 0     # guard_nonnull_class on a NULL
             else:
                 assert 0, typetag
 
@@ -781,7 +833,14 @@ class AbstractResumeGuardDescr(ResumeDescr):
                           intval * 1442968193)
         #
         increment = jitdriver_sd.warmstate.increment_trace_eagerness
-        return jitcounter.tick(hash, increment)
+        if not jitcounter.tick(hash, increment):
+            return False
+        if not metainterp_sd.warmrunnerdesc.compile_budget.can_compile():
+            # out of compile time for now: try again a bit later
+            metainterp_sd.profiler.count(Counters.DEFERRED_COMPILATIONS)
+            jitcounter.change_current_fraction(hash, DEFERRED_FRACTION)
+            return False
+        return True
 
     def start_compiling(self):
         # start tracing and compiling from this guard.
@@ -807,11 +866,16 @@ class AbstractResumeGuardDescr(ResumeDescr):
         send_bridge_to_backend(metainterp.jitdriver_sd, metainterp.staticdata,
                                self, inputargs, new_loop.operations,
                                new_loop.original_jitcell_token,
-                               metainterp.box_names_memo)
+                               metainterp.box_names_memo,
+                               metainterp.resumekey_live_failargs)
         record_loop_or_bridge(metainterp.staticdata, new_loop)
 
     def make_a_counter_per_value(self, guard_value_op, index):
-        assert guard_value_op.getopnum() == rop.GUARD_VALUE
+        opnum = guard_value_op.getopnum()
+        if opnum == rop.GUARD_CLASS or opnum == rop.GUARD_NONNULL_CLASS:
+            self.status = self.TY_CLASS | (r_uint(index) << self.ST_SHIFT)
+            return
+        assert opnum == rop.GUARD_VALUE
         box = guard_value_op.getarg(0)
         if box.type == history.INT:
             ty = self.TY_INT
@@ -907,6 +971,24 @@ class CompileLoopVersionDescr(ResumeGuardDescr):
         cloned.copy_all_attributes_from(self)
         return cloned
 
+class ResumeRetraceCheckDescr(ResumeGuardDescr):
+    """The guard at the start of a bridge of a profiled loop, which fails
+    every N runs of the bridge to check the counters (see loopprofile.py).
+    It resumes like the guard that the bridge is attached to."""
+    counter = lltype.nullptr(loopprofile.COUNTER)
+
+    def handle_fail(self, deadframe, metainterp_sd, jitdriver_sd):
+        from rpython.jit.metainterp.blackhole import resume_in_blackhole
+        min_runs = jitdriver_sd.warmstate.retrace_hot_bridges
+        if min_runs > 0:
+            looptoken = self.rd_loop_token.loop_token_wref()
+            if looptoken is not None:
+                loopprofile.check_hot_bridges(metainterp_sd.cpu, looptoken,
+                                              min_runs)
+        loopprofile.schedule_next_check(self.counter, min_runs)
+        resume_in_blackhole(metainterp_sd, jitdriver_sd, self, deadframe)
+        assert 0, "unreachable"
+
 class AllVirtuals(object):
     llopaque = True
     cache = None
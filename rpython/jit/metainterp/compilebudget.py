@@ -0,0 +1,65 @@
+import time
+
+#
+# Logic to bound the time spent tracing and compiling.
+#
+# Tracing and compiling a loop or a bridge is a pause in the execution of
+# the interpreted program, which matters for latency-sensitive programs
+# where a burst of compilations shows up as a few very slow requests.
+# When the 'compile_budget' parameter is set, the time spent tracing and
+# compiling is accumulated over windows of one second; once the budget of
+# the current window is exhausted, further loops and bridges that become
+# hot are not traced but deferred: their counter is set close to the
+# threshold again, so that they are reconsidered a bit later, typically
+# in the next window.
+#
+
+# the fraction of the threshold at which the counter of a deferred loop or
+# bridge is put back: with the default threshold of 1039, it is reconsidered
+# after about 50 more iterations
+DEFERRED_FRACTION = 0.95
+
+
+class CompileBudget(object):
+
+    WINDOW = 1.0     # seconds
+
+    def __init__(self):
+        self.budget = 0.0          # seconds per window; 0.0 means no limit
+        self.window_start = 0.0
+        self.used = 0.0
+        self.nesting = 0
+        self.start_time = 0.0
+
+    def set_budget(self, milliseconds):
+        if milliseconds <= 0:
+            self.budget = 0.0
+        else:
+            self.budget = milliseconds / 1000.0
+        self.used = 0.0
+
+    def get_time(self):
+        return time.time()
+
+    def can_compile(self):
+        """Return True if there is time left in the current window to
+        trace and compile something."""
+        if self.budget == 0.0:
+            return True
+        now = self.get_time()
+        if now - self.window_start >= self.WINDOW:
+            self.window_start = now
+            self.used = 0.0
+        return self.used < self.budget
+
+    def start_compiling(self):
+        # tracing may start nested tracings, e.g. when a residual call
+        # runs into another loop: only the outermost one is measured
+        if self.nesting == 0:
+            self.start_time = self.get_time()
+        self.nesting += 1
+
+    def done_compiling(self):
+        self.nesting -= 1
+        if self.nesting == 0:
+            self.used += self.get_time() - self.start_time
@@ -445,6 +445,7 @@ class JitCellToken(AbstractDescr):
     # and more data specified by the backend when the loop is compiled
     number = -1
     generation = r_int64(0)
+    counted_code_size = 0    # see MemoryManager.alive_code_size
     # one purpose of LoopToken is to keep alive the CompiledLoopToken
     # returned by the backend.  When the LoopToken goes away, the
     # CompiledLoopToken has its __del__ called, which frees the assembler
@@ -468,6 +469,11 @@ class JitCellToken(AbstractDescr):
     def dump(self):
         self.compiled_loop_token.cpu.dump_loop_token(self)
 
+    def get_code_size(self):
+        if self.compiled_loop_token is None:
+            return 0
+        return self.compiled_loop_token.get_code_size()
+
     def get_retraced_count(self):
         return self.retraced_count >> 1
 
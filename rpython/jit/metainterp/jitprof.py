@@ -9,8 +9,8 @@ from rpython.jit.metainterp.jitexc import JitException
 from rpython.rlib.jit import Counters
 
 
-JITPROF_LINES = Counters.ncounters + 1 + 1
-# one for TOTAL, 1 for calls, update if needed
+JITPROF_LINES = Counters.ncounters + 1 + 1 + 2
+# one for TOTAL, 1 for calls, 2 for the max times, update if needed
 _CPU_LINES = 4       # the last 4 lines are stored on the cpu
 
 class BaseProfiler(object):
@@ -49,12 +49,20 @@ class EmptyProfiler(BaseProfiler):
     def get_times(self, num):
         return 0.0
 
+    def get_max_times(self, num):
+        return 0.0
+
+    def take_phase_time(self, event):
+        return 0.0
+
 class Profiler(BaseProfiler):
     initialized = False
     timer = staticmethod(time.time)
     starttime = 0
     t1 = 0
+    t_taken = 0
     times = None
+    max_times = None
     counters = None
     calls = 0
     current = None
@@ -63,10 +71,16 @@ class Profiler(BaseProfiler):
     def start(self):
         self.starttime = self.timer()
         self.t1 = self.starttime
+        self.t_taken = self.starttime
         self.times = [0, 0]
+        # the longest single TRACING and BACKEND phases, including the
+        # time spent in nested phases: these are the pauses that the
+        # JIT introduces in the execution of the program
+        self.max_times = [0.0, 0.0]
         self.counters = [0] * (Counters.ncounters - _CPU_LINES)
         self.calls = 0
         self.current = []
+        self.current_starts = []
 
     def finish(self):
         self.tk = self.timer()
@@ -79,6 +93,7 @@ class Profiler(BaseProfiler):
             self.times[self.current[-1]] += self.t1 - t0
         self.counters[event] += 1
         self.current.append(event)
+        self.current_starts.append(self.t1)
 
     def _end(self, event):
         t0 = self.t1
@@ -87,10 +102,13 @@ class Profiler(BaseProfiler):
             debug_print("BROKEN PROFILER DATA!")
             return
         ev1 = self.current.pop()
+        start = self.current_starts.pop()
         if ev1 != event:
             debug_print("BROKEN PROFILER DATA!")
             return
         self.times[ev1] += self.t1 - t0
+        if self.t1 - start > self.max_times[ev1]:
+            self.max_times[ev1] = self.t1 - start
 
     def start_tracing(self):   self._start(Counters.TRACING)
     def end_tracing(self):     self._end  (Counters.TRACING)
@@ -115,6 +133,26 @@ class Profiler(BaseProfiler):
     def get_times(self, num):
         return self.times[num]
 
+    def get_max_times(self, num):
+        return self.max_times[num]
+
+    def take_phase_time(self, event):
+        """The time spent in the innermost running phase of the given
+        kind, e.g. in the tracing that is compiling a loop, up to the last
+        event recorded.  Only the time since the previous call is returned,
+        so that a phase that compiles several loops or bridges doesn't
+        count the same time for each of them."""
+        i = len(self.current) - 1
+        while i >= 0:
+            if self.current[i] == event:
+                start = self.current_starts[i]
+                if self.t_taken > start:
+                    start = self.t_taken
+                self.t_taken = self.t1
+                return self.t1 - start
+            i -= 1
+        return 0.0
+
     def count_ops(self, opnum, kind=Counters.OPS):
         from rpython.jit.metainterp.resoperation import OpHelpers
         self.counters[kind] += 1
@@ -135,6 +173,10 @@ class Profiler(BaseProfiler):
                               tim[Counters.TRACING])
         self._print_line_time("Backend", cnt[Counters.BACKEND],
                               tim[Counters.BACKEND])
+        self._print_line_time("Tracing max", cnt[Counters.TRACING],
+                              self.max_times[Counters.TRACING])
+        self._print_line_time("Backend max", cnt[Counters.BACKEND],
+                              self.max_times[Counters.BACKEND])
         line = "TOTAL:      \t\t%f" % (self.tk - self.starttime, )
         debug_print(line)
         self._print_intline("ops", cnt[Counters.OPS])
@@ -160,8 +202,12 @@ class Profiler(BaseProfiler):
         self._print_intline("nvirtuals", cnt[Counters.NVIRTUALS])
         self._print_intline("nvholes", cnt[Counters.NVHOLES])
         self._print_intline("nvreused", cnt[Counters.NVREUSED])
+        self._print_intline("resume bytes", cnt[Counters.RESUME_BYTES])
+        self._print_intline("resume shared", cnt[Counters.RESUME_SHARED])
         self._print_intline("vecopt tried", cnt[Counters.OPT_VECTORIZE_TRY])
         self._print_intline("vecopt success", cnt[Counters.OPT_VECTORIZED])
+        self._print_intline("deferred compilations",
+                            cnt[Counters.DEFERRED_COMPILATIONS])
         cpu = self.cpu
         if cpu is not None:   # for some tests
             self._print_intline("Total # of loops",
@@ -0,0 +1,138 @@
+import sys
+
+from rpython.rlib.debug import debug_start, debug_print, debug_stop
+from rpython.rlib.objectmodel import we_are_translated
+from rpython.rtyper.lltypesystem import lltype, rffi
+from rpython.jit.metainterp.history import ConstInt
+from rpython.jit.metainterp.resoperation import rop, ResOperation
+from rpython.jit.metainterp.support import ptr2int
+
+#
+# Profile-guided retracing of loops, enabled with the 'retrace_hot_bridges'
+# parameter.
+#
+# A loop is traced along the path taken by one iteration, and the other
+# paths become bridges.  If that iteration was not a typical one, the hot
+# path of the loop ends up in a bridge: every iteration runs the beginning
+# of the loop, fails a guard and continues in the bridge.  To detect this,
+# the loop counts its iterations with an INCREMENT_DEBUG_COUNTER just after
+# its last LABEL, and each of its bridges counts its runs in the same way.
+#
+# The counters are checked when a guard of the loop without a bridge
+# fails, and also every N runs of each bridge: the bridge starts with a
+# guard that fails when its counter reaches the next check.  That guard
+# resumes exactly like the guard the bridge is attached to, and it never
+# gets a bridge of its own.  This is needed because in the steady state
+# the loop runs into the bridge and the bridge jumps back to the loop
+# without ever leaving the machine code.
+#
+# If one of the bridges ran in more than two thirds of the iterations, the
+# loop is invalidated like after a change of a quasi-immutable field: the
+# interpreter stops entering it and traces it again later, most probably
+# along the hot path this time.  The old machine code stays valid for the
+# bridges that jump to it, until the memory manager frees it.
+#
+# The counters are raw memory attached to the CompiledLoopToken, whose
+# first entry is the loop's counter; they are freed together with the
+# machine code, in CompiledLoopToken.__del__().  A bridge counter has a
+# second item, the number of runs at which the next check happens.
+#
+
+COUNTER = rffi.CArray(lltype.Signed)
+
+
+def _new_counter(length=1):
+    counter = lltype.malloc(COUNTER, length, flavor='raw',
+                            track_allocation=False)
+    for i in range(length):
+        counter[i] = 0
+    return counter
+
+def _counter_adr(counter):
+    return ConstInt(ptr2int(counter))
+
+def _increment_op(counter):
+    c_adr = _counter_adr(counter)
+    return ResOperation(rop.INCREMENT_DEBUG_COUNTER, [c_adr])
+
+def insert_loop_counter(loop):
+    """Make the loop count its iterations.  Returns the counter, to be
+    passed to attach_loop_counter() once the loop is compiled."""
+    operations = loop.operations
+    i = len(operations) - 1
+    while i >= 0 and operations[i].getopnum() != rop.LABEL:
+        i -= 1
+    counter = _new_counter()
+    loop.operations = (operations[:i + 1] + [_increment_op(counter)] +
+                       operations[i + 1:])
+    return counter
+
+def attach_loop_counter(looptoken, counter):
+    clt = looptoken.compiled_loop_token
+    assert clt.profile_counters is None
+    clt.profile_counters = [counter]
+
+def insert_bridge_counter(metainterp_sd, looptoken, inputargs, operations,
+                          min_runs, checkdescr=None, live_failargs=None):
+    """Make the bridge count its runs, if its loop is profiled.  If a
+    'checkdescr' is given, the bridge also starts with a guard that fails
+    every 'min_runs' runs; its fail arguments are the bridge's inputargs,
+    laid out as the fail arguments of the guard that the bridge is
+    attached to, according to 'live_failargs'."""
+    clt = looptoken.compiled_loop_token
+    if clt is None or clt.profile_counters is None:
+        return operations
+    counter = _new_counter(2)
+    schedule_next_check(counter, min_runs)
+    clt.profile_counters.append(counter)
+    ops = [_increment_op(counter)]
+    if checkdescr is not None:
+        checkdescr.rd_loop_token = clt
+        checkdescr.counter = counter
+        c_adr = _counter_adr(counter)
+        descr = metainterp_sd.profile_counter_descr
+        runs = ResOperation(rop.GETARRAYITEM_RAW_I, [c_adr, ConstInt(0)],
+                            descr=descr)
+        next_check = ResOperation(rop.GETARRAYITEM_RAW_I,
+                                  [c_adr, ConstInt(1)], descr=descr)
+        cond = ResOperation(rop.INT_LT, [runs, next_check])
+        guard = ResOperation(rop.GUARD_TRUE, [cond], descr=checkdescr)
+        failargs = [None] * len(live_failargs)
+        j = 0
+        for i in range(len(live_failargs)):
+            if live_failargs[i]:
+                failargs[i] = inputargs[j]
+                j += 1
+        assert j == len(inputargs)
+        guard.setfailargs(failargs)
+        ops += [runs, next_check, cond, guard]
+    return ops + operations
+
+def schedule_next_check(counter, min_runs):
+    if min_runs > 0:
+        counter[1] = counter[0] + min_runs
+    else:
+        counter[1] = sys.maxint      # the parameter was turned off
+
+def check_hot_bridges(cpu, looptoken, min_runs):
+    """Invalidate the loop if one of its bridges ran at least 'min_runs'
+    times, and in more than two thirds of the iterations of the loop."""
+    if looptoken.invalidated:
+        return
+    clt = looptoken.compiled_loop_token
+    if clt is None or clt.profile_counters is None:
+        return
+    counters = clt.profile_counters
+    loop_runs = counters[0][0]
+    for i in range(1, len(counters)):
+        bridge_runs = counters[i][0]
+        if bridge_runs >= min_runs and 3 * bridge_runs > 2 * loop_runs:
+            debug_start("jit-retrace-hot-bridge")
+            debug_print("loop", looptoken.number, "iterations:", loop_runs)
+            debug_print("bridge runs:", bridge_runs)
+            debug_stop("jit-retrace-hot-bridge")
+            looptoken.invalidated = True
+            cpu.invalidate_loop(looptoken)
+            if not we_are_translated():
+                cpu.stats.invalidated_token_numbers.add(looptoken.number)
+            return
@@ -2,6 +2,9 @@ import math
 from rpython.rlib.rarithmetic import r_int64
 from rpython.rlib.debug import debug_start, debug_print, debug_stop
 from rpython.rlib.objectmodel import we_are_translated
+from rpython.rlib.listsort import make_timsort_class
+from rpython.rlib.jit_hooks import LOOP_STATS_CONTAINER
+from rpython.rtyper.lltypesystem import lltype
 
 #
 # Logic to decide which loops are old and not used any more.
@@ -19,6 +22,24 @@ from rpython.rlib.objectmodel import we_are_translated
 # 'generation' field is much smaller than the current generation, and
 # removed from the set.
 #
+# Independently, if a maximum code size is set, the total size of the
+# machine code of the loops in 'alive_loops' is checked after each
+# compilation.  This total is kept up to date when loops are added to or
+# removed from the set, and when they get new code (see code_size_changed()).  If it is too large, the loops that were run the least
+# recently (i.e. with the smallest 'generation') are removed from the set
+# until the rest fits again.  The loops run since the previous compilation
+# are always kept.
+#
+
+def _generation_lt(looptoken1, looptoken2):
+    return looptoken1.generation < looptoken2.generation
+
+LoopTokenSort = make_timsort_class(lt=_generation_lt)
+
+def _number_lt(looptoken1, looptoken2):
+    return looptoken1.number < looptoken2.number
+
+LoopNumberSort = make_timsort_class(lt=_number_lt)
 
 class MemoryManager(object):
 
@@ -38,6 +59,8 @@ class MemoryManager(object):
         self.current_generation = r_int64(1)
         self.next_check = r_int64(-1)
         self.alive_loops = {}
+        self.alive_code_size = 0    # the code size of the loops in alive_loops
+        self.max_code_size = 0      # in bytes; 0 means no limit
 
     def set_max_age(self, max_age, check_frequency=0):
         if max_age <= 0:
@@ -49,16 +72,41 @@ class MemoryManager(object):
             self.check_frequency = check_frequency
             self.next_check = self.current_generation + 1
 
+    def set_max_code_size(self, max_kb):
+        if max_kb <= 0:
+            self.max_code_size = 0
+        else:
+            self.max_code_size = max_kb * 1024
+
     def next_generation(self):
         self.current_generation += 1
         if self.current_generation == self.next_check:
             self._kill_old_loops_now()
             self.next_check = self.current_generation + self.check_frequency
+        if self.max_code_size > 0:
+            self._check_code_size()
 
     def keep_loop_alive(self, looptoken):
         if looptoken.generation != self.current_generation:
             looptoken.generation = self.current_generation
-            self.alive_loops[looptoken] = None
+            if looptoken not in self.alive_loops:
+                self.alive_loops[looptoken] = None
+                self._count_code_size(looptoken)
+
+    def code_size_changed(self, looptoken):
+        """Called after a loop or a bridge was compiled for looptoken."""
+        if looptoken in self.alive_loops:
+            self._count_code_size(looptoken)
+
+    def _count_code_size(self, looptoken):
+        size = looptoken.get_code_size()
+        self.alive_code_size += size - looptoken.counted_code_size
+        looptoken.counted_code_size = size
+
+    def _forget_loop(self, looptoken):
+        del self.alive_loops[looptoken]
+        self.alive_code_size -= looptoken.counted_code_size
+        looptoken.counted_code_size = 0
 
     def _kill_old_loops_now(self):
         debug_start("jit-mem-collect")
@@ -70,7 +118,7 @@ class MemoryManager(object):
         for looptoken in self.alive_loops.keys():
             if (0 <= looptoken.generation < max_generation or
                 looptoken.invalidated):
-                del self.alive_loops[looptoken]
+                self._forget_loop(looptoken)
         newtotal = len(self.alive_loops)
         debug_print("Loop tokens freed: ", oldtotal - newtotal)
         debug_print("Loop tokens left:  ", newtotal)
@@ -82,8 +130,57 @@ class MemoryManager(object):
             rgc.collect(); rgc.collect(); rgc.collect()
         debug_stop("jit-mem-collect")
 
+    def get_alive_code_size(self):
+        return self.alive_code_size
+
+    def _check_code_size(self):
+        if self.alive_code_size <= self.max_code_size:
+            return
+        debug_start("jit-mem-limit")
+        debug_print("Code size before:", self.alive_code_size)
+        looptokens = self.alive_loops.keys()
+        LoopTokenSort(looptokens).sort()
+        freed = 0
+        for looptoken in looptokens:
+            if self.alive_code_size <= self.max_code_size:
+                break
+            if looptoken.generation >= self.current_generation - 1:
+                break    # keep the loops run since the previous compilation
+            self._forget_loop(looptoken)
+            freed += 1
+        debug_print("Loop tokens freed: ", freed)
+        debug_print("Code size after:  ", self.alive_code_size)
+        if not we_are_translated() and freed > 0:
+            looptoken = None
+            from rpython.rlib import rgc
+            rgc.collect(); rgc.collect(); rgc.collect()
+        debug_stop("jit-mem-limit")
+
+    def get_loop_stats(self):
+        """Return the statistics of the loops kept alive, sorted by
+        loop number, as a LOOP_STATS_CONTAINER."""
+        looptokens = []
+        for looptoken in self.alive_loops:
+            if looptoken.compiled_loop_token is not None:
+                looptokens.append(looptoken)
+        LoopNumberSort(looptokens).sort()
+        result = lltype.malloc(LOOP_STATS_CONTAINER, len(looptokens))
+        for i in range(len(looptokens)):
+            looptoken = looptokens[i]
+            clt = looptoken.compiled_loop_token
+            result[i].number = looptoken.number
+            result[i].entries = clt.entry_count
+            result[i].guard_failures = clt.guard_failures
+            result[i].bridges = clt.bridges_count
+            result[i].compile_time = clt.compile_time
+            result[i].code_size = clt.get_code_size()
+        return result
+
     def release_all_loops(self):
         debug_start("jit-mem-releaseall")
         debug_print("Loop tokens cleared:", len(self.alive_loops))
+        for looptoken in self.alive_loops:
+            looptoken.counted_code_size = 0
         self.alive_loops.clear()
+        self.alive_code_size = 0
         debug_stop("jit-mem-releaseall")
@@ -4,10 +4,20 @@ optimizer of the bridge attached to a guard. """
 from rpython.jit.metainterp import resumecode
 from rpython.jit.metainterp.history import Const, ConstInt, CONST_NULL
 from .info import getptrinfo
+from .util import get_box_replacement
+
+EXTRA_KINDS = 'irf'
 
 
 # adds the following sections at the end of the resume code:
 #
+# ---- extra liveboxes
+# <length>
+# <start> only if length > 0: the index of the first extra livebox
+# <kind> length times, for the liveboxes starting at <start>: 0 for int,
+#        1 for ref, 2 for float.  These boxes are not used by the resume
+#        data, only by the sections below (see add_extra_liveboxes)
+#
 # ---- known classes
 # <bitfield> size is the number of reference boxes in the liveboxes
 #            1 klass known
@@ -60,12 +70,90 @@ def decode_box(resumestorage, tagged, liveboxes, cpu):
         raise AssertionError("unreachable")
     return box
 
-def serialize_optimizer_knowledge(optimizer, numb_state, liveboxes, liveboxes_from_env, memo):
+def add_extra_liveboxes(optimizer, liveboxes, liveboxes_from_env, start):
+    """ In a peeled loop, the values computed by the short preamble are
+    extra arguments of the label, so they are available at all the guards
+    of the loop body.  Add the ones that the heap knowledge refers to to
+    the liveboxes, so that a bridge does not need to read them again when
+    it inlines the short preamble to jump back to the loop.  They are
+    inserted at index 'start', i.e. after the boxes of the environment
+    and before the fields of the virtuals, whose numbers count from the
+    end.  Returns the number of boxes added. """
+    from rpython.jit.metainterp.resume import tag, TAGBOX
+    candidates = optimizer.get_loop_invariant_boxes()
+    if not candidates or not optimizer.optheap:
+        return 0
+    available_boxes = {}
+    present_boxes = {}
+    for box in liveboxes:
+        if box is not None:
+            present_boxes[box] = None
+            if box in liveboxes_from_env:
+                available_boxes[box] = None
+    extra_boxes = []
+    for box in candidates:
+        box = get_box_replacement(box)
+        if box.is_constant() or box in present_boxes:
+            continue
+        if box.type == 'r':
+            info = getptrinfo(box)
+            if info is not None and info.is_virtual():
+                continue
+        present_boxes[box] = None
+        available_boxes[box] = None
+        extra_boxes.append(box)
+    if not extra_boxes:
+        return 0
+    triples_struct, triples_array = optimizer.optheap.serialize_optheap(
+        available_boxes)
+    used_boxes = {}
+    for box1, descr, box2 in triples_struct:
+        used_boxes[box1] = None
+        used_boxes[box2] = None
+    for box1, index, descr, box2 in triples_array:
+        used_boxes[box1] = None
+        used_boxes[box2] = None
+    limit = optimizer.metainterp_sd.options.failargs_limit
+    new_boxes = []
+    for box in extra_boxes:
+        if box in used_boxes and len(liveboxes) + len(new_boxes) < limit:
+            liveboxes_from_env[box] = tag(start + len(new_boxes), TAGBOX)
+            new_boxes.append(box)
+    if new_boxes:
+        tail = liveboxes[start:]
+        del liveboxes[start:]
+        liveboxes.extend(new_boxes)
+        liveboxes.extend(tail)
+    return len(new_boxes)
+
+def get_extra_liveboxes(resumestorage):
+    """ Returns the index of the first extra livebox and their kinds. """
+    reader = resumecode.Reader(resumestorage.rd_numb)
+    startcount = reader.next_item()
+    reader.jump(startcount - 1)
+    length = reader.next_item()
+    if not length:
+        return 0, []
+    start = reader.next_item()
+    return start, [EXTRA_KINDS[reader.next_item()] for i in range(length)]
+
+def serialize_optimizer_knowledge(optimizer, numb_state, liveboxes,
+                                  liveboxes_from_env, memo, extra_start=0,
+                                  num_extra=0):
     available_boxes = {}
     for box in liveboxes:
         if box is not None and box in liveboxes_from_env:
             available_boxes[box] = None
 
+    # extra liveboxes
+    numb_state.append_int(num_extra)
+    if num_extra:
+        numb_state.append_int(extra_start)
+        for i in range(extra_start, extra_start + num_extra):
+            kind = EXTRA_KINDS.find(liveboxes[i].type)
+            assert kind >= 0
+            numb_state.append_int(kind)
+
     # class knowledge is stored as bits, true meaning the class is known, false
     # means unknown. on deserializing we look at the bits, and read the runtime
     # class for the known classes (which has to be the same in the bridge) and
@@ -130,6 +218,11 @@ def deserialize_optimizer_knowledge(optimizer, resumestorage, frontend_boxes, li
     startcount = reader.next_item()
     reader.jump(startcount - 1)
 
+    # skip the extra liveboxes, they are already in liveboxes
+    length = reader.next_item()
+    if length:
+        reader.jump(length + 1)
+
     # class knowledge
     bitfield = 0
     mask = 0
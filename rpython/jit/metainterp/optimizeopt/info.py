@@ -225,6 +225,27 @@ class AbstractStructPtrInfo(AbstractVirtualPtrInfo):
                 self._fields[i] = None
                 optforce.emit_extra(setfieldop)
 
+    def force_copy(self, op, optforce):
+        """Emit the allocation of a copy of this virtual, which stays
+        virtual, and return it.  Only used for arguments that a residual
+        call reads but does not keep."""
+        assert self.is_virtual()
+        if self._is_immutable_and_filled_with_constants(optforce.optimizer):
+            return self.force_box(op, optforce)
+        newop = op.copy_and_change(op.getopnum())
+        optforce.emit_extra(newop)
+        newop = optforce.optimizer.getlastop()
+        if self._fields is not None:
+            for i, fielddescr in enumerate(self.descr.get_all_fielddescrs()):
+                fld = self._fields[i]
+                if fld is not None:
+                    subbox = optforce.optimizer.force_box(fld)
+                    setfieldop = ResOperation(rop.SETFIELD_GC,
+                                              [newop, subbox],
+                                              descr=fielddescr)
+                    optforce.emit_extra(setfieldop)
+        return newop
+
     def _force_at_the_end_of_preamble(self, op, optforce, rec):
         if self._fields is None:
             return get_box_replacement(op)
@@ -293,6 +293,9 @@ class Optimizer(Optimization):
     def force_op_from_preamble(self, op):
         return op
 
+    def get_loop_invariant_boxes(self):
+        return None
+
     def notice_guard_future_condition(self, op):
         self.patchguardop = op
 
@@ -612,6 +612,74 @@ class TestOptimizeBasic(BaseTestBasic):
             where ptr is a node_vtable, valuedescr=i2
             ''', rop.GUARD_TRUE)
 
+    def test_virtual_passed_to_readonly_arg(self):
+        ops = """
+        [i1, i2]
+        p1 = new_with_vtable(descr=nodesize)
+        setfield_gc(p1, i2, descr=valuedescr)
+        i3 = call_i(123, p1, descr=readonlyargdescr)
+        guard_true(i1) [p1]
+        i4 = getfield_gc_i(p1, descr=valuedescr)
+        jump(i3, i4)
+        """
+        expected = """
+        [i1, i2]
+        p2 = new_with_vtable(descr=nodesize)
+        setfield_gc(p2, i2, descr=valuedescr)
+        i3 = call_i(123, p2, descr=readonlyargdescr)
+        guard_true(i1) [i2]
+        jump(i3, i2)
+        """
+        self.optimize_loop(ops, expected)
+        self.check_expanded_fail_descr('''ptr
+            where ptr is a node_vtable, valuedescr=i2
+            ''', rop.GUARD_TRUE)
+
+    def test_virtual_passed_to_readonly_arg_twice(self):
+        ops = """
+        [i1, i2]
+        p1 = new_with_vtable(descr=nodesize)
+        setfield_gc(p1, i2, descr=valuedescr)
+        i3 = call_i(123, p1, descr=readonlyargdescr)
+        i4 = call_i(123, p1, descr=readonlyargdescr)
+        setfield_gc(p1, i4, descr=valuedescr)
+        i5 = call_i(123, p1, descr=readonlyargdescr)
+        guard_true(i1) [p1]
+        jump(i3, i5)
+        """
+        expected = """
+        [i1, i2]
+        p2 = new_with_vtable(descr=nodesize)
+        setfield_gc(p2, i2, descr=valuedescr)
+        i3 = call_i(123, p2, descr=readonlyargdescr)
+        i4 = call_i(123, p2, descr=readonlyargdescr)
+        p3 = new_with_vtable(descr=nodesize)
+        setfield_gc(p3, i4, descr=valuedescr)
+        i5 = call_i(123, p3, descr=readonlyargdescr)
+        guard_true(i1) [i4]
+        jump(i3, i5)
+        """
+        self.optimize_loop(ops, expected)
+
+    def test_virtual_passed_to_other_arg(self):
+        ops = """
+        [i1, i2]
+        p1 = new_with_vtable(descr=nodesize)
+        setfield_gc(p1, i2, descr=valuedescr)
+        i3 = call_i(123, i2, p1, descr=readonlyargdescr)
+        guard_true(i1) [p1]
+        jump(i3, i2)
+        """
+        expected = """
+        [i1, i2]
+        p1 = new_with_vtable(descr=nodesize)
+        setfield_gc(p1, i2, descr=valuedescr)
+        i3 = call_i(123, i2, p1, descr=readonlyargdescr)
+        guard_true(i1) [p1]
+        jump(i3, i2)
+        """
+        self.optimize_loop(ops, expected)
+
     def test_expand_fail_3(self):
         ops = """
         [i1, i2, i3, p3]
@@ -38,6 +38,15 @@ class UnrollOptimizer(Optimizer):
             return preamble_op.op
         return preamble_op
 
+    def get_loop_invariant_boxes(self):
+        # while optimizing the peeled loop: the boxes computed by the short
+        # preamble that were used so far.  They become extra arguments of
+        # the label, so they are available everywhere in the loop body
+        sb = self.optunroll.short_preamble_producer
+        if isinstance(sb, ShortPreambleBuilder):
+            return sb.used_boxes
+        return None
+
     def setinfo_from_preamble_list(self, lst, infos):
         for item in lst:
             if item is None:
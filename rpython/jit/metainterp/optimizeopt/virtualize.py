@@ -17,6 +17,11 @@ class OptVirtualize(optimizer.Optimization):
     _last_guard_not_forced_2 = None
     _finish_guard_op = None
 
+    def __init__(self):
+        # {info of a virtual structure: copy of it made for a residual
+        # call}, see _copy_readonly_virtual_args()
+        self._readonly_copies = {}
+
     def make_virtual(self, known_class, source_op, descr):
         opinfo = info.InstancePtrInfo(descr, known_class, is_virtual=True)
         opinfo.init_fields(descr, 0)
@@ -200,6 +205,8 @@ class OptVirtualize(optimizer.Optimization):
         if opinfo is not None and opinfo.is_virtual():
             opinfo.setfield(op.getdescr(), struct,
                             get_box_replacement(op.getarg(1)))
+            if opinfo in self._readonly_copies:
+                del self._readonly_copies[opinfo]
         else:
             self.make_nonnull(struct)
             return self.emit(op)
@@ -235,10 +242,30 @@ class OptVirtualize(optimizer.Optimization):
             if info and info.is_virtual():
                 return
         else:
+            if effectinfo.readonly_args:
+                self._copy_readonly_virtual_args(op, effectinfo)
             return self.emit(op)
     optimize_CALL_R = optimize_CALL_N
     optimize_CALL_I = optimize_CALL_N
 
+    def _copy_readonly_virtual_args(self, op, effectinfo):
+        # a virtual structure passed to an argument that the function only
+        # reads does not escape: pass a copy and keep the virtual.  The
+        # copy is reused by the following calls until the virtual changes
+        for i in range(1, op.numargs()):
+            arg = get_box_replacement(op.getarg(i))
+            if arg.type != 'r' or not effectinfo.check_readonly_arg(i - 1):
+                continue
+            opinfo = getptrinfo(arg)
+            if (isinstance(opinfo, info.AbstractStructPtrInfo) and
+                    opinfo.is_virtual()):
+                copy = self._readonly_copies.get(opinfo, None)
+                if copy is None:
+                    copy = opinfo.force_copy(arg, self)
+                    if opinfo.is_virtual():
+                        self._readonly_copies[opinfo] = copy
+                op.setarg(i, copy)
+
     def do_RAW_MALLOC_VARSIZE_CHAR(self, op):
         sizebox = self.get_constant_box(op.getarg(1))
         if sizebox is None:
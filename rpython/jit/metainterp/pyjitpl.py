@@ -1,6 +1,7 @@
 from __future__ import print_function
 
 import sys
+import time
 
 import py
 
@@ -9,6 +10,7 @@ from rpython.jit.codewriter.effectinfo import EffectInfo
 from rpython.jit.codewriter.jitcode import JitCode, SwitchDictDescr
 from rpython.jit.codewriter.liveness import OFFSET_SIZE
 from rpython.jit.metainterp import history, compile, resume, executor, jitexc
+from rpython.jit.metainterp import loopprofile
 from rpython.jit.metainterp.heapcache import HeapCache
 from rpython.jit.metainterp.history import (Const, ConstInt, ConstPtr,
     ConstFloat, ConstPtrJitCode,
@@ -1616,7 +1618,8 @@ class MIFrame(object):
         metainterp.history.record(rop.DEBUG_MERGE_POINT, args, None)
         warmrunnerstate = jitdriver_sd.warmstate
         if (metainterp.force_finish_trace and
-                (metainterp.history.length() > warmrunnerstate.trace_limit * 0.8)):
+                (metainterp.history.length() > warmrunnerstate.trace_limit * 0.8
+                 or metainterp.trace_time_exceeded(0.8))):
             self._create_segmented_trace_and_blackhole()
 
     def _create_segmented_trace_and_blackhole(self):
@@ -2282,6 +2285,9 @@ class MetaInterpStaticData(object):
         #
         self.cpu.propagate_exception_descr = exc_descr
         #
+        # for the checks at the start of the bridges, see loopprofile.py
+        self.profile_counter_descr = self.cpu.arraydescrof(loopprofile.COUNTER)
+        #
         self.globaldata = MetaInterpGlobalData(self)
 
     def finish_setup_descrs(self):
@@ -2404,6 +2410,7 @@ class MetaInterp(object):
     exported_state = None
     last_exc_box = None
     _last_op = None
+    resumekey_live_failargs = None
 
     def __init__(self, staticdata, jitdriver_sd, force_finish_trace=False):
         self.staticdata = staticdata
@@ -2433,6 +2440,8 @@ class MetaInterp(object):
         # with a GUARD_ALWAYS_FAILS (and an unreachable finish that raises
         # AssertionError)
         self.force_finish_trace = force_finish_trace
+        # when the tracing started, for the 'trace_time_limit'
+        self.tracing_start_time = 0.0
         self.trace_length_at_last_tco = -1
 
     def retrace_needed(self, trace, exported_state):
@@ -2629,9 +2638,24 @@ class MetaInterp(object):
         self.history = history.History(len(inputargs), self.staticdata)
         self.history.set_inputargs(inputargs)
         self.staticdata.stats.set_history(self.history)
+        self.start_tracing_time()
 
     def create_history(self, max_num_inputargs):
         self.history = history.History(max_num_inputargs, self.staticdata)
+        self.start_tracing_time()
+
+    def start_tracing_time(self):
+        if self.jitdriver_sd.warmstate.trace_time_limit > 0.0:
+            self.tracing_start_time = time.time()
+
+    def trace_time_exceeded(self, fraction=1.0):
+        """Did the tracing take longer than the given fraction of the
+        'trace_time_limit'?  A long tracing is a long pause in the
+        execution of the program."""
+        limit = self.jitdriver_sd.warmstate.trace_time_limit
+        if limit <= 0.0:
+            return False
+        return time.time() - self.tracing_start_time > limit * fraction
 
     def _all_constants(self, *boxes):
         if len(boxes) == 0:
@@ -2813,7 +2837,8 @@ class MetaInterp(object):
         warmrunnerstate = self.jitdriver_sd.warmstate
         length = self.history.length()
         if (length > warmrunnerstate.trace_limit or
-                self.history.trace_tag_overflow()):
+                self.history.trace_tag_overflow() or
+                self.trace_time_exceeded()):
             jd_sd, greenkey_of_huge_function = self.find_biggest_function()
             self.staticdata.stats.record_aborted(greenkey_of_huge_function)
             self.portal_trace_positions = None
@@ -3307,6 +3332,9 @@ class MetaInterp(object):
             self.portal_call_depth = -1 # always one portal around
             inputargs_and_holes = self.rebuild_state_after_failure(resumedescr,
                                                                    deadframe)
+            # which fail arguments become the inputargs of the bridge
+            self.resumekey_live_failargs = [box is not None
+                                            for box in inputargs_and_holes]
             return [box for box in inputargs_and_holes if box]
         finally:
             rstack._stack_criticalcode_stop()
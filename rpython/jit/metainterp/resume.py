@@ -8,7 +8,7 @@ from rpython.jit.metainterp.resoperation import rop
 from rpython.rlib import rarithmetic, rstack
 from rpython.rlib.objectmodel import (we_are_translated, specialize,
         compute_unique_id)
-from rpython.rlib.debug import ll_assert, debug_print
+from rpython.rlib.debug import ll_assert, debug_print, debug_start, debug_stop
 from rpython.rtyper import annlowlevel
 from rpython.rtyper.lltypesystem import lltype, llmemory, rffi, rstr
 from rpython.rtyper.rclass import OBJECTPTR
@@ -153,6 +153,10 @@ class ResumeDataLoopMemo(object):
         self.nvirtuals = 0
         self.nvholes = 0
         self.nvreused = 0
+        # bytes of resume data -> NUMBERING, to share identical ones
+        self.numberings = {}
+        self.nresumebytes = 0
+        self.nresumeshared = 0
 
     def getconst(self, const):
         if const.type == INT:
@@ -287,10 +291,34 @@ class ResumeDataLoopMemo(object):
         self.cached_boxes.clear()
         self.cached_virtuals.clear()
 
+    def share_numbering(self, numb):
+        """Return a numbering equal to 'numb' that was already made for
+        another guard of the same trace if there is one, or 'numb'."""
+        key = resumecode.numbering_key(numb)
+        shared = self.numberings.get(key, resumecode.NULL_NUMBER)
+        if shared:
+            self.nresumeshared += 1
+            return shared
+        self.numberings[key] = numb
+        self.nresumebytes += len(numb.code)
+        return numb
+
     def update_counters(self, profiler):
         profiler.count(jitprof.Counters.NVIRTUALS, self.nvirtuals)
         profiler.count(jitprof.Counters.NVHOLES, self.nvholes)
         profiler.count(jitprof.Counters.NVREUSED, self.nvreused)
+        # the resume data is counted only once, even if we are called
+        # again on the same memo, e.g. for the preamble and the peeled loop
+        if self.nresumebytes or self.nresumeshared:
+            debug_start("jit-resume-stats")
+            debug_print("resume data bytes:", self.nresumebytes)
+            debug_print("resume data shared:", self.nresumeshared)
+            debug_stop("jit-resume-stats")
+            profiler.count(jitprof.Counters.RESUME_BYTES, self.nresumebytes)
+            profiler.count(jitprof.Counters.RESUME_SHARED,
+                           self.nresumeshared)
+            self.nresumebytes = 0
+            self.nresumeshared = 0
 
 _frame_info_placeholder = (None, 0, 0)
 
@@ -443,11 +471,14 @@ class ResumeDataVirtualAdder(VirtualVisitor):
 
         self._number_virtuals(liveboxes, num_virtuals)
         self._add_pending_fields(pending_setfields)
+        num_extra = self._add_extra_liveboxes(liveboxes, liveboxes_from_env, n)
 
         numb_state.patch(1, len(liveboxes))
 
-        self._add_optimizer_sections(numb_state, liveboxes, liveboxes_from_env)
-        storage.rd_numb = numb_state.create_numbering()
+        self._add_optimizer_sections(numb_state, liveboxes, liveboxes_from_env,
+                                     n, num_extra)
+        storage.rd_numb = self.memo.share_numbering(
+            numb_state.create_numbering())
         storage.rd_consts = self.memo.consts
         return liveboxes[:]
 
@@ -567,11 +598,20 @@ class ResumeDataVirtualAdder(VirtualVisitor):
                 return self.liveboxes_from_env[box]
             return self.liveboxes[box]
 
-    def _add_optimizer_sections(self, numb_state, liveboxes, liveboxes_from_env):
+    def _add_extra_liveboxes(self, liveboxes, liveboxes_from_env, start):
+        # add boxes that are not needed to resume, but that the optimizer
+        # of a bridge can use
+        from rpython.jit.metainterp.optimizeopt.bridgeopt import add_extra_liveboxes
+        return add_extra_liveboxes(self.optimizer, liveboxes,
+                                   liveboxes_from_env, start)
+
+    def _add_optimizer_sections(self, numb_state, liveboxes, liveboxes_from_env,
+                                extra_start=0, num_extra=0):
         # add extra information about things the optimizer learned
         from rpython.jit.metainterp.optimizeopt.bridgeopt import serialize_optimizer_knowledge
         serialize_optimizer_knowledge(
-            self.optimizer, numb_state, liveboxes, liveboxes_from_env, self.memo)
+            self.optimizer, numb_state, liveboxes, liveboxes_from_env, self.memo,
+            extra_start, num_extra)
 
 class AbstractVirtualInfo(object):
     kind = REF
@@ -1054,6 +1094,7 @@ def rebuild_from_resumedata(metainterp, storage, deadframe,
         resumereader.consume_boxes(f.get_current_position_info(),
                                    f.registers_i, f.registers_r, f.registers_f)
         f.handle_rvmprof_enter_on_resume()
+    resumereader.consume_extra_liveboxes(storage)
     return resumereader.liveboxes, virtualizable_boxes, virtualref_boxes
 
 
@@ -1264,6 +1305,12 @@ class ResumeDataBoxReader(AbstractResumeDataReader):
         assert box.type == kind
         return box
 
+    def consume_extra_liveboxes(self, storage):
+        from rpython.jit.metainterp.optimizeopt.bridgeopt import get_extra_liveboxes
+        start, kinds = get_extra_liveboxes(storage)
+        for i in range(len(kinds)):
+            self.load_box_from_cpu(start + i, kinds[i])
+
     def load_box_from_cpu(self, num, kind):
         if num < 0:
             num += len(self.liveboxes)
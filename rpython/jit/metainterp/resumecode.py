@@ -20,10 +20,14 @@
 
   # ----- optimization section
   <more code>                                      further sections according to bridgeopt.py
+
+Guards of the same trace whose resume bytecode is identical share a
+single NUMBERING (see ResumeDataLoopMemo.share_numbering()).
 """
 
 from rpython.rtyper.lltypesystem import rffi, lltype
 from rpython.rlib import objectmodel
+from rpython.rlib.rstring import StringBuilder
 
 NUMBERINGP = lltype.Ptr(lltype.GcForwardReference())
 NUMBERING = lltype.GcStruct('Numbering',
@@ -50,6 +54,15 @@ def append_numbering(lst, item):
         lst.append(rffi.cast(rffi.UCHAR, item >> 14))
 
 
+def numbering_key(numb):
+    """Return the bytes of 'numb' as a string, to find identical
+    numberings."""
+    builder = StringBuilder(len(numb.code))
+    for i in range(len(numb.code)):
+        builder.append(chr(rffi.cast(lltype.Signed, numb.code[i])))
+    return builder.build()
+
+
 def numb_next_item(numb, index):
     value = rffi.cast(lltype.Signed, numb.code[index])
     index += 1
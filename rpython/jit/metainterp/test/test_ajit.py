@@ -1885,6 +1885,42 @@ class BasicTests:
         # this checks that the logic triggered by make_a_counter_per_value()
         # works and prevents generating tons of bridges
 
+    def test_guard_class_counter_per_class(self):
+        class A(object):
+            def f(self):
+                return 1
+        class B(A):
+            def f(self):
+                return 2
+        class C(A):
+            def f(self):
+                return 3
+        class D(A):
+            def f(self):
+                return 4
+        class E(A):
+            def f(self):
+                return 5
+        myjitdriver = JitDriver(greens = [], reds = ['i', 'res', 'lst'])
+        def f(n):
+            lst = [A()] * n
+            for x in [B(), C(), D(), E()]:
+                lst += [x] + [A()] * 5
+            i = 0
+            res = 0
+            while i < len(lst):
+                myjitdriver.can_enter_jit(i=i, res=res, lst=lst)
+                myjitdriver.jit_merge_point(i=i, res=res, lst=lst)
+                res += lst[i].f()
+                i += 1
+            return res
+        res = self.meta_interp(f, [20])
+        assert res == 20 + 2 + 3 + 4 + 5 + 4 * 5
+        self.check_trace_count(1)
+        # each of the classes B, C, D and E makes the guard_class fail
+        # only once: with a single counter for all of them, as it was
+        # the case before, we would get two bridges
+
     def test_swap_values(self):
         def f(x, y):
             if x > 5:
@@ -2021,8 +2057,8 @@ class BasicTests:
         res = self.meta_interp(g, [6, 20])
         assert res == g(6, 20)
         self.check_trace_count(8)
-        # 6 extra from sharing guard data
-        self.check_resops(getarrayitem_gc_i=10 + 6)
+        # 4 extra from sharing guard data
+        self.check_resops(getarrayitem_gc_i=10 + 4)
 
     def test_multiple_specialied_versions_bridge(self):
         myjitdriver = JitDriver(greens = [], reds = ['y', 'x', 'z', 'res'])
@@ -3326,7 +3362,7 @@ class BasicTests:
             return x
         res = self.meta_interp(g, [4])
         # used to be 29
-        assert len(get_stats().loops[0].operations[3]._descr.rd_numb.code) == 14
+        assert len(get_stats().loops[0].operations[3]._descr.rd_numb.code) == 15
 
     def test_tail_recursion_elimination_tracing_void(self):
         myjitdriver = JitDriver(greens=[], reds='auto')
@@ -3358,7 +3394,7 @@ class BasicTests:
         res = self.meta_interp(g, [4])
         assert res == g(4)
         # used to be 22
-        assert len(get_stats().loops[0].operations[4]._descr.rd_numb.code) == 12
+        assert len(get_stats().loops[0].operations[4]._descr.rd_numb.code) == 13
 
     def test_uint_mul_high(self):
         from rpython.rlib.rarithmetic import uint_mul_high, intmask, r_uint
@@ -57,7 +57,7 @@ def test_known_classes():
     serialize_optimizer_knowledge(optimizer, numb_state, liveboxes, {}, None)
 
     assert unpack_numbering(numb_state.create_numbering()) == [
-            1, 0b010000, 0, 0, 0]
+            1, 0, 0b010000, 0, 0, 0]
 
     rbox1 = InputArgRef()
     rbox2 = InputArgRef()
@@ -96,7 +96,7 @@ def test_random_class_knowledge(boxes_known_classes):
 
     serialize_optimizer_knowledge(optimizer, numb_state, liveboxes, {}, None)
 
-    assert len(numb_state.create_numbering().code) == 4 + math.ceil(len(refboxes) / 6.0)
+    assert len(numb_state.create_numbering().code) == 5 + math.ceil(len(refboxes) / 6.0)
 
     dct = {box: cls
               for box, known_class in boxes_known_classes
@@ -258,6 +258,32 @@ class TestOptBridge(LLJitMixin):
         self.check_resops(getfield_gc_i=4) # 3x a.x, 1x a.n
         self.check_resops(getfield_gc_r=1) # in main loop
 
+    def test_bridge_reuses_values_of_short_preamble(self):
+        myjitdriver = jit.JitDriver(greens=[], reds=['y', 'res', 'n', 'a'])
+        class A(object):
+            pass
+        class M(object):
+            def __init__(self, x):
+                self.x = x
+        def f(x, y, n):
+            a = A()
+            a.m = M(x)
+            res = 0
+            while y > 0:
+                myjitdriver.jit_merge_point(y=y, n=n, res=res, a=a)
+                res += a.m.x
+                if y > n:
+                    res += 1
+                y -= 1
+            return res
+        res = self.meta_interp(f, [6, 32, 16])
+        assert res == f(6, 32, 16)
+        self.check_trace_count(3)
+        # a.m and a.m.x are read by the preamble and by the bridge out of
+        # the preamble, which jumps to the loop.  The bridge out of the
+        # loop itself gets them from the failing guard instead
+        self.check_resops(getfield_gc_r=2, getfield_gc_i=2)
+
     def test_bridge_array_read(self):
         myjitdriver = jit.JitDriver(greens=[], reds=['y', 'res', 'n', 'a'])
         def f(x, y, n):
@@ -14,7 +14,7 @@ class FakeCPU(object):
     supports_guard_gc_type = True
 
     class Storage:
-        pass
+        compile_time = 0.0
 
     class tracker:
         pass
@@ -42,6 +42,7 @@ class FakeState(object):
     enable_opts = ALL_OPTS_DICT.copy()
     enable_opts.pop('unroll')
     pureop_historylength = 16
+    retrace_hot_bridges = 0
 
     def attach_unoptimized_bridge_from_interp(*args):
         pass
@@ -0,0 +1,105 @@
+from rpython.jit.metainterp.compilebudget import CompileBudget
+from rpython.jit.metainterp.test.test_jitprof import ProfilerMixin
+from rpython.jit.metainterp import pyjitpl
+from rpython.rlib.jit import JitDriver, Counters, set_param
+
+
+class FakeClock(object):
+    def __init__(self, step):
+        self.now = 1000.0
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+def make_budget(milliseconds):
+    budget = CompileBudget()
+    budget.get_time = clock = FakeClock(0.0)
+    budget.set_budget(milliseconds)
+    return budget, clock
+
+def test_no_limit():
+    budget, clock = make_budget(0)
+    for i in range(5):
+        assert budget.can_compile()
+        budget.start_compiling()
+        clock.now += 10.0
+        budget.done_compiling()
+
+def test_budget_exhausted():
+    budget, clock = make_budget(20)
+    assert budget.can_compile()
+    budget.start_compiling()
+    clock.now += 0.015
+    budget.done_compiling()
+    assert budget.can_compile()
+    budget.start_compiling()
+    clock.now += 0.015
+    budget.done_compiling()
+    assert not budget.can_compile()
+    clock.now += 0.5
+    assert not budget.can_compile()
+    clock.now += 0.5      # a new window starts
+    assert budget.can_compile()
+    assert budget.used == 0.0
+
+def test_nested_compilations_counted_once():
+    budget, clock = make_budget(20)
+    assert budget.can_compile()
+    budget.start_compiling()
+    clock.now += 0.005
+    budget.start_compiling()
+    clock.now += 0.005
+    budget.done_compiling()
+    clock.now += 0.005
+    budget.done_compiling()
+    assert abs(budget.used - 0.015) < 1e-9
+
+
+class TestCompileBudget(ProfilerMixin):
+
+    def test_deferred_loop(self, monkeypatch):
+        # every reading of the clock takes 10 ms
+        monkeypatch.setattr(CompileBudget, 'get_time', FakeClock(0.01))
+        myjitdriver = JitDriver(greens=['k'], reds=['i', 'n', 'res'])
+        def f(n):
+            set_param(myjitdriver, 'compile_budget', 5)
+            res = 0
+            k = 0
+            while k < 2:
+                i = n
+                while i > 0:
+                    myjitdriver.can_enter_jit(k=k, i=i, n=n, res=res)
+                    myjitdriver.jit_merge_point(k=k, i=i, n=n, res=res)
+                    res += k + 1
+                    i -= 1
+                k += 1
+            return res
+        res = self.meta_interp(f, [300])
+        assert res == 900
+        profiler = pyjitpl._warmrunnerdesc.metainterp_sd.profiler
+        # the first loop uses up the budget of the window, so the second
+        # one is only traced once the next window starts
+        assert profiler.counters[Counters.DEFERRED_COMPILATIONS] > 0
+        assert profiler.counters[Counters.TRACING] == 2
+
+    def test_no_budget(self):
+        myjitdriver = JitDriver(greens=['k'], reds=['i', 'n', 'res'])
+        def f(n):
+            res = 0
+            k = 0
+            while k < 2:
+                i = n
+                while i > 0:
+                    myjitdriver.can_enter_jit(k=k, i=i, n=n, res=res)
+                    myjitdriver.jit_merge_point(k=k, i=i, n=n, res=res)
+                    res += k + 1
+                    i -= 1
+                k += 1
+            return res
+        res = self.meta_interp(f, [30])
+        assert res == 90
+        profiler = pyjitpl._warmrunnerdesc.metainterp_sd.profiler
+        assert profiler.counters[Counters.DEFERRED_COMPILATIONS] == 0
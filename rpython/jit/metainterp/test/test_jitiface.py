@@ -141,6 +141,37 @@ class JitHookInterfaceTests(object):
             assert jit_hooks.stats_get_counter_value(None,
                                                      Counters.TRACING) == 2
             assert jit_hooks.stats_get_times_value(None, Counters.TRACING) >= 0
+            assert jit_hooks.stats_get_max_times_value(None,
+                                                       Counters.TRACING) >= 0
+
+        self.meta_interp(main, [], ProfilerClass=Profiler)
+
+    def test_get_loop_stats(self):
+        driver = JitDriver(greens = [], reds = ['i', 's'])
+
+        def loop(i):
+            s = 0
+            while i > 0:
+                driver.jit_merge_point(i=i, s=s)
+                if i % 2:
+                    s += 1
+                i -= 1
+                s+= 2
+            return s
+
+        def main():
+            loop(30)
+            loop(30)
+            l = jit_hooks.stats_get_loop_stats(None)
+            assert len(l) == 1
+            assert l[0].number >= 0
+            # each call to loop() enters the loop at least once, and
+            # the guards fail at least at the end of each call
+            assert l[0].entries >= 2
+            assert l[0].guard_failures >= 2
+            assert l[0].bridges >= 1
+            assert l[0].compile_time > 0.0
+            assert l[0].code_size >= 0
 
         self.meta_interp(main, [], ProfilerClass=Profiler)
 
@@ -155,6 +186,8 @@ class JitHookInterfaceTests(object):
             assert jit_hooks.stats_get_counter_value(None,
                                            Counters.TOTAL_COMPILED_LOOPS) == 0
             assert jit_hooks.stats_get_times_value(None, Counters.TRACING) == 0
+            assert jit_hooks.stats_get_max_times_value(None,
+                                                       Counters.BACKEND) == 0
         self.meta_interp(main, [], ProfilerClass=EmptyProfiler)
 
     def test_get_jitcell_at_key(self):
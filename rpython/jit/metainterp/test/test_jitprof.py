@@ -54,6 +54,11 @@ class TestProfile(ProfilerMixin):
             ]
         assert profiler.events == expected
         assert profiler.times == [2, 1]
+        assert profiler.max_times == [3, 1]
+        # the loop was compiled by the end of the BACKEND phase
+        loops = pyjitpl._warmrunnerdesc.memory_manager.get_loop_stats()
+        assert len(loops) == 1
+        assert loops[0].compile_time == 2
         py.test.skip("disabled until unrolling")
         assert profiler.counters == [1, 1, 3, 3, 2, 15, 2, 0, 0, 0, 0,
                                      0, 0, 0, 0, 0, 0, 0]
@@ -126,3 +131,22 @@ class TestProfile(ProfilerMixin):
         profiler = pyjitpl._warmrunnerdesc.metainterp_sd.profiler
         assert profiler.counters[Counters.HEAPCACHED_OPS] == 3
 
+
+    def test_take_phase_time(self):
+        profiler = FakeProfiler()
+        profiler.start()                          # t = 123456
+        profiler.start_tracing()                  # t = 123457
+        profiler.start_backend()                  # t = 123458
+        profiler.end_backend()                    # t = 123459
+        assert profiler.take_phase_time(Counters.TRACING) == 2
+        assert profiler.take_phase_time(Counters.TRACING) == 0
+        # a second loop or bridge sent by the same tracing only counts
+        # the time since the first one
+        profiler.start_backend()                  # t = 123460
+        profiler.end_backend()                    # t = 123461
+        assert profiler.take_phase_time(Counters.TRACING) == 2
+        profiler.end_tracing()                    # t = 123462
+        assert profiler.take_phase_time(Counters.TRACING) == 0.0
+        profiler.start_tracing()                  # t = 123463
+        profiler.start_backend()                  # t = 123464
+        assert profiler.take_phase_time(Counters.TRACING) == 1
@@ -0,0 +1,69 @@
+from rpython.jit.metainterp.test.support import LLJitMixin
+from rpython.jit.metainterp.warmspot import get_stats
+from rpython.rlib.jit import JitDriver, set_param
+
+
+class LoopProfileTests(object):
+
+    def _run(self, retrace_hot_bridges):
+        myjitdriver = JitDriver(greens=[], reds=['k', 'i', 'n', 'res', 'lst'])
+        def f(n):
+            set_param(myjitdriver, 'retrace_hot_bridges', retrace_hot_bridges)
+            lst = [0] * 10 + [1] * (n - 10)
+            res = 0
+            k = 0
+            while k < 3:
+                i = 0
+                while i < n:
+                    myjitdriver.can_enter_jit(k=k, i=i, n=n, res=res, lst=lst)
+                    myjitdriver.jit_merge_point(k=k, i=i, n=n, res=res, lst=lst)
+                    # the loop is traced along the first path, but
+                    # the second one is taken by most iterations
+                    if lst[i] + k == 0:
+                        res += 1
+                    else:
+                        res += 2
+                    i += 1
+                k += 1
+            return res
+        res = self.meta_interp(f, [100])
+        assert res == 590
+        return get_stats()
+
+    def test_retrace_hot_bridge(self):
+        stats = self._run(20)
+        assert len(stats.invalidated_token_numbers) == 1
+        # the loop was traced a second time, along the hot path
+        self.check_jitcell_token_count(2)
+
+    def test_retrace_hot_bridge_single_loop(self):
+        # the loop is never left: after the first iterations, it always
+        # runs into the bridge, which jumps back to the loop
+        myjitdriver = JitDriver(greens=[], reds=['i', 'n', 'res', 'lst'])
+        def f(n):
+            set_param(myjitdriver, 'retrace_hot_bridges', 20)
+            lst = [0] * 10 + [1] * (n - 10)
+            res = 0
+            i = 0
+            while i < n:
+                myjitdriver.jit_merge_point(i=i, n=n, res=res, lst=lst)
+                if lst[i] == 0:
+                    res += 1
+                else:
+                    res += 2
+                i += 1
+            return res
+        res = self.meta_interp(f, [300])
+        assert res == 590
+        stats = get_stats()
+        assert len(stats.invalidated_token_numbers) == 1
+        self.check_jitcell_token_count(2)
+
+    def test_off(self):
+        stats = self._run(0)
+        assert len(stats.invalidated_token_numbers) == 0
+        self.check_jitcell_token_count(1)
+
+
+class TestLoopProfile(LoopProfileTests, LLJitMixin):
+    pass
@@ -21,6 +21,11 @@ from rpython.rlib import rgc
 class FakeLoopToken:
     generation = 0
     invalidated = False
+    code_size = 0
+    counted_code_size = 0
+
+    def get_code_size(self):
+        return self.code_size
 
 
 class _TestMemoryManager:
@@ -78,6 +83,59 @@ class _TestMemoryManager:
             else:
                 assert tokens[i] in memmgr.alive_loops
 
+    def test_max_code_size(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_code_size(4)
+        tokens = [FakeLoopToken() for i in range(10)]
+        for token in tokens:
+            token.code_size = 1024
+            memmgr.keep_loop_alive(token)
+            memmgr.next_generation()
+            memmgr.keep_loop_alive(tokens[0])    # tokens[0] is always run
+        assert memmgr.alive_loops == dict.fromkeys(
+            [tokens[0]] + tokens[7:])
+        assert memmgr.get_alive_code_size() == 4096
+
+    def test_max_code_size_keeps_recent(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_code_size(1)
+        token = FakeLoopToken()
+        token.code_size = 5000
+        memmgr.keep_loop_alive(token)
+        memmgr.next_generation()
+        assert memmgr.alive_loops == {token: None}
+        memmgr.next_generation()
+        assert memmgr.alive_loops == {}
+        memmgr.set_max_code_size(0)
+        memmgr.keep_loop_alive(token)
+        memmgr.next_generation()
+        assert memmgr.alive_loops == {token: None}
+
+    def test_alive_code_size(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_age(3, 1)
+        token1 = FakeLoopToken()
+        token1.code_size = 100
+        memmgr.keep_loop_alive(token1)
+        token2 = FakeLoopToken()
+        token2.code_size = 1000
+        memmgr.keep_loop_alive(token2)
+        assert memmgr.get_alive_code_size() == 1100
+        token1.code_size = 150      # a bridge was attached
+        memmgr.code_size_changed(token1)
+        assert memmgr.get_alive_code_size() == 1150
+        for i in range(3):
+            memmgr.next_generation()
+            memmgr.keep_loop_alive(token2)
+        assert memmgr.alive_loops == {token2: None}
+        assert memmgr.get_alive_code_size() == 1000
+        memmgr.code_size_changed(token1)      # not alive, not counted
+        assert memmgr.get_alive_code_size() == 1000
+        memmgr.release_all_loops()
+        assert memmgr.get_alive_code_size() == 0
+        memmgr.keep_loop_alive(token1)
+        assert memmgr.get_alive_code_size() == 150
+
 
 class _TestIntegration(LLJitMixin):
     # See comments in TestMemoryManager.  To get temporarily the normal
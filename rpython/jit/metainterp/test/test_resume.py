@@ -54,6 +54,9 @@ class FakeOptimizer(object):
             op = op.get_forwarded()
         return op
 
+    def get_loop_invariant_boxes(self):
+        return None
+
 
 # ____________________________________________________________
 
@@ -869,6 +872,24 @@ def test_virtual_adder_memo_const_sharing():
     assert len(memo.consts) == 3
     assert storage2.rd_consts is memo.consts
 
+def test_virtual_adder_numbering_sharing():
+    metainterp_sd = FakeMetaInterpStaticData()
+    memo = ResumeDataLoopMemo(metainterp_sd)
+    storages = []
+    for b2 in [2**23, 2**23, 2**24]:
+        b1s, b2s, b3s = [ConstInt(sys.maxint), ConstInt(b2), ConstInt(-65)]
+        storage, t = make_storage(b1s, b2s, b3s)
+        i = t.get_iter()
+        modifier = ResumeDataVirtualAdder(FakeOptimizer(i), storage, storage,
+                                          i, memo)
+        modifier.finish()
+        storages.append(storage)
+    assert storages[1].rd_numb == storages[0].rd_numb
+    assert storages[2].rd_numb != storages[0].rd_numb
+    assert memo.nresumeshared == 1
+    assert memo.nresumebytes == (len(storages[0].rd_numb.code) +
+                                 len(storages[2].rd_numb.code))
+
 
 class ResumeDataFakeReader(ResumeDataBoxReader):
     """Another subclass of AbstractResumeDataReader meant for tests."""
@@ -1,5 +1,5 @@
 from rpython.jit.metainterp.resumecode import create_numbering,\
-    unpack_numbering, Reader, Writer
+    unpack_numbering, Reader, Writer, numbering_key
 from rpython.rtyper.lltypesystem import lltype
 
 from hypothesis import strategies, given, example
@@ -60,3 +60,11 @@ def test_patch(l):
         n = w.create_numbering()
         assert unpack_numbering(n)[1:] == l
         assert unpack_numbering(n)[0] == middle + 1
+
+@hypothesis_and_examples
+def test_numbering_key(l):
+    n = create_numbering(l)
+    key = numbering_key(n)
+    assert [ord(c) for c in key] == list(n.code)
+    assert numbering_key(create_numbering(l)) == key
+    assert numbering_key(create_numbering(l + [1])) != key
@@ -49,6 +49,62 @@ class TraceLimitTests:
         self.check_trace_count(7)
         self.check_jitcell_token_count(1)
 
+    def test_trace_time_limit(self, monkeypatch):
+        from rpython.jit.metainterp import pyjitpl
+        class FakeTime(object):
+            now = 0.0
+            def time(self):
+                # the clock is read when the traced frame changes, pretend
+                # that it happens every 20 milliseconds
+                self.now += 0.02
+                return self.now
+        monkeypatch.setattr(pyjitpl, 'time', FakeTime())
+
+        def p(pc, code):
+            return "%s %d %s" % (code, pc, code[pc])
+        myjitdriver = JitDriver(greens=['pc', 'code'], reds=['n'],
+                                get_printable_location=p,
+                                is_recursive=True)
+
+        def f(code, n):
+            pc = 0
+            while pc < len(code):
+
+                myjitdriver.jit_merge_point(n=n, code=code, pc=pc)
+                op = code[pc]
+                if op == "-":
+                    n -= 1
+                elif op == "c":
+                    f('--------------------', n)
+                elif op == "l":
+                    if n > 0:
+                        myjitdriver.can_enter_jit(n=n, code=code, pc=0)
+                        pc = 0
+                        continue
+                else:
+                    assert 0
+                pc += 1
+            return n
+        def g(m):
+            set_param(None, 'inlining', True)
+            set_param(None, 'trace_time_limit', 40)
+            if m > 1000000:
+                f('', 0)
+            result = 0
+            s = '-' * 50 + '-c-l-'
+            for i in range(m):
+                result += f(s, i+100)
+            return result
+        res = self.meta_interp(g, [10], backendopt=True, ProfilerClass=Profiler)
+        assert res == g(10)
+        # the tracing is aborted after 40 "milliseconds", like with a
+        # trace_limit, and the inner f() is not inlined any more: it gets
+        # its own loop
+        stats = get_stats()
+        assert stats.metainterp_sd.profiler.counters[
+            Counters.ABORT_TOO_LONG] > 0
+        self.check_jitcell_token_count(2)
+
     def test_virtualizable(self):
         # basically the same test as test_segmented_trace, but the value of n
         # is stored in a virtualizable
@@ -657,6 +657,7 @@ class TestWarmspotDirect(object):
                 return FakeDescr()
             fielddescrof = nodescr
             calldescrof  = nodescr
+            arraydescrof = nodescr
             sizeof       = nodescr
 
             def get_fail_descr_from_number(self, no):
@@ -107,6 +107,7 @@ def test_make_unwrap_greenkey():
 class FakeWarmRunnerDesc:
     cpu = None
     memory_manager = None
+    compile_budget = None
     rtyper = None
     jitcounter = DeterministicJitCounter()
     class metainterp_sd:
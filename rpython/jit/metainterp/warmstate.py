@@ -4,9 +4,10 @@ import weakref
 from rpython.jit.codewriter import support, longlong
 from rpython.jit.metainterp import resoperation, history, jitexc
 from rpython.jit.metainterp.support import ptr2int, int2adr
+from rpython.jit.metainterp.compilebudget import DEFERRED_FRACTION
 from rpython.rlib.debug import debug_start, debug_stop, debug_print
 from rpython.rlib.debug import have_debug_prints_for
-from rpython.rlib.jit import PARAMETERS
+from rpython.rlib.jit import PARAMETERS, Counters
 from rpython.rlib.rjitlog import rjitlog as jl
 from rpython.rlib.nonconst import NonConstant
 from rpython.rlib.objectmodel import specialize, we_are_translated, r_dict
@@ -266,6 +267,11 @@ class WarmEnterState(object):
             raise ValueError
         self.trace_limit = value
 
+    def set_param_trace_time_limit(self, value):
+        if value < 0:
+            raise ValueError
+        self.trace_time_limit = value / 1000.0     # in seconds
+
     def set_param_decay(self, decay):
         self.warmrunnerdesc.jitcounter.set_decay(decay)
 
@@ -296,6 +302,18 @@ class WarmEnterState(object):
             self.warmrunnerdesc.memory_manager is not None):   # all for tests
             self.warmrunnerdesc.memory_manager.set_max_age(value)
 
+    def set_param_max_code_size(self, value):
+        # note: it's a global parameter, not a per-jitdriver one
+        if (self.warmrunnerdesc is not None and
+            self.warmrunnerdesc.memory_manager is not None):   # all for tests
+            self.warmrunnerdesc.memory_manager.set_max_code_size(value)
+
+    def set_param_compile_budget(self, value):
+        # note: it's a global parameter, not a per-jitdriver one
+        if (self.warmrunnerdesc is not None and
+            self.warmrunnerdesc.compile_budget is not None):   # all for tests
+            self.warmrunnerdesc.compile_budget.set_budget(value)
+
     def set_param_retrace_limit(self, value):
         if self.warmrunnerdesc:
             if self.warmrunnerdesc.memory_manager:
@@ -328,6 +346,9 @@ class WarmEnterState(object):
     def set_param_vec_cost(self, ivalue):
         self.vec_cost = ivalue
 
+    def set_param_retrace_hot_bridges(self, value):
+        self.retrace_hot_bridges = value
+
     def disable_noninlinable_function(self, greenkey):
         cell = self.JitCell.ensure_jit_cell_at_key(greenkey)
         cell.flags |= JC_DONT_TRACE_HERE
@@ -357,6 +378,7 @@ class WarmEnterState(object):
 
         warmrunnerdesc = self.warmrunnerdesc
         metainterp_sd = warmrunnerdesc.metainterp_sd
+        compile_budget = warmrunnerdesc.compile_budget
         jitdriver_sd = self.jitdriver_sd
         vinfo = jitdriver_sd.virtualizable_info
         index_of_virtualizable = jitdriver_sd.index_of_virtualizable
@@ -395,6 +417,9 @@ class WarmEnterState(object):
                 virtualizable = args[index_of_virtualizable]
                 vinfo.clear_vable_token(virtualizable)
 
+            clt = loop_token.compiled_loop_token
+            if clt is not None:
+                clt.entry_count += 1
             deadframe = func_execute_token(loop_token, *args)
             #
             # Record in the memmgr that we just ran this loop,
@@ -426,6 +451,11 @@ class WarmEnterState(object):
             from rpython.jit.metainterp.pyjitpl import MetaInterp
             if not confirm_enter_jit(*args):
                 return
+            if not compile_budget.can_compile():
+                # out of compile time for now: try again a bit later
+                metainterp_sd.profiler.count(Counters.DEFERRED_COMPILATIONS)
+                jitcounter.change_current_fraction(hash, DEFERRED_FRACTION)
+                return
             jitcounter.decay_all_counters()
             if rstack.stack_almost_full():
                 return
@@ -438,9 +468,11 @@ class WarmEnterState(object):
                 metainterp_sd, jitdriver_sd,
                 force_finish_trace=bool(cell.flags & JC_FORCE_FINISH))
             cell.flags |= JC_TRACING | JC_TRACING_OCCURRED
+            compile_budget.start_compiling()
             try:
                 metainterp.compile_and_run_once(jitdriver_sd, *args)
             finally:
+                compile_budget.done_compiling()
                 cell.flags &= ~JC_TRACING
 
         def maybe_compile_and_run(increment_threshold, *args):
@@ -10,6 +10,8 @@ import re
 REGEXES = [
     (('tracing_no', 'tracing_time'), '^Tracing:\s+([\d.]+)\s+([\d.]+)$'),
     (('backend_no', 'backend_time'), '^Backend:\s+([\d.]+)\s+([\d.]+)$'),
+    (('tracing_max_time',), '^Tracing max:\s+[\d.]+\s+([\d.]+)$'),
+    (('backend_max_time',), '^Backend max:\s+[\d.]+\s+([\d.]+)$'),
     (None, '^TOTAL.*$'),
     (('ops.total',), '^ops:\s+(\d+)$'),
     (('heapcached_ops', ), '^heapcached ops:\s+(\d+)$'),
@@ -30,8 +32,11 @@ REGEXES = [
     (('nvirtuals',), '^nvirtuals:\s+(\d+)$'),
     (('nvholes',), '^nvholes:\s+(\d+)$'),
     (('nvreused',), '^nvreused:\s+(\d+)$'),
+    (('resume_bytes',), '^resume bytes:\s+(\d+)$'),
+    (('resume_shared',), '^resume shared:\s+(\d+)$'),
     (('vecopt_tried',), '^vecopt tried:\s+(\d+)$'),
     (('vecopt_success',), '^vecopt success:\s+(\d+)$'),
+    (('deferred_compilations',), '^deferred compilations:\s+(\d+)$'),
     (('total_compiled_loops',),   '^Total # of loops:\s+(\d+)$'),
     (('total_compiled_bridges',), '^Total # of bridges:\s+(\d+)$'),
     (('total_freed_loops',),      '^Freed # of loops:\s+(\d+)$'),
@@ -54,6 +59,8 @@ class OutputInfo(object):
     tracing_time = 0.0
     backend_no = 0
     backend_time = 0.0
+    tracing_max_time = 0.0
+    backend_max_time = 0.0
     asm_no = 0
     asm_time = 0.0
     guards = 0
@@ -63,8 +70,11 @@ class OutputInfo(object):
     nvirtuals = 0
     nvholes = 0
     nvreused = 0
+    resume_bytes = 0
+    resume_shared = 0
     vecopt_tried = 0
     vecopt_success = 0
+    deferred_compilations = 0
 
     def __init__(self):
         self.ops = Ops()
@@ -52,6 +52,8 @@ def test_really_run():
 
 DATA = '''Tracing:         1       0.006992
 Backend:        1       0.000525
+Tracing max:    1       0.006992
+Backend max:    1       0.000525
 TOTAL:                  0.025532
 ops:                    2
 heapcached ops:         111
@@ -72,8 +74,11 @@ virtualizables forced:  1123
 nvirtuals:              13
 nvholes:                14
 nvreused:               15
+resume bytes:           1234
+resume shared:          5
 vecopt tried:           12
 vecopt success:         4
+deferred compilations:  7
 Total # of loops:       100
 Total # of bridges:     300
 Freed # of loops:       99
@@ -86,6 +91,8 @@ def test_parse():
     assert info.tracing_time == 0.006992
     assert info.backend_no == 1
     assert info.backend_time == 0.000525
+    assert info.tracing_max_time == 0.006992
+    assert info.backend_max_time == 0.000525
     assert info.ops.total == 2
     assert info.heapcached_ops == 111
     assert info.recorded_ops.total == 6
@@ -103,5 +110,8 @@ def test_parse():
     assert info.nvirtuals == 13
     assert info.nvholes == 14
     assert info.nvreused == 15
+    assert info.resume_bytes == 1234
+    assert info.resume_shared == 5
     assert info.vecopt_tried == 12
     assert info.vecopt_success == 4
+    assert info.deferred_compilations == 7
@@ -1,5 +1,14 @@
+from rpython.rtyper.lltypesystem import lltype
 from rpython.rlib import rgc
 
+# The result of a heap census, passed to GcHooks.on_gc_census(): item 'i'
+# counts the surviving objects whose type has the member index 'i' (the
+# index used by rgc.get_typeids_z() and by the heap dumps)
+HEAP_CENSUS = lltype.Array(lltype.Struct('HEAP_CENSUS_ITEM',
+                                         ('count', lltype.Signed),
+                                         ('size', lltype.Signed)))
+
+
 # WARNING: at the moment of writing, gc hooks are implemented only for
 # incminimark. Please add calls to hooks to the other GCs if you need it.
 class GcHooks(object):
@@ -21,6 +30,9 @@ class GcHooks(object):
     def is_gc_collect_enabled(self):
         return False
 
+    def is_gc_census_enabled(self):
+        return False
+
     def on_gc_minor(self, duration, total_memory_used, pinned_objects):
         """
         Called after a minor collection
@@ -45,6 +57,16 @@ class GcHooks(object):
         Called after a major collection is fully done
         """
 
+    def on_gc_census(self, census):
+        """
+        Called at the end of the sweeping phase of a major collection, if
+        is_gc_census_enabled() was true when the sweeping started.
+
+        ``census`` is a raw array of HEAP_CENSUS giving the number and the
+        total size of the objects which survived, by type.  It is owned by
+        the GC and stays valid until the next census is done.
+        """
+
     # the fire_* methods are meant to be called from the GC and should NOT be
     # overridden
 
@@ -68,3 +90,8 @@ class GcHooks(object):
                                arenas_count_before, arenas_count_after,
                                arenas_bytes, rawmalloc_bytes_before,
                                rawmalloc_bytes_after, pinned_objects)
+
+    @rgc.no_collect
+    def fire_gc_census(self, census):
+        if self.is_gc_census_enabled():
+            self.on_gc_census(census)
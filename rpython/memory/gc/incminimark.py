@@ -9,6 +9,16 @@ Environment variables can be used to fine-tune the following parameters:
  PYPY_GC_NURSERY_DEBUG   If set to non-zero, will fill nursery with garbage,
                          to help debugging.
 
+ PYPY_GC_NURSERY_MAX     If set to more than the nursery size, the nursery
+                         size becomes adaptive: after each minor collection
+                         it can grow (up to this value) when few objects
+                         survive, or shrink when most objects survive or
+                         when the minor collection took longer than
+                         PYPY_GC_MAX_PAUSE.
+
+ PYPY_GC_NURSERY_MIN     With PYPY_GC_NURSERY_MAX, the smallest size of the
+                         nursery.  Defaults to 1/4 of the nursery size.
+
  PYPY_GC_INCREMENT_STEP  The size of memory marked during the marking step.
                          Default is size of nursery * 2. If you mark it too high
                          your GC is not incremental at all. The minimum is set
@@ -52,6 +62,20 @@ Environment variables can be used to fine-tune the following parameters:
                          in time.  Defaults to a conservative value depending
                          on nursery size and maximum object size inside the
                          nursery.  Useful for debugging by setting it to 0.
+
+ PYPY_GC_MARK_PREFETCH   The number of objects whose header is prefetched
+                         ahead of the one being marked during major
+                         collections.  Defaults to 8, at most 64.  Set it
+                         to 1 to disable prefetching.
+
+ PYPY_GC_MAX_PAUSE       If set, the target duration in seconds of the
+                         marking and sweeping steps of major collections,
+                         like '0.002' for 2ms.  The size of the steps is
+                         then adapted to the measured speed of marking and
+                         sweeping, instead of PYPY_GC_INCREMENT_STEP.  A
+                         marking or sweeping step is still large enough
+                         to keep up with the objects surviving minor
+                         collections.
 """
 # XXX Should find a way to bound the major collection threshold by the
 # XXX total addressable size.  Maybe by keeping some minimarkpage arenas
@@ -67,6 +91,7 @@ from rpython.rtyper.lltypesystem import lltype, llmemory, llarena, llgroup
 from rpython.rtyper.lltypesystem.lloperation import llop
 from rpython.rtyper.lltypesystem.llmemory import raw_malloc_usage
 from rpython.memory.gc.base import GCBase, MovingGCBase
+from rpython.memory.gc.hook import HEAP_CENSUS
 from rpython.memory.gc import env
 from rpython.memory.support import mangle_hash
 from rpython.rlib.rarithmetic import ovfcheck, LONG_BIT, intmask, r_uint
@@ -191,6 +216,25 @@ STATE_FINALIZING = 3
 
 GC_STATES = ['SCANNING', 'MARKING', 'SWEEPING', 'FINALIZING']
 
+# How many objects are prefetched ahead during marking, see
+# visit_all_objects_step() and PYPY_GC_MARK_PREFETCH
+MARK_PREFETCH_DEFAULT = 8
+MARK_PREFETCH_MAX = 64
+
+# With an adaptive nursery size (PYPY_GC_NURSERY_MAX), the nursery is
+# halved when more than NURSERY_SURVIVAL_HIGH of it survives a minor
+# collection, and doubled when less than NURSERY_SURVIVAL_LOW survives
+NURSERY_SURVIVAL_HIGH = 0.5
+NURSERY_SURVIVAL_LOW = 0.1
+
+# During the sweeping phase, how many not-yet-swept pages of a size class
+# are swept on demand when that size class has no page with room left,
+# see ArenaCollection.mass_free_lazily()
+LAZY_SWEEP_MAX_PAGES = 4
+
+# Initial length of the array of a heap census, see census_add()
+CENSUS_MIN_LENGTH = 256
+
 
 FORWARDSTUB = lltype.GcStruct('forwarding_stub',
                               ('forw', llmemory.Address))
@@ -285,6 +329,8 @@ class IncrementalMiniMarkGC(MovingGCBase):
                  read_from_env=False,
                  nursery_size=32*WORD,
                  nursery_cleanup=9*WORD,
+                 nursery_min_size=0,
+                 nursery_max_size=0,
                  page_size=16*WORD,
                  arena_size=64*WORD,
                  small_request_threshold=5*WORD,
@@ -299,6 +345,19 @@ class IncrementalMiniMarkGC(MovingGCBase):
         assert small_request_threshold % WORD == 0
         self.read_from_env = read_from_env
         self.nursery_size = nursery_size
+        #
+        # The bounds of the nursery size if it is adaptive, or 0 if it
+        # is fixed; see adapt_nursery_size()
+        self.nursery_min_size = nursery_min_size
+        self.nursery_max_size = nursery_max_size
+        self.nursery_resizes = 0
+        self.nursery_survival_rate = 0.0
+        #
+        # The heap census filled while sweeping, and the last completed one;
+        # see census_add()
+        self.census_active = False
+        self.census = lltype.nullptr(HEAP_CENSUS)
+        self.census_result = lltype.nullptr(HEAP_CENSUS)
 
         self.small_request_threshold = small_request_threshold
         self.major_collection_threshold = major_collection_threshold
@@ -385,6 +444,14 @@ class IncrementalMiniMarkGC(MovingGCBase):
         self.rawmalloced_total_size = r_uint(0)
         self.rawmalloced_peak_size = r_uint(0)
         self.total_gc_time = 0.0
+        #
+        # With PYPY_GC_MAX_PAUSE, the target duration of a major step and
+        # the measured speeds: bytes marked, pages swept and rawmalloced
+        # objects swept per second.  Zero if unknown so far.
+        self.max_pause = 0.0
+        self.mark_speed = 0.0
+        self.sweep_speed = 0.0
+        self.rawsweep_speed = 0.0
 
         self.gc_state = STATE_SCANNING
 
@@ -447,6 +514,7 @@ class IncrementalMiniMarkGC(MovingGCBase):
             self.allocate_nursery()
             self.gc_increment_step = self.nursery_size * 4
             self.gc_nursery_debug = False
+            self.mark_prefetch_depth = MARK_PREFETCH_DEFAULT
         else:
             #
             defaultsize = self.nursery_size
@@ -472,6 +540,18 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 self.debug_tiny_nursery = newsize & ~(WORD-1)
                 newsize = minsize
             #
+            nursery_max = env.read_from_env('PYPY_GC_NURSERY_MAX')
+            if nursery_max > newsize and self.debug_tiny_nursery < 0:
+                nursery_min = env.read_from_env('PYPY_GC_NURSERY_MIN')
+                if nursery_min <= 0:
+                    nursery_min = newsize // 4
+                if nursery_min < minsize:
+                    nursery_min = minsize
+                if nursery_min > newsize:
+                    nursery_min = newsize
+                self.nursery_min_size = nursery_min & ~(WORD-1)
+                self.nursery_max_size = nursery_max & ~(WORD-1)
+            #
             major_coll = env.read_float_from_env('PYPY_GC_MAJOR_COLLECT')
             if major_coll > 1.0:
                 self.major_collection_threshold = major_coll
@@ -508,11 +588,30 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 self.gc_nursery_debug = True
             else:
                 self.gc_nursery_debug = False
+            #
+            mark_prefetch = env.read_uint_from_env('PYPY_GC_MARK_PREFETCH')
+            if mark_prefetch > MARK_PREFETCH_MAX:
+                self.mark_prefetch_depth = MARK_PREFETCH_MAX
+            elif mark_prefetch > 0:
+                self.mark_prefetch_depth = intmask(mark_prefetch)
+            else:
+                self.mark_prefetch_depth = MARK_PREFETCH_DEFAULT
+            #
+            max_pause = env.read_float_from_env('PYPY_GC_MAX_PAUSE')
+            if max_pause > 0.0:
+                self.max_pause = max_pause
             self._minor_collection()    # to empty the nursery
             llarena.arena_free(self.nursery)
             self.nursery_size = newsize
             self.allocate_nursery()
         #
+        # The objects popped from 'objects_to_trace' wait in this ring
+        # while their header is being fetched, see visit_all_objects_step()
+        self.mark_prefetch_fifo = lltype.malloc(self._ADDRARRAY,
+                                                self.mark_prefetch_depth,
+                                                flavor='raw',
+                                                track_allocation=False)
+        #
         env_max_number_of_pinned_objects = os.environ.get('PYPY_GC_MAX_PINNED')
         if env_max_number_of_pinned_objects:
             try:
@@ -525,7 +624,10 @@ class IncrementalMiniMarkGC(MovingGCBase):
         else:
             # Estimate this number conservatively
             bigobj = self.nonlarge_max + 1
-            self.max_number_of_pinned_objects = self.nursery_size / (bigobj * 2)
+            nursery_size = self.nursery_size
+            if self.nursery_max_size > 0:
+                nursery_size = self.nursery_min_size
+            self.max_number_of_pinned_objects = nursery_size / (bigobj * 2)
 
     def enable(self):
         self.enabled = True
@@ -538,7 +640,8 @@ class IncrementalMiniMarkGC(MovingGCBase):
 
     def _nursery_memory_size(self):
         extra = self.nonlarge_max + 1
-        return self.nursery_size + extra
+        # an adaptive nursery is allocated at its maximal size
+        return max(self.nursery_size, self.nursery_max_size) + extra
 
     def _alloc_nursery(self):
         # the start of the nursery: we actually allocate a bit more for
@@ -1007,6 +1110,9 @@ class IncrementalMiniMarkGC(MovingGCBase):
                       "rounding up made totalsize > small_request_threshold")
             #
             # Allocate from the ArenaCollection.  Don't clear it.
+            if self.gc_state == STATE_SWEEPING:
+                self.ac.mass_free_lazily(totalsize, self._free_if_unvisited,
+                                         LAZY_SWEEP_MAX_PAGES)
             result = self.ac.malloc(totalsize)
             #
             extra_flags = GCFLAG_TRACK_YOUNG_PTRS
@@ -1781,6 +1887,15 @@ class IncrementalMiniMarkGC(MovingGCBase):
         # inside the nursery. We reset it here and increase it in
         # '_trace_drag_out()'.
         any_pinned_object_from_earlier = self.any_pinned_object_kept
+        #
+        # How much of the nursery was used, if it is contiguous
+        nursery_used = 0
+        if not any_pinned_object_from_earlier:
+            if self.nursery_free:
+                nursery_used = self.nursery_free - self.nursery
+            else:
+                # from collect_and_reserve(): the nursery is full
+                nursery_used = self.nursery_top - self.nursery
         self.pinned_objects_in_nursery = 0
         self.any_pinned_object_kept = False
         #
@@ -1965,6 +2080,11 @@ class IncrementalMiniMarkGC(MovingGCBase):
         self.root_walker.finished_minor_collection()
         #
         duration = time.time() - start
+        if nursery_used > 0:
+            self.nursery_survival_rate = (float(self.nursery_surviving_size) /
+                                          float(nursery_used))
+            if self.nursery_max_size > 0:
+                self.adapt_nursery_size(nursery_used, duration)
         self.total_gc_time += duration
         debug_print("time taken:", duration)
         debug_stop("gc-minor")
@@ -1973,6 +2093,45 @@ class IncrementalMiniMarkGC(MovingGCBase):
             total_memory_used=total_memory_used,
             pinned_objects=self.pinned_objects_in_nursery)
 
+    def adapt_nursery_size(self, nursery_used, duration):
+        """Called after a minor collection if the nursery size is adaptive.
+        Few surviving objects mean that the nursery works well, and
+        that a larger one would be collected less often for the same
+        copying work: double it.  If most objects survive, they must be
+        copied anyway and a larger nursery only makes longer pauses:
+        halve it.  Also halve it if the minor collection took more than
+        'max_pause', and don't double it if it took more than half.
+        The nursery is allocated at 'nursery_max_size' from the start,
+        so resizing it only moves 'nursery_top'.
+        """
+        if self.pinned_objects_in_nursery > 0 or self.gc_nursery_debug:
+            return     # keep the nursery barriers valid
+        if nursery_used < self.nursery_size // 2:
+            return     # not a full nursery, e.g. an explicit collection
+        #
+        newsize = self.nursery_size
+        slow = self.max_pause > 0.0 and duration > self.max_pause
+        if self.nursery_survival_rate > NURSERY_SURVIVAL_HIGH or slow:
+            newsize = (newsize // 2) & ~(WORD-1)
+            if newsize < self.nursery_min_size:
+                newsize = self.nursery_min_size
+        elif self.nursery_survival_rate < NURSERY_SURVIVAL_LOW:
+            if not (self.max_pause > 0.0 and duration * 2 > self.max_pause):
+                newsize = newsize * 2
+                if newsize > self.nursery_max_size:
+                    newsize = self.nursery_max_size
+        if newsize == self.nursery_size:
+            return
+        #
+        ll_assert(self.nursery_free == self.nursery,
+                  "adapt_nursery_size: the nursery is not empty")
+        debug_print("survival rate", self.nursery_survival_rate,
+                    "- changing the nursery size from", self.nursery_size,
+                    "to", newsize)
+        self.nursery_size = newsize
+        self.nursery_top = self.nursery + newsize
+        self.nursery_resizes += 1
+
     def _reset_flag_old_objects_pointing_to_pinned(self, obj, ignore):
         ll_assert(self.header(obj).tid & GCFLAG_PINNED_OBJECT_PARENT_KNOWN != 0,
                   "!GCFLAG_PINNED_OBJECT_PARENT_KNOWN, but requested to reset.")
@@ -2304,6 +2463,9 @@ class IncrementalMiniMarkGC(MovingGCBase):
         if (r_uint(raw_malloc_usage(totalsize)) <=
             r_uint(self.small_request_threshold)):
             # most common path
+            if self.gc_state == STATE_SWEEPING:
+                self.ac.mass_free_lazily(totalsize, self._free_if_unvisited,
+                                         LAZY_SWEEP_MAX_PAGES)
             return self.ac.malloc(totalsize)
         else:
             # for nursery objects that are not small
@@ -2451,12 +2613,18 @@ class IncrementalMiniMarkGC(MovingGCBase):
                         self.objects_to_trace.length(),
                         "plus",
                         self.more_objects_to_trace.length())
-            estimate = self.gc_increment_step
+            estimate = self.paced_step_size(intmask(self.gc_increment_step),
+                                            self.mark_speed)
             estimate_from_nursery = self.nursery_surviving_size * 2
             if estimate_from_nursery > estimate:
                 estimate = estimate_from_nursery
             estimate = intmask(estimate)
+            step_start = time.time()
             remaining = self.visit_all_objects_step(estimate)
+            if remaining <= 0:
+                # the whole budget was used: a valid measure of the speed
+                self.mark_speed = self.measured_speed(
+                    self.mark_speed, estimate, time.time() - step_start)
             #
             if remaining >= estimate // 2:
                 if self.more_objects_to_trace.non_empty():
@@ -2530,6 +2698,8 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 #
                 self.stat_ac_arenas_count = self.ac.arenas_count
                 self.stat_rawmalloced_total_size = self.rawmalloced_total_size
+                if self.hooks.is_gc_census_enabled():
+                    self.census_start()
                 self.gc_state = STATE_SWEEPING
             #END MARKING
         elif self.gc_state == STATE_SWEEPING:
@@ -2539,9 +2709,21 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 # have the GCFLAG_VISITED flag.  Visit at most 'limit' objects.
                 # This limit is conservatively high enough to guarantee that
                 # a total object size of at least '3 * nursery_size' bytes
-                # is processed.
+                # is processed.  With PYPY_GC_MAX_PAUSE, it is adapted to
+                # the measured speed instead, but it is still large enough
+                # to keep up with the objects surviving minor collections.
                 limit = 3 * self.nursery_size // self.small_request_threshold
+                limit = self.paced_step_size(limit, self.rawsweep_speed)
+                min_limit = (self.nursery_surviving_size * 2 //
+                             self.small_request_threshold)
+                if limit < min_limit:
+                    limit = min_limit
+                step_start = time.time()
                 nobjects = self.free_unvisited_rawmalloc_objects_step(limit)
+                if nobjects <= 0:
+                    # exactly 'limit' objects were visited
+                    self.rawsweep_speed = self.measured_speed(
+                        self.rawsweep_speed, limit, time.time() - step_start)
                 debug_print("freeing raw objects:", limit-nobjects,
                             "freed, limit was", limit)
                 done = False    # the 2nd half below must still be done
@@ -2549,16 +2731,29 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 # Ask the ArenaCollection to visit a fraction of the objects.
                 # Free the ones that have not been visited above, and reset
                 # GCFLAG_VISITED on the others.  Visit at most '3 *
-                # nursery_size' bytes.
+                # nursery_size' bytes, or with PYPY_GC_MAX_PAUSE what fits
+                # in the pause but at least twice the surviving objects.
                 limit = 3 * self.nursery_size // self.ac.page_size
+                limit = self.paced_step_size(limit, self.sweep_speed)
+                min_limit = (self.nursery_surviving_size * 2 //
+                             self.ac.page_size)
+                if limit < min_limit:
+                    limit = min_limit
+                step_start = time.time()
                 done = self.ac.mass_free_incremental(self._free_if_unvisited,
                                                      limit)
+                if not done:
+                    # exactly 'limit' pages were swept
+                    self.sweep_speed = self.measured_speed(
+                        self.sweep_speed, limit, time.time() - step_start)
                 status = done and "No more pages left." or "More to do."
                 debug_print("freeing GC objects, up to", limit, "pages.", status)
             # XXX tweak the limits above
             #
             if done:
                 self.num_major_collects += 1
+                if self.census_active:
+                    self.census_done()
                 #
                 # We also need to reset the GCFLAG_VISITED on prebuilt GC objects.
                 self.prebuilt_root_objects.foreach(self._reset_gcflag_visited, None)
@@ -2643,6 +2838,32 @@ class IncrementalMiniMarkGC(MovingGCBase):
             oldstate=oldstate,
             newstate=self.gc_state)
 
+    def paced_step_size(self, default_size, speed):
+        """Return the amount of work to do in a major collection step.
+        Without PYPY_GC_MAX_PAUSE, or as long as 'speed' was not measured,
+        it is 'default_size'.  Otherwise, it is what should take
+        'max_pause' seconds at this speed.
+        """
+        if self.max_pause <= 0.0 or speed <= 0.0:
+            return default_size
+        size = self.max_pause * speed
+        if size < 1.0:
+            return 1
+        if size > float(sys.maxint // 2):
+            return sys.maxint // 2
+        return int(size)
+
+    def measured_speed(self, speed, amount, duration):
+        """Update the measured 'speed' after 'amount' of work was done
+        in 'duration' seconds.  Only needed with PYPY_GC_MAX_PAUSE."""
+        if self.max_pause <= 0.0 or amount <= 0 or duration <= 0.0:
+            return speed     # nothing (reliable) to measure
+        new_speed = amount / duration
+        if speed > 0.0:
+            # smooth the variations between the steps
+            new_speed = (speed + new_speed) * 0.5
+        return new_speed
+
     def _sweep_old_objects_pointing_to_pinned(self, obj, new_list):
         if self.header(obj).tid & GCFLAG_VISITED:
             new_list.append(obj)
@@ -2652,6 +2873,8 @@ class IncrementalMiniMarkGC(MovingGCBase):
         obj = hdr + size_gc_header
         if self.header(obj).tid & GCFLAG_VISITED:
             self.header(obj).tid &= ~GCFLAG_VISITED
+            if self.census_active:
+                self.census_add(obj)
             return False     # survives
         return True      # dies
 
@@ -2696,11 +2919,75 @@ class IncrementalMiniMarkGC(MovingGCBase):
     def free_unvisited_rawmalloc_objects_step(self, nobjects):
         while self.raw_malloc_might_sweep.non_empty() and nobjects > 0:
             obj = self.raw_malloc_might_sweep.pop()
+            if self.census_active and self.header(obj).tid & GCFLAG_VISITED:
+                self.census_add(obj)
             self.free_rawmalloced_object_if_unvisited(obj, GCFLAG_VISITED)
             nobjects -= 1
 
         return nobjects
 
+    # ----------
+    # Heap census: while sweeping, every surviving old object is seen exactly
+    # once, so if the hooks ask for it we count them there by type.  Objects
+    # which become old during the sweeping phase are not counted, nor are
+    # the prebuilt objects.
+
+    def census_start(self):
+        census = self.census
+        if not census:
+            self.census_grow(0)     # a new array, full of zeroes
+        else:
+            i = 0
+            while i < len(census):
+                census[i].count = 0
+                census[i].size = 0
+                i += 1
+        self.census_active = True
+
+    def census_add(self, obj):
+        index = self.get_member_index(self.get_type_id(obj))
+        census = self.census
+        if index >= len(census):
+            census = self.census_grow(index + 1)
+        size_gc_header = self.gcheaderbuilder.size_gc_header
+        totalsize = size_gc_header + self.get_size(obj)
+        census[index].count += 1
+        census[index].size += raw_malloc_usage(totalsize)
+
+    def census_grow(self, minlength):
+        old = self.census
+        oldlength = 0
+        newlength = CENSUS_MIN_LENGTH
+        if old:
+            oldlength = len(old)
+            newlength = oldlength * 2
+        while newlength < minlength:
+            newlength *= 2
+        census = lltype.malloc(HEAP_CENSUS, newlength, flavor='raw',
+                               track_allocation=False)
+        i = 0
+        while i < newlength:
+            if i < oldlength:
+                census[i].count = old[i].count
+                census[i].size = old[i].size
+            else:
+                census[i].count = 0
+                census[i].size = 0
+            i += 1
+        if old:
+            lltype.free(old, flavor='raw', track_allocation=False)
+        self.census = census
+        return census
+
+    def census_done(self):
+        # keep the result around for the hooks, and fill the other array
+        # next time
+        self.census_active = False
+        result = self.census
+        self.census = self.census_result
+        self.census_result = result
+        self.hooks.fire_gc_census(result)
+
 
     def collect_nonstack_roots(self):
         # Non-stack roots: first, the objects from 'prebuilt_root_objects'
@@ -2765,14 +3052,49 @@ class IncrementalMiniMarkGC(MovingGCBase):
     TEST_VISIT_SINGLE_STEP = False    # for tests
 
     def visit_all_objects_step(self, size_to_track):
-        # Objects can be added to pending by visit
+        # Objects can be added to pending by visit.
+        #
+        # Marking is mostly waiting for the cache misses on the headers
+        # of the objects.  So the objects popped from 'pending' are not
+        # visited immediately: their header is prefetched and they wait
+        # in the small 'mark_prefetch_fifo' ring, until the objects
+        # popped before them have been visited.  The order in which the
+        # objects are visited doesn't matter.
         pending = self.objects_to_trace
-        while pending.non_empty():
-            obj = pending.pop()
+        fifo = self.mark_prefetch_fifo
+        depth = self.mark_prefetch_depth
+        if self.TEST_VISIT_SINGLE_STEP:
+            depth = 1     # visit the objects in the order of 'pending'
+        size_gc_header = self.gcheaderbuilder.size_gc_header
+        head = 0
+        count = 0
+        while True:
+            while count < depth and pending.non_empty():
+                obj = pending.pop()
+                llop.prefetch_read(lltype.Void, obj - size_gc_header)
+                index = head + count
+                if index >= depth:
+                    index -= depth
+                fifo[index] = obj
+                count += 1
+            if count == 0:
+                return size_to_track
+            obj = fifo[head]
+            head += 1
+            if head == depth:
+                head = 0
+            count -= 1
             size_to_track -= self.visit(obj)
             if size_to_track < 0 or self.TEST_VISIT_SINGLE_STEP:
+                # put the waiting objects back into 'pending', in the
+                # order in which they were popped
+                while count > 0:
+                    count -= 1
+                    index = head + count
+                    if index >= depth:
+                        index -= depth
+                    pending.append(fifo[index])
                 return 0
-        return size_to_track
 
     def visit(self, obj):
         #
@@ -3151,6 +3473,18 @@ class IncrementalMiniMarkGC(MovingGCBase):
             return intmask(self.nursery_size)
         elif stats_no == rgc.TOTAL_GC_TIME:
             return int(self.total_gc_time * 1000)
+        elif stats_no == rgc.NURSERY_MIN_SIZE:
+            if self.nursery_max_size > 0:
+                return intmask(self.nursery_min_size)
+            return intmask(self.nursery_size)
+        elif stats_no == rgc.NURSERY_MAX_SIZE:
+            if self.nursery_max_size > 0:
+                return intmask(self.nursery_max_size)
+            return intmask(self.nursery_size)
+        elif stats_no == rgc.NURSERY_RESIZES:
+            return self.nursery_resizes
+        elif stats_no == rgc.NURSERY_SURVIVAL_RATE:
+            return int(self.nursery_survival_rate * 1000)
         return 0
 
 
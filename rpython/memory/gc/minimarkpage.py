@@ -373,6 +373,25 @@ class ArenaCollection(object):
         return True
 
 
+    def mass_free_lazily(self, size, ok_to_free_func, max_pages):
+        """Called between mass_free_prepare() and the end of the calls
+        to mass_free_incremental(), before allocating a block of the
+        given 'size'.  If no page of this size class has room left but
+        some of its pages were not walked yet, walk up to 'max_pages' of
+        them now, so that malloc() can reuse their freed blocks instead
+        of taking a fresh page.  The walked pages are re-chained as in
+        mass_free_incremental(), which will then skip them.
+        """
+        nsize = llmemory.raw_malloc_usage(size)
+        size_class = nsize >> WORD_POWER_2
+        while (self.page_for_size[size_class] == PAGE_NULL and
+               max_pages > 0 and
+               (self.old_full_page_for_size[size_class] != PAGE_NULL or
+                self.old_page_for_size[size_class] != PAGE_NULL)):
+            self.mass_free_in_pages(size_class, ok_to_free_func, 1)
+            max_pages -= 1
+
+
     def mass_free(self, ok_to_free_func):
         """For each object, if ok_to_free_func(obj) returns True, then free
         the object.
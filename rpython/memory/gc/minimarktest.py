@@ -53,6 +53,9 @@ class SimpleArenaCollection(object):
                 return False
         return True
 
+    def mass_free_lazily(self, size, ok_to_free_func, max_pages):
+        pass     # there are no pages to reuse
+
     def mass_free(self, ok_to_free_func):
         self.mass_free_prepare()
         res = self.mass_free_incremental(ok_to_free_func, sys.maxint)
@@ -646,6 +646,135 @@ class TestIncrementalMiniMarkGCSimple(TestMiniMarkGCSimple):
         self.gc._minor_collection()
         self.gc.debug_check_consistency()
 
+    def test_visit_step_with_prefetching(self):
+        for i in range(5):
+            curobj = self.malloc(S)
+            curobj.x = i
+            self.stackroots.append(curobj)
+        self.gc.debug_gc_step_until(incminimark.STATE_MARKING)
+        pending = self.gc.objects_to_trace.tolist()    # top first
+        assert len(pending) == 5
+        #
+        # more objects are prefetched than visited: the others must be
+        # put back in 'objects_to_trace', in the same order
+        self.gc.visit_all_objects_step(1)
+        assert self.gc.objects_to_trace.tolist() == pending[1:]
+        hdr = self.gc.header(pending[0])
+        assert hdr.tid & incminimark.GCFLAG_VISITED
+        #
+        self.gc.visit_all_objects()
+        assert not self.gc.objects_to_trace.non_empty()
+        for obj in pending:
+            assert self.gc.header(obj).tid & incminimark.GCFLAG_VISITED
+
+    def test_max_pause(self):
+        gc = self.gc
+        assert gc.max_pause == 0.0
+        assert gc.paced_step_size(1000, 1e6) == 1000       # disabled
+        assert gc.measured_speed(0.0, 500, 0.001) == 0.0
+        #
+        gc.max_pause = 0.002
+        assert gc.paced_step_size(1000, 0.0) == 1000       # not measured
+        assert gc.paced_step_size(1000, 1e6) == 2000
+        assert gc.paced_step_size(1000, 10.0) == 1
+        speed = gc.measured_speed(0.0, 500, 0.001)
+        assert speed == 500000.0
+        assert gc.measured_speed(speed, 1500, 0.001) == 1000000.0
+        assert gc.measured_speed(speed, 1500, 0.0) == speed
+        #
+        # the speeds are measured during a major collection
+        for i in range(50):
+            curobj = self.malloc(S)
+            curobj.x = i
+            self.stackroots.append(curobj)
+        gc.TEST_VISIT_SINGLE_STEP = True
+        gc.debug_gc_step_until(incminimark.STATE_SCANNING)
+        gc.debug_gc_step_until(incminimark.STATE_SWEEPING)
+        assert gc.mark_speed > 0.0
+
+    def sweeping_limits(self, max_pause, surviving_size):
+        # run the sweeping of a major collection with very slow measured
+        # speeds, and return the limits given to each sweeping step
+        gc = self.gc
+        gc.max_pause = max_pause
+        gc.sweep_speed = 10.0
+        gc.rawsweep_speed = 10.0
+        limits = []
+        def mass_free_incremental(ok_to_free_func, max_pages):
+            limits.append(('pages', max_pages))
+            return True
+        def free_unvisited_rawmalloc_objects_step(nobjects):
+            limits.append(('raw', nobjects))
+            while gc.raw_malloc_might_sweep.non_empty():
+                gc.raw_malloc_might_sweep.pop()
+            return nobjects          # didn't use the whole limit
+        gc.ac.mass_free_incremental = mass_free_incremental
+        gc.free_unvisited_rawmalloc_objects_step = (
+            free_unvisited_rawmalloc_objects_step)
+        #
+        self.stackroots.append(self.malloc(S))
+        gc.debug_gc_step_until(incminimark.STATE_SWEEPING)
+        gc.raw_malloc_might_sweep.append(llmemory.NULL)
+        while gc.gc_state == incminimark.STATE_SWEEPING:
+            # as if 'surviving_size' bytes survived the minor collection
+            # done just before the step
+            gc.nursery_surviving_size = surviving_size
+            gc.major_collection_step()
+        return limits
+
+    def test_max_pause_sweeping_limits(self):
+        # the slow speeds give steps of a single page or object, below
+        # the default sizes
+        limits = self.sweeping_limits(0.002, 0)
+        assert limits == [('raw', 1), ('pages', 1)]
+        # the raw sweeping step stopped before its limit: no new speed
+        assert self.gc.rawsweep_speed == 10.0
+
+    def test_max_pause_sweeping_keeps_up(self):
+        # but the steps are large enough to keep up with the objects
+        # surviving the minor collections
+        gc = self.gc
+        limits = self.sweeping_limits(0.002, 8 * gc.ac.page_size)
+        assert limits == [
+            ('raw', 16 * gc.ac.page_size // gc.small_request_threshold),
+            ('pages', 16)]
+
+    def test_no_max_pause_sweeping_limits(self):
+        gc = self.gc
+        limits = self.sweeping_limits(0.0, 0)
+        assert limits == [
+            ('raw', 3 * gc.nursery_size // gc.small_request_threshold),
+            ('pages', 3 * gc.nursery_size // gc.ac.page_size)]
+
+    def test_adaptive_nursery_size(self):
+        from rpython.rlib import rgc
+        gc = self.gc
+        assert gc.nursery_size == 32*WORD
+        assert gc.get_stats(rgc.NURSERY_MIN_SIZE) == 16*WORD
+        assert gc.get_stats(rgc.NURSERY_MAX_SIZE) == 128*WORD
+        #
+        # only garbage: the nursery grows up to its maximal size
+        for i in range(100):
+            self.malloc(S)
+        assert gc.nursery_size == 128*WORD
+        assert gc.nursery_top == gc.nursery + 128*WORD
+        assert gc.get_stats(rgc.NURSERY_RESIZES) == 2
+        assert gc.get_stats(rgc.NURSERY_SURVIVAL_RATE) == 0
+        #
+        # all objects survive: the nursery shrinks down to its minimal size
+        for i in range(100):
+            self.stackroots.append(self.malloc(S))
+        assert gc.nursery_size == 16*WORD
+        assert gc.get_stats(rgc.NURSERY_RESIZES) == 5
+        assert gc.get_stats(rgc.NURSERY_SURVIVAL_RATE) == 1000
+        #
+        gc._minor_collection()    # already at the minimal size
+        assert gc.nursery_size == 16*WORD
+        for i in range(100):
+            assert self.stackroots[i]
+    test_adaptive_nursery_size.GC_PARAMS = {'nursery_min_size': 16*WORD,
+                                            'nursery_max_size': 128*WORD}
+
     def test_sweeping_simple(self):
         assert self.gc.gc_state == incminimark.STATE_SCANNING
 
@@ -1,6 +1,6 @@
 from rpython.rtyper.lltypesystem import lltype, llmemory
 from rpython.memory.gc.hook import GcHooks
-from rpython.memory.gc.test.test_direct import BaseDirectGCTest, S
+from rpython.memory.gc.test.test_direct import BaseDirectGCTest, S, VAR
 
 
 class MyGcHooks(GcHooks):
@@ -10,6 +10,7 @@ class MyGcHooks(GcHooks):
         self._gc_minor_enabled = False
         self._gc_collect_step_enabled = False
         self._gc_collect_enabled = False
+        self._gc_census_enabled = False
         self.reset()
 
     def is_gc_minor_enabled(self):
@@ -21,10 +22,14 @@ class MyGcHooks(GcHooks):
     def is_gc_collect_enabled(self):
         return self._gc_collect_enabled
 
+    def is_gc_census_enabled(self):
+        return self._gc_census_enabled
+
     def reset(self):
         self.minors = []
         self.steps = []
         self.collects = []
+        self.censuses = []
         self.durations = []
 
     def on_gc_minor(self, duration, total_memory_used, pinned_objects):
@@ -53,6 +58,13 @@ class MyGcHooks(GcHooks):
             'pinned_objects': pinned_objects,
         })
 
+    def on_gc_census(self, census):
+        d = {}
+        for i in range(len(census)):
+            if census[i].count:
+                d[i] = (census[i].count, census[i].size)
+        self.censuses.append(d)
+
 
 class TestIncMiniMarkHooks(BaseDirectGCTest):
     from rpython.memory.gc.incminimark import IncrementalMiniMarkGC as GCClass
@@ -135,3 +147,35 @@ class TestIncMiniMarkHooks(BaseDirectGCTest):
         assert self.gc.hooks.minors == []
         assert self.gc.hooks.steps == []
         assert self.gc.hooks.collects == []
+        assert self.gc.hooks.censuses == []
+
+    def test_on_gc_census(self):
+        gc = self.gc
+        gc.hooks._gc_census_enabled = True
+        self.stackroots.append(self.malloc(S))
+        self.stackroots.append(self.malloc(S))
+        self.malloc(S)    # dies
+        self.stackroots.append(self.malloc(VAR, 100))    # raw-malloced
+        def index(p):
+            obj = llmemory.cast_ptr_to_adr(p)
+            return gc.get_member_index(gc.get_type_id(obj))
+        size_gc_header = gc.gcheaderbuilder.size_gc_header
+        size_of_VAR = llmemory.raw_malloc_usage(
+            size_gc_header + llmemory.sizeof(VAR, 100))
+        index_S = index(self.stackroots[0])
+        index_VAR = index(self.stackroots[2])
+        gc.hooks.reset()    # allocating VAR may have run a major collection
+        gc.collect()
+        assert gc.hooks.censuses == [{index_S: (2, self.size_of_S * 2),
+                                      index_VAR: (1, size_of_VAR)}]
+        gc.hooks.reset()
+        #
+        # the census doesn't accumulate across major collections
+        self.stackroots.pop()
+        gc.collect()
+        assert gc.hooks.censuses == [{index_S: (2, self.size_of_S * 2)}]
+        gc.hooks.reset()
+        #
+        gc.hooks._gc_census_enabled = False
+        gc.collect()
+        assert gc.hooks.censuses == []
@@ -402,13 +402,40 @@ def test_mass_free_half_page_becomes_more_free():
     assert freepages(ac) == NULL
     assert ac.full_page_for_size[2] == PAGE_NULL
 
+def test_mass_free_lazily():
+    pagesize = hdrsize + 9*WORD
+    ac = arena_collection_for_test(pagesize, "##", fill_with_objects=2)
+    ok_to_free = OkToFree(ac, 0.5)
+    ac.mass_free_prepare()
+    ac.mass_free_lazily(3*WORD, ok_to_free, 4)     # other size class
+    assert ok_to_free.seen == {}
+    ac.mass_free_lazily(2*WORD, ok_to_free, 4)
+    assert ok_to_free.seen == {hdrsize + 0*WORD: False,
+                               hdrsize + 2*WORD: True,
+                               hdrsize + 4*WORD: False,
+                               hdrsize + 6*WORD: True}
+    page = getpage(ac, 0)
+    assert page == ac.page_for_size[2]
+    assert ac.old_full_page_for_size[2] == getpage(ac, 1)
+    ac.mass_free_lazily(2*WORD, ok_to_free, 4)     # there is room now
+    assert len(ok_to_free.seen) == 4
+    #
+    obj = ac.malloc(2*WORD); chkob(ac, 0, 2*WORD, obj)
+    obj = ac.malloc(2*WORD); chkob(ac, 0, 6*WORD, obj)
+    #
+    # the 2nd page is left to mass_free_incremental()
+    assert ac.mass_free_incremental(ok_to_free, 10) is True
+    assert len(ok_to_free.seen) == 8
+    assert ac.page_for_size[2] == getpage(ac, 1)
+    assert ac.full_page_for_size[2] == page
+
 # ____________________________________________________________
 
 class DoneTesting(Exception):
     counter = 0
 
 @given(random=strategies.randoms())
-def randomize(random, incremental):
+def randomize(random, incremental, lazily):
     pagesize = hdrsize + 24*WORD
     num_pages = 3
     ac = arena_collection_for_test(pagesize, " " * num_pages)
@@ -432,12 +459,16 @@ def randomize(random, incremental):
         a.mark_freed = my_mark_freed
     ac.allocate_new_arena = my_allocate_new_arena
 
-    def allocate_object(live_objects):
+    def allocate_object(live_objects, ok_to_free=None):
         size_class = random.randrange(1, 7)
+        if ok_to_free is not None:
+            ac.mass_free_lazily(size_class * WORD, ok_to_free,
+                                random.randrange(1, 3))
         obj = ac.malloc(size_class * WORD)
         at = (obj.arena, obj.offset)
         assert at not in live_objects
         live_objects[at] = size_class * WORD
+        return size_class * WORD
 
     try:
         while True:
@@ -466,9 +497,11 @@ def randomize(random, incremental):
                     total_memory_after = ac.total_memory_used
                     assert total_memory_after <= total_memory_before
                     print '[]'
-                    prev = ac.total_memory_used
-                    allocate_object(live_objects_extra)
-                    fresh_extra += ac.total_memory_used - prev
+                    if lazily:
+                        fresh_extra += allocate_object(live_objects_extra,
+                                                       ok_to_free)
+                    else:
+                        fresh_extra += allocate_object(live_objects_extra)
             #
             # Check that we have seen all objects
             assert sorted(ok_to_free.seen) == sorted(live_objects)
@@ -487,7 +520,10 @@ def randomize(random, incremental):
         pass
 
 def test_random():
-    randomize(incremental=False)
+    randomize(incremental=False, lazily=False)
 
 def test_random_incremental():
-    randomize(incremental=True)
+    randomize(incremental=True, lazily=False)
+
+def test_random_incremental_lazily():
+    randomize(incremental=True, lazily=True)
@@ -1402,6 +1402,8 @@ class GcHooksStats(object):
     minors = 0
     steps = 0
     collects = 0
+    censuses = 0
+    census_objects = 0
 
     def reset(self):
         # the NonConstant are needed so that the annotator annotates the
@@ -1411,6 +1413,8 @@ class GcHooksStats(object):
         self.minors = NonConstant(0)
         self.steps = NonConstant(0)
         self.collects = NonConstant(0)
+        self.censuses = NonConstant(0)
+        self.census_objects = NonConstant(-1)     # until the first census
 
 
 class MyGcHooks(GcHooks):
@@ -1427,6 +1431,9 @@ class MyGcHooks(GcHooks):
     def is_gc_collect_enabled(self):
         return True
 
+    def is_gc_census_enabled(self):
+        return True
+
     def on_gc_minor(self, duration, total_memory_used, pinned_objects):
         self.stats.minors += 1
 
@@ -1439,6 +1446,13 @@ class MyGcHooks(GcHooks):
                       rawmalloc_bytes_after, pinned_objects):
         self.stats.collects += 1
 
+    def on_gc_census(self, census):
+        self.stats.censuses += 1
+        total = 0
+        for i in range(len(census)):
+            total += census[i].count
+        self.stats.census_objects = total
+
 
 class TestIncrementalMiniMarkGC(TestMiniMarkGC):
     gcname = "incminimark"
@@ -1520,6 +1534,28 @@ class TestIncrementalMiniMarkGC(TestMiniMarkGC):
         assert steps == 4 * collects   # 4 steps for each major collection
         assert minors == steps         # one minor collection for each step
 
+    def define_gc_census_hook(cls):
+        from rpython.rlib import objectmodel
+        S = lltype.GcStruct('S', ('x', lltype.Signed))
+        A = lltype.GcArray(lltype.Ptr(S))
+        stats = cls.gchooks.stats
+        def f():
+            stats.reset()
+            lst = lltype.malloc(A, 100)
+            for i in range(100):
+                lst[i] = lltype.malloc(S)
+            llop.gc__collect(lltype.Void)
+            llop.gc__collect(lltype.Void)
+            objectmodel.keepalive_until_here(lst)
+            return 1000 * stats.censuses + stats.census_objects
+        return f
+
+    def test_gc_census_hook(self):
+        run = self.runner("gc_census_hook")
+        censuses, objects = divmod(run([]), 1000)
+        assert censuses >= 2       # the allocations may run more collections
+        assert objects >= 101      # 'lst' and its items, at least
+
 # ________________________________________________________________
 # tagged pointers
 
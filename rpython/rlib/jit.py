@@ -568,6 +568,9 @@ PARAMETER_DOCS = {
     'trace_eagerness': 'number of times a guard has to fail before we start compiling a bridge',
     'decay': 'amount to regularly decay counters by (0=none, 1000=max)',
     'trace_limit': 'number of recorded operations before we abort tracing with ABORT_TOO_LONG',
+    'trace_time_limit': 'number of milliseconds of tracing before we abort '
+                        'it with ABORT_TOO_LONG, like trace_limit (0 = no '
+                        'limit)',
     'inlining': 'inline python functions or not (1/0)',
     'loop_longevity': 'a parameter controlling how long loops will be kept before being freed, an estimate',
     'retrace_limit': 'how many times we can try retracing before giving up',
@@ -583,6 +586,15 @@ PARAMETER_DOCS = {
     'vec_cost': 'threshold for which traces to bail. Unpacking increases the counter,'\
                 ' vector operation decrease the cost',
     'vec_all': 'try to vectorize trace loops that occur outside of the numpypy library',
+    'max_code_size': 'maximum size in kilobytes of the machine code of the '
+                     'compiled loops; beyond it, the loops that were run the '
+                     'least recently are freed (0 = no limit)',
+    'compile_budget': 'maximum number of milliseconds per second spent tracing '
+                      'and compiling; further compilations are deferred '
+                      '(0 = no limit)',
+    'retrace_hot_bridges': 'trace a loop again when one of its bridges runs '
+                           'in more than two thirds of its iterations, after '
+                           'this many runs of the bridge (0 = off)',
 }
 
 PARAMETERS = {'threshold': 1039, # just above 1024, prime
@@ -590,6 +602,7 @@ PARAMETERS = {'threshold': 1039, # just above 1024, prime
               'trace_eagerness': 200,
               'decay': 40,
               'trace_limit': 6000,
+              'trace_time_limit': 0,
               'inlining': 1,
               'loop_longevity': 1000,
               'retrace_limit': 0,
@@ -602,6 +615,9 @@ PARAMETERS = {'threshold': 1039, # just above 1024, prime
               'vec': 0,
               'vec_all': 0,
               'vec_cost': 0,
+              'max_code_size': 0,
+              'compile_budget': 0,
+              'retrace_hot_bridges': 0,
               }
 unroll_parameters = unrolling_iterable(PARAMETERS.items())
 
@@ -1435,6 +1451,9 @@ class Counters(object):
     NVIRTUALS
     NVHOLES
     NVREUSED
+    RESUME_BYTES
+    RESUME_SHARED
+    DEFERRED_COMPILATIONS
     TOTAL_COMPILED_LOOPS
     TOTAL_COMPILED_BRIDGES
     TOTAL_FREED_LOOPS
@@ -111,6 +111,10 @@ def stats_get_counter_value(warmrunnerdesc, no):
 def stats_get_times_value(warmrunnerdesc, no):
     return warmrunnerdesc.metainterp_sd.profiler.get_times(no)
 
+@register_helper(annmodel.SomeFloat())
+def stats_get_max_times_value(warmrunnerdesc, no):
+    return warmrunnerdesc.metainterp_sd.profiler.get_max_times(no)
+
 LOOP_RUN_CONTAINER = lltype.GcArray(lltype.Struct('elem',
                                                   ('type', lltype.Char),
                                                   ('number', lltype.Signed),
@@ -120,6 +124,20 @@ LOOP_RUN_CONTAINER = lltype.GcArray(lltype.Struct('elem',
 def stats_get_loop_run_times(warmrunnerdesc):
     return warmrunnerdesc.metainterp_sd.cpu.get_all_loop_runs()
 
+LOOP_STATS_CONTAINER = lltype.GcArray(lltype.Struct('loopstats',
+                                                  ('number', lltype.Signed),
+                                                  ('entries', lltype.Signed),
+                                                  ('guard_failures',
+                                                   lltype.Signed),
+                                                  ('bridges', lltype.Signed),
+                                                  ('compile_time',
+                                                   lltype.Float),
+                                                  ('code_size', lltype.Signed)))
+
+@register_helper(lltype.Ptr(LOOP_STATS_CONTAINER))
+def stats_get_loop_stats(warmrunnerdesc):
+    return warmrunnerdesc.memory_manager.get_loop_stats()
+
 @register_helper(annmodel.SomeInteger(unsigned=True))
 def stats_asmmemmgr_allocated(warmrunnerdesc):
     return warmrunnerdesc.metainterp_sd.cpu.asmmemmgr.get_stats()[0]
@@ -128,6 +146,10 @@ def stats_asmmemmgr_allocated(warmrunnerdesc):
 def stats_asmmemmgr_used(warmrunnerdesc):
     return warmrunnerdesc.metainterp_sd.cpu.asmmemmgr.get_stats()[1]
 
+@register_helper(annmodel.SomeInteger(unsigned=True))
+def stats_asmmemmgr_peak(warmrunnerdesc):
+    return warmrunnerdesc.metainterp_sd.cpu.asmmemmgr.get_stats()[2]
+
 @register_helper(None)
 def stats_memmgr_release_all(warmrunnerdesc):
     warmrunnerdesc.memory_manager.release_all_loops()
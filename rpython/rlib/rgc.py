@@ -874,7 +874,8 @@ def cast_gcref_to_int(gcref):
 (TOTAL_MEMORY, TOTAL_ALLOCATED_MEMORY, TOTAL_MEMORY_PRESSURE,
  PEAK_MEMORY, PEAK_ALLOCATED_MEMORY, TOTAL_ARENA_MEMORY,
  TOTAL_RAWMALLOCED_MEMORY, PEAK_ARENA_MEMORY, PEAK_RAWMALLOCED_MEMORY,
- NURSERY_SIZE, TOTAL_GC_TIME) = range(11)
+ NURSERY_SIZE, TOTAL_GC_TIME, NURSERY_MIN_SIZE, NURSERY_MAX_SIZE,
+ NURSERY_RESIZES, NURSERY_SURVIVAL_RATE) = range(15)
 
 @not_rpython
 def get_stats(stat_no):
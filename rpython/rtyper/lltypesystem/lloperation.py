@@ -420,6 +420,7 @@ LL_OPERATIONS = {
     'raw_load':             LLOp(revdb_protect=True, sideeffects=False,
                                                      canrun=True),
     'raw_store':            LLOp(revdb_protect=True, canrun=True),
+    'prefetch_read':        LLOp(canrun=True),   # a hint only
     'bare_raw_store':       LLOp(revdb_protect=True),
     'gc_load_indexed':      LLOp(sideeffects=False, canrun=True),
     'gc_store':             LLOp(canrun=True),   # only used by the boehm gc
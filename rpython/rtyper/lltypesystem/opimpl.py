@@ -776,6 +776,9 @@ def op_gc_store_indexed(p, index, newvalue, scale, base_ofs):
     p = rffi.cast(rffi.CArrayPtr(TVAL), llmemory.cast_ptr_to_adr(p) + ofs)
     p[0] = newvalue
 
+def op_prefetch_read(addr):
+    checkadr(addr)
+
 def op_likely(x):
     assert isinstance(x, bool)
     return x
@@ -32,6 +32,12 @@
 #define OP_RAW_MEMCOPY(x,y,size,r) memcpy(y,x,size);
 #define OP_RAW_MEMMOVE(x,y,size,r) memmove(y,x,size);
 
+#ifdef __GNUC__
+#  define OP_PREFETCH_READ(x, r)  __builtin_prefetch((void *)(x), 0, 3)
+#else
+#  define OP_PREFETCH_READ(x, r)  /* nothing */
+#endif
+
 /************************************************************/
 
 #define OP_FREE(p)	OP_RAW_FREE(p, do_not_use)
@@ -133,6 +133,20 @@ def test_raw_memcopy():
     res = fc()
     assert res
 
+def test_prefetch_read():
+    from rpython.rtyper.lltypesystem import lltype
+    from rpython.rtyper.lltypesystem.lloperation import llop
+    def f():
+        addr = raw_malloc(100)
+        addr.signed[0] = 12
+        llop.prefetch_read(lltype.Void, addr)
+        result = addr.signed[0]
+        raw_free(addr)
+        return result
+    fc = compile(f, [])
+    res = fc()
+    assert res == 12
+
 def test_raw_memmove():
     def f():
         addr = raw_malloc(100)